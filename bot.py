@@ -11,11 +11,19 @@ from tgbot.config import load_config, Config
 from tgbot.handlers import routers_list
 from tgbot.middlewares.config import ConfigMiddleware
 from tgbot.middlewares.database import DatabaseMiddleware
+from tgbot.middlewares.callback_answer import CallbackAnswerMiddleware, CallbackAnswerTracker
+from tgbot.middlewares.throttling import ThrottlingMiddleware, MemoryThrottleStorage, RedisThrottleStorage
+from tgbot.services.export import CsvExporter
+from tgbot.services.jobs import register_jobs
+from tgbot.services.outbox import OutboxDispatcher
+from tgbot.services.scheduler import JobScheduler
+from tgbot.utils.render_cache import precompile_static_markups
 from aiogram.client.bot import Bot, DefaultBotProperties
 
 
 
-def register_global_middlewares(dp: Dispatcher, config: Config, session_pool=None):
+def register_global_middlewares(dp: Dispatcher, config: Config, session_pool=None, throttle_storage=None,
+                                callback_answer_tracker=None):
     """
     Register global middlewares for the given dispatcher.
     Global middlewares here are the ones that are applied to all the handlers (you specify the type of update)
@@ -24,9 +32,13 @@ def register_global_middlewares(dp: Dispatcher, config: Config, session_pool=Non
     :type dp: Dispatcher
     :param config: The configuration object from the loaded configuration.
     :param session_pool: Optional session pool object for the database using SQLAlchemy.
+    :param throttle_storage: Storage of the per-user throttling state (memory or Redis).
+    :param callback_answer_tracker: Bot session middleware deduplicating callback answers.
     :return: None
     """
     middleware_types = [
+        # Goes first, so rejected taps never open a database session
+        ThrottlingMiddleware(throttle_storage),
         ConfigMiddleware(config),
         DatabaseMiddleware(session_pool)
     ]
@@ -35,6 +47,10 @@ def register_global_middlewares(dp: Dispatcher, config: Config, session_pool=Non
         dp.message.outer_middleware(middleware_type)
         dp.callback_query.outer_middleware(middleware_type)
 
+    # Inner middleware, because the flags of the matched handler are needed
+    if callback_answer_tracker is not None:
+        dp.callback_query.middleware(CallbackAnswerMiddleware(callback_answer_tracker))
+
 
 def setup_logging():
     """
@@ -94,15 +110,45 @@ async def main():
     )
     dp = Dispatcher(storage=storage)
 
+    # Early callback acknowledgements must not collide with handlers' own answers
+    callback_answer_tracker = CallbackAnswerTracker()
+    bot.session.middleware(callback_answer_tracker)
+
     engine = create_engine(config.db)
     session_pool = create_session_pool(engine)
 
+    # Background jobs: promotion boundaries and periodic maintenance
+    scheduler = JobScheduler(session_pool)
+    register_jobs(scheduler)
+    dp["scheduler"] = scheduler
+
+    # CSV exports run in the background with their own sessions
+    dp["exporter"] = CsvExporter(session_pool)
+
+    # Side effects recorded in the outbox together with orders and promotions
+    outbox = OutboxDispatcher(session_pool, bot, config.tg_bot.admin_ids)
+    dp["outbox"] = outbox
+
     dp.include_routers(*routers_list)
 
-    register_global_middlewares(dp, config, session_pool)
+    # Throttling state is shared through Redis when the FSM storage is there too
+    if isinstance(storage, RedisStorage):
+        throttle_storage = RedisThrottleStorage(storage.redis)
+    else:
+        throttle_storage = MemoryThrottleStorage()
+    register_global_middlewares(dp, config, session_pool, throttle_storage, callback_answer_tracker)
+
+    # Static menus are built once here instead of on every click
+    logging.getLogger(__name__).info(f"Precompiled {precompile_static_markups()} static keyboards")
 
-    await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+    await scheduler.start()
+    await outbox.start()
+    try:
+        await bot.delete_webhook(drop_pending_updates=True)
+        await dp.start_polling(bot)
+    finally:
+        await outbox.stop()
+        await scheduler.stop()
 
 if __name__ == "__main__":
     try:
@@ -6,6 +6,9 @@ from .base import Base
 from .subscriptions import Subscription, SubscriptionType
 from .specifications import Specification
 from .categories import Category
+from .scheduled_jobs import ScheduledJob
+from .media_files import MediaFile
+from .outbox import OutboxEvent
 
 # Import models with simple dependencies next
 from .products import Product
@@ -16,11 +19,14 @@ from .admin_users import AdminUser
 
 # Import models with complex dependencies last
 from .users import User
-from .orders import Order
+from .orders import Order, OrderStatusTransition
+from .order_items import OrderItem
 from .favorites import Favorite
+from .price_alerts import PriceAlert
+from .stock_waitlist import StockWaitlistEntry
 from .chats import Chat
 from .promotions import Promotion, DiscountType
 from .product_promotions import ProductPromotion
 from .reviews import Review
 from .categories import ProductCategory
-from .statistics import ProductStatistic
\ No newline at end of file
+from .statistics import ProductStatistic, ActionStatistic, RollupWatermark
\ No newline at end of file
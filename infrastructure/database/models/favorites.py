@@ -1,6 +1,6 @@
 # infrastructure/database/models/favorites.py
 
-from sqlalchemy import Column, Integer, ForeignKey, TIMESTAMP, func
+from sqlalchemy import Column, Integer, ForeignKey, TIMESTAMP, UniqueConstraint, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from infrastructure.database.models.base import Base, TableNameMixin, TimestampMixin
 
@@ -17,6 +17,12 @@ class Favorite(Base, TableNameMixin, TimestampMixin):
     user = relationship("User", back_populates="favorites")
     product = relationship("Product", back_populates="favorited_by")
 
+    # One row per (user, product): adding is an idempotent INSERT ... ON CONFLICT DO NOTHING.
+    # The index also serves the per-user favorites list.
+    __table_args__ = (
+        UniqueConstraint('user_id', 'product_id', name='uq_favorites_user_product'),
+    )
+
     def __repr__(self):
         return (
             f"<Favorite id={self.id} user_id={self.user_id} "
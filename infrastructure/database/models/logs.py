@@ -1,20 +1,79 @@
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import ForeignKey, String, Text, TIMESTAMP, BIGINT, func
+from enum import IntEnum
+from typing import Any, Dict, Optional
+from sqlalchemy import ForeignKey, SmallInteger, TIMESTAMP, BIGINT, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import Mapped, mapped_column
 from infrastructure.database.models.base import Base, TableNameMixin
 
 
+class LogAction(IntEnum):
+    """
+    Codes of logged user actions, stored as a small integer.
+
+    The codes are persisted: never renumber existing members, only append new ones.
+    """
+    OTHER = 0  # Legacy action without its own code, the original name is kept in details
+    VIEW_PRODUCT = 1
+    OPEN_FILTER_MENU = 2
+    FILTER_PRODUCTS = 3
+    INITIATE_PURCHASE = 4
+    ORDER_CREATED = 5
+    CANCEL_PURCHASE = 6
+    ADD_FAVORITE = 7
+    REMOVE_FAVORITE = 8
+    SEARCH_PRODUCTS = 9
+    VIEW_CATALOG = 10
+    SEND_NOTIFICATION = 11
+    NOTIFICATION_ERROR = 12
+    ADMIN_AUTHORIZED = 13
+    ADD_ADMIN = 14
+    REMOVE_ADMIN = 15
+
+    @property
+    def label(self) -> str:
+        """
+        Readable action name (as it was stored before the codes were introduced).
+        """
+        return self.name.lower()
+
+
+class LogActionType(TypeDecorator):
+    """
+    Column type storing LogAction as its small integer code.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return int(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return LogAction(value) if value is not None else None
+
+
 class Log(Base, TableNameMixin):
     """
     Logs table representing user actions for audit or debugging purposes.
+
+    The table is range-partitioned by month on ``timestamp`` (partitions are named
+    logs_pYYYYMM), so the partition key is a part of the primary key.
+    Actions are stored as LogAction codes, their parameters (product_id, order_id, ...)
+    as a JSONB object in ``details``.
     """
 
     log_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id"), nullable=False)
-    action: Mapped[str] = mapped_column(String(255), nullable=False)
-    details: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    timestamp: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now())
+    action: Mapped[LogAction] = mapped_column(LogActionType, nullable=False)
+    details: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    timestamp: Mapped[datetime] = mapped_column(TIMESTAMP, primary_key=True, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_logs_timestamp", "timestamp"),
+        Index("ix_logs_action_timestamp", "action", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
     def __repr__(self):
-        return f"<Log {self.log_id} User: {self.user_id} Action: {self.action} Time: {self.timestamp}>"
+        return f"<Log {self.log_id} User: {self.user_id} Action: {self.action.label} Time: {self.timestamp}>"
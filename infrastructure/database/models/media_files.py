@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import String, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+from infrastructure.database.models.base import Base
+
+
+class MediaFile(Base):
+    """
+    Cache of images already uploaded to Telegram.
+    
+    Attributes:
+        id: Unique record identifier
+        source: Original image location (local path or URL) as stored in products.image_url
+        content_hash: SHA-256 of the image content, used to deduplicate identical images
+        file_id: Telegram file_id returned after the upload
+        created_at: Upload time
+    """
+    __tablename__ = 'media_files'
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    source: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True, index=True)
+    file_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<MediaFile {self.id} source='{self.source}' file_id='{self.file_id}'>"
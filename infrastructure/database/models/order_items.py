@@ -0,0 +1,30 @@
+from decimal import Decimal
+from sqlalchemy import ForeignKey, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from infrastructure.database.models.base import Base
+
+
+class OrderItem(Base):
+    """
+    Line item of an order placed from the cart.
+    
+    Attributes:
+        item_id: Unique line item identifier
+        order_id: Parent order
+        product_id: Ordered product
+        quantity: Number of items of the product
+        unit_price: Price of one item at checkout time
+    """
+    __tablename__ = 'order_items'
+
+    item_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.order_id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.product_id"), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    unit_price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+
+    order = relationship("Order", back_populates="items")
+    product = relationship("Product")
+
+    def __repr__(self):
+        return f"<OrderItem {self.item_id} order_id={self.order_id} product_id={self.product_id} quantity={self.quantity}>"
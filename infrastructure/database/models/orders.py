@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime
+from typing import List, Optional
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
 from infrastructure.database.models.base import Base, TimestampMixin, TableNameMixin
@@ -11,7 +12,8 @@ class Order(Base, TimestampMixin, TableNameMixin):
     Attributes:
         order_id: Primary key, unique identifier for the order.
         user_id: Foreign key linking to the user who placed the order.
-        product_id: Foreign key linking to the product being ordered.
+        product_id: Foreign key linking to the product being ordered (NULL for cart orders,
+            whose products are listed in items).
         quantity: Number of items in the order.
         total_price: Total price for the order (calculated as product price * quantity).
         status: Current status of the order (e.g., 'Processing', 'Delivered', 'Cancelled').
@@ -21,13 +23,24 @@ class Order(Base, TimestampMixin, TableNameMixin):
 
     order_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id"), nullable=False)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.product_id"), nullable=False)
+    product_id: Mapped[Optional[int]] = mapped_column(ForeignKey("products.product_id"), nullable=True)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     total_price: Mapped[float] = mapped_column(Float, nullable=False)
     status: Mapped[str] = mapped_column(String(50), nullable=False, server_default="Processing")
 
     user = relationship("User", back_populates="orders")
     product = relationship("Product", back_populates="orders")
+    items: Mapped[List["OrderItem"]] = relationship(
+        "OrderItem", back_populates="order", cascade="all, delete-orphan"
+    )
+
+    # Indexes for period queries (statistics for the current day, exports) and for
+    # the admin order list, newest first, filtered by status or by user
+    __table_args__ = (
+        Index("ix_orders_created_at", "created_at"),
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+    )
 
     def __repr__(self):
         return (
@@ -35,3 +48,23 @@ class Order(Base, TimestampMixin, TableNameMixin):
             f"product_id={self.product_id}, quantity={self.quantity}, "
             f"total_price={self.total_price}, status={self.status})>"
         )
+
+
+class OrderStatusTransition(Base):
+    """
+    Allowed order status transitions.
+
+    Bulk status updates join this table, so a transition that is not listed here
+    is never applied, and the allowed transitions are validated in SQL.
+
+    Attributes:
+        from_status: Current status of the order.
+        to_status: Status the order may be moved to.
+    """
+    __tablename__ = "order_status_transitions"
+
+    from_status: Mapped[str] = mapped_column(String(50), primary_key=True)
+    to_status: Mapped[str] = mapped_column(String(50), primary_key=True)
+
+    def __repr__(self):
+        return f"<OrderStatusTransition {self.from_status} -> {self.to_status}>"
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import BigInteger, Index, Integer, String, Text, TIMESTAMP, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from infrastructure.database.models.base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Side effect (message to send, notification to fan out) recorded in the same
+    transaction as the business change that caused it.
+
+    A background dispatcher claims pending events with FOR UPDATE SKIP LOCKED and
+    processes them; failed events are retried with exponential backoff.
+
+    Attributes:
+        event_id: Unique event identifier (also the processing order)
+        kind: Event kind, selects the dispatcher handler (e.g. send_message, order_created)
+        payload: Event parameters
+        attempts: Number of failed processing attempts
+        next_attempt_at: Earliest time of the next processing attempt
+        created_at: Time the event was recorded
+        processed_at: Time the event was processed or given up (NULL while pending)
+        last_error: Error of the last failed attempt
+    """
+    __tablename__ = 'outbox_events'
+
+    event_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now())
+    processed_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Pending events are claimed by next_attempt_at; processed ones are not indexed
+    __table_args__ = (
+        Index(
+            "ix_outbox_events_pending", "next_attempt_at", "event_id",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<OutboxEvent {self.event_id} kind={self.kind} attempts={self.attempts}>"
@@ -0,0 +1,33 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import BigInteger, ForeignKey, Numeric, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+from infrastructure.database.models.base import Base
+
+
+class PriceAlert(Base):
+    """
+    Last price-drop alert sent to a user about a favorited product.
+    
+    Used to deduplicate alerts: a user is alerted again about the same product
+    only when the price falls below the last alerted price (or the alert is old).
+    
+    Attributes:
+        user_id: Alerted user
+        product_id: Product the alert was about
+        price: Price reported in the last alert
+        notified_at: Time of the last alert
+    """
+    __tablename__ = 'price_alerts'
+
+    user_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True
+    )
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.product_id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    notified_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<PriceAlert user_id={self.user_id} product_id={self.product_id} price={self.price}>"
@@ -3,7 +3,7 @@
 from typing import Optional, List, TYPE_CHECKING
 from enum import Enum
 from decimal import Decimal
-from sqlalchemy import String, Text, Numeric, TIMESTAMP, CheckConstraint, Integer, Boolean, Enum as SQLAlchemyEnum
+from sqlalchemy import String, Text, Numeric, TIMESTAMP, CheckConstraint, UniqueConstraint, Index, Integer, Boolean, Enum as SQLAlchemyEnum, true, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column, validates
 from infrastructure.database.models.base import Base, TimestampMixin, TableNameMixin
 
@@ -23,6 +23,7 @@ class Product(Base, TimestampMixin, TableNameMixin):
     
     Attributes:
         product_id: Unique product identifier
+        sku: Supplier article (stock keeping unit), the key of price list imports
         name: Product name
         description: Product description
         type: Product type (door, accessory, etc.)
@@ -30,9 +31,15 @@ class Product(Base, TimestampMixin, TableNameMixin):
         price: Product price
         stock_quantity: Quantity in stock
         is_in_stock: Flag indicating product availability
-        discount_price: Discounted price (if promotion is applied)
-        image_url: Image URL or Telegram media ID
-        average_rating: Average product rating
+        is_active: False for products removed from the supplier catalog (soft delete)
+        discount_price: Manually set discounted price
+        effective_price: Final price after the best active promotion, precomputed by the pricing engine
+        image_url: Image URL, local path or Telegram media ID
+        image_file_id: Telegram file_id of the uploaded image (filled by the media cache)
+        average_rating: Average rating of approved reviews (rating_sum / rating_count)
+        rating_sum: Sum of the ratings of approved reviews
+        rating_count: Number of approved reviews
+        favorite_count: Number of users who added the product to favorites
         
     Relationships:
         orders: Relationship with orders
@@ -47,9 +54,13 @@ class Product(Base, TimestampMixin, TableNameMixin):
     # Price constraints
     __table_args__ = (
         CheckConstraint('price >= 0', name='check_price_non_negative'),
+        UniqueConstraint('sku', name='uq_products_sku'),
+        # "Most favorited" listings read the counter through this index
+        Index('ix_products_favorite_count', text('favorite_count DESC'), 'product_id'),
     )
 
     product_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    sku: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
@@ -57,9 +68,17 @@ class Product(Base, TimestampMixin, TableNameMixin):
     price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     stock_quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     is_in_stock: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, server_default=true())
     discount_price: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2), nullable=True)
+    effective_price: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2), nullable=True)
     image_url: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)  # Telegram media ID
+    image_file_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     average_rating: Mapped[Optional[Decimal]] = mapped_column(Numeric(3, 2), nullable=True)
+    # Maintained by ReviewsRepo in the same transaction as the review row
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Maintained by FavoritesRepo in the same statement as the favorite row
+    favorite_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     if TYPE_CHECKING:
@@ -93,6 +112,16 @@ class Product(Base, TimestampMixin, TableNameMixin):
         """String representation of the object for debugging."""
         return f"<Product id={self.product_id} name='{self.name}' price={self.price}>"
     
+    @property
+    def current_price(self) -> Decimal:
+        """Price the customer actually pays (precomputed effective price or the regular price)."""
+        return self.effective_price if self.effective_price is not None else self.price
+
+    @property
+    def has_discount(self) -> bool:
+        """Whether the effective price is lower than the regular price."""
+        return self.effective_price is not None and self.price is not None and self.effective_price < self.price
+    
     @validates('price')
     def validate_price(self, key, price) -> Decimal:
         """Validate product price."""
@@ -135,6 +164,17 @@ class Product(Base, TimestampMixin, TableNameMixin):
             
         return quantity
     
+    def formatted_price(self) -> str:
+        """
+        Format the price the customer pays, mentioning the regular price when discounted.
+        
+        Returns:
+            str: Formatted price string
+        """
+        if self.has_discount:
+            return f"{self.current_price}₽ (вместо {self.price}₽)"
+        return f"{self.current_price}₽"
+    
     def formatted_info(self) -> str:
         """
         Format product information for user display.
@@ -143,7 +183,7 @@ class Product(Base, TimestampMixin, TableNameMixin):
             str: Formatted string with product information
         """
         price_str = f"{self.price}" if self.price is not None else "Not specified"
-        discount_str = f" (Скидка: {self.discount_price})" if self.discount_price is not None else ""
+        discount_str = f" (Скидка: {self.current_price})" if self.has_discount else ""
         
         return (
             f"📦 Информация о товаре:\n\n"
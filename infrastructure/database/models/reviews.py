@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlalchemy import String, Text, Integer, ForeignKey, CheckConstraint, Boolean
+from sqlalchemy import String, Text, Integer, ForeignKey, CheckConstraint, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from infrastructure.database.models.base import Base, TimestampMixin, TableNameMixin
 
@@ -20,6 +20,8 @@ class Review(Base, TimestampMixin, TableNameMixin):
     
     __table_args__ = (
         CheckConstraint('rating >= 1 AND rating <= 5', name='check_rating_range'),
+        # Keyset pagination of product reviews (newest first, review_id breaks ties)
+        Index('ix_reviews_product_created', 'product_id', 'created_at', 'review_id'),
     )
     
     review_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+from infrastructure.database.models.base import Base, TimestampMixin
+
+
+class ScheduledJob(Base, TimestampMixin):
+    """
+    Persisted state of a background scheduler job.
+    
+    Attributes:
+        name: Unique job name
+        next_run_at: Time of the next planned run
+        last_run_at: Time of the last completed run
+    """
+    __tablename__ = 'scheduled_jobs'
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    next_run_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+    last_run_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+
+    def __repr__(self):
+        return f"<ScheduledJob {self.name} next_run_at={self.next_run_at}>"
@@ -1,7 +1,8 @@
-from datetime import datetime
-from sqlalchemy import ForeignKey, Integer, String, TIMESTAMP, func, UniqueConstraint
+from datetime import date, datetime
+from sqlalchemy import ForeignKey, Integer, String, TIMESTAMP, Date, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from infrastructure.database.models.base import Base, TableNameMixin
+from infrastructure.database.models.logs import LogAction, LogActionType
 
 class ProductStatistic(Base, TableNameMixin):
     """
@@ -23,19 +24,49 @@ class ProductStatistic(Base, TableNameMixin):
     # Отношения
     product = relationship("Product")
     
-    # Уникальное ограничение: одна запись статистики на товар, тип и день
+    # Уникальный функциональный индекс: одна запись статистики на товар, тип и день.
+    # Второй индекс обслуживает выборку топа товаров за период по типу статистики
     __table_args__ = (
-        UniqueConstraint('product_id', 'stat_type', func.date('date'), name='uq_product_stat_daily'),
+        Index('uq_product_stat_daily', 'product_id', 'stat_type', text('date(date)'), unique=True),
+        Index('ix_productstatistics_type_date', 'stat_type', 'date'),
     )
     
     def __repr__(self):
         return f"<ProductStatistic id={self.stat_id} product_id={self.product_id} type='{self.stat_type}' count={self.count}>"
+
+
+class ActionStatistic(Base, TableNameMixin):
+    """
+    Модель суточной статистики действий пользователей (свертка таблицы логов).
     
-    __table_args__ = (
-    UniqueConstraint(
-        "product_id",
-        "stat_type",
-        func.date(date).label("day"),
-        name="uq_product_stat_daily"
-    ),
-)
\ No newline at end of file
+    Attributes:
+        day: День, за который посчитана статистика
+        action: Код действия из логов
+        count: Количество действий за день
+        unique_users: Количество разных пользователей, совершивших действие за день
+    """
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    action: Mapped[LogAction] = mapped_column(LogActionType, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unique_users: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ActionStatistic day={self.day} action='{self.action.label}' count={self.count}>"
+
+
+class RollupWatermark(Base, TableNameMixin):
+    """
+    Граница суточных сверток статистики.
+    
+    Хранится явно, а не вычисляется по сверткам: день без событий не дает строк
+    в свертках, но тоже считается свернутым.
+    
+    Attributes:
+        name: Имя свертки (ключ строки)
+        rolled_until: Первый день, еще не свернутый в статистику
+    """
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    rolled_until: Mapped[date] = mapped_column(Date, nullable=False)
+    
+    def __repr__(self):
+        return f"<RollupWatermark name='{self.name}' rolled_until={self.rolled_until}>"
\ No newline at end of file
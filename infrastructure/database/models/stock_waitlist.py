@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, ForeignKey, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+from infrastructure.database.models.base import Base
+
+
+class StockWaitlistEntry(Base):
+    """
+    User waiting for an out-of-stock product to become available again.
+    
+    The primary key starts with product_id, so the users waiting for the products
+    that came back in stock are found by an index scan; entries are deleted when
+    the users are notified.
+    
+    Attributes:
+        product_id: Awaited product
+        user_id: Waiting user
+        created_at: Time the user asked to be notified
+    """
+    __tablename__ = 'stock_waitlist'
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.product_id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True
+    )
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<StockWaitlistEntry product_id={self.product_id} user_id={self.user_id}>"
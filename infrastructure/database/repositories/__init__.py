@@ -9,4 +9,8 @@ from .chat import ChatRepo
 from .logs import LogsRepo
 from .reviews import ReviewsRepo
 from .categories import CategoriesRepo
-from .specifications import SpecificationsRepo
\ No newline at end of file
+from .specifications import SpecificationsRepo
+from .promotion_repo import PromotionRepo
+from .scheduled_jobs import ScheduledJobsRepo
+from .media import MediaRepo
+from .product_statistic_repo import ProductStatisticRepo
\ No newline at end of file
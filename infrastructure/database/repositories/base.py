@@ -1,7 +1,7 @@
-from typing import Any, Dict, List, Optional, Type, TypeVar, Generic, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Type, TypeVar, Generic, Union
 import logging
 
-from sqlalchemy import select, update, delete, and_
+from sqlalchemy import select, update, delete, and_, Row, Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import BinaryExpression
 from sqlalchemy.exc import SQLAlchemyError
@@ -256,3 +256,21 @@ class BaseRepo(Generic[T]):
         except Exception as e:
             self.logger.error(f"Error checking existence of {self.model.__name__} with ID {id_value}: {e}")
             return False
+
+    async def stream_rows(self, stmt: Select, batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream query results in batches using a server-side cursor.
+        
+        Only one batch is held in memory at a time, so memory use does not
+        depend on the number of rows. Errors are propagated to the caller.
+        
+        Args:
+            stmt: Select statement (preferably of plain columns, not ORM entities)
+            batch_size: Number of rows fetched from the cursor at once
+            
+        Yields:
+            Batches of result rows
+        """
+        result = await self.session.stream(stmt.execution_options(yield_per=batch_size))
+        async for batch in result.partitions():
+            yield batch
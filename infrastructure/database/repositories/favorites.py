@@ -1,48 +1,103 @@
-from sqlalchemy import select, delete
-from sqlalchemy.orm import selectinload
+from typing import List, Tuple
+from sqlalchemy import select, delete, update, func, Row
+from sqlalchemy.dialects.postgresql import insert
 from infrastructure.database.models.favorites import Favorite
+from infrastructure.database.models.products import Product
 from infrastructure.database.repositories.base import BaseRepo
 
 
 class FavoritesRepo(BaseRepo):
-    async def add_favorite(self, user_id: int, product_id: int) -> Favorite:
+    async def add_favorite(self, user_id: int, product_id: int) -> bool:
         """
         Adds a product to a user's favorites.
+
+        One statement: INSERT ... ON CONFLICT DO NOTHING RETURNING feeds the increment
+        of the product's favorite_count, so a repeated add (e.g. a double tap) changes
+        nothing and no existence check is needed beforehand.
+
+        Returns True if the product was added, False if it was already in favorites.
         """
-        # Проверка, не добавлен ли продукт уже в избранное
-        stmt = select(Favorite).where(
-            Favorite.user_id == user_id,
-            Favorite.product_id == product_id
+        inserted = (
+            insert(Favorite)
+            .values(user_id=user_id, product_id=product_id)
+            .on_conflict_do_nothing(constraint="uq_favorites_user_product")
+            .returning(Favorite.product_id)
+            .cte("inserted")
         )
-        existing_fav = await self.session.execute(stmt)
-        existing_fav = existing_fav.scalar_one_or_none()
-        if existing_fav:
-            return existing_fav  # Или можно выбросить исключение
-
-        favorite = Favorite(user_id=user_id, product_id=product_id)
-        self.session.add(favorite)
+        stmt = (
+            update(Product)
+            .where(Product.product_id == inserted.c.product_id)
+            # A favorite is not a product change: updated_at keeps its value
+            .values(favorite_count=Product.favorite_count + 1, updated_at=Product.updated_at)
+            .returning(Product.product_id)
+        )
+        result = await self.session.execute(stmt)
+        added = result.first() is not None
         await self.session.commit()
-        await self.session.refresh(favorite)
-        return favorite
+        return added
 
-    async def get_favorites_by_user(self, user_id: int):
+    async def get_favorites_page(self, user_id: int, page: int = 0, page_size: int = 10) -> Tuple[List[Row], int]:
         """
-        Retrieves all favorite products for a user.
+        Retrieves one page of a user's favorites, the most recently added first.
+
+        Only the columns needed for the list are selected (rows with product_id and name);
+        the total is computed by a window function in the same query.
+
+        Products removed from the catalog (is_active = false) are not listed; their
+        favorites are kept, so they reappear if the product returns to the catalog.
+
+        Returns a tuple of the rows and the total number of favorites.
         """
-        stmt = select(Favorite).options(selectinload(Favorite.product)).where(Favorite.user_id == user_id)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        stmt = (
+            select(Favorite.product_id, Product.name, func.count().over().label("total"))
+            .join(Product, Product.product_id == Favorite.product_id)
+            .where(Favorite.user_id == user_id, Product.is_active == True)
+            .order_by(Favorite.id.desc())
+            .limit(page_size)
+            .offset(page * page_size)
+        )
+        rows = list((await self.session.execute(stmt)).all())
+        if rows:
+            return rows, rows[0].total
+        if page > 0:
+            # The page is past the end (e.g. its last item was removed): only the total is needed
+            total = await self.session.scalar(
+                select(func.count())
+                .select_from(Favorite)
+                .join(Product, Product.product_id == Favorite.product_id)
+                .where(Favorite.user_id == user_id, Product.is_active == True)
+            )
+            return [], total or 0
+        return [], 0
 
-    async def remove_favorite_by_user_product(self, user_id: int, product_id: int):
+    async def remove_favorite_by_user_product(self, user_id: int, product_id: int) -> bool:
         """
         Removes a favorite by user ID and product ID.
+
+        The DELETE ... RETURNING feeds the decrement of the product's favorite_count,
+        so the counter changes only if a row was actually removed.
+
+        Returns True if the favorite existed.
         """
-        stmt = delete(Favorite).where(
-            Favorite.user_id == user_id,
-            Favorite.product_id == product_id
+        deleted = (
+            delete(Favorite)
+            .where(
+                Favorite.user_id == user_id,
+                Favorite.product_id == product_id
+            )
+            .returning(Favorite.product_id)
+            .cte("deleted")
         )
-        await self.session.execute(stmt)
+        stmt = (
+            update(Product)
+            .where(Product.product_id == deleted.c.product_id)
+            .values(favorite_count=func.greatest(Product.favorite_count - 1, 0), updated_at=Product.updated_at)
+            .returning(Product.product_id)
+        )
+        result = await self.session.execute(stmt)
+        removed = result.first() is not None
         await self.session.commit()
+        return removed
 
     async def is_favorite(self, user_id: int, product_id: int) -> bool:
         """
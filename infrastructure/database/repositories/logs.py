@@ -1,9 +1,24 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-from sqlalchemy import select, func, and_, between, desc
-from infrastructure.database.models.logs import Log
+from typing import AsyncIterator, List, Optional, Dict, Any, Sequence, Tuple
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select, func, and_, between, desc, delete, text, Row
+from infrastructure.database.models.logs import Log, LogAction
 from infrastructure.database.repositories.base import BaseRepo
+import asyncio
+import gzip
 import logging
+import os
+import re
+
+# Месячные партиции таблицы логов называются logs_pГГГГММ
+PARTITION_NAME = re.compile(r"^logs_p(\d{4})(\d{2})$")
+
+
+def _add_months(month: date, count: int) -> date:
+    """
+    Возвращает первое число месяца, отстоящего от month на count месяцев.
+    """
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
 
 
 class LogsRepo(BaseRepo[Log]):
@@ -12,14 +27,15 @@ class LogsRepo(BaseRepo[Log]):
     """
     model = Log
     
-    async def create_log(self, user_id: int, action: str, details: Optional[str] = None) -> Optional[Log]:
+    async def create_log(self, user_id: int, action: LogAction,
+                         details: Optional[Dict[str, Any]] = None) -> Optional[Log]:
         """
         Создает запись лога о действии пользователя.
         
         Args:
             user_id: ID пользователя
-            action: Тип действия (просмотр товара, фильтрация, добавление в избранное и т.д.)
-            details: Дополнительная информация о действии
+            action: Код действия (просмотр товара, фильтрация, добавление в избранное и т.д.)
+            details: Параметры действия, например {"product_id": 5}
             
         Returns:
             Созданная запись лога или None в случае ошибки
@@ -79,12 +95,12 @@ class LogsRepo(BaseRepo[Log]):
             logging.error(f"Ошибка при получении логов для пользователя {user_id}: {e}")
             return []
             
-    async def get_logs_by_action(self, action: str, limit: int = 100) -> List[Log]:
+    async def get_logs_by_action(self, action: LogAction, limit: int = 100) -> List[Log]:
         """
         Получает логи по конкретному типу действия.
         
         Args:
-            action: Тип действия
+            action: Код действия
             limit: Максимальное количество записей
             
         Returns:
@@ -101,7 +117,7 @@ class LogsRepo(BaseRepo[Log]):
             result = await self.session.execute(stmt)
             return list(result.scalars().all())
         except Exception as e:
-            logging.error(f"Ошибка при получении логов для действия {action}: {e}")
+            logging.error(f"Ошибка при получении логов для действия {action.label}: {e}")
             return []
             
     async def get_logs_by_date_range(self, start_date: datetime, end_date: datetime, limit: int = 100) -> List[Log]:
@@ -130,7 +146,7 @@ class LogsRepo(BaseRepo[Log]):
             logging.error(f"Ошибка при получении логов за период {start_date} - {end_date}: {e}")
             return []
             
-    async def get_action_count_by_user(self, user_id: int) -> Dict[str, int]:
+    async def get_action_count_by_user(self, user_id: int) -> Dict[LogAction, int]:
         """
         Подсчитывает количество действий каждого типа для пользователя.
         
@@ -138,7 +154,7 @@ class LogsRepo(BaseRepo[Log]):
             user_id: ID пользователя
             
         Returns:
-            Словарь {тип_действия: количество}
+            Словарь {код_действия: количество}
         """
         try:
             stmt = (
@@ -167,44 +183,172 @@ class LogsRepo(BaseRepo[Log]):
         """
         try:
             start_date = datetime.now() - timedelta(days=days)
+            viewed_product_id = Log.details["product_id"].as_integer()
             
-            # Получаем ID товаров из деталей логов (предполагается формат "Просмотр товара с ID X")
-            # Это простая версия, в реальности может потребоваться более сложная логика извлечения ID товаров
             stmt = (
-                select(
-                    Log.details,
-                    func.count(Log.log_id).label("views")
-                )
+                select(viewed_product_id, func.count(Log.log_id).label("views"))
                 .where(
                     and_(
-                        Log.action == "view_product",
+                        Log.action == LogAction.VIEW_PRODUCT,
                         Log.timestamp >= start_date
                     )
                 )
-                .group_by(Log.details)
+                .group_by(viewed_product_id)
                 .order_by(desc("views"))
                 .limit(limit)
             )
             
             result = await self.session.execute(stmt)
+            return [{"product_id": product_id, "views": views} for product_id, views in result]
+        except Exception as e:
+            logging.error(f"Ошибка при получении популярных товаров: {e}")
+            return []
+            
+    async def delete_logs_older_than(self, days: int) -> int:
+        """
+        Удаляет записи логов старше указанного количества дней.
+        
+        Args:
+            days: Срок хранения логов в днях
+            
+        Returns:
+            Количество удаленных записей
+        """
+        try:
+            cutoff = datetime.now() - timedelta(days=days)
+            result = await self.session.execute(delete(Log).where(Log.timestamp < cutoff))
+            await self.session.commit()
+            return result.rowcount
+        except Exception as e:
+            logging.error(f"Ошибка при удалении устаревших логов: {e}")
+            await self.session.rollback()
+            return 0
+
+    # Колонки CSV-выгрузки логов в порядке, в котором их возвращает export_rows()
+    EXPORT_COLUMNS = ["log_id", "timestamp", "user_id", "action", "details"]
+
+    def export_rows(self, date_from: Optional[datetime] = None,
+                    date_to: Optional[datetime] = None) -> AsyncIterator[Sequence[Row]]:
+        """
+        Потоково выбирает логи для выгрузки пачками, по возрастанию ID.
+        
+        Args:
+            date_from: Начало периода (включительно)
+            date_to: Конец периода (не включительно)
+            
+        Returns:
+            Асинхронный итератор по пачкам строк (см. EXPORT_COLUMNS)
+        """
+        stmt = select(Log.log_id, Log.timestamp, Log.user_id, Log.action, Log.details).order_by(Log.log_id)
+        if date_from is not None:
+            stmt = stmt.where(Log.timestamp >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(Log.timestamp < date_to)
+        return self.stream_rows(stmt)
+
+    async def get_partitions(self) -> List[Tuple[str, date]]:
+        """
+        Получает месячные партиции таблицы логов.
+        
+        Returns:
+            Список пар (имя партиции, первое число месяца) по возрастанию месяца
+        """
+        result = await self.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'logs'::regclass"
+        ))
+        partitions = []
+        for name in result.scalars():
+            match = PARTITION_NAME.match(name)
+            if match:
+                partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    async def create_partitions(self, months_ahead: int = 3) -> List[str]:
+        """
+        Создает недостающие партиции логов на текущий месяц и months_ahead месяцев вперед.
+        
+        Args:
+            months_ahead: Сколько будущих месяцев должно быть покрыто партициями
             
-            # Преобразуем результаты в удобный формат
-            popular_products = []
-            for details, views in result:
-                # Извлекаем ID товара из деталей (пример: "Просмотр товара с ID 123")
-                try:
-                    product_id_str = details.split("ID")[-1].strip()
-                    product_id = int(product_id_str)
-                    
-                    popular_products.append({
-                        "product_id": product_id,
-                        "views": views
-                    })
-                except (IndexError, ValueError):
-                    # Пропускаем записи с неправильным форматом деталей
+        Returns:
+            Имена созданных партиций
+        """
+        try:
+            existing = {name for name, _ in await self.get_partitions()}
+            current = date.today().replace(day=1)
+            created = []
+            for offset in range(months_ahead + 1):
+                month = _add_months(current, offset)
+                name = f"logs_p{month:%Y%m}"
+                if name in existing:
                     continue
-                    
-            return popular_products
+                await self.session.execute(text(
+                    f"CREATE TABLE {name} PARTITION OF logs "
+                    f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+                ))
+                created.append(name)
+            await self.session.commit()
+            return created
         except Exception as e:
-            logging.error(f"Ошибка при получении популярных товаров: {e}")
-            return []
\ No newline at end of file
+            logging.error(f"Ошибка при создании партиций логов: {e}")
+            await self.session.rollback()
+            return []
+
+    async def _copy_partition(self, name: str, path: str) -> None:
+        """
+        Выгружает партицию в gzip-сжатый CSV через COPY текущей транзакции.
+        """
+        conn = await self.session.connection()
+        driver = (await conn.get_raw_connection()).driver_connection
+        with gzip.open(path, "wb") as file:
+            async def write(chunk: bytes) -> None:
+                # Сжатие выполняется в потоке, чтобы не блокировать цикл событий
+                await asyncio.to_thread(file.write, chunk)
+
+            await driver.copy_from_table(name, output=write, format="csv", header=True)
+
+    async def archive_partitions_before(self, before: datetime, archive_dir: str) -> List[str]:
+        """
+        Архивирует и удаляет партиции логов, целиком лежащие раньше before.
+        
+        Каждая партиция выгружается в archive_dir/<имя>.csv.gz, затем отсоединяется
+        от таблицы логов и удаляется в той же транзакции. Если выгрузка не удалась,
+        партиция остается на месте.
+        
+        Args:
+            before: Граница: архивируются месяцы, закончившиеся не позже нее
+            archive_dir: Каталог для архивов
+            
+        Returns:
+            Пути к созданным архивам
+        """
+        archived = []
+        try:
+            partitions = await self.get_partitions()
+        except Exception as e:
+            logging.error(f"Ошибка при получении партиций логов: {e}")
+            return archived
+
+        os.makedirs(archive_dir, exist_ok=True)
+        for name, month in partitions:
+            if datetime.combine(_add_months(month, 1), time.min) > before:
+                break
+
+            path = os.path.join(archive_dir, f"{name}.csv.gz")
+            temp_path = f"{path}.part"
+            try:
+                await self._copy_partition(name, temp_path)
+                await self.session.execute(text(f"ALTER TABLE logs DETACH PARTITION {name}"))
+                await self.session.execute(text(f"DROP TABLE {name}"))
+                await self.session.commit()
+                # Под итоговым именем архив появляется только после удаления партиции
+                os.replace(temp_path, path)
+                archived.append(path)
+            except Exception as e:
+                logging.error(f"Ошибка при архивировании партиции логов {name}: {e}")
+                await self.session.rollback()
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                break
+        return archived
\ No newline at end of file
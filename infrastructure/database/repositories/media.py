@@ -0,0 +1,88 @@
+from typing import Optional
+import logging
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from infrastructure.database.models.media_files import MediaFile
+from infrastructure.database.models.products import Product
+from infrastructure.database.repositories.base import BaseRepo
+
+
+class MediaRepo(BaseRepo[MediaFile]):
+    """
+    Repository for the Telegram media file_id cache.
+    """
+    model = MediaFile
+
+    async def get_by_source(self, source: str) -> Optional[MediaFile]:
+        """
+        Gets a cached upload by its original location.
+        
+        Args:
+            source: Local path or URL of the image
+            
+        Returns:
+            MediaFile object or None if the image was never uploaded
+        """
+        try:
+            result = await self.session.scalars(select(MediaFile).where(MediaFile.source == source))
+            return result.first()
+        except SQLAlchemyError as e:
+            logging.error(f"Error retrieving media file for {source}: {e}")
+            return None
+
+    async def get_by_hash(self, content_hash: str) -> Optional[MediaFile]:
+        """
+        Gets a cached upload of an image with the same content.
+        
+        Args:
+            content_hash: SHA-256 of the image content
+            
+        Returns:
+            MediaFile object or None if no identical image was uploaded
+        """
+        try:
+            result = await self.session.scalars(
+                select(MediaFile).where(MediaFile.content_hash == content_hash).limit(1)
+            )
+            return result.first()
+        except SQLAlchemyError as e:
+            logging.error(f"Error retrieving media file by hash {content_hash}: {e}")
+            return None
+
+    async def save_file_id(self, source: str, file_id: str, content_hash: Optional[str] = None) -> bool:
+        """
+        Records the file_id of an uploaded image and attaches it to every product using that image.
+        
+        Args:
+            source: Local path or URL of the image (products.image_url)
+            file_id: Telegram file_id returned by the upload
+            content_hash: SHA-256 of the image content, if known
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            values = {"source": source, "file_id": file_id, "content_hash": content_hash}
+            stmt = (
+                insert(MediaFile)
+                .values(**values)
+                .on_conflict_do_update(
+                    index_elements=[MediaFile.source],
+                    set_=dict(file_id=file_id, content_hash=content_hash),
+                )
+            )
+            await self.session.execute(stmt)
+            await self.session.execute(
+                update(Product)
+                .where(Product.image_url == source)
+                .values(image_file_id=file_id)
+            )
+            await self.session.commit()
+            return True
+        except SQLAlchemyError as e:
+            logging.error(f"Error saving media file for {source}: {e}")
+            await self.session.rollback()
+            return False
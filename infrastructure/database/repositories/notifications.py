@@ -1,9 +1,21 @@
+from datetime import timedelta
 from typing import List, Optional, Dict, Any
-from sqlalchemy import select, update, delete, and_
+from sqlalchemy import CTE, String, select, update, delete, and_, or_, func, insert, literal
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from infrastructure.database.models.favorites import Favorite
 from infrastructure.database.models.notifications import Notification
+from infrastructure.database.models.outbox import OutboxEvent
+from infrastructure.database.models.price_alerts import PriceAlert
 from infrastructure.database.repositories.base import BaseRepo
+from infrastructure.database.repositories.outbox import PRICE_DROP
 import logging
 
+# Пользователь получает уведомление, только если цена снизилась больше чем на столько процентов
+PRICE_DROP_ALERT_PERCENT = 5
+
+# Через сколько дней об уже сообщенной цене можно напомнить снова
+PRICE_ALERT_REPEAT_AFTER = timedelta(days=30)
+
 
 class NotificationsRepo(BaseRepo[Notification]):
     """
@@ -140,6 +152,71 @@ class NotificationsRepo(BaseRepo[Notification]):
             logging.error(f"Ошибка при создании уведомления об изменении цены для пользователя {user_id}: {e}")
             return None
             
+    @staticmethod
+    def queue_price_drop_alerts(changed: CTE, min_drop_percent: float = PRICE_DROP_ALERT_PERCENT) -> CTE:
+        """
+        Строит CTE, ставящий в outbox уведомления о снижении цен товаров в избранном.
+        
+        Все выполняется одним набором запросов внутри WITH того же оператора, что
+        меняет цены: пользователи, добавившие товары в избранное, находятся одним
+        соединением с favorites, правило «снижение больше X%» проверяется в SQL,
+        а повторы отсекаются таблицей price_alerts (о том же товаре пользователь
+        узнает снова, только если цена стала ниже уже сообщенной или прошло
+        PRICE_ALERT_REPEAT_AFTER). На пользователя ставится одно событие price_drop
+        со всеми подешевевшими товарами.
+        
+        Args:
+            changed: CTE измененных товаров с колонками product_id, name, is_active,
+                old_price, new_price (например, UPDATE ... RETURNING)
+            min_drop_percent: Минимальное снижение цены в процентах
+            
+        Returns:
+            CTE вставки событий в outbox (возвращает event_id)
+        """
+        drops = (
+            select(Favorite.user_id, changed.c.product_id, changed.c.new_price)
+            .join(Favorite, Favorite.product_id == changed.c.product_id)
+            .where(
+                changed.c.is_active == True,
+                changed.c.new_price < changed.c.old_price * (100 - literal(min_drop_percent)) / 100
+            )
+        )
+        upsert = pg_insert(PriceAlert).from_select(["user_id", "product_id", "price"], drops)
+        alerted = (
+            upsert.on_conflict_do_update(
+                index_elements=[PriceAlert.user_id, PriceAlert.product_id],
+                set_={"price": upsert.excluded.price, "notified_at": func.now()},
+                where=or_(
+                    PriceAlert.price > upsert.excluded.price,
+                    PriceAlert.notified_at < func.now() - PRICE_ALERT_REPEAT_AFTER
+                )
+            )
+            .returning(PriceAlert.user_id, PriceAlert.product_id)
+            .cte("alerted")
+        )
+        items = func.jsonb_agg(
+            func.jsonb_build_object(
+                "product_id", changed.c.product_id,
+                "name", changed.c.name,
+                "old_price", changed.c.old_price,
+                "new_price", changed.c.new_price,
+            )
+        )
+        events = (
+            select(
+                literal(PRICE_DROP, String),
+                func.jsonb_build_object("user_id", alerted.c.user_id, "items", items, type_=JSONB)
+            )
+            .select_from(alerted.join(changed, changed.c.product_id == alerted.c.product_id))
+            .group_by(alerted.c.user_id)
+        )
+        return (
+            insert(OutboxEvent)
+            .from_select(["kind", "payload"], events)
+            .returning(OutboxEvent.event_id)
+            .cte("queued")
+        )
+            
     async def create_new_product_notification(self, user_ids: List[int], product_id: int, product_name: str) -> bool:
         """
         Создает уведомления о новом товаре для нескольких пользователей.
@@ -1,8 +1,15 @@
-from typing import List, Optional
-from sqlalchemy import select, update, delete
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, update, delete, insert, func, literal, values, column, BigInteger, Integer, String, Row
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import SQLAlchemyError
-from infrastructure.database.models.orders import Order
+from sqlalchemy.orm import joinedload, selectinload
+from infrastructure.database.models.orders import Order, OrderStatusTransition
+from infrastructure.database.models.order_items import OrderItem
+from infrastructure.database.models.outbox import OutboxEvent
+from infrastructure.database.models.products import Product
 from infrastructure.database.repositories.base import BaseRepo
+from infrastructure.database.repositories.outbox import OutboxRepo, ORDER_CREATED, ORDER_STATUS_CHANGED
 
 
 class OrdersRepo(BaseRepo[Order]):
@@ -29,6 +36,152 @@ class OrdersRepo(BaseRepo[Order]):
             await self.session.rollback()
             return None
 
+    async def place_order(self, user_id: int, product_id: int, quantity: int = 1,
+                          status: str = "Новый") -> Optional[Order]:
+        """
+        Reserves stock and creates an order in a single statement.
+
+        The conditional UPDATE decrements stock only if enough items are left and
+        recomputes is_in_stock; the INSERT of the order reads the reserved row, so
+        concurrent buyers never oversell and no row lock is held between round trips.
+        An order_created outbox event is committed in the same transaction.
+
+        :param user_id: ID of the buyer.
+        :param product_id: ID of the product being ordered.
+        :param quantity: Number of items to reserve.
+        :param status: Initial order status.
+        :return: Created Order object, or None if the product is inactive, there is
+                 not enough stock, or an error occurs.
+        """
+        try:
+            reserved = (
+                update(Product)
+                .where(
+                    Product.product_id == product_id,
+                    Product.is_active.is_(True),
+                    Product.stock_quantity >= quantity,
+                )
+                .values(
+                    stock_quantity=Product.stock_quantity - quantity,
+                    is_in_stock=Product.stock_quantity - quantity > 0,
+                )
+                .returning(
+                    Product.product_id,
+                    func.coalesce(Product.effective_price, Product.price).label("unit_price"),
+                )
+                .cte("reserved")
+            )
+            stmt = (
+                insert(Order)
+                .from_select(
+                    ["user_id", "product_id", "quantity", "total_price", "status"],
+                    select(
+                        literal(user_id, BigInteger),
+                        reserved.c.product_id,
+                        literal(quantity),
+                        reserved.c.unit_price * quantity,
+                        literal(status),
+                    ),
+                )
+                .returning(*Order.__table__.c)
+            )
+            result = await self.session.scalars(select(Order).from_statement(stmt))
+            order = result.first()
+            if order is not None:
+                OutboxRepo(self.session).stage(ORDER_CREATED, {"order_id": order.order_id})
+            await self.session.commit()
+            return order
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error placing order for product {product_id}: {e}")
+            await self.session.rollback()
+            return None
+        except Exception as e:
+            self.logger.error(f"Unexpected error placing order for product {product_id}: {e}")
+            await self.session.rollback()
+            return None
+
+    async def place_cart_order(self, user_id: int, items: Dict[int, int],
+                               status: str = "Новый") -> Tuple[Optional[Order], List[int]]:
+        """
+        Reserves stock for all cart items and creates a parent order with line items
+        in one transaction.
+
+        Product rows are locked in product_id order (so concurrent checkouts of
+        overlapping carts cannot deadlock), then a single UPDATE ... FROM (VALUES ...)
+        decrements stock for every item that is active and has enough stock left.
+        If any item could not be reserved, the whole transaction is rolled back;
+        otherwise an order_created outbox event is committed together with the order.
+
+        :param user_id: ID of the buyer.
+        :param items: Mapping of product ID to the number of items to reserve.
+        :param status: Initial order status.
+        :return: Tuple of the created Order (with items loaded) and an empty list, or
+                 None and the IDs of products that could not be reserved. On error
+                 returns (None, []).
+        """
+        if not items:
+            return None, []
+        try:
+            await self.session.execute(
+                select(Product.product_id)
+                .where(Product.product_id.in_(items))
+                .order_by(Product.product_id)
+                .with_for_update()
+            )
+            requested = values(
+                column("product_id", Integer), column("quantity", Integer), name="requested"
+            ).data(sorted(items.items()))
+            stmt = (
+                update(Product)
+                .where(
+                    Product.product_id == requested.c.product_id,
+                    Product.is_active.is_(True),
+                    Product.stock_quantity >= requested.c.quantity,
+                )
+                .values(
+                    stock_quantity=Product.stock_quantity - requested.c.quantity,
+                    is_in_stock=Product.stock_quantity - requested.c.quantity > 0,
+                )
+                .returning(
+                    Product.product_id,
+                    requested.c.quantity,
+                    func.coalesce(Product.effective_price, Product.price).label("unit_price"),
+                )
+            )
+            reserved = (await self.session.execute(stmt)).all()
+
+            missing = sorted(set(items) - {row.product_id for row in reserved})
+            if missing:
+                await self.session.rollback()
+                return None, missing
+
+            order = Order(
+                user_id=user_id,
+                product_id=None,
+                quantity=sum(row.quantity for row in reserved),
+                total_price=float(sum(row.unit_price * row.quantity for row in reserved)),
+                status=status,
+                items=[
+                    OrderItem(product_id=row.product_id, quantity=row.quantity, unit_price=row.unit_price)
+                    for row in reserved
+                ],
+            )
+            self.session.add(order)
+            await self.session.flush()
+            OutboxRepo(self.session).stage(ORDER_CREATED, {"order_id": order.order_id})
+            await self.session.commit()
+            # Only the server-generated timestamps are reloaded, the items stay loaded
+            await self.session.refresh(order, ["created_at", "updated_at"])
+            return order, []
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error placing cart order for user {user_id}: {e}")
+            await self.session.rollback()
+            return None, []
+        except Exception as e:
+            self.logger.error(f"Unexpected error placing cart order for user {user_id}: {e}")
+            await self.session.rollback()
+            return None, []
+
     async def get_all_orders(self) -> List[Order]:
         """
         Retrieves all orders from the database.
@@ -46,15 +199,101 @@ class OrdersRepo(BaseRepo[Order]):
             self.logger.error(f"Unexpected error retrieving all orders: {e}")
             return []
 
-    async def get_order_by_id(self, order_id: int) -> Optional[Order]:
+    @staticmethod
+    def _filter_conditions(status: Optional[str] = None, date_from: Optional[datetime] = None,
+                           date_to: Optional[datetime] = None, user_id: Optional[int] = None) -> List[Any]:
+        conditions = []
+        if status is not None:
+            conditions.append(Order.status == status)
+        if date_from is not None:
+            conditions.append(Order.created_at >= date_from)
+        if date_to is not None:
+            conditions.append(Order.created_at < date_to)
+        if user_id is not None:
+            conditions.append(Order.user_id == user_id)
+        return conditions
+
+    async def get_orders_page(self, page: int = 0, page_size: int = 5, status: Optional[str] = None,
+                              date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                              user_id: Optional[int] = None) -> Tuple[List[Order], int]:
+        """
+        Retrieves one page of orders, newest first, with their product and user.
+
+        The product and the user are joined into the same query, and the total number
+        of matching orders is computed with a window function, so a page is one round trip.
+        Filtering by status over a period uses the (status, created_at) index.
+
+        :param page: Zero-based page number.
+        :param page_size: Number of orders per page.
+        :param status: Only orders with this status.
+        :param date_from: Only orders created at or after this moment.
+        :param date_to: Only orders created before this moment.
+        :param user_id: Only orders of this user.
+        :return: Tuple of (orders on the page, total number of matching orders).
+        """
+        try:
+            stmt = (
+                select(Order, func.count().over().label("total"))
+                .options(joinedload(Order.product), joinedload(Order.user))
+                .where(*self._filter_conditions(status, date_from, date_to, user_id))
+                .order_by(Order.created_at.desc(), Order.order_id.desc())
+                .offset(page * page_size)
+                .limit(page_size)
+            )
+            rows = (await self.session.execute(stmt)).all()
+            if not rows:
+                return [], 0
+            return [order for order, _ in rows], rows[0].total
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error retrieving orders page {page}: {e}")
+            return [], 0
+        except Exception as e:
+            self.logger.error(f"Unexpected error retrieving orders page {page}: {e}")
+            return [], 0
+
+    async def count_orders_by_status(self, date_from: Optional[datetime] = None,
+                                     date_to: Optional[datetime] = None,
+                                     user_id: Optional[int] = None) -> Dict[str, int]:
+        """
+        Counts orders per status in one aggregate query.
+
+        :param date_from: Only orders created at or after this moment.
+        :param date_to: Only orders created before this moment.
+        :param user_id: Only orders of this user.
+        :return: Dictionary of status to number of orders, most frequent first.
+        """
+        try:
+            stmt = (
+                select(Order.status, func.count())
+                .where(*self._filter_conditions(None, date_from, date_to, user_id))
+                .group_by(Order.status)
+                .order_by(func.count().desc(), Order.status)
+            )
+            result = await self.session.execute(stmt)
+            return {status: count for status, count in result.all()}
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error counting orders by status: {e}")
+            return {}
+        except Exception as e:
+            self.logger.error(f"Unexpected error counting orders by status: {e}")
+            return {}
+
+    async def get_order_by_id(self, order_id: int, with_user: bool = False) -> Optional[Order]:
         """
         Retrieves an order by its ID.
 
         :param order_id: ID of the order to retrieve.
+        :param with_user: Also load the buyer (e.g. for admin notifications).
         :return: Order object or None if not found.
         """
         try:
-            stmt = select(Order).where(Order.order_id == order_id)
+            stmt = (
+                select(Order)
+                .where(Order.order_id == order_id)
+                .options(selectinload(Order.product), selectinload(Order.items).selectinload(OrderItem.product))
+            )
+            if with_user:
+                stmt = stmt.options(joinedload(Order.user))
             result = await self.session.execute(stmt)
             return result.scalars().first()
         except SQLAlchemyError as e:
@@ -72,7 +311,11 @@ class OrdersRepo(BaseRepo[Order]):
         :return: List of Order objects for the user.
         """
         try:
-            stmt = select(Order).where(Order.user_id == user_id)
+            stmt = (
+                select(Order)
+                .where(Order.user_id == user_id)
+                .options(selectinload(Order.product), selectinload(Order.items).selectinload(OrderItem.product))
+            )
             result = await self.session.execute(stmt)
             return list(result.scalars().all())
         except SQLAlchemyError as e:
@@ -109,6 +352,97 @@ class OrdersRepo(BaseRepo[Order]):
             await self.session.rollback()
             return None
 
+    async def get_allowed_transitions(self, from_status: str) -> List[str]:
+        """
+        Retrieves the statuses an order in the given status may be moved to.
+
+        :param from_status: Current status of the orders.
+        :return: List of allowed target statuses.
+        """
+        try:
+            stmt = (
+                select(OrderStatusTransition.to_status)
+                .where(OrderStatusTransition.from_status == from_status)
+                .order_by(OrderStatusTransition.to_status)
+            )
+            result = await self.session.scalars(stmt)
+            return list(result.all())
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error retrieving transitions from status {from_status}: {e}")
+            return []
+
+    async def bulk_transition_status(self, to_status: str, from_status: Optional[str] = None,
+                                     date_from: Optional[datetime] = None,
+                                     date_to: Optional[datetime] = None,
+                                     user_id: Optional[int] = None,
+                                     order_ids: Optional[Sequence[int]] = None,
+                                     notify_users: bool = False) -> Optional[List[Row]]:
+        """
+        Moves all matching orders to a new status in a single UPDATE ... RETURNING.
+
+        The UPDATE joins order_status_transitions on the current status, so orders
+        whose transition to to_status is not allowed are left untouched. With
+        notify_users, the same statement stages one order_status_changed outbox
+        event per user, so the notifications are committed with the change.
+
+        :param to_status: New status.
+        :param from_status: Only orders currently in this status.
+        :param date_from: Only orders created at or after this moment.
+        :param date_to: Only orders created before this moment.
+        :param user_id: Only orders of this user.
+        :param order_ids: Only these orders.
+        :param notify_users: Queue status change notifications for the owners of the orders.
+        :return: Rows (order_id, user_id, old_status) of the updated orders, or None on error.
+        """
+        try:
+            conditions = self._filter_conditions(from_status, date_from, date_to, user_id)
+            if order_ids is not None:
+                conditions.append(Order.order_id.in_(order_ids))
+            moved = (
+                update(Order)
+                .where(
+                    OrderStatusTransition.from_status == Order.status,
+                    OrderStatusTransition.to_status == to_status,
+                    *conditions,
+                )
+                .values(status=to_status)
+                .returning(Order.order_id, Order.user_id, OrderStatusTransition.from_status.label("old_status"))
+                .cte("moved")
+            )
+            stmt = select(moved.c.order_id, moved.c.user_id, moved.c.old_status).order_by(moved.c.order_id)
+            if notify_users:
+                orders = func.jsonb_agg(
+                    func.jsonb_build_object("order_id", moved.c.order_id, "old_status", moved.c.old_status)
+                )
+                queued = (
+                    insert(OutboxEvent)
+                    .from_select(
+                        ["kind", "payload"],
+                        select(
+                            literal(ORDER_STATUS_CHANGED, String),
+                            func.jsonb_build_object(
+                                "user_id", moved.c.user_id,
+                                "status", literal(to_status, String),
+                                "orders", orders,
+                                type_=JSONB,
+                            ),
+                        ).group_by(moved.c.user_id),
+                    )
+                    .cte("queued")
+                )
+                stmt = stmt.add_cte(queued)
+            rows = (await self.session.execute(stmt)).all()
+            await self.session.commit()
+            return list(rows)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error moving orders to status {to_status}: {e}")
+            await self.session.rollback()
+            return None
+        except Exception as e:
+            self.logger.error(f"Unexpected error moving orders to status {to_status}: {e}")
+            await self.session.rollback()
+            return None
+
     async def delete_order(self, order_id: int) -> bool:
         """
         Deletes an order by its ID.
@@ -129,3 +463,30 @@ class OrdersRepo(BaseRepo[Order]):
             self.logger.error(f"Unexpected error deleting order with ID {order_id}: {e}")
             await self.session.rollback()
             return False
+
+    # Columns of the orders CSV export, in the same order as export_rows() yields them
+    EXPORT_COLUMNS = ["order_id", "created_at", "user_id", "product_id", "product_name",
+                      "quantity", "total_price", "status", "updated_at"]
+
+    def export_rows(self, date_from: Optional[datetime] = None,
+                    date_to: Optional[datetime] = None) -> AsyncIterator[Sequence[Row]]:
+        """
+        Streams orders for export in batches, ordered by ID.
+
+        :param date_from: Include orders created at or after this moment.
+        :param date_to: Include orders created before this moment.
+        :return: Async iterator over batches of rows (see EXPORT_COLUMNS).
+        """
+        stmt = (
+            select(
+                Order.order_id, Order.created_at, Order.user_id, Order.product_id, Product.name,
+                Order.quantity, Order.total_price, Order.status, Order.updated_at
+            )
+            .outerjoin(Product, Product.product_id == Order.product_id)
+            .order_by(Order.order_id)
+        )
+        if date_from is not None:
+            stmt = stmt.where(Order.created_at >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(Order.created_at < date_to)
+        return self.stream_rows(stmt)
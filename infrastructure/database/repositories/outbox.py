@@ -0,0 +1,135 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+from sqlalchemy import Select, String, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import SQLAlchemyError
+
+from infrastructure.database.models.outbox import OutboxEvent
+from infrastructure.database.repositories.base import BaseRepo
+
+# Event kinds handled by the dispatcher (tgbot/services/outbox.py)
+SEND_MESSAGE = "send_message"
+ORDER_CREATED = "order_created"
+PROMOTION_CREATED = "promotion_created"
+PRICE_DROP = "price_drop"
+BACK_IN_STOCK = "back_in_stock"
+ORDER_STATUS_CHANGED = "order_status_changed"
+
+
+class OutboxRepo(BaseRepo[OutboxEvent]):
+    """
+    Repository of the transactional outbox.
+
+    stage() and stage_messages() only add events to the current transaction: they
+    are committed (or rolled back) together with the business change. The claim
+    and result methods are used by the dispatcher inside its own transaction.
+    """
+    model = OutboxEvent
+
+    def stage(self, kind: str, payload: Dict[str, Any]) -> None:
+        """
+        Adds an event to the current transaction without committing it.
+
+        Args:
+            kind: Event kind
+            payload: Event parameters (JSON-serializable)
+        """
+        self.session.add(OutboxEvent(kind=kind, payload=payload))
+
+    async def stage_messages(self, chat_ids: Select, text: str, parse_mode: Optional[str] = None) -> int:
+        """
+        Adds a send_message event for every chat selected by a query, in one
+        INSERT ... SELECT, without committing.
+
+        Args:
+            chat_ids: Query selecting a single column of chat IDs
+            text: Message text
+            parse_mode: Telegram parse mode of the text
+
+        Returns:
+            Number of staged events
+        """
+        chat_id = chat_ids.subquery().c[0]
+        payload = func.jsonb_build_object(
+            "chat_id", chat_id,
+            "text", literal(text, String),
+            "parse_mode", literal(parse_mode, String),
+            type_=JSONB,
+        )
+        stmt = insert(OutboxEvent).from_select(
+            ["kind", "payload"],
+            select(literal(SEND_MESSAGE, String), payload),
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    async def claim_batch(self, limit: int) -> List[OutboxEvent]:
+        """
+        Locks a batch of due events, skipping events locked by other dispatchers.
+
+        The locks are held until the caller commits the results.
+
+        Args:
+            limit: Maximum number of events
+
+        Returns:
+            Claimed events in processing order
+        """
+        stmt = (
+            select(OutboxEvent)
+            .where(OutboxEvent.processed_at.is_(None), OutboxEvent.next_attempt_at <= func.now())
+            .order_by(OutboxEvent.next_attempt_at, OutboxEvent.event_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.scalars(stmt)
+        return list(result.all())
+
+    async def complete(self, event_ids: Sequence[int]) -> None:
+        """
+        Marks events as processed (within the current transaction).
+        """
+        if event_ids:
+            await self.session.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.event_id.in_(event_ids))
+                .values(processed_at=func.now(), last_error=None)
+            )
+
+    async def fail(self, event_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        """
+        Records a failed attempt (within the current transaction).
+
+        Args:
+            event_id: Event ID
+            error: Error description
+            retry_at: Time of the next attempt, None to give up
+        """
+        values: Dict[str, Any] = {"attempts": OutboxEvent.attempts + 1, "last_error": error[:1000]}
+        if retry_at is None:
+            values["processed_at"] = func.now()
+        else:
+            values["next_attempt_at"] = retry_at
+        await self.session.execute(
+            update(OutboxEvent).where(OutboxEvent.event_id == event_id).values(**values)
+        )
+
+    async def purge_processed(self, before: datetime) -> int:
+        """
+        Deletes events processed before the given moment.
+
+        Returns:
+            Number of deleted events
+        """
+        try:
+            result = await self.session.execute(
+                delete(OutboxEvent).where(OutboxEvent.processed_at < before)
+            )
+            await self.session.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            logging.error(f"Error purging processed outbox events: {e}")
+            await self.session.rollback()
+            return 0
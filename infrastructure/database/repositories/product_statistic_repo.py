@@ -1,13 +1,70 @@
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-from sqlalchemy import select, func, and_, between, desc
-from infrastructure.database.models.statistics import ProductStatistic
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select, func, and_, between, desc, delete, insert, cast, literal, union_all, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import Subquery
+from infrastructure.database.models.statistics import ProductStatistic, ActionStatistic, RollupWatermark
+from infrastructure.database.models.logs import Log, LogAction
+from infrastructure.database.models.favorites import Favorite
+from infrastructure.database.models.orders import Order
+from infrastructure.database.models.order_items import OrderItem
+from infrastructure.database.models.products import Product
 from infrastructure.database.repositories.base import BaseRepo
 import logging
 
+# Типы статистики товаров
+STAT_TYPES = ("view", "favorite", "purchase")
+
+# Ключ строки границы суточных сверток
+DAILY_ROLLUP = "daily"
+
+
+def _period_start(days: int) -> datetime:
+    """
+    Начало периода из days последних дней, включая текущий (days=1 - с начала сегодняшнего дня).
+    """
+    today = datetime.combine(date.today(), time.min)
+    return today - timedelta(days=max(days, 1) - 1)
+
+
+def _raw_product_events(start: datetime, end: Optional[datetime] = None) -> Subquery:
+    """
+    Подзапрос событий по товарам из исходных таблиц: (stat_type, product_id, ts).
+    
+    Просмотры берутся из логов, покупки - из заказов и позиций заказов из корзины, добавления в избранное - из
+    избранного (удаленные из избранного товары не учитываются).
+    """
+    def in_period(column):
+        return and_(column >= start, column < end) if end is not None else column >= start
+
+    views = select(
+        literal("view").label("stat_type"),
+        Log.details["product_id"].as_integer().label("product_id"),
+        Log.timestamp.label("ts"),
+    ).where(Log.action == LogAction.VIEW_PRODUCT, in_period(Log.timestamp))
+    favorites = select(literal("favorite"), Favorite.product_id, Favorite.created_at).where(
+        in_period(Favorite.created_at)
+    )
+    purchases = select(literal("purchase"), Order.product_id, Order.created_at).where(
+        Order.product_id.is_not(None), in_period(Order.created_at)
+    )
+    cart_purchases = (
+        select(literal("purchase"), OrderItem.product_id, Order.created_at)
+        .join(Order, Order.order_id == OrderItem.order_id)
+        .where(in_period(Order.created_at))
+    )
+    return union_all(views, favorites, purchases, cart_purchases).subquery("events")
+
+
 class ProductStatisticRepo(BaseRepo):
     """
     Репозиторий для работы со статистикой товаров.
+    
+    Статистика хранится суточными свертками: по товару и типу (productstatistics)
+    и по действию из логов (actionstatistics). Свертки заполняет фоновая задача
+    rollup_pending_days() за полностью завершенные дни, а запросы за период читают
+    свертки и досчитывают по исходным таблицам только дни после последней свертки
+    (обычно это текущий неполный день).
     """
     model = ProductStatistic
     
@@ -93,84 +150,281 @@ class ProductStatisticRepo(BaseRepo):
             logging.error(f"Ошибка при получении статистики для товара {product_id}, тип {stat_type}: {e}")
             return []
             
+    async def get_rollup_watermark(self) -> Optional[date]:
+        """
+        Возвращает первый день, еще не свернутый в статистику.
+        
+        Граница хранится в rollupwatermarks и сдвигается вместе со сверткой,
+        в том числе за дни без событий.
+        
+        Returns:
+            День, следующий за последним свернутым, или None, если свертка не выполнялась
+        """
+        return await self.session.scalar(
+            select(RollupWatermark.rolled_until).where(RollupWatermark.name == DAILY_ROLLUP)
+        )
+
+    async def _first_data_day(self) -> Optional[date]:
+        """
+        Возвращает день самого раннего события в исходных таблицах.
+        """
+        first = await self.session.scalar(
+            select(func.least(
+                select(func.min(Log.timestamp)).scalar_subquery(),
+                select(func.min(Order.created_at)).scalar_subquery(),
+                select(func.min(Favorite.created_at)).scalar_subquery(),
+            ))
+        )
+        return first.date() if first else None
+
+    async def rollup_days(self, start_day: date, end_day: date) -> bool:
+        """
+        Пересчитывает суточные свертки за дни [start_day, end_day) в одной транзакции.
+        
+        Повторный пересчет тех же дней дает тот же результат. Граница сверток
+        сдвигается в той же транзакции (назад не сдвигается).
+        
+        Args:
+            start_day: Первый пересчитываемый день
+            end_day: День, следующий за последним пересчитываемым
+            
+        Returns:
+            True, если свертки успешно обновлены, иначе False
+        """
+        start = datetime.combine(start_day, time.min)
+        end = datetime.combine(end_day, time.min)
+        try:
+            await self.session.execute(
+                delete(ProductStatistic).where(ProductStatistic.date >= start, ProductStatistic.date < end)
+            )
+            await self.session.execute(
+                delete(ActionStatistic).where(ActionStatistic.day >= start_day, ActionStatistic.day < end_day)
+            )
+
+            # Просмотры удаленных товаров пропускаются соединением с таблицей товаров
+            events = _raw_product_events(start, end)
+            event_day = func.date_trunc("day", events.c.ts)
+            await self.session.execute(
+                insert(ProductStatistic).from_select(
+                    ["product_id", "stat_type", "count", "date"],
+                    select(events.c.product_id, events.c.stat_type, func.count(), event_day)
+                    .join(Product, Product.product_id == events.c.product_id)
+                    .group_by(events.c.product_id, events.c.stat_type, event_day)
+                )
+            )
+
+            log_day = cast(Log.timestamp, Date)
+            await self.session.execute(
+                insert(ActionStatistic).from_select(
+                    ["day", "action", "count", "unique_users"],
+                    select(log_day, Log.action, func.count(), func.count(Log.user_id.distinct()))
+                    .where(Log.timestamp >= start, Log.timestamp < end)
+                    .group_by(log_day, Log.action)
+                )
+            )
+
+            watermark = pg_insert(RollupWatermark).values(name=DAILY_ROLLUP, rolled_until=end_day)
+            await self.session.execute(
+                watermark.on_conflict_do_update(
+                    index_elements=[RollupWatermark.name],
+                    set_={"rolled_until": func.greatest(RollupWatermark.rolled_until, watermark.excluded.rolled_until)}
+                )
+            )
+
+            await self.session.commit()
+            return True
+        except Exception as e:
+            logging.error(f"Ошибка при свертке статистики за {start_day} - {end_day}: {e}")
+            await self.session.rollback()
+            return False
+
+    async def rollup_pending_days(self, chunk_days: int = 7) -> int:
+        """
+        Сворачивает все завершенные дни после последней свертки (сегодняшний день не сворачивается).
+        
+        Дни обрабатываются частями по chunk_days, каждая часть фиксируется отдельно,
+        поэтому первичное заполнение по большой истории можно прервать без потери прогресса.
+        
+        Args:
+            chunk_days: Количество дней, пересчитываемых в одной транзакции
+            
+        Returns:
+            Количество свернутых дней
+        """
+        try:
+            start_day = await self.get_rollup_watermark() or await self._first_data_day()
+        except Exception as e:
+            logging.error(f"Ошибка при определении дней для свертки статистики: {e}")
+            return 0
+
+        today = date.today()
+        rolled = 0
+        while start_day is not None and start_day < today:
+            end_day = min(start_day + timedelta(days=chunk_days), today)
+            if not await self.rollup_days(start_day, end_day):
+                break
+            rolled += (end_day - start_day).days
+            start_day = end_day
+        return rolled
+
+    async def _period_totals(self, days: int) -> Subquery:
+        """
+        Подзапрос сумм по товарам и типам за период: (product_id, stat_type, total).
+        
+        Дни до последней свертки читаются из productstatistics, остальные - из исходных таблиц.
+        """
+        start = _period_start(days)
+        watermark = await self.get_rollup_watermark()
+        raw_start = max(start, datetime.combine(watermark, time.min)) if watermark else start
+
+        rollup = select(
+            ProductStatistic.product_id,
+            ProductStatistic.stat_type,
+            ProductStatistic.count.label("total"),
+        ).where(ProductStatistic.date >= start, ProductStatistic.date < raw_start)
+
+        events = _raw_product_events(raw_start)
+        raw = select(events.c.product_id, events.c.stat_type, func.count()).group_by(
+            events.c.product_id, events.c.stat_type
+        )
+
+        combined = union_all(rollup, raw).subquery("combined")
+        return (
+            select(combined.c.product_id, combined.c.stat_type, func.sum(combined.c.total).label("total"))
+            .group_by(combined.c.product_id, combined.c.stat_type)
+            .subquery("totals")
+        )
+
     async def get_top_products_by_stat(self, stat_type: str, days: int = 30, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Получает топ товаров по определенному типу статистики.
         
         Args:
             stat_type: Тип статистики
-            days: Количество дней для анализа
+            days: Количество дней для анализа, включая текущий
             limit: Максимальное количество результатов
             
         Returns:
             Список словарей с информацией о товарах и их статистике
         """
         try:
-            # Вычисляем начальную дату
-            start_date = datetime.now() - timedelta(days=days)
-            
-            # Получаем сумму счетчиков, сгруппированную по product_id
+            totals = await self._period_totals(days)
             stmt = (
-                select(
-                    ProductStatistic.product_id,
-                    func.sum(ProductStatistic.count).label("total")
-                )
-                .where(
-                    and_(
-                        ProductStatistic.stat_type == stat_type,
-                        ProductStatistic.date >= start_date
-                    )
-                )
-                .group_by(ProductStatistic.product_id)
-                .order_by(desc("total"))
+                select(totals.c.product_id, Product.name, totals.c.total)
+                .join(Product, Product.product_id == totals.c.product_id)
+                .where(totals.c.stat_type == stat_type)
+                .order_by(desc(totals.c.total), totals.c.product_id)
                 .limit(limit)
             )
             
             result = await self.session.execute(stmt)
             
             # Преобразуем в список словарей
-            return [{"product_id": row[0], "total": row[1]} for row in result]
+            return [{"product_id": row[0], "name": row[1], "total": row[2]} for row in result]
         except Exception as e:
             logging.error(f"Ошибка при получении топ товаров по {stat_type}: {e}")
             return []
-            
-    async def get_stats_summary_by_period(self, days: int = 30) -> Dict[str, Dict[str, int]]:
+
+    async def get_product_stats_table(self, days: int = 30, limit: int = 10) -> List[Dict[str, Any]]:
         """
-        Получает сводную статистику по всем типам за указанный период.
+        Получает товары с наибольшим числом просмотров и их просмотры, добавления
+        в избранное и покупки за период.
         
         Args:
-            days: Количество дней для анализа
+            days: Количество дней для анализа, включая текущий
+            limit: Максимальное количество результатов
             
         Returns:
-            Словарь с общей статистикой по типам
+            Список словарей с названием товара и счетчиками по типам статистики
         """
         try:
-            # Вычисляем начальную дату
-            start_date = datetime.now() - timedelta(days=days)
-            
-            # Получаем суммы по каждому типу статистики
+            totals = await self._period_totals(days)
+            counters = [
+                func.coalesce(func.sum(totals.c.total).filter(totals.c.stat_type == stat_type), 0).label(stat_type)
+                for stat_type in STAT_TYPES
+            ]
             stmt = (
-                select(
-                    ProductStatistic.stat_type,
-                    func.sum(ProductStatistic.count).label("total")
-                )
-                .where(ProductStatistic.date >= start_date)
-                .group_by(ProductStatistic.stat_type)
+                select(totals.c.product_id, Product.name, *counters)
+                .join(Product, Product.product_id == totals.c.product_id)
+                .group_by(totals.c.product_id, Product.name)
+                .order_by(desc("view"), desc("purchase"), totals.c.product_id)
+                .limit(limit)
             )
             
             result = await self.session.execute(stmt)
+            return [dict(row._mapping) for row in result]
+        except Exception as e:
+            logging.error(f"Ошибка при получении статистики товаров за {days} дн.: {e}")
+            return []
             
-            # Формируем итоговый словарь
-            summary = {
-                "view": 0,
-                "favorite": 0,
-                "purchase": 0
-            }
+    async def get_stats_summary_by_period(self, days: int = 30) -> Dict[str, int]:
+        """
+        Получает сводную статистику по всем типам за указанный период.
+        
+        Args:
+            days: Количество дней для анализа, включая текущий
             
+        Returns:
+            Словарь с общей статистикой по типам
+        """
+        summary = {stat_type: 0 for stat_type in STAT_TYPES}
+        try:
+            totals = await self._period_totals(days)
+            stmt = select(totals.c.stat_type, func.sum(totals.c.total)).group_by(totals.c.stat_type)
+            
+            result = await self.session.execute(stmt)
             for stat_type, total in result:
-                summary[stat_type] = total
+                summary[stat_type] = int(total)
                 
             return summary
         except Exception as e:
             logging.error(f"Ошибка при получении сводной статистики: {e}")
-            return {"view": 0, "favorite": 0, "purchase": 0}
\ No newline at end of file
+            return summary
+
+    async def get_action_summary(self, days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Получает количество действий пользователей каждого типа за период.
+        
+        Args:
+            days: Количество дней для анализа, включая текущий
+            
+        Returns:
+            Список словарей (action, count, user_days) по убыванию количества, где
+            user_days - сумма по дням числа разных пользователей, совершивших действие
+        """
+        try:
+            start = _period_start(days)
+            watermark = await self.get_rollup_watermark()
+            raw_start = max(start, datetime.combine(watermark, time.min)) if watermark else start
+
+            rollup = select(
+                ActionStatistic.action,
+                ActionStatistic.count,
+                ActionStatistic.unique_users,
+            ).where(ActionStatistic.day >= start.date(), ActionStatistic.day < raw_start.date())
+
+            log_day = cast(Log.timestamp, Date)
+            raw = (
+                select(Log.action, func.count(), func.count(Log.user_id.distinct()))
+                .where(Log.timestamp >= raw_start)
+                .group_by(log_day, Log.action)
+            )
+            combined = union_all(rollup, raw).subquery("combined")
+            stmt = (
+                select(
+                    combined.c.action,
+                    func.sum(combined.c.count).label("count"),
+                    func.sum(combined.c.unique_users).label("user_days"),
+                )
+                .group_by(combined.c.action)
+                .order_by(desc("count"))
+            )
+
+            result = await self.session.execute(stmt)
+            return [
+                {"action": action, "count": int(count), "user_days": int(user_days)}
+                for action, count, user_days in result
+            ]
+        except Exception as e:
+            logging.error(f"Ошибка при получении сводки действий за {days} дн.: {e}")
+            return []
\ No newline at end of file
@@ -1,13 +1,17 @@
 # infrastructure/database/repositories/products.py
 
-from typing import List, Optional, Dict, Any, Union
+from typing import AsyncIterator, Callable, Collection, List, Optional, Dict, Any, Sequence, Union, Tuple
+from datetime import datetime
 from decimal import Decimal
 import logging
 
-from sqlalchemy import select, update, delete, and_, or_, func
+from sqlalchemy import select, update, delete, and_, or_, func, text, Row
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import load_only
 from infrastructure.database.models.products import Product, ProductType
 from infrastructure.database.repositories.base import BaseRepo
+from infrastructure.database.repositories.promotion_repo import PromotionRepo
+from infrastructure.database.repositories.waitlist import WaitlistRepo
 
 
 class ProductsRepo(BaseRepo[Product]):
@@ -47,8 +51,14 @@ class ProductsRepo(BaseRepo[Product]):
         # Set is_in_stock based on stock_quantity
         if 'stock_quantity' in product_data:
             product_data['is_in_stock'] = int(product_data['stock_quantity']) > 0
-            
-        return await self.create(product_data)
+        
+        product = await self.create(product_data)
+        if product is not None:
+            # The effective price follows the pricing rule, including promotions
+            # the product may already be linked to
+            await PromotionRepo(self.session).recalculate_effective_prices([product.product_id])
+            await self.session.refresh(product)
+        return product
 
     async def get_all_products(self, in_stock_only: bool = False) -> List[Product]:
         """
@@ -64,11 +74,12 @@ class ProductsRepo(BaseRepo[Product]):
         
         @safe_db_operation("Failed to retrieve products")
         async def _get_products() -> List[Product]:
-            conditions = []
+            # Products removed from the catalog by sync are hidden
+            conditions = [Product.is_active == True]
             if in_stock_only:
                 conditions.append(Product.is_in_stock == True)
                 
-            return await self.get_all(conditions=conditions if conditions else None, order_by="product_id")
+            return await self.get_all(conditions=conditions, order_by="product_id")
         
         try:
             return await _get_products()
@@ -76,17 +87,74 @@ class ProductsRepo(BaseRepo[Product]):
             self.logger.error(f"Error retrieving all products: {e}")
             return []
 
-    async def get_product_by_id(self, product_id: int) -> Optional[Product]:
+    async def get_product_by_id(self, product_id: int, active_only: bool = False) -> Optional[Product]:
         """
         Gets a product by ID.
         
         Args:
             product_id: Product ID
+            active_only: Skip products removed from the catalog (for user-facing lookups)
             
         Returns:
             Product object or None if product not found
         """
-        return await self.get_by_id(product_id)
+        if not active_only:
+            return await self.get_by_id(product_id)
+        try:
+            stmt = select(Product).where(Product.product_id == product_id, Product.is_active == True)
+            return await self.session.scalar(stmt)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error retrieving active product by ID {product_id}: {e}")
+            return None
+
+    async def get_products_by_ids(self, product_ids: Sequence[int]) -> List[Product]:
+        """
+        Gets active products by a list of IDs in one query (e.g. the contents of a cart).
+        
+        Args:
+            product_ids: Product IDs
+            
+        Returns:
+            List of found active products, sorted by ID
+        """
+        if not product_ids:
+            return []
+        try:
+            stmt = (
+                select(Product)
+                .where(Product.product_id.in_(product_ids), Product.is_active == True)
+                .order_by(Product.product_id)
+            )
+            result = await self.session.scalars(stmt)
+            return list(result.all())
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error retrieving products by IDs: {e}")
+            return []
+
+    async def get_most_favorited(self, limit: int = 10) -> List[Product]:
+        """
+        Gets active products most often added to favorites.
+        
+        Reads the denormalized favorite_count through its index, no COUNT(*) over favorites.
+        
+        Args:
+            limit: Maximum number of products
+            
+        Returns:
+            List of products, the most favorited first
+        """
+        try:
+            stmt = (
+                select(Product)
+                .where(Product.is_active == True, Product.favorite_count > 0)
+                .order_by(Product.favorite_count.desc(), Product.product_id)
+                .limit(limit)
+            )
+            result = await self.session.scalars(stmt)
+            return list(result.all())
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error retrieving most favorited products: {e}")
+            return []
 
     async def update_product(self, product_id: int, update_data: Dict[str, Any]) -> Optional[Product]:
         """
@@ -118,8 +186,45 @@ class ProductsRepo(BaseRepo[Product]):
         # Set is_in_stock based on stock_quantity
         if 'stock_quantity' in update_data:
             update_data['is_in_stock'] = int(update_data['stock_quantity']) > 0
+        
+        # A new image invalidates the cached Telegram file_id
+        if 'image_url' in update_data and 'image_file_id' not in update_data:
+            update_data['image_file_id'] = None
+            
+        product = await self.update(product_id, update_data)
+        if product is not None and ('price' in update_data or 'discount_price' in update_data):
+            await PromotionRepo(self.session).recalculate_effective_prices([product_id])
+            await self.session.refresh(product)
+        return product
+
+    async def set_stock_quantity(self, product_id: int, quantity: int) -> bool:
+        """
+        Sets the stock quantity of a product and recomputes is_in_stock in the same UPDATE.
+        
+        A restocked product releases its waitlist in the same transaction.
+        
+        Args:
+            product_id: Product ID
+            quantity: New stock quantity
             
-        return await self.update(product_id, update_data)
+        Returns:
+            True if the product was updated, otherwise False
+        """
+        try:
+            stmt = (
+                update(Product)
+                .where(Product.product_id == product_id)
+                .values(stock_quantity=quantity, is_in_stock=quantity > 0)
+            )
+            result = await self.session.execute(stmt)
+            if quantity > 0:
+                await WaitlistRepo(self.session).release_in_stock([product_id])
+            await self.session.commit()
+            return result.rowcount > 0
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error updating stock of product {product_id}: {e}")
+            await self.session.rollback()
+            return False
 
     async def delete_product(self, product_id: int) -> bool:
         """
@@ -161,21 +266,25 @@ class ProductsRepo(BaseRepo[Product]):
                     self.logger.error(f"Invalid discount_price value: {field_value}")
                     return False
         
-        # Update is_in_stock when stock_quantity changes
+        # Stock and is_in_stock are updated together in one statement
         if field_name == 'stock_quantity':
             try:
                 quantity = int(field_value)
-                # Also update is_in_stock field
-                product = await self.get_by_id(product_id)
-                if product:
-                    is_in_stock = quantity > 0
-                    if product.is_in_stock != is_in_stock:
-                        await self.update_field(product_id, 'is_in_stock', is_in_stock)
             except (ValueError, TypeError):
                 self.logger.error(f"Invalid stock_quantity value: {field_value}")
                 return False
+            return await self.set_stock_quantity(product_id, quantity)
+                
+        # A new image invalidates the cached Telegram file_id
+        if field_name == 'image_url':
+            return await self.update_product(product_id, {'image_url': field_value}) is not None
                 
-        return await self.update_field(product_id, field_name, field_value)
+        updated = await self.update_field(product_id, field_name, field_value)
+        
+        # Price changes shift the effective price under active promotions
+        if updated and field_name in ('price', 'discount_price'):
+            await PromotionRepo(self.session).recalculate_effective_prices([product_id])
+        return updated
     
     async def search_products(self, query: str, limit: int = 10) -> List[Product]:
         """
@@ -204,6 +313,7 @@ class ProductsRepo(BaseRepo[Product]):
                     (Product.name.ilike(f"%{query}%")) | 
                     (Product.description.ilike(f"%{query}%"))
                 )
+                .where(Product.is_active == True)
                 .order_by(Product.product_id)
                 .limit(limit)
             )
@@ -217,6 +327,72 @@ class ProductsRepo(BaseRepo[Product]):
             self.logger.error(f"Error searching products: {e}")
             return []
             
+    @staticmethod
+    def _name_contains(query: str):
+        """
+        Case-insensitive substring match on the product name.
+        
+        % and _ typed by the admin are escaped, so they match literally instead of acting as wildcards.
+        """
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return Product.name.ilike(f"%{escaped}%", escape="\\")
+    
+    async def get_products_page(self, query: Optional[str] = None,
+                                page: int = 0, page_size: int = 10) -> Tuple[List[Product], int]:
+        """
+        Get one page of products for list pickers, optionally filtered by name.
+        
+        Only the columns needed to render a list button are loaded, and the total
+        number of matching rows is computed in the same query with a window function.
+        
+        Args:
+            query: Optional search string matched against the product name
+            page: Zero-based page number
+            page_size: Number of products per page
+            
+        Returns:
+            Tuple of (products on the page, total number of matching products)
+        """
+        try:
+            stmt = (
+                select(Product, func.count().over().label("total"))
+                .options(load_only(Product.product_id, Product.name, Product.price, Product.effective_price))
+                .where(Product.is_active == True)
+                .order_by(Product.product_id)
+                .offset(page * page_size)
+                .limit(page_size)
+            )
+            if query:
+                stmt = stmt.where(self._name_contains(query))
+                
+            rows = (await self.session.execute(stmt)).all()
+            if not rows:
+                return [], 0
+            return [product for product, _ in rows], rows[0].total
+        except Exception as e:
+            self.logger.error(f"Error retrieving products page {page}: {e}")
+            return [], 0
+            
+    async def get_product_ids(self, query: Optional[str] = None) -> List[int]:
+        """
+        Get IDs of all products matching a name search (used for "select all").
+        
+        Args:
+            query: Optional search string matched against the product name
+            
+        Returns:
+            List of product IDs
+        """
+        try:
+            stmt = select(Product.product_id).where(Product.is_active == True).order_by(Product.product_id)
+            if query:
+                stmt = stmt.where(self._name_contains(query))
+            result = await self.session.execute(stmt)
+            return list(result.scalars().all())
+        except Exception as e:
+            self.logger.error(f"Error retrieving product IDs: {e}")
+            return []
+            
     async def filter_products(self, 
                             material: Optional[str] = None, 
                             product_type: Optional[str] = None, 
@@ -240,7 +416,10 @@ class ProductsRepo(BaseRepo[Product]):
         """
         try:
             # Start building query
-            conditions = []
+            conditions = [Product.is_active == True]
+            
+            # Filter by the price the customer actually pays
+            current_price = func.coalesce(Product.effective_price, Product.price)
             
             # Add filter conditions
             if material:
@@ -252,22 +431,18 @@ class ProductsRepo(BaseRepo[Product]):
             if min_price is not None:
                 if not isinstance(min_price, Decimal):
                     min_price = Decimal(str(min_price))
-                conditions.append(Product.price >= min_price)
+                conditions.append(current_price >= min_price)
             
             if max_price is not None:
                 if not isinstance(max_price, Decimal):
                     max_price = Decimal(str(max_price))
-                conditions.append(Product.price <= max_price)
+                conditions.append(current_price <= max_price)
                 
             if in_stock_only:
                 conditions.append(Product.is_in_stock == True)
             
             # Build final query
-            stmt = select(Product)
-            
-            # Apply conditions if any
-            if conditions:
-                stmt = stmt.where(and_(*conditions))
+            stmt = select(Product).where(and_(*conditions))
             
             # Add sorting and limit
             stmt = stmt.order_by(Product.product_id).limit(limit)
@@ -284,7 +459,7 @@ class ProductsRepo(BaseRepo[Product]):
     
     async def get_products_with_discount(self, limit: int = 20) -> List[Product]:
         """
-        Get products that have a discount price.
+        Get products whose effective price is below the regular price.
         
         Args:
             limit: Maximum number of results
@@ -295,7 +470,7 @@ class ProductsRepo(BaseRepo[Product]):
         try:
             stmt = (
                 select(Product)
-                .where(Product.discount_price.is_not(None))
+                .where(Product.effective_price < Product.price, Product.is_active == True)
                 .order_by(Product.product_id)
                 .limit(limit)
             )
@@ -314,7 +489,7 @@ class ProductsRepo(BaseRepo[Product]):
             List of unique materials
         """
         try:
-            stmt = select(Product.material).distinct().where(Product.material.is_not(None))
+            stmt = select(Product.material).distinct().where(Product.material.is_not(None), Product.is_active == True)
             result = await self.session.execute(stmt)
             return [material for material, in result if material]
         except Exception as e:
@@ -329,9 +504,318 @@ class ProductsRepo(BaseRepo[Product]):
             List of unique product types
         """
         try:
-            stmt = select(Product.type).distinct().where(Product.type.is_not(None))
+            stmt = select(Product.type).distinct().where(Product.type.is_not(None), Product.is_active == True)
             result = await self.session.execute(stmt)
             return [product_type for product_type, in result if product_type]
         except Exception as e:
             self.logger.error(f"Error retrieving available product types: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    # Columns of the products CSV export, in the same order as export_rows() yields them
+    EXPORT_COLUMNS = ["product_id", "name", "type", "material", "price", "discount_price",
+                      "effective_price", "stock_quantity", "is_in_stock", "is_active", "created_at", "updated_at"]
+
+    def export_rows(self, date_from: Optional[datetime] = None,
+                    date_to: Optional[datetime] = None) -> AsyncIterator[Sequence[Row]]:
+        """
+        Streams products for export in batches, ordered by ID.
+        
+        Args:
+            date_from: Include products updated at or after this moment
+            date_to: Include products updated before this moment
+            
+        Returns:
+            Async iterator over batches of rows (see EXPORT_COLUMNS)
+        """
+        stmt = select(
+            Product.product_id, Product.name, Product.type, Product.material, Product.price,
+            Product.discount_price, Product.effective_price, Product.stock_quantity,
+            Product.is_in_stock, Product.is_active, Product.created_at, Product.updated_at
+        ).order_by(Product.product_id)
+        if date_from is not None:
+            stmt = stmt.where(Product.updated_at >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(Product.updated_at < date_to)
+        return self.stream_rows(stmt)
+
+    async def _load_staging(self, conn, table: str, columns: List[str],
+                            batches: AsyncIterator[List[tuple]]) -> Tuple[int, List[int]]:
+        """
+        Creates a temporary staging table dropped on commit and fills it with COPY.
+        
+        Column types match the products table, so staged and stored values
+        compare (and hash) identically.
+        
+        Args:
+            conn: Connection of the current transaction
+            table: Staging table name
+            columns: Columns present in the batches after the row number
+            batches: Async iterator over batches of rows
+            
+        Returns:
+            Number of loaded rows and row numbers dropped as duplicated SKUs
+        """
+        await conn.execute(text(
+            f"CREATE TEMP TABLE {table} ("
+            " row_no integer NOT NULL, sku varchar(64) NOT NULL, name varchar(100),"
+            " description text, type varchar(50), material varchar(50),"
+            " price numeric(10, 2), discount_price numeric(10, 2),"
+            " stock_quantity integer, image_url varchar(255)"
+            ") ON COMMIT DROP"
+        ))
+
+        # COPY through the asyncpg connection of the same transaction
+        raw_connection = await conn.get_raw_connection()
+        driver = raw_connection.driver_connection
+        loaded = 0
+        async for batch in batches:
+            await driver.copy_records_to_table(table, records=batch, columns=["row_no", *columns])
+            loaded += len(batch)
+
+        # The last occurrence of a duplicated SKU wins
+        duplicates = await conn.execute(text(
+            f"DELETE FROM {table} s USING {table} d "
+            f"WHERE s.sku = d.sku AND s.row_no < d.row_no RETURNING s.row_no"
+        ))
+        return loaded, list(duplicates.scalars())
+
+    # Columns of a price list import; "sku" is the key and is always present
+    IMPORT_COLUMNS = ["sku", "name", "description", "type", "material",
+                      "price", "discount_price", "stock_quantity", "image_url"]
+
+    async def import_price_list(self, batches: AsyncIterator[List[tuple]],
+                                columns: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Imports a price list with one set-based upsert keyed by SKU.
+        
+        Rows are loaded with COPY into a temporary staging table, invalid rows
+        are rejected in SQL, then new SKUs are inserted and changed products
+        updated with a single INSERT ... ON CONFLICT. Columns missing from the
+        file keep their current values. Everything runs in one transaction.
+        
+        Args:
+            batches: Async iterator over batches of validated rows (row number first,
+                then values in the order of columns)
+            columns: Columns present in the file (subset of IMPORT_COLUMNS, with "sku")
+            
+        Returns:
+            Dictionary with inserted/updated/unchanged counts, rejected row numbers
+            with reasons and IDs of affected products, or None in case of error
+        """
+        try:
+            conn = await self.session.connection()
+            loaded, duplicates = await self._load_staging(conn, "product_import", columns, batches)
+
+            rejected: Dict[int, str] = dict.fromkeys(duplicates, "артикул повторяется ниже в файле")
+
+            async def reject(sql: str, reason: str) -> None:
+                result = await conn.execute(text(sql))
+                for row_no in result.scalars():
+                    rejected[row_no] = reason
+
+            # Products created before SKUs existed are matched by name once
+            if "name" in columns:
+                await conn.execute(text(
+                    "UPDATE products p SET sku = s.sku FROM product_import s "
+                    "WHERE p.product_id = ("
+                    "  SELECT min(x.product_id) FROM products x WHERE x.sku IS NULL AND x.name = s.name"
+                    ") AND NOT EXISTS (SELECT 1 FROM products y WHERE y.sku = s.sku)"
+                ))
+
+            await reject(
+                "DELETE FROM product_import s "
+                "WHERE (s.name IS NULL OR s.price IS NULL) "
+                "AND NOT EXISTS (SELECT 1 FROM products p WHERE p.sku = s.sku) RETURNING s.row_no",
+                "для нового товара нужны название и цена"
+            )
+            if "discount_price" in columns:
+                await reject(
+                    "DELETE FROM product_import s WHERE s.discount_price > "
+                    "COALESCE(s.price, (SELECT p.price FROM products p WHERE p.sku = s.sku)) "
+                    "RETURNING s.row_no",
+                    "цена со скидкой больше обычной цены"
+                )
+
+            # SET only the columns present in the file
+            assignments = {column: f"EXCLUDED.{column}" for column in columns if column != "sku"}
+            if "stock_quantity" in columns:
+                assignments["is_in_stock"] = "EXCLUDED.is_in_stock"
+            if "image_url" in columns:
+                # A new image invalidates the cached Telegram file_id
+                assignments["image_file_id"] = (
+                    "CASE WHEN products.image_url IS DISTINCT FROM EXCLUDED.image_url "
+                    "THEN NULL ELSE products.image_file_id END"
+                )
+            if "price" in columns and "discount_price" not in columns:
+                # Drop a manual discount that became higher than the new price
+                assignments["discount_price"] = (
+                    "CASE WHEN products.discount_price > EXCLUDED.price "
+                    "THEN NULL ELSE products.discount_price END"
+                )
+            changed = [column for column in columns if column != "sku"]
+            set_clause = ", ".join(f"{column} = {value}" for column, value in assignments.items())
+            where_clause = (
+                f"({', '.join(f'products.{column}' for column in changed)}) IS DISTINCT FROM "
+                f"({', '.join(f'EXCLUDED.{column}' for column in changed)})"
+            )
+            if not changed:
+                set_clause, where_clause = "sku = EXCLUDED.sku", "false"
+
+            result = await conn.execute(text(
+                "INSERT INTO products (sku, name, description, type, material, price, discount_price,"
+                " stock_quantity, is_in_stock, image_url) "
+                "SELECT sku, name, description, type, material, price, discount_price,"
+                " COALESCE(stock_quantity, 0), COALESCE(stock_quantity, 0) > 0, image_url "
+                "FROM product_import ORDER BY row_no "
+                f"ON CONFLICT (sku) DO UPDATE SET {set_clause}, updated_at = now() "
+                f"WHERE {where_clause} "
+                "RETURNING product_id, (xmax = 0) AS inserted"
+            ))
+            upserted = result.all()
+            await WaitlistRepo(self.session).release_in_stock([row.product_id for row in upserted])
+            await self.session.commit()
+        except Exception as e:
+            self.logger.error(f"Error importing price list: {e}")
+            await self.session.rollback()
+            return None
+
+        product_ids = [row.product_id for row in upserted]
+        if product_ids:
+            await PromotionRepo(self.session).recalculate_effective_prices(product_ids)
+
+        inserted = sum(1 for row in upserted if row.inserted)
+        return {
+            "inserted": inserted,
+            "updated": len(upserted) - inserted,
+            "unchanged": loaded - len(rejected) - len(upserted),
+            "rejected": rejected,
+            "product_ids": product_ids,
+        }
+
+    async def sync_catalog(self, batches: AsyncIterator[List[tuple]], columns: List[str],
+                           dry_run: bool = False, max_delete_ratio: float = 0.2,
+                           rejected_skus: Optional[Callable[[], Optional[Collection[str]]]] = None
+                           ) -> Optional[Dict[str, Any]]:
+        """
+        Synchronizes products with a full supplier catalog keyed by SKU.
+        
+        The catalog is loaded with COPY into a staging table and compared with
+        products by per-row content hashes (md5 of the row of catalog columns),
+        so only new SKUs are inserted, only changed rows are updated and products
+        missing from the catalog are soft-deleted (is_active = false). Products
+        without SKU are never touched. Everything runs in one transaction; in
+        dry-run mode the transaction is rolled back after counting the changes.
+        
+        Args:
+            batches: Async iterator over batches of validated rows (row number first,
+                then values in the order of columns)
+            columns: Catalog columns (subset of IMPORT_COLUMNS with "sku", "name" and "price")
+            dry_run: Only report the changes without applying them
+            max_delete_ratio: Abort if the catalog would deactivate a larger share of
+                active products (protects against truncated source files)
+            rejected_skus: Called after the batches are loaded; returns the SKUs of
+                catalog rows rejected by validation, whose products are kept as they are
+                instead of being treated as missing, or None if some rejected rows have
+                no readable SKU (their products cannot be identified, so nothing is
+                soft-deleted)
+            
+        Returns:
+            Dictionary with inserted/updated/deactivated/unchanged counts and duplicated
+            row numbers, or None in case of error or if the delete guard triggered
+        """
+        compared = [column for column in columns if column != "sku"]
+        stored_hash = f"md5(ROW({', '.join(f'p.{column}' for column in compared)})::text)"
+        source_hash = f"md5(ROW({', '.join(f's.{column}' for column in compared)})::text)"
+        assignments = [f"{column} = s.{column}" for column in compared]
+        if "stock_quantity" in columns:
+            assignments.append("is_in_stock = COALESCE(s.stock_quantity, 0) > 0")
+        if "image_url" in columns:
+            # A new image invalidates the cached Telegram file_id
+            assignments.append(
+                "image_file_id = CASE WHEN p.image_url IS DISTINCT FROM s.image_url "
+                "THEN NULL ELSE p.image_file_id END"
+            )
+
+        try:
+            conn = await self.session.connection()
+            loaded, duplicates = await self._load_staging(conn, "catalog_sync", columns, batches)
+            if "stock_quantity" in columns:
+                # An empty stock cell means out of stock, as stored in products
+                await conn.execute(text(
+                    "UPDATE catalog_sync SET stock_quantity = 0 WHERE stock_quantity IS NULL"
+                ))
+
+            # Rows rejected by validation are still in the catalog: a typo in a cell
+            # must not hide the product
+            kept = rejected_skus() if rejected_skus is not None else ()
+            deactivate_missing = kept is not None
+            await conn.execute(text(
+                "CREATE TEMP TABLE catalog_rejected (sku varchar(64) PRIMARY KEY) ON COMMIT DROP"
+            ))
+            if kept:
+                raw_connection = await conn.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    "catalog_rejected", records=[(sku,) for sku in set(kept)], columns=["sku"]
+                )
+            elif not deactivate_missing:
+                self.logger.warning("Catalog sync: rejected rows without SKU, missing products are kept")
+
+            # Soft-delete first: the guard must run before anything is changed
+            active = (await conn.execute(text(
+                "SELECT count(*) FROM products WHERE is_active AND sku IS NOT NULL"
+            ))).scalar_one()
+            deactivated = []
+            if deactivate_missing:
+                deactivated = (await conn.execute(text(
+                    "UPDATE products p SET is_active = false, is_in_stock = false, updated_at = now() "
+                    "WHERE p.is_active AND p.sku IS NOT NULL "
+                    "AND NOT EXISTS (SELECT 1 FROM catalog_sync s WHERE s.sku = p.sku) "
+                    "AND NOT EXISTS (SELECT 1 FROM catalog_rejected r WHERE r.sku = p.sku) "
+                    "RETURNING p.product_id"
+                ))).scalars().all()
+            if active and len(deactivated) > active * max_delete_ratio:
+                self.logger.error(
+                    f"Catalog sync aborted: {len(deactivated)} of {active} products would be deactivated"
+                )
+                await self.session.rollback()
+                return None
+
+            # Changed (or reappearing) products, detected by content hash
+            updated = (await conn.execute(text(
+                f"UPDATE products p SET {', '.join(assignments)}, is_active = true, updated_at = now() "
+                f"FROM catalog_sync s WHERE p.sku = s.sku "
+                f"AND ({stored_hash} <> {source_hash} OR NOT p.is_active) "
+                f"RETURNING p.product_id"
+            ))).scalars().all()
+
+            inserted = (await conn.execute(text(
+                "INSERT INTO products (sku, name, description, type, material, price, discount_price,"
+                " stock_quantity, is_in_stock, image_url) "
+                "SELECT s.sku, s.name, s.description, s.type, s.material, s.price, s.discount_price,"
+                " COALESCE(s.stock_quantity, 0), COALESCE(s.stock_quantity, 0) > 0, s.image_url "
+                "FROM catalog_sync s WHERE NOT EXISTS (SELECT 1 FROM products p WHERE p.sku = s.sku) "
+                "ORDER BY s.row_no RETURNING product_id"
+            ))).scalars().all()
+
+            if dry_run:
+                await self.session.rollback()
+            else:
+                await WaitlistRepo(self.session).release_in_stock(updated)
+                await self.session.commit()
+        except Exception as e:
+            self.logger.error(f"Error synchronizing catalog: {e}")
+            await self.session.rollback()
+            return None
+
+        changed_ids = [*updated, *inserted]
+        if changed_ids and not dry_run:
+            await PromotionRepo(self.session).recalculate_effective_prices(changed_ids)
+
+        return {
+            "inserted": len(inserted),
+            "updated": len(updated),
+            "deactivated": len(deactivated),
+            "unchanged": loaded - len(duplicates) - len(inserted) - len(updated),
+            "duplicates": duplicates,
+            "dry_run": dry_run,
+        }
\ No newline at end of file
@@ -1,9 +1,16 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable
+from decimal import Decimal
 from datetime import datetime
-from sqlalchemy import select, update, delete, and_, or_, func
-from infrastructure.database.models.promotions import Promotion
+from sqlalchemy import select, update, delete, and_, or_, func, case, cast, literal, any_, all_, Integer, Numeric
+from sqlalchemy.dialects.postgresql import insert, ARRAY
+from sqlalchemy.orm import aliased
+from infrastructure.database.models.promotions import Promotion, DiscountType
 from infrastructure.database.models.product_promotions import ProductPromotion
+from infrastructure.database.models.products import Product
+from infrastructure.database.models.categories import ProductCategory
 from infrastructure.database.repositories.base import BaseRepo
+from infrastructure.database.repositories.outbox import OutboxRepo, PROMOTION_CREATED
+from infrastructure.database.repositories.notifications import NotificationsRepo
 import logging
 
 class PromotionRepo(BaseRepo):
@@ -12,18 +19,27 @@ class PromotionRepo(BaseRepo):
     """
     model = Promotion
     
-    async def create_promotion(self, promotion_data: Dict[str, Any]) -> Optional[Promotion]:
+    async def create_promotion(self, promotion_data: Dict[str, Any],
+                               notify_subscribers: bool = False) -> Optional[Promotion]:
         """
         Создает новую акцию.
         
         Args:
             promotion_data: Словарь с данными акции
+            notify_subscribers: Записать в outbox событие для рассылки подписчикам
+                (фиксируется в той же транзакции, что и акция)
             
         Returns:
             Созданный объект акции или None в случае ошибки
         """
         try:
-            promotion = await self.create(promotion_data)
+            promotion = Promotion(**promotion_data)
+            self.session.add(promotion)
+            if notify_subscribers:
+                await self.session.flush()
+                OutboxRepo(self.session).stage(PROMOTION_CREATED, {"promo_id": promotion.promo_id})
+            await self.session.commit()
+            await self.session.refresh(promotion)
             logging.info(f"Создана новая акция: {promotion.name}")
             return promotion
         except Exception as e:
@@ -67,56 +83,172 @@ class PromotionRepo(BaseRepo):
         Returns:
             True, если акция успешно применена к товару, иначе False
         """
+        return await self.apply_promotion_to_products(promo_id, [product_id]) is not None
+            
+    async def remove_promotion_from_product(self, promo_id: int, product_id: int) -> bool:
+        """
+        Удаляет акцию с товара.
+        
+        Args:
+            promo_id: ID акции
+            product_id: ID товара
+            
+        Returns:
+            True, если акция успешно удалена с товара, иначе False
+        """
+        return await self.remove_promotion_from_products(promo_id, [product_id]) is not None
+        
+    @staticmethod
+    def _id_array(ids: Iterable[int]):
+        """
+        Передает список ID одним параметром-массивом, чтобы размер запроса не зависел от количества товаров.
+        """
+        return literal(list(ids), ARRAY(Integer))
+        
+    async def _link_products(self, promo_id: int, product_select) -> List[int]:
+        """
+        Связывает акцию с товарами из подзапроса одним INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+        
+        Args:
+            promo_id: ID акции
+            product_select: SELECT, возвращающий колонку product_id
+            
+        Returns:
+            ID товаров, для которых связь была создана
+        """
+        product_ids = product_select.subquery()
+        stmt = (
+            insert(ProductPromotion)
+            .from_select(
+                ["product_id", "promo_id"],
+                select(product_ids.c.product_id, literal(promo_id))
+            )
+            .on_conflict_do_nothing(constraint="uq_product_promotion")
+            .returning(ProductPromotion.product_id)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+        
+    async def apply_promotion_to_products(self, promo_id: int, product_ids: Iterable[int]) -> Optional[List[int]]:
+        """
+        Применяет акцию к списку товаров одним запросом.
+        
+        Уже связанные и несуществующие товары пропускаются.
+        
+        Args:
+            promo_id: ID акции
+            product_ids: ID товаров
+            
+        Returns:
+            ID товаров, к которым акция была применена впервые, или None в случае ошибки
+        """
+        product_ids = list(product_ids)
+        if not product_ids:
+            return []
         try:
-            # Проверяем, существует ли уже связь
-            stmt = select(ProductPromotion).where(
-                and_(
-                    ProductPromotion.promo_id == promo_id,
-                    ProductPromotion.product_id == product_id
+            linked = await self._link_products(
+                promo_id,
+                select(Product.product_id).where(Product.product_id == any_(self._id_array(product_ids)))
+            )
+            await self.session.commit()
+            logging.info(f"Акция {promo_id} применена к {len(linked)} товарам")
+            await self.recalculate_effective_prices(linked)
+            return linked
+        except Exception as e:
+            logging.error(f"Ошибка при применении акции {promo_id} к товарам: {e}")
+            await self.session.rollback()
+            return None
+            
+    async def remove_promotion_from_products(self, promo_id: int, product_ids: Iterable[int]) -> Optional[List[int]]:
+        """
+        Удаляет акцию с набора товаров одним запросом.
+        
+        Args:
+            promo_id: ID акции
+            product_ids: ID товаров
+            
+        Returns:
+            ID товаров, с которых акция была удалена, или None в случае ошибки
+        """
+        product_ids = list(product_ids)
+        if not product_ids:
+            return []
+        try:
+            stmt = (
+                delete(ProductPromotion)
+                .where(
+                    and_(
+                        ProductPromotion.promo_id == promo_id,
+                        ProductPromotion.product_id == any_(self._id_array(product_ids))
+                    )
                 )
+                .returning(ProductPromotion.product_id)
             )
             result = await self.session.execute(stmt)
-            if result.scalars().first():
-                logging.info(f"Акция {promo_id} уже применена к товару {product_id}")
-                return True
-                
-            # Создаем новую связь
-            link = ProductPromotion(promo_id=promo_id, product_id=product_id)
-            self.session.add(link)
+            removed = list(result.scalars().all())
             await self.session.commit()
-            logging.info(f"Акция {promo_id} применена к товару {product_id}")
-            return True
+            logging.info(f"Акция {promo_id} удалена с {len(removed)} товаров")
+            await self.recalculate_effective_prices(removed)
+            return removed
         except Exception as e:
-            logging.error(f"Ошибка при применении акции {promo_id} к товару {product_id}: {e}")
+            logging.error(f"Ошибка при удалении акции {promo_id} с товаров: {e}")
             await self.session.rollback()
-            return False
+            return None
             
-    async def remove_promotion_from_product(self, promo_id: int, product_id: int) -> bool:
+    async def apply_promotion_by_rule(self, promo_id: int,
+                                      product_type: Optional[str] = None,
+                                      material: Optional[str] = None,
+                                      category_id: Optional[int] = None,
+                                      min_price: Optional[Decimal] = None,
+                                      max_price: Optional[Decimal] = None) -> Optional[List[int]]:
         """
-        Удаляет акцию с товара.
+        Применяет акцию ко всем товарам, подходящим под правило, на стороне БД (INSERT ... SELECT).
+        
+        Условия правила объединяются через AND; хотя бы одно условие обязательно.
+        Товары, снятые с продажи, не затрагиваются.
         
         Args:
             promo_id: ID акции
-            product_id: ID товара
+            product_type: Тип товара
+            material: Материал товара
+            category_id: ID категории
+            min_price: Минимальная обычная цена товара (включительно)
+            max_price: Максимальная обычная цена товара (включительно)
             
         Returns:
-            True, если акция успешно удалена с товара, иначе False
+            ID товаров, к которым акция была применена впервые, или None в случае ошибки
         """
-        try:
-            stmt = delete(ProductPromotion).where(
-                and_(
-                    ProductPromotion.promo_id == promo_id,
-                    ProductPromotion.product_id == product_id
+        conditions = []
+        if product_type:
+            conditions.append(Product.type == product_type)
+        if material:
+            conditions.append(Product.material == material)
+        if category_id is not None:
+            conditions.append(
+                Product.product_id.in_(
+                    select(ProductCategory.product_id).where(ProductCategory.category_id == category_id)
                 )
             )
-            await self.session.execute(stmt)
+        if min_price is not None:
+            conditions.append(Product.price >= min_price)
+        if max_price is not None:
+            conditions.append(Product.price <= max_price)
+        if not conditions:
+            logging.error(f"Не задано ни одного условия для применения акции {promo_id}")
+            return None
+            
+        try:
+            linked = await self._link_products(
+                promo_id, select(Product.product_id).where(Product.is_active == True, *conditions)
+            )
             await self.session.commit()
-            logging.info(f"Акция {promo_id} удалена с товара {product_id}")
-            return True
+            logging.info(f"Акция {promo_id} применена по правилу к {len(linked)} товарам")
+            await self.recalculate_effective_prices(linked)
+            return linked
         except Exception as e:
-            logging.error(f"Ошибка при удалении акции {promo_id} с товара {product_id}: {e}")
+            logging.error(f"Ошибка при применении акции {promo_id} по правилу: {e}")
             await self.session.rollback()
-            return False
+            return None
             
     async def get_promotions_for_product(self, product_id: int) -> List[Promotion]:
         """
@@ -163,7 +295,10 @@ class PromotionRepo(BaseRepo):
         Returns:
             Обновленный объект акции или None в случае ошибки
         """
-        return await self.update(promo_id, update_data)
+        promotion = await self.update(promo_id, update_data)
+        if promotion is not None:
+            await self.recalculate_effective_prices(await self.get_promotion_product_ids(promo_id))
+        return promotion
         
     async def deactivate_promotion(self, promo_id: int) -> bool:
         """
@@ -176,7 +311,263 @@ class PromotionRepo(BaseRepo):
             True, если акция успешно деактивирована, иначе False
         """
         try:
-            return await self.update_field(promo_id, "is_active", False)
+            deactivated = await self.update_field(promo_id, "is_active", False)
+            if deactivated:
+                await self.recalculate_effective_prices(await self.get_promotion_product_ids(promo_id))
+            return deactivated
         except Exception as e:
             logging.error(f"Ошибка при деактивации акции {promo_id}: {e}")
-            return False
\ No newline at end of file
+            return False
+            
+    async def get_promotion_by_id(self, promo_id: int) -> Optional[Promotion]:
+        """
+        Получает акцию по ID.
+        
+        Args:
+            promo_id: ID акции
+            
+        Returns:
+            Объект акции или None, если акция не найдена
+        """
+        return await self.get_by_id(promo_id)
+        
+    async def get_all_promotions(self) -> List[Promotion]:
+        """
+        Получает все акции, начиная с самых новых.
+        
+        Returns:
+            Список акций
+        """
+        return await self.get_all(order_by="-start_date")
+        
+    async def get_promotion_product_ids(self, promo_id: int) -> List[int]:
+        """
+        Получает ID товаров, участвующих в акции.
+        
+        Args:
+            promo_id: ID акции
+            
+        Returns:
+            Список ID товаров
+        """
+        try:
+            stmt = select(ProductPromotion.product_id).where(ProductPromotion.promo_id == promo_id)
+            result = await self.session.execute(stmt)
+            return list(result.scalars().all())
+        except Exception as e:
+            logging.error(f"Ошибка при получении товаров акции {promo_id}: {e}")
+            return []
+            
+    async def get_promotion_products(self, promo_id: int) -> List[Product]:
+        """
+        Получает товары, участвующие в акции.
+        
+        Args:
+            promo_id: ID акции
+            
+        Returns:
+            Список товаров акции
+        """
+        try:
+            stmt = (
+                select(Product)
+                .join(ProductPromotion, ProductPromotion.product_id == Product.product_id)
+                .where(ProductPromotion.promo_id == promo_id)
+                .order_by(Product.product_id)
+            )
+            result = await self.session.execute(stmt)
+            return list(result.scalars().all())
+        except Exception as e:
+            logging.error(f"Ошибка при получении товаров акции {promo_id}: {e}")
+            return []
+            
+    async def update_promotion_products(self, promo_id: int, product_ids: Iterable[int]) -> bool:
+        """
+        Заменяет список товаров акции и пересчитывает цены затронутых товаров.
+        
+        Выполняется двумя запросами независимо от количества товаров:
+        DELETE лишних связей и INSERT ... ON CONFLICT DO NOTHING новых.
+        
+        Args:
+            promo_id: ID акции
+            product_ids: Новый список ID товаров
+            
+        Returns:
+            True, если список товаров успешно обновлен, иначе False
+        """
+        product_ids = list(set(product_ids))
+        try:
+            stmt = delete(ProductPromotion).where(ProductPromotion.promo_id == promo_id)
+            if product_ids:
+                stmt = stmt.where(ProductPromotion.product_id != all_(self._id_array(product_ids)))
+            removed = await self.session.execute(stmt.returning(ProductPromotion.product_id))
+            affected = set(removed.scalars().all())
+            
+            if product_ids:
+                affected.update(await self._link_products(
+                    promo_id,
+                    select(Product.product_id).where(Product.product_id == any_(self._id_array(product_ids)))
+                ))
+            await self.session.commit()
+            logging.info(f"Обновлен список товаров акции {promo_id}: {len(product_ids)} шт.")
+            await self.recalculate_effective_prices(affected)
+            return True
+        except Exception as e:
+            logging.error(f"Ошибка при обновлении товаров акции {promo_id}: {e}")
+            await self.session.rollback()
+            return False
+            
+    async def delete_promotion(self, promo_id: int) -> bool:
+        """
+        Удаляет акцию и пересчитывает цены товаров, на которые она действовала.
+        
+        Args:
+            promo_id: ID акции
+            
+        Returns:
+            True, если акция успешно удалена, иначе False
+        """
+        product_ids = await self.get_promotion_product_ids(promo_id)
+        deleted = await self.delete(promo_id)
+        if deleted:
+            await self.recalculate_effective_prices(product_ids)
+        return deleted
+        
+    async def get_next_boundary(self, after: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Получает ближайший момент начала или окончания активной акции.
+        
+        Args:
+            after: Момент времени, после которого ищется граница (по умолчанию — сейчас)
+            
+        Returns:
+            Время ближайшей границы или None, если запланированных изменений нет
+        """
+        after = after or datetime.now()
+        try:
+            next_start = (
+                select(func.min(Promotion.start_date))
+                .where(and_(Promotion.is_active == True, Promotion.start_date > after))
+                .scalar_subquery()
+            )
+            next_end = (
+                select(func.min(Promotion.end_date))
+                .where(and_(Promotion.is_active == True, Promotion.end_date >= after))
+                .scalar_subquery()
+            )
+            result = await self.session.execute(select(func.least(next_start, next_end)))
+            return result.scalar()
+        except Exception as e:
+            logging.error(f"Ошибка при получении ближайшей границы акций: {e}")
+            return None
+            
+    @staticmethod
+    def best_promotion_price(now: datetime):
+        """
+        Строит коррелированный подзапрос с лучшей ценой товара по действующим акциям.
+        
+        Для каждой действующей акции товара вычисляется цена со скидкой
+        (процент от цены или фиксированная сумма, но не ниже нуля),
+        из пересекающихся акций выбирается минимальная цена.
+        
+        Args:
+            now: Момент времени, на который оцениваются периоды акций
+            
+        Returns:
+            Скалярный подзапрос с ценой или NULL, если действующих акций нет
+        """
+        discount = cast(Promotion.discount_value, Numeric(10, 2))
+        promo_price = case(
+            (
+                Promotion.discount_type == DiscountType.PERCENTAGE.value,
+                Product.price * (100 - func.least(discount, 100)) / 100
+            ),
+            else_=Product.price - discount
+        )
+        return (
+            select(func.min(func.greatest(func.round(promo_price, 2), 0)))
+            .select_from(ProductPromotion)
+            .join(Promotion, Promotion.promo_id == ProductPromotion.promo_id)
+            .where(
+                and_(
+                    ProductPromotion.product_id == Product.product_id,
+                    Promotion.is_active == True,
+                    Promotion.start_date <= now,
+                    or_(
+                        Promotion.end_date.is_(None),
+                        Promotion.end_date >= now
+                    )
+                )
+            )
+            .scalar_subquery()
+        )
+        
+    async def recalculate_effective_prices(self, product_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Пересчитывает итоговые цены товаров одним UPDATE.
+        
+        Итоговая цена — минимум из обычной цены, ручной цены со скидкой
+        и лучшей цены по действующим акциям. Строки, цена которых не изменилась,
+        не перезаписываются.
+        
+        Это общая точка всех изменений цен (ручная правка, импорт прайс-листа,
+        синхронизация каталога, границы акций), поэтому в том же операторе
+        в outbox ставятся уведомления о снижении цен товаров в избранном
+        (см. NotificationsRepo.queue_price_drop_alerts).
+        
+        Args:
+            product_ids: ID товаров для пересчета (None — весь каталог)
+            
+        Returns:
+            Количество товаров, у которых изменилась итоговая цена
+        """
+        if product_ids is not None:
+            product_ids = list(product_ids)
+            if not product_ids:
+                return 0
+                
+        try:
+            new_price = func.least(
+                Product.price,
+                Product.discount_price,
+                self.best_promotion_price(datetime.now())
+            )
+            # Самосоединение дает доступ к цене до обновления в RETURNING
+            old = aliased(Product, name="old")
+            changed = (
+                update(Product)
+                .where(
+                    old.product_id == Product.product_id,
+                    Product.effective_price.is_distinct_from(new_price)
+                )
+                .values(effective_price=new_price)
+                .returning(
+                    Product.product_id,
+                    Product.name,
+                    Product.is_active,
+                    old.effective_price.label("old_price"),
+                    Product.effective_price.label("new_price")
+                )
+            )
+            if product_ids is not None:
+                changed = changed.where(Product.product_id.in_(product_ids))
+            changed = changed.cte("changed")
+            
+            queued = NotificationsRepo.queue_price_drop_alerts(changed)
+            stmt = (
+                select(
+                    select(func.count()).select_from(changed).scalar_subquery(),
+                    select(func.count()).select_from(queued).scalar_subquery()
+                )
+            )
+            updated, alerts = (await self.session.execute(stmt)).one()
+            await self.session.commit()
+            if updated:
+                logging.info(f"Пересчитаны итоговые цены: {updated} товаров")
+            if alerts:
+                logging.info(f"Поставлены уведомления о снижении цен: {alerts} пользователей")
+            return updated
+        except Exception as e:
+            logging.error(f"Ошибка при пересчете итоговых цен: {e}")
+            await self.session.rollback()
+            return 0
@@ -15,6 +15,12 @@ from infrastructure.database.repositories.specifications import SpecificationsRe
 from infrastructure.database.repositories.logs import LogsRepo
 from infrastructure.database.repositories.chat import ChatRepo
 from infrastructure.database.repositories.admin_user_repo import AdminUserRepo
+from infrastructure.database.repositories.promotion_repo import PromotionRepo
+from infrastructure.database.repositories.scheduled_jobs import ScheduledJobsRepo
+from infrastructure.database.repositories.media import MediaRepo
+from infrastructure.database.repositories.product_statistic_repo import ProductStatisticRepo
+from infrastructure.database.repositories.outbox import OutboxRepo
+from infrastructure.database.repositories.waitlist import WaitlistRepo
 
 
 @dataclass
@@ -117,3 +123,46 @@ class RequestsRepo:
         The AdminUser repository for managing admin users.
         """
         return AdminUserRepo(self.session)
+
+        
+    @property
+    def promotions(self) -> PromotionRepo:
+        """
+        The Promotion repository for managing promotions and effective product prices.
+        """
+        return PromotionRepo(self.session)
+        
+    @property
+    def scheduled_jobs(self) -> ScheduledJobsRepo:
+        """
+        The ScheduledJobs repository for persisting background scheduler state.
+        """
+        return ScheduledJobsRepo(self.session)
+        
+    @property
+    def media(self) -> MediaRepo:
+        """
+        The Media repository for managing the Telegram file_id cache of product images.
+        """
+        return MediaRepo(self.session)
+        
+    @property
+    def statistics(self) -> ProductStatisticRepo:
+        """
+        The ProductStatistic repository for daily statistics rollups of products and user actions.
+        """
+        return ProductStatisticRepo(self.session)
+        
+    @property
+    def outbox(self) -> OutboxRepo:
+        """
+        The Outbox repository for side effects recorded together with business changes.
+        """
+        return OutboxRepo(self.session)
+        
+    @property
+    def waitlist(self) -> WaitlistRepo:
+        """
+        The Waitlist repository for back-in-stock notifications.
+        """
+        return WaitlistRepo(self.session)
\ No newline at end of file
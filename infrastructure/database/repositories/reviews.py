@@ -1,7 +1,10 @@
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
 import logging
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, update, delete, and_, func, cast, tuple_, Numeric
+from sqlalchemy.sql import ColumnElement
+from infrastructure.database.models.products import Product
 from infrastructure.database.models.reviews import Review
 from infrastructure.database.repositories.base import BaseRepo
 
@@ -11,13 +14,47 @@ class ReviewsRepo(BaseRepo[Review]):
     Репозиторий для работы с отзывами о товарах.
     
     Предоставляет методы для создания, получения, обновления и удаления отзывов.
+    Каждое изменение одобренного отзыва в той же транзакции меняет агрегаты товара
+    (rating_sum, rating_count, average_rating), поэтому рейтинг читается из карточки
+    товара без подсчета по отзывам.
     """
     model = Review
     
+    @staticmethod
+    def _rating_values(sum_delta: Any, count_delta: Any) -> Dict[str, ColumnElement]:
+        """
+        Значения UPDATE products, сдвигающие агрегаты рейтинга на заданные величины.
+        
+        В SET справа видны старые значения столбцов, поэтому средняя оценка
+        вычисляется из уже сдвинутых суммы и количества.
+        """
+        rating_sum = Product.rating_sum + sum_delta
+        rating_count = Product.rating_count + count_delta
+        return {
+            "rating_sum": rating_sum,
+            "rating_count": rating_count,
+            "average_rating": func.round(cast(rating_sum, Numeric) / func.nullif(rating_count, 0), 2),
+            # Новый отзыв не является изменением товара: updated_at сохраняет значение
+            "updated_at": Product.updated_at,
+        }
+    
+    async def _apply_rating_delta(self, product_id: int, sum_delta: int, count_delta: int) -> None:
+        """
+        Сдвигает агрегаты рейтинга товара (без коммита).
+        """
+        stmt = (
+            update(Product)
+            .where(Product.product_id == product_id)
+            .values(**self._rating_values(sum_delta, count_delta))
+        )
+        await self.session.execute(stmt)
+    
     async def create_review(self, review_data: Dict[str, Any]) -> Optional[Review]:
         """
         Создает новый отзыв о товаре в базе данных.
         
+        Одобренный сразу отзыв учитывается в рейтинге товара в той же транзакции.
+        
         Args:
             review_data: Словарь с данными отзыва (user_id, product_id, rating, text)
             
@@ -25,26 +62,52 @@ class ReviewsRepo(BaseRepo[Review]):
             Созданный объект отзыва или None в случае ошибки
         """
         try:
-            return await self.create(review_data)
+            review = Review(**review_data)
+            self.session.add(review)
+            await self.session.flush()
+            if review_data.get("is_approved"):
+                await self._apply_rating_delta(review.product_id, review.rating, 1)
+            await self.session.commit()
+            await self.session.refresh(review)
+            return review
         except Exception as e:
             logging.error(f"Ошибка при создании отзыва: {e}")
+            await self.session.rollback()
             return None
     
-    async def get_product_reviews(self, product_id: int) -> List[Review]:
+    async def get_product_reviews(
+        self,
+        product_id: int,
+        limit: int = 10,
+        after: Optional[Tuple[datetime, int]] = None,
+        approved_only: bool = True,
+    ) -> List[Review]:
         """
-        Получает все отзывы для конкретного товара.
+        Получает страницу отзывов товара, новые первыми.
+        
+        Keyset-пагинация по (created_at, review_id) идет по индексу
+        ix_reviews_product_created, поэтому дальние страницы не дороже первой.
         
         Args:
             product_id: ID товара
+            limit: Размер страницы
+            after: (created_at, review_id) последнего отзыва предыдущей страницы
+                (None — первая страница)
+            approved_only: Только одобренные отзывы (False — для модерации)
             
         Returns:
             Список отзывов для товара
         """
         try:
+            stmt = select(self.model).where(self.model.product_id == product_id)
+            if approved_only:
+                stmt = stmt.where(self.model.is_approved == True)
+            if after is not None:
+                stmt = stmt.where(tuple_(self.model.created_at, self.model.review_id) < tuple_(*after))
             stmt = (
-                select(self.model)
-                .where(self.model.product_id == product_id)
-                .order_by(self.model.created_at.desc())
+                stmt
+                .order_by(self.model.created_at.desc(), self.model.review_id.desc())
+                .limit(limit)
             )
             result = await self.session.execute(stmt)
             return list(result.scalars().all())
@@ -90,6 +153,10 @@ class ReviewsRepo(BaseRepo[Review]):
         """
         Обновляет отзыв по ID.
         
+        Строка отзыва блокируется до обновления, так что разница между старым и новым
+        вкладом отзыва (оценка, одобрение) в рейтинг товара вычисляется без гонок
+        и применяется в той же транзакции.
+        
         Args:
             review_id: ID отзыва
             update_data: Словарь с обновляемыми полями
@@ -97,23 +164,97 @@ class ReviewsRepo(BaseRepo[Review]):
         Returns:
             Обновленный объект отзыва или None в случае ошибки
         """
-        return await self.update(review_id, update_data)
+        try:
+            old = (await self.session.execute(
+                select(self.model.product_id, self.model.rating, self.model.is_approved)
+                .where(self.model.review_id == review_id)
+                .with_for_update()
+            )).first()
+            if old is None:
+                await self.session.rollback()
+                return None
+
+            stmt = (
+                update(self.model)
+                .where(self.model.review_id == review_id)
+                .values(**update_data)
+                .returning(self.model)
+            )
+            review = (await self.session.execute(stmt)).scalars().first()
+
+            # Вклад отзыва в агрегаты товара до и после изменения
+            deltas: Dict[int, Tuple[int, int]] = {}
+            for product_id, rating, is_approved, sign in (
+                (old.product_id, old.rating, old.is_approved, -1),
+                (review.product_id, review.rating, review.is_approved, 1),
+            ):
+                if is_approved:
+                    rating_sum, rating_count = deltas.get(product_id, (0, 0))
+                    deltas[product_id] = (rating_sum + sign * rating, rating_count + sign)
+            for product_id, (sum_delta, count_delta) in deltas.items():
+                if sum_delta or count_delta:
+                    await self._apply_rating_delta(product_id, sum_delta, count_delta)
+
+            await self.session.commit()
+            return review
+        except Exception as e:
+            logging.error(f"Ошибка при обновлении отзыва {review_id}: {e}")
+            await self.session.rollback()
+            return None
+    
+    async def approve_review(self, review_id: int) -> Optional[Review]:
+        """
+        Одобряет отзыв, после чего он учитывается в рейтинге товара.
+        
+        Args:
+            review_id: ID отзыва
+            
+        Returns:
+            Обновленный объект отзыва или None в случае ошибки
+        """
+        return await self.update_review(review_id, {"is_approved": True})
     
     async def delete_review(self, review_id: int) -> bool:
         """
         Удаляет отзыв по ID.
         
+        Один запрос: DELETE ... RETURNING передает оценку удаленного отзыва в UPDATE
+        агрегатов товара, если отзыв был одобрен.
+        
         Args:
             review_id: ID отзыва
             
         Returns:
             True, если отзыв успешно удален, иначе False
         """
-        return await self.delete(review_id)
+        try:
+            deleted = (
+                delete(self.model)
+                .where(self.model.review_id == review_id)
+                .returning(self.model.product_id, self.model.rating, self.model.is_approved)
+                .cte("deleted")
+            )
+            recounted = (
+                update(Product)
+                .where(Product.product_id == deleted.c.product_id, deleted.c.is_approved == True)
+                .values(**self._rating_values(-deleted.c.rating, -1))
+                .returning(Product.product_id)
+                .cte("recounted")
+            )
+            stmt = select(func.count()).select_from(deleted).add_cte(recounted)
+            removed = bool(await self.session.scalar(stmt))
+            await self.session.commit()
+            return removed
+        except Exception as e:
+            logging.error(f"Ошибка при удалении отзыва {review_id}: {e}")
+            await self.session.rollback()
+            return False
     
     async def get_avg_product_rating(self, product_id: int) -> Optional[float]:
         """
-        Получает среднюю оценку товара на основе всех отзывов.
+        Получает среднюю оценку товара по одобренным отзывам.
+        
+        Значение поддерживается при изменении отзывов и читается из товара.
         
         Args:
             product_id: ID товара
@@ -123,8 +264,8 @@ class ReviewsRepo(BaseRepo[Review]):
         """
         try:
             stmt = (
-                select(func.avg(self.model.rating))
-                .where(self.model.product_id == product_id)
+                select(Product.average_rating)
+                .where(Product.product_id == product_id)
             )
             result = await self.session.execute(stmt)
             return result.scalar()
@@ -134,7 +275,7 @@ class ReviewsRepo(BaseRepo[Review]):
     
     async def get_review_count(self, product_id: int) -> int:
         """
-        Получает количество отзывов для товара.
+        Получает количество одобренных отзывов для товара (из агрегата товара).
         
         Args:
             product_id: ID товара
@@ -144,8 +285,8 @@ class ReviewsRepo(BaseRepo[Review]):
         """
         try:
             stmt = (
-                select(func.count())
-                .where(self.model.product_id == product_id)
+                select(Product.rating_count)
+                .where(Product.product_id == product_id)
             )
             result = await self.session.execute(stmt)
             return result.scalar() or 0
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from infrastructure.database.models.scheduled_jobs import ScheduledJob
+from infrastructure.database.repositories.base import BaseRepo
+
+
+class ScheduledJobsRepo(BaseRepo[ScheduledJob]):
+    """
+    Repository for persisting scheduler state, so restarts do not miss planned runs.
+    """
+    model = ScheduledJob
+
+    async def get_next_run_times(self) -> Dict[str, Optional[datetime]]:
+        """
+        Gets the persisted next run time of every job.
+        
+        Returns:
+            Dictionary mapping job name to its next run time
+        """
+        try:
+            result = await self.session.execute(select(ScheduledJob.name, ScheduledJob.next_run_at))
+            return {name: next_run_at for name, next_run_at in result}
+        except SQLAlchemyError as e:
+            logging.error(f"Error retrieving scheduled job state: {e}")
+            return {}
+
+    async def save_run_state(self, name: str, next_run_at: Optional[datetime],
+                             last_run_at: Optional[datetime] = None) -> bool:
+        """
+        Creates or updates the persisted state of a job.
+        
+        Args:
+            name: Job name
+            next_run_at: Time of the next planned run
+            last_run_at: Time of the run that has just finished (kept unchanged if None)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        values = {"name": name, "next_run_at": next_run_at}
+        if last_run_at is not None:
+            values["last_run_at"] = last_run_at
+        try:
+            stmt = (
+                insert(ScheduledJob)
+                .values(**values)
+                .on_conflict_do_update(
+                    index_elements=[ScheduledJob.name],
+                    set_={key: value for key, value in values.items() if key != "name"},
+                )
+            )
+            await self.session.execute(stmt)
+            await self.session.commit()
+            return True
+        except SQLAlchemyError as e:
+            logging.error(f"Error saving state of scheduled job {name}: {e}")
+            await self.session.rollback()
+            return False
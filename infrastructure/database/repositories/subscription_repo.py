@@ -1,5 +1,5 @@
 from typing import List, Optional
-from sqlalchemy import select, update, and_, or_
+from sqlalchemy import Select, select, update, and_, or_
 from infrastructure.database.models.subscriptions import Subscription, SubscriptionType
 from infrastructure.database.repositories.base import BaseRepo
 import logging
@@ -138,6 +138,23 @@ class SubscriptionRepo(BaseRepo):
             logging.error(f"Ошибка при проверке подписки пользователя {user_id} на {subscription_type}: {e}")
             return False
             
+    @staticmethod
+    def subscribers_query(subscription_type: str = SubscriptionType.ALL.value) -> Select:
+        """
+        Запрос ID пользователей, подписанных на тип уведомлений (или на все уведомления).
+        
+        Используется и для выборки списка, и для массовой вставки в outbox (INSERT ... SELECT).
+        """
+        return select(Subscription.user_id).where(
+            and_(
+                or_(
+                    Subscription.subscription_type == subscription_type,
+                    Subscription.subscription_type == SubscriptionType.ALL.value
+                ),
+                Subscription.is_active == True
+            )
+        ).distinct()
+            
     async def get_subscribers_by_type(self, subscription_type: str = SubscriptionType.ALL.value) -> List[int]:
         """
         Получает список ID пользователей, подписанных на определенный тип уведомлений.
@@ -149,15 +166,7 @@ class SubscriptionRepo(BaseRepo):
             Список ID пользователей
         """
         try:
-            stmt = select(Subscription.user_id).where(
-                and_(
-                    or_(
-                        Subscription.subscription_type == subscription_type,
-                        Subscription.subscription_type == SubscriptionType.ALL.value
-                    ),
-                    Subscription.is_active == True
-                )
-            ).distinct()
+            stmt = self.subscribers_query(subscription_type)
             
             result = await self.session.execute(stmt)
             return [row[0] for row in result]
@@ -0,0 +1,100 @@
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import String, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from infrastructure.database.models.outbox import OutboxEvent
+from infrastructure.database.models.products import Product
+from infrastructure.database.models.stock_waitlist import StockWaitlistEntry
+from infrastructure.database.repositories.base import BaseRepo
+from infrastructure.database.repositories.outbox import BACK_IN_STOCK
+
+
+class WaitlistRepo(BaseRepo[StockWaitlistEntry]):
+    """
+    Repository of the back-in-stock waitlist.
+    """
+    model = StockWaitlistEntry
+
+    async def add(self, user_id: int, product_id: int) -> Optional[bool]:
+        """
+        Puts a user on the waitlist of a product (idempotent).
+
+        Args:
+            user_id: User ID
+            product_id: Product ID
+
+        Returns:
+            True if the user was added, False if already waiting, None on error
+        """
+        try:
+            stmt = (
+                pg_insert(StockWaitlistEntry)
+                .values(user_id=user_id, product_id=product_id)
+                .on_conflict_do_nothing(index_elements=["product_id", "user_id"])
+                .returning(StockWaitlistEntry.product_id)
+            )
+            added = (await self.session.execute(stmt)).first() is not None
+            await self.session.commit()
+            return added
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error adding user {user_id} to the waitlist of product {product_id}: {e}")
+            await self.session.rollback()
+            return None
+
+    async def release_in_stock(self, product_ids: Optional[Sequence[int]] = None) -> Tuple[int, int]:
+        """
+        Clears the waitlist entries of products that are back in stock and queues
+        the notifications, in one statement and without committing.
+
+        A DELETE ... USING products ... RETURNING collects the waiting users of every
+        active in-stock product, and the outbox INSERT built on it queues one
+        back_in_stock event per user with all their products; the outbox dispatcher
+        sends them in rate-limited batches. Called inside the transaction that
+        restocks products, so entries are cleared only if the restock is committed.
+
+        Args:
+            product_ids: Products to check (None — all products, e.g. after external updates)
+
+        Returns:
+            Tuple of the number of released entries and of queued notifications
+        """
+        released = (
+            delete(StockWaitlistEntry)
+            .where(
+                StockWaitlistEntry.product_id == Product.product_id,
+                Product.is_in_stock == True,
+                Product.is_active == True,
+            )
+            .returning(StockWaitlistEntry.user_id, Product.product_id, Product.name)
+        )
+        if product_ids is not None:
+            if not product_ids:
+                return 0, 0
+            released = released.where(Product.product_id.in_(product_ids))
+        released = released.cte("released")
+
+        items = func.jsonb_agg(
+            func.jsonb_build_object("product_id", released.c.product_id, "name", released.c.name)
+        )
+        queued = (
+            insert(OutboxEvent)
+            .from_select(
+                ["kind", "payload"],
+                select(
+                    literal(BACK_IN_STOCK, String),
+                    func.jsonb_build_object("user_id", released.c.user_id, "items", items, type_=JSONB),
+                ).group_by(released.c.user_id),
+            )
+            .returning(OutboxEvent.event_id)
+            .cte("queued")
+        )
+        stmt = select(
+            select(func.count()).select_from(released).scalar_subquery(),
+            select(func.count()).select_from(queued).scalar_subquery(),
+        )
+        entries, notifications = (await self.session.execute(stmt)).one()
+        if entries:
+            self.logger.info(f"Back in stock: {entries} waitlist entries released, {notifications} users notified")
+        return entries, notifications
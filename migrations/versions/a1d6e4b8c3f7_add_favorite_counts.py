@@ -0,0 +1,43 @@
+"""add favorites uniqueness and product favorite counts
+
+Revision ID: a1d6e4b8c3f7
+Revises: f9c5d3a7b2e6
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1d6e4b8c3f7'
+down_revision: Union[str, None] = 'f9c5d3a7b2e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicates left by concurrent double taps: keep the earliest row
+    op.execute(
+        "DELETE FROM favorites f USING favorites d "
+        "WHERE f.user_id = d.user_id AND f.product_id = d.product_id AND f.id > d.id"
+    )
+    op.create_unique_constraint('uq_favorites_user_product', 'favorites', ['user_id', 'product_id'])
+
+    op.add_column('products', sa.Column('favorite_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE products p SET favorite_count = f.cnt "
+        "FROM (SELECT product_id, count(*) AS cnt FROM favorites GROUP BY product_id) f "
+        "WHERE p.product_id = f.product_id"
+    )
+    op.create_index(
+        'ix_products_favorite_count', 'products', [sa.text('favorite_count DESC'), 'product_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_favorite_count', table_name='products')
+    op.drop_column('products', 'favorite_count')
+    op.drop_constraint('uq_favorites_user_product', 'favorites', type_='unique')
@@ -0,0 +1,51 @@
+"""add effective_price to products
+
+Revision ID: a3f1c9e7b2d4
+Revises: 21f5c8cbf9a2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9e7b2d4'
+down_revision: Union[str, None] = '21f5c8cbf9a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add precomputed effective price column
+    op.add_column('products', sa.Column('effective_price', sa.Numeric(precision=10, scale=2), nullable=True))
+
+    # Seed effective prices from the best active promotion, manual discount or regular price
+    op.execute("""
+        UPDATE products p
+        SET effective_price = LEAST(
+            p.price,
+            p.discount_price,
+            (
+                SELECT MIN(GREATEST(ROUND(
+                    CASE
+                        WHEN pr.discount_type = 'percentage'
+                            THEN p.price * (100 - LEAST(pr.discount_value::numeric(10, 2), 100)) / 100
+                        ELSE p.price - pr.discount_value::numeric(10, 2)
+                    END, 2), 0))
+                FROM product_promotions pp
+                JOIN promotions pr ON pr.promo_id = pp.promo_id
+                WHERE pp.product_id = p.product_id
+                  AND pr.is_active
+                  AND pr.start_date <= now()
+                  AND (pr.end_date IS NULL OR pr.end_date >= now())
+            )
+        )
+    """)
+
+
+def downgrade() -> None:
+    # Drop effective price column
+    op.drop_column('products', 'effective_price')
@@ -0,0 +1,98 @@
+"""partition logs by month
+
+Revision ID: a4d9e7b2c5f8
+Revises: f3a8c2d6e9b1
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d9e7b2c5f8'
+down_revision: Union[str, None] = 'f3a8c2d6e9b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created ahead of the current month (the bot keeps this horizon afterwards)
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    # Keep the plain table aside while its rows are copied into the partitioned one
+    op.execute("ALTER TABLE logs RENAME TO logs_unpartitioned")
+    op.execute("ALTER INDEX logs_pkey RENAME TO logs_unpartitioned_pkey")
+    op.execute("DROP INDEX ix_logs_timestamp")
+
+    # The partition key has to be a part of the primary key
+    op.execute("""
+        CREATE TABLE logs (
+            log_id integer NOT NULL DEFAULT nextval('logs_log_id_seq'),
+            user_id bigint NOT NULL REFERENCES users (user_id),
+            action varchar(255) NOT NULL,
+            details text,
+            "timestamp" timestamp without time zone NOT NULL DEFAULT now(),
+            CONSTRAINT logs_pkey PRIMARY KEY (log_id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+
+    # Monthly partitions logs_pYYYYMM from the oldest existing row up to the horizon
+    op.execute(f"""
+        DO $$
+        DECLARE
+            part_month date;
+            last_month date := date_trunc('month', now())::date + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            SELECT date_trunc('month', coalesce(min("timestamp"), now()))::date INTO part_month FROM logs_unpartitioned;
+            WHILE part_month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF logs FOR VALUES FROM (%L) TO (%L)',
+                    'logs_p' || to_char(part_month, 'YYYYMM'), part_month, (part_month + interval '1 month')::date
+                );
+                part_month := (part_month + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+
+    op.execute(
+        'INSERT INTO logs (log_id, user_id, action, details, "timestamp") '
+        'SELECT log_id, user_id, action, details, "timestamp" FROM logs_unpartitioned'
+    )
+
+    # Indexes are built after the copy; on the parent they are created in every partition
+    op.create_index('ix_logs_timestamp', 'logs', ['timestamp'], unique=False)
+    op.create_index('ix_logs_action_timestamp', 'logs', ['action', 'timestamp'], unique=False)
+
+    # The sequence would be dropped together with the table owning it
+    op.execute("ALTER SEQUENCE logs_log_id_seq OWNED BY logs.log_id")
+    op.execute("DROP TABLE logs_unpartitioned")
+
+
+def downgrade() -> None:
+    # Move rows of the remaining partitions back into a plain table
+    op.execute("ALTER TABLE logs RENAME TO logs_partitioned")
+    op.execute("ALTER INDEX logs_pkey RENAME TO logs_partitioned_pkey")
+    op.execute("DROP INDEX ix_logs_timestamp")
+    op.execute("DROP INDEX ix_logs_action_timestamp")
+
+    op.execute("""
+        CREATE TABLE logs (
+            log_id integer NOT NULL DEFAULT nextval('logs_log_id_seq'),
+            user_id bigint NOT NULL REFERENCES users (user_id),
+            action varchar(255) NOT NULL,
+            details text,
+            "timestamp" timestamp without time zone NOT NULL DEFAULT now(),
+            CONSTRAINT logs_pkey PRIMARY KEY (log_id)
+        )
+    """)
+    op.execute(
+        'INSERT INTO logs (log_id, user_id, action, details, "timestamp") '
+        'SELECT log_id, user_id, action, details, "timestamp" FROM logs_partitioned'
+    )
+    op.create_index('ix_logs_timestamp', 'logs', ['timestamp'], unique=False)
+
+    op.execute("ALTER SEQUENCE logs_log_id_seq OWNED BY logs.log_id")
+    # Partitions are dropped together with the parent table
+    op.execute("DROP TABLE logs_partitioned")
@@ -0,0 +1,37 @@
+"""add price alerts
+
+Revision ID: b2e7f5c9d4a8
+Revises: a1d6e4b8c3f7
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e7f5c9d4a8'
+down_revision: Union[str, None] = 'a1d6e4b8c3f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Last price-drop alert per user and favorited product (deduplication of alerts)
+    op.create_table('price_alerts',
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('notified_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.product_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'product_id')
+    )
+    op.create_index(op.f('ix_price_alerts_product_id'), 'price_alerts', ['product_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_price_alerts_product_id'), table_name='price_alerts')
+    op.drop_table('price_alerts')
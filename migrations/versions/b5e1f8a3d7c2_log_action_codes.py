@@ -0,0 +1,118 @@
+"""log action codes and jsonb details
+
+Revision ID: b5e1f8a3d7c2
+Revises: a4d9e7b2c5f8
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1f8a3d7c2'
+down_revision: Union[str, None] = 'a4d9e7b2c5f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# LogAction codes at the time of this migration; unknown actions get code 0
+ACTION_CODES = {
+    'view_product': 1,
+    'open_filter_menu': 2,
+    'filter_products': 3,
+    'initiate_purchase': 4,
+    'order_created': 5,
+    'create_order': 5,
+    'cancel_purchase': 6,
+    'add_favorite': 7,
+    'remove_favorite': 8,
+    'search_products': 9,
+    'view_catalog': 10,
+    'send_notification': 11,
+    'notification_error': 12,
+    'admin_authorized': 13,
+    'add_admin': 14,
+    'remove_admin': 15,
+}
+
+# Actions whose free text details end with "... товара с ID <product_id>"
+PRODUCT_ACTIONS = (
+    'view_product', 'initiate_purchase', 'cancel_purchase',
+    'add_favorite', 'remove_favorite', 'create_order',
+)
+
+
+def _code_case(column: str) -> str:
+    whens = " ".join(f"WHEN '{action}' THEN {code}" for action, code in ACTION_CODES.items())
+    return f"CASE {column} {whens} ELSE 0 END"
+
+
+def _in_list(actions) -> str:
+    return ", ".join(f"'{action}'" for action in actions)
+
+
+def upgrade() -> None:
+    # Details are parsed into keys where the text format is known, otherwise kept as {"text": ...}.
+    # Both columns are converted in one ALTER TABLE, so the table is rewritten once.
+    details = rf"""
+        NULLIF(
+            COALESCE(
+                CASE
+                    WHEN details IS NULL THEN NULL
+                    WHEN action IN ({_in_list(PRODUCT_ACTIONS)}) AND details ~ 'ID \d+'
+                        THEN jsonb_build_object('product_id', substring(details from 'ID (\d+)')::int)
+                    WHEN action = 'order_created' AND details ~ '#\d+'
+                        THEN jsonb_build_object('order_id', substring(details from '#(\d+)')::int, 'text', details)
+                    ELSE jsonb_build_object('text', details)
+                END,
+                '{{}}'::jsonb
+            ) || CASE
+                WHEN action IN ({_in_list(ACTION_CODES)}) THEN '{{}}'::jsonb
+                ELSE jsonb_build_object('legacy_action', action)
+            END,
+            '{{}}'::jsonb
+        )
+    """
+    op.execute(
+        f"ALTER TABLE logs "
+        f"ALTER COLUMN action TYPE smallint USING {_code_case('action')}, "
+        f"ALTER COLUMN details TYPE jsonb USING {details}"
+    )
+
+    # Daily action rollup is regrouped by code (legacy actions collapse into code 0)
+    op.execute("ALTER TABLE actionstatistics RENAME TO actionstatistics_legacy")
+    op.execute("ALTER INDEX actionstatistics_pkey RENAME TO actionstatistics_legacy_pkey")
+    op.execute("""
+        CREATE TABLE actionstatistics (
+            day date NOT NULL,
+            action smallint NOT NULL,
+            count integer NOT NULL,
+            unique_users integer NOT NULL,
+            CONSTRAINT actionstatistics_pkey PRIMARY KEY (day, action)
+        )
+    """)
+    op.execute(f"""
+        INSERT INTO actionstatistics (day, action, count, unique_users)
+        SELECT day, {_code_case('action')}, sum(count), sum(unique_users)
+        FROM actionstatistics_legacy
+        GROUP BY 1, 2
+    """)
+    op.execute("DROP TABLE actionstatistics_legacy")
+
+
+def downgrade() -> None:
+    # Codes are turned back into names, details back into text
+    names = " ".join(
+        f"WHEN {code} THEN '{action}'" for action, code in ACTION_CODES.items() if action != 'create_order'
+    )
+    op.execute(
+        f"ALTER TABLE logs "
+        f"ALTER COLUMN action TYPE varchar(255) USING "
+        f"COALESCE(details ->> 'legacy_action', CASE action {names} ELSE 'other' END), "
+        f"ALTER COLUMN details TYPE text USING COALESCE(details ->> 'text', details::text)"
+    )
+    op.execute(
+        f"ALTER TABLE actionstatistics ALTER COLUMN action TYPE varchar(255) "
+        f"USING CASE action {names} ELSE 'other' END"
+    )
@@ -0,0 +1,36 @@
+"""add scheduled_jobs table
+
+Revision ID: b7e2d41c9a05
+Revises: a3f1c9e7b2d4
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d41c9a05'
+down_revision: Union[str, None] = 'a3f1c9e7b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create scheduler state table
+    op.create_table('scheduled_jobs',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('next_run_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('last_run_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    # Drop scheduler state table
+    op.drop_table('scheduled_jobs')
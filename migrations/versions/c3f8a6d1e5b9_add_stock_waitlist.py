@@ -0,0 +1,34 @@
+"""add stock waitlist
+
+Revision ID: c3f8a6d1e5b9
+Revises: b2e7f5c9d4a8
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a6d1e5b9'
+down_revision: Union[str, None] = 'b2e7f5c9d4a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Users waiting for out-of-stock products, looked up by product
+    op.create_table('stock_waitlist',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.product_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id', 'user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stock_waitlist')
@@ -0,0 +1,42 @@
+"""add media file_id cache
+
+Revision ID: c4d8e5f1a6b3
+Revises: b7e2d41c9a05
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e5f1a6b3'
+down_revision: Union[str, None] = 'b7e2d41c9a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create uploaded media cache table
+    op.create_table('media_files',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('source', sa.String(length=255), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+        sa.Column('file_id', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source')
+    )
+    op.create_index(op.f('ix_media_files_content_hash'), 'media_files', ['content_hash'], unique=False)
+
+    # Add cached file_id to products
+    op.add_column('products', sa.Column('image_file_id', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    # Drop cached file_id and media cache table
+    op.drop_column('products', 'image_file_id')
+    op.drop_index(op.f('ix_media_files_content_hash'), table_name='media_files')
+    op.drop_table('media_files')
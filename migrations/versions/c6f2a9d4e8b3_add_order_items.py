@@ -0,0 +1,43 @@
+"""add order items
+
+Revision ID: c6f2a9d4e8b3
+Revises: b5e1f8a3d7c2
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f2a9d4e8b3'
+down_revision: Union[str, None] = 'b5e1f8a3d7c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Line items of orders placed from the cart
+    op.create_table('order_items',
+        sa.Column('item_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.order_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.product_id']),
+        sa.PrimaryKeyConstraint('item_id')
+    )
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    # Cart orders keep their products in order_items
+    op.alter_column('orders', 'product_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade() -> None:
+    # Cart orders cannot be represented without line items
+    op.execute("DELETE FROM orders WHERE product_id IS NULL")
+    op.alter_column('orders', 'product_id', existing_type=sa.Integer(), nullable=False)
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_table('order_items')
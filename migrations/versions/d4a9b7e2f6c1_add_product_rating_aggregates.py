@@ -0,0 +1,40 @@
+"""add product rating aggregates and review pagination index
+
+Revision ID: d4a9b7e2f6c1
+Revises: c3f8a6d1e5b9
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a9b7e2f6c1'
+down_revision: Union[str, None] = 'c3f8a6d1e5b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('products', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+    # Only approved reviews are counted; average_rating was never filled before
+    op.execute(
+        "UPDATE products p SET rating_sum = r.total, rating_count = r.cnt, "
+        "average_rating = round(r.total::numeric / r.cnt, 2) "
+        "FROM (SELECT product_id, sum(rating) AS total, count(*) AS cnt "
+        "FROM reviews WHERE is_approved GROUP BY product_id) r "
+        "WHERE p.product_id = r.product_id"
+    )
+    op.create_index(
+        'ix_reviews_product_created', 'reviews', ['product_id', 'created_at', 'review_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reviews_product_created', table_name='reviews')
+    op.drop_column('products', 'rating_count')
+    op.drop_column('products', 'rating_sum')
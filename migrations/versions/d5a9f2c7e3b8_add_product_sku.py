@@ -0,0 +1,30 @@
+"""add product sku
+
+Revision ID: d5a9f2c7e3b8
+Revises: c4d8e5f1a6b3
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a9f2c7e3b8'
+down_revision: Union[str, None] = 'c4d8e5f1a6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add supplier article used as the key of price list imports
+    op.add_column('products', sa.Column('sku', sa.String(length=64), nullable=True))
+    op.create_unique_constraint('uq_products_sku', 'products', ['sku'])
+
+
+def downgrade() -> None:
+    # Drop supplier article
+    op.drop_constraint('uq_products_sku', 'products', type_='unique')
+    op.drop_column('products', 'sku')
@@ -0,0 +1,29 @@
+"""add order list indexes
+
+Revision ID: d7a3b1e5f9c4
+Revises: c6f2a9d4e8b3
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3b1e5f9c4'
+down_revision: Union[str, None] = 'c6f2a9d4e8b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Admin order list: newest first, filtered by status or by user
+    op.create_index('ix_orders_status_created_at', 'orders', ['status', 'created_at'], unique=False)
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    # Drop order list indexes
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_status_created_at', table_name='orders')
@@ -0,0 +1,28 @@
+"""add product is_active
+
+Revision ID: e1b6c3d8f4a2
+Revises: d5a9f2c7e3b8
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b6c3d8f4a2'
+down_revision: Union[str, None] = 'd5a9f2c7e3b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Soft delete flag for products removed from the supplier catalog
+    op.add_column('products', sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+
+def downgrade() -> None:
+    # Drop soft delete flag
+    op.drop_column('products', 'is_active')
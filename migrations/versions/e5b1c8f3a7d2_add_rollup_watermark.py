@@ -0,0 +1,36 @@
+"""add explicit statistics rollup watermark
+
+Revision ID: e5b1c8f3a7d2
+Revises: d4a9b7e2f6c1
+Create Date: 2026-10-20 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1c8f3a7d2'
+down_revision: Union[str, None] = 'd4a9b7e2f6c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The first day not yet rolled up; it advances over days without activity too
+    op.create_table('rollupwatermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('rolled_until', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Continue from the watermark previously derived from the rollup rows
+    op.execute(
+        "INSERT INTO rollupwatermarks (name, rolled_until) "
+        "SELECT 'daily', max(day) + 1 FROM actionstatistics HAVING max(day) IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollupwatermarks')
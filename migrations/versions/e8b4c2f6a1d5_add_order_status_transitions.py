@@ -0,0 +1,43 @@
+"""add order status transitions
+
+Revision ID: e8b4c2f6a1d5
+Revises: d7a3b1e5f9c4
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4c2f6a1d5'
+down_revision: Union[str, None] = 'd7a3b1e5f9c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Allowed order status transitions, joined by bulk status updates
+    transitions = op.create_table('order_status_transitions',
+        sa.Column('from_status', sa.String(length=50), nullable=False),
+        sa.Column('to_status', sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('from_status', 'to_status')
+    )
+    # "Processing" is the model's server default, orders from the bot start as "Новый"
+    op.bulk_insert(transitions, [
+        {'from_status': 'Новый', 'to_status': 'В обработке'},
+        {'from_status': 'Новый', 'to_status': 'Отменен'},
+        {'from_status': 'Processing', 'to_status': 'В обработке'},
+        {'from_status': 'Processing', 'to_status': 'Отправлен'},
+        {'from_status': 'Processing', 'to_status': 'Отменен'},
+        {'from_status': 'В обработке', 'to_status': 'Отправлен'},
+        {'from_status': 'В обработке', 'to_status': 'Отменен'},
+        {'from_status': 'Отправлен', 'to_status': 'Доставлен'},
+    ])
+
+
+def downgrade() -> None:
+    # Drop order status transitions
+    op.drop_table('order_status_transitions')
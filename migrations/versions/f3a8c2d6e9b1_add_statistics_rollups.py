@@ -0,0 +1,42 @@
+"""add statistics rollups
+
+Revision ID: f3a8c2d6e9b1
+Revises: e1b6c3d8f4a2
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c2d6e9b1'
+down_revision: Union[str, None] = 'e1b6c3d8f4a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Daily rollup of user actions from the logs table
+    op.create_table('actionstatistics',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('action', sa.String(length=255), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('unique_users', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'action')
+    )
+    # Top products by stat type over a period read the product rollup by type and date
+    op.create_index('ix_productstatistics_type_date', 'productstatistics', ['stat_type', 'date'], unique=False)
+    # Raw data is still read for the current day, so it has to be found by time
+    op.create_index(op.f('ix_logs_timestamp'), 'logs', ['timestamp'], unique=False)
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    # Drop rollup table and period indexes
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.drop_index(op.f('ix_logs_timestamp'), table_name='logs')
+    op.drop_index('ix_productstatistics_type_date', table_name='productstatistics')
+    op.drop_table('actionstatistics')
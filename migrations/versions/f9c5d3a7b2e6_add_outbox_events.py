@@ -0,0 +1,44 @@
+"""add outbox events
+
+Revision ID: f9c5d3a7b2e6
+Revises: e8b4c2f6a1d5
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9c5d3a7b2e6'
+down_revision: Union[str, None] = 'e8b4c2f6a1d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Side effects recorded together with the business change, processed in the background
+    op.create_table('outbox_events',
+        sa.Column('event_id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('processed_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_index(
+        'ix_outbox_events_pending', 'outbox_events', ['next_attempt_at', 'event_id'],
+        unique=False, postgresql_where=sa.text('processed_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    # Drop outbox
+    op.drop_index('ix_outbox_events_pending', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк стоимости диспетчеризации callback-запросов.
+
+Сравнивает цепочку обычных роутеров (каждый админский роутер со своим AdminFilter,
+обработчики проверяются по очереди) с цепочкой PrefixRouter за общим админским
+роутером-шлюзом. Обработчики ничего не делают, поэтому измеряется только поиск
+обработчика: среднее время на одно обновление для администратора и пользователя.
+
+Запуск: python scripts/benchmark_callback_dispatch.py [количество обновлений]
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Добавляем корневую директорию в Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Router, F
+from aiogram.types import CallbackQuery, User
+
+from tgbot.utils.prefix_router import PrefixRouter
+
+ADMIN_ID = 1
+USER_ID = 2
+
+# Размеры, близкие к routers_list: 6 админских и 6 пользовательских роутеров
+ADMIN_ROUTERS = 6
+USER_ROUTERS = 6
+HANDLERS_PER_ROUTER = 12
+
+
+async def admin_filter(event: CallbackQuery) -> bool:
+    return event.from_user.id == ADMIN_ID
+
+
+async def noop(callback: CallbackQuery):
+    return True
+
+
+def add_handlers(router: Router, name: str):
+    """Регистрирует обработчики в стиле проекта: ==, startswith и regexp."""
+    for i in range(HANDLERS_PER_ROUTER):
+        if i % 3 == 0:
+            router.callback_query.register(noop, F.data == f"{name}_action_{i}")
+        elif i % 3 == 1:
+            router.callback_query.register(noop, F.data.startswith(f"{name}_select_{i}_"))
+        else:
+            router.callback_query.register(noop, F.data.regexp(rf"^{name}_item_{i}_(\d+)$"))
+
+
+def build_linear() -> Router:
+    """Текущая схема: у каждого админского роутера свой фильтр."""
+    root = Router(name="linear")
+    for r in range(ADMIN_ROUTERS):
+        router = Router(name=f"admin{r}")
+        router.callback_query.filter(admin_filter)
+        add_handlers(router, f"admin{r}")
+        root.include_router(router)
+    for r in range(USER_ROUTERS):
+        router = Router(name=f"user{r}")
+        add_handlers(router, f"user{r}")
+        root.include_router(router)
+    return root
+
+
+def build_indexed() -> Router:
+    """Новая схема: админские роутеры за одним шлюзом, обработчики в префиксном дереве."""
+    root = Router(name="indexed")
+    gate = Router(name="admin_gate")
+    gate.callback_query.filter(admin_filter)
+    for r in range(ADMIN_ROUTERS):
+        router = PrefixRouter(name=f"admin{r}")
+        add_handlers(router, f"admin{r}")
+        gate.include_router(router)
+    root.include_router(gate)
+    for r in range(USER_ROUTERS):
+        router = PrefixRouter(name=f"user{r}")
+        add_handlers(router, f"user{r}")
+        root.include_router(router)
+    return root
+
+
+def make_callback(user_id: int, data: str) -> CallbackQuery:
+    return CallbackQuery(
+        id="1",
+        from_user=User(id=user_id, is_bot=False, first_name="bench"),
+        chat_instance="1",
+        data=data,
+    )
+
+
+async def measure(router: Router, event: CallbackQuery, number: int) -> float:
+    """Возвращает среднее время диспетчеризации одного обновления в микросекундах."""
+    result = await router.propagate_event("callback_query", event)
+    assert result is True, f"Обработчик не найден для {event.data}"
+
+    started = time.perf_counter()
+    for _ in range(number):
+        await router.propagate_event("callback_query", event)
+    return (time.perf_counter() - started) / number * 1e6
+
+
+async def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    linear = build_linear()
+    indexed = build_indexed()
+
+    last = HANDLERS_PER_ROUTER - 1
+    cases = [
+        ("админ, первый роутер", make_callback(ADMIN_ID, "admin0_action_0")),
+        ("админ, последний роутер", make_callback(ADMIN_ID, f"admin{ADMIN_ROUTERS - 1}_item_{last}_42")),
+        ("пользователь, каталог", make_callback(USER_ID, "user0_select_1_7")),
+        ("пользователь, последний роутер", make_callback(USER_ID, f"user{USER_ROUTERS - 1}_item_{last}_42")),
+    ]
+
+    print(f"Обновлений на случай: {number}\n")
+    print(f"{'Случай':<34} {'линейно, мкс':>14} {'индекс, мкс':>14} {'ускорение':>10}")
+    for name, event in cases:
+        linear_time = await measure(linear, event, number)
+        indexed_time = await measure(indexed, event, number)
+        print(f"{name:<34} {linear_time:>14.2f} {indexed_time:>14.2f} {linear_time / indexed_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарк кэша отрисовки клавиатур и карточек товаров.
+
+Сравнивает построение клавиатур и текста карточки без кэша и с кэшем:
+время одного обновления (timeit) и количество выделений памяти (tracemalloc).
+База данных не нужна, товары создаются в памяти.
+
+Запуск: python scripts/benchmark_render_cache.py [количество повторов]
+"""
+
+import sys
+import os
+import timeit
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+# Добавляем корневую директорию в Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Регистрируем все модели, иначе связи Product и User не разрешатся
+import infrastructure.database.models  # noqa: F401
+import infrastructure.database.models.feedback  # noqa: F401
+from infrastructure.database.models.products import Product
+from tgbot.keyboards.product_management import product_management_keyboard, product_details_keyboard
+from tgbot.keyboards.purchase import purchase_keyboard
+from tgbot.keyboards.user_products import filter_keyboard
+from tgbot.utils.render_cache import ProductCardCache, user_card_text, admin_card_text
+
+
+def make_product(product_id: int) -> Product:
+    """Создает товар в памяти для бенчмарка."""
+    return Product(
+        product_id=product_id,
+        name=f"Дверь {product_id}",
+        description="Межкомнатная дверь с покрытием экошпон",
+        type="Межкомнатная",
+        material="МДФ",
+        price=Decimal("12990.00"),
+        effective_price=Decimal("11990.00"),
+        stock_quantity=5,
+        updated_at=datetime(2024, 1, 1),
+    )
+
+
+def measure(name: str, func, number: int):
+    """Печатает среднее время и число выделений памяти на один вызов."""
+    func()  # прогрев
+
+    seconds = timeit.timeit(func, number=number)
+
+    # Те же вызовы под tracemalloc; результаты сохраняются, иначе освобожденные
+    # блоки не попадут в разницу снимков
+    results = [None] * number
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(number):
+        results[i] = func()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocations = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    print(f"{name:<40} {seconds / number * 1e6:>10.2f} мкс  {allocations / number:>8.1f} выделений/вызов")
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    products = [make_product(i) for i in range(1, 51)]
+    cards = ProductCardCache()
+
+    def card_update(render):
+        return [render(product) for product in products]
+
+    print(f"Повторов: {number}\n")
+
+    measure("filter_keyboard (без кэша)", filter_keyboard.__wrapped__, number)
+    measure("filter_keyboard (кэш)", filter_keyboard, number)
+    measure("product_management_keyboard (без кэша)", product_management_keyboard.__wrapped__, number)
+    measure("product_management_keyboard (кэш)", product_management_keyboard, number)
+    measure("purchase_keyboard (без кэша)", lambda: purchase_keyboard.__wrapped__(42), number)
+    measure("purchase_keyboard (кэш)", lambda: purchase_keyboard(42), number)
+    measure("product_details_keyboard (без кэша)", lambda: product_details_keyboard.__wrapped__(42), number)
+    measure("product_details_keyboard (кэш)", lambda: product_details_keyboard(42), number)
+
+    number //= 50
+    measure("50 карточек пользователя (без кэша)", lambda: card_update(user_card_text), number)
+    measure("50 карточек пользователя (кэш)",
+            lambda: card_update(lambda p: cards.get(p, "user", user_card_text)), number)
+    measure("50 карточек админа (без кэша)", lambda: card_update(admin_card_text), number)
+    measure("50 карточек админа (кэш)",
+            lambda: card_update(lambda p: cards.get(p, "admin", admin_card_text)), number)
+
+    print(f"\nРазмер кэша карточек: {cards.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,7 @@ from tgbot.config import load_config
 from infrastructure.database.setup import create_engine, create_session_pool
 from infrastructure.database.repositories.requests import RequestsRepo
 from infrastructure.database.models.products import ProductType
+from infrastructure.database.models.logs import LogAction
 
 # Sample product data
 PRODUCT_NAMES = [
@@ -137,13 +138,13 @@ async def generate_test_logs(repo, count=100):
     
     # Possible log actions
     actions = [
-        "view_product", 
-        "add_favorite", 
-        "remove_favorite",
-        "create_order",
-        "filter_products",
-        "search_products",
-        "view_catalog"
+        LogAction.VIEW_PRODUCT,
+        LogAction.ADD_FAVORITE,
+        LogAction.REMOVE_FAVORITE,
+        LogAction.ORDER_CREATED,
+        LogAction.FILTER_PRODUCTS,
+        LogAction.SEARCH_PRODUCTS,
+        LogAction.VIEW_CATALOG
     ]
     
     # Generate logs with weighted distribution (more views than orders)
@@ -164,24 +165,15 @@ async def generate_test_logs(repo, count=100):
         # Generate appropriate details based on action
         details = None
         
-        if action == "view_product":
+        if action in (LogAction.VIEW_PRODUCT, LogAction.ADD_FAVORITE,
+                      LogAction.REMOVE_FAVORITE, LogAction.ORDER_CREATED):
             product = random.choice(products)
-            details = f"Просмотр товара с ID {product.product_id}"
-        elif action == "add_favorite":
-            product = random.choice(products)
-            details = f"Добавление в избранное товара с ID {product.product_id}"
-        elif action == "remove_favorite":
-            product = random.choice(products)
-            details = f"Удаление из избранного товара с ID {product.product_id}"
-        elif action == "create_order":
-            product = random.choice(products)
-            details = f"Создание заказа товара с ID {product.product_id}"
-        elif action == "filter_products":
-            filter_type = random.choice(["по цене", "по материалу", "по типу"])
-            details = f"Фильтрация товаров {filter_type}"
-        elif action == "search_products":
+            details = {"product_id": product.product_id}
+        elif action == LogAction.FILTER_PRODUCTS:
+            details = {"filter": random.choice(["price", "material", "type"])}
+        elif action == LogAction.SEARCH_PRODUCTS:
             search_terms = ["дверь", "металл", "дерево", "ручка", "замок"]
-            details = f"Поиск товаров по запросу: {random.choice(search_terms)}"
+            details = {"query": random.choice(search_terms)}
         
         # Generate random timestamp within the last 30 days
         days_ago = random.randint(0, 30)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Скрипт инкрементальной синхронизации каталога товаров с файлом поставщика.
+
+В отличие от update_products_with_images.py, товары не удаляются и не
+вставляются заново: каталог загружается во временную таблицу, сравнивается
+с товарами по хэшам содержимого строк, и применяются только изменения:
+новые артикулы добавляются, измененные товары обновляются, отсутствующие
+в каталоге скрываются (is_active = false). Товары из строк с ошибками
+не изменяются и не скрываются. История заказов и избранное сохраняются. Все изменения выполняются в одной транзакции.
+
+Формат файла - как у импорта прайс-листа (CSV или XLSX с заголовками),
+обязательны колонки «артикул», «название» и «цена».
+
+Запуск:
+    python scripts/sync_catalog.py catalog.csv --dry-run
+    python scripts/sync_catalog.py catalog.xlsx --max-delete-ratio 0.3
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Добавляем корневую директорию в Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infrastructure.database.repositories.products import ProductsRepo
+from infrastructure.database.setup import create_engine, create_session_pool
+from tgbot.config import load_config
+from tgbot.services.price_import import PriceListReader, PriceListError
+
+
+async def sync_catalog(path: str, dry_run: bool, max_delete_ratio: float) -> int:
+    """Синхронизирует товары с файлом каталога. Возвращает код завершения."""
+    try:
+        reader = await asyncio.to_thread(PriceListReader, path, os.path.basename(path))
+    except PriceListError as e:
+        print(f"❌ Не удалось прочитать каталог: {e}")
+        return 1
+
+    missing = {"name", "price"} - set(reader.columns)
+    if missing:
+        print(f"❌ В каталоге нет обязательных колонок: {', '.join(sorted(missing))}")
+        return 1
+
+    # Загружаем конфигурацию из переменных окружения
+    config = load_config(".env")
+    engine = create_engine(config.db)
+    session_pool = create_session_pool(engine)
+
+    try:
+        async with session_pool() as session:
+            result = await ProductsRepo(session).sync_catalog(
+                reader.batches(), reader.columns, dry_run=dry_run, max_delete_ratio=max_delete_ratio,
+                rejected_skus=reader.kept_skus
+            )
+    finally:
+        await engine.dispose()
+
+    if result is None:
+        print("❌ Синхронизация не выполнена (подробности в логе), изменения не применены.")
+        return 1
+
+    # Строки с ошибками не применяются, но их товары не скрываются
+    if reader.rejected:
+        print(f"⚠️ Отклонено строк (товары оставлены без изменений): {len(reader.rejected)}")
+        for row_no in sorted(reader.rejected)[:20]:
+            print(f"    Строка {row_no}: {reader.rejected[row_no]}")
+    if reader.rejected_without_sku:
+        print("⚠️ В отклоненных строках есть строки без артикула, поэтому отсутствующие товары не скрыты")
+    if result["duplicates"]:
+        print(f"⚠️ Повторяющиеся артикулы (использована последняя строка): {len(result['duplicates'])}")
+
+    title = "🔍 Пробный запуск, изменения не применены" if dry_run else "✅ Синхронизация завершена"
+    print(f"\n{title}")
+    print(f"➕ Добавлено: {result['inserted']}")
+    print(f"✏️ Обновлено: {result['updated']}")
+    print(f"🗑 Скрыто (нет в каталоге): {result['deactivated']}")
+    print(f"➖ Без изменений: {result['unchanged']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Инкрементальная синхронизация каталога товаров")
+    parser.add_argument("path", help="Файл каталога (.csv или .xlsx)")
+    parser.add_argument("--dry-run", action="store_true", help="Только показать изменения")
+    parser.add_argument(
+        "--max-delete-ratio", type=float, default=0.2,
+        help="Максимальная доля активных товаров, которую можно скрыть за запуск (по умолчанию 0.2)"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(sync_catalog(args.path, args.dry_run, args.max_delete_ratio)))
+
+
+if __name__ == "__main__":
+    main()
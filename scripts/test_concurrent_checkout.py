@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Проверка резервирования товара при одновременных покупках.
+
+Создает тестовый товар с остатком STOCK и BUYERS тестовых покупателей, которые
+одновременно (каждый в своей сессии и соединении) оформляют заказ через
+OrdersRepo.place_order(). Проверяется, что заказов создано ровно столько,
+сколько было товара, остаток не ушел в минус, а is_in_stock сброшен.
+Тестовые данные удаляются после проверки.
+
+Запуск: python scripts/test_concurrent_checkout.py [покупателей] [остаток] [штук в заказе]
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Добавляем корневую директорию в Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, select
+
+from infrastructure.database.models.orders import Order
+from infrastructure.database.models.products import Product
+from infrastructure.database.models.users import User
+from infrastructure.database.repositories.orders import OrdersRepo
+from infrastructure.database.repositories.products import ProductsRepo
+from infrastructure.database.setup import create_engine, create_session_pool
+from tgbot.config import load_config
+
+# Диапазон ID тестовых покупателей, не пересекающийся с ID Telegram
+TEST_USER_ID_BASE = 9_900_000_000_000
+
+
+async def buy(session_pool, user_id: int, product_id: int, quantity: int, start: asyncio.Event) -> bool:
+    """Ждет общего старта и пытается оформить заказ."""
+    async with session_pool() as session:
+        await start.wait()
+        order = await OrdersRepo(session).place_order(user_id, product_id, quantity)
+        return order is not None
+
+
+async def main() -> int:
+    buyers = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    stock = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    quantity = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    config = load_config(".env")
+    # Пул движка (20 + 200 сверх) вмещает всех покупателей, каждый получает свое соединение
+    engine = create_engine(config.db)
+    session_pool = create_session_pool(engine)
+    user_ids = [TEST_USER_ID_BASE + i for i in range(buyers)]
+
+    async with session_pool() as session:
+        session.add_all(User(user_id=user_id, first_name="checkout-test") for user_id in user_ids)
+        await session.commit()
+        product = await ProductsRepo(session).create_product(
+            {"name": "Тест одновременных покупок", "price": 100, "stock_quantity": stock}
+        )
+        product_id = product.product_id
+
+    try:
+        start = asyncio.Event()
+        tasks = [
+            asyncio.create_task(buy(session_pool, user_id, product_id, quantity, start))
+            for user_id in user_ids
+        ]
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        start.set()
+        results = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        async with session_pool() as session:
+            product = await session.get(Product, product_id)
+            orders = (await session.scalars(select(Order).where(Order.product_id == product_id))).all()
+
+        expected = min(buyers, stock // quantity)
+        print(f"Покупателей: {buyers}, остаток: {stock}, штук в заказе: {quantity}")
+        print(f"Успешных покупок: {sum(results)} (ожидалось {expected}), заказов в базе: {len(orders)}")
+        print(f"Остаток после покупок: {product.stock_quantity}, в наличии: {product.is_in_stock}")
+        print(f"Время: {elapsed * 1000:.1f} мс")
+
+        checks = [
+            sum(results) == expected,
+            len(orders) == expected,
+            product.stock_quantity == stock - expected * quantity,
+            product.is_in_stock == (product.stock_quantity > 0),
+        ]
+        if all(checks):
+            print("✅ Перепродажи нет")
+            return 0
+        print("❌ Остаток и заказы не сходятся")
+        return 1
+    finally:
+        async with session_pool() as session:
+            await session.execute(delete(Order).where(Order.product_id == product_id))
+            await session.execute(delete(Product).where(Product.product_id == product_id))
+            await session.execute(delete(User).where(User.user_id.in_(user_ids)))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
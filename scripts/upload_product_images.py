@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Скрипт для предварительной загрузки изображений товаров в Telegram.
+
+Каждое изображение загружается в служебный чат (MEDIA_CACHE_CHAT_ID, по умолчанию
+первый администратор) один раз, полученный file_id сохраняется в media_files
+и проставляется всем товарам с этим изображением. Одинаковые по содержимому
+файлы определяются по SHA-256 и повторно не загружаются.
+"""
+
+import asyncio
+import sys
+import os
+
+# Добавляем корневую директорию в Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Bot
+from sqlalchemy import select
+
+from infrastructure.database.models.products import Product
+from infrastructure.database.repositories.media import MediaRepo
+from infrastructure.database.setup import create_engine, create_session_pool
+from tgbot.config import load_config
+from tgbot.services.media import upload_image, is_local_file, is_url
+
+
+async def upload_product_images():
+    """Загружает изображения товаров, у которых еще нет file_id."""
+    
+    # Загружаем конфигурацию из переменных окружения
+    config = load_config(".env")
+    chat_id = config.tg_bot.media_cache_chat_id or config.tg_bot.admin_ids[0]
+    
+    bot = Bot(token=config.tg_bot.token)
+    engine = create_engine(config.db)
+    session_pool = create_session_pool(engine)
+    
+    try:
+        async with session_pool() as session:
+            # Уникальные источники изображений товаров без file_id
+            result = await session.execute(
+                select(Product.image_url)
+                .where(Product.image_url.is_not(None), Product.image_file_id.is_(None))
+                .distinct()
+            )
+            sources = [source for source in result.scalars() if is_local_file(source) or is_url(source)]
+            
+            if not sources:
+                print("✅ Все изображения товаров уже загружены.")
+                return
+            
+            print(f"🔄 Изображений для загрузки: {len(sources)}")
+            media_repo = MediaRepo(session)
+            
+            for source in sources:
+                try:
+                    file_id = await upload_image(bot, media_repo, chat_id, source)
+                    if file_id:
+                        print(f"✅ {source} -> {file_id}")
+                    else:
+                        print(f"⚠️ Не удалось загрузить: {source}")
+                except Exception as e:
+                    print(f"❌ Ошибка при загрузке {source}: {e}")
+    finally:
+        await bot.session.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(upload_product_images())
@@ -75,6 +75,7 @@ class TgBot:
     token: str
     admin_ids: list[int]
     use_redis: bool
+    media_cache_chat_id: Optional[int] = None
 
     @staticmethod
     def from_env(env: Env):
@@ -84,7 +85,14 @@ class TgBot:
         token = env.str("BOT_TOKEN")
         admin_ids = list(map(int, env.list("ADMINS")))
         use_redis = env.bool("USE_REDIS")
-        return TgBot(token=token, admin_ids=admin_ids, use_redis=use_redis)
+        # Private chat the bot uploads product images to once, to obtain their file_id
+        media_cache_chat_id = env.int("MEDIA_CACHE_CHAT_ID", None)
+        return TgBot(
+            token=token,
+            admin_ids=admin_ids,
+            use_redis=use_redis,
+            media_cache_chat_id=media_cache_chat_id,
+        )
 
 
 @dataclass
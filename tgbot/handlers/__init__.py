@@ -4,6 +4,7 @@ from tgbot.handlers.admins import admin_routers
 from tgbot.handlers.users.user_menu import user_menu_router
 from tgbot.handlers.users.user_products import user_products_router
 from tgbot.handlers.users.user_orders import user_orders_router
+from tgbot.handlers.users.user_cart import user_cart_router
 from tgbot.handlers.users.user_faq import user_faq_router
 from tgbot.handlers.users.user_feedback import user_feedback_router
 from tgbot.handlers.users.user_favorites import user_favorites_router
@@ -18,6 +19,7 @@ user_router_list = [
     user_faq_router,        # Часто задаваемые вопросы
     user_products_router,   # Каталог товаров
     user_orders_router,     # Управление заказами
+    user_cart_router,       # Корзина
     user_feedback_router,   # Обратная связь
     user_favorites_router,  # Избранное
 ]
@@ -2,21 +2,33 @@
 Admin handlers router configuration
 """
 from aiogram import Router
+from tgbot.filters.admin import AdminFilter
 from .admin import admin_router
 from .admin_orders import admin_orders_router
 from .admin_product_management import admin_product_router
 from .admin_auth import admin_auth_router
 from .admin_statistics import admin_stats_router
+from .admin_export import admin_export_router
 from .admin_subscriptions import admin_subscription_router  # Fixed singular/plural mismatch
 from .promotion import promotion_router, register_promotion_handlers
 
-# Initialize and configure all admin-related routers
-admin_routers = [
+# Admin-only routers are gated by a single router: for ordinary users AdminFilter
+# is evaluated once per update instead of once per admin router
+admin_gate_router = Router(name="admin_gate_router")
+admin_gate_router.message.filter(AdminFilter())
+admin_gate_router.callback_query.filter(AdminFilter())
+admin_gate_router.include_routers(
     admin_router,                   # Main admin router
     admin_orders_router,            # Order management
     admin_product_router,           # Product management
-    admin_auth_router,              # Admin authentication
     admin_stats_router,             # Statistics and logs
+    admin_export_router,            # CSV export
     admin_subscription_router,      # Subscription management (fixed name)
     register_promotion_handlers(),  # Promotion management
+)
+
+# Initialize and configure all admin-related routers
+admin_routers = [
+    admin_gate_router,              # Admin-only routers
+    admin_auth_router,              # Admin authentication (also serves non-admins: /admin login)
 ]
\ No newline at end of file
@@ -1,14 +1,16 @@
 # tgbot/handlers/admins/admin.py
-from aiogram import Router, F
+from aiogram import F
 from aiogram.filters import CommandStart, Command
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
+from tgbot.utils.prefix_router import PrefixRouter
 import logging
 
 from tgbot.filters.admin import AdminFilter
 from tgbot.keyboards.admin_main_menu import main_menu_keyboard
+from tgbot.utils.message_edit import edit_text
 
-admin_router = Router()
+admin_router = PrefixRouter(name="admin_router")
 admin_router.message.filter(AdminFilter())
 admin_router.callback_query.filter(AdminFilter())
 
@@ -45,7 +47,8 @@ async def admin_menu_callback(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     
     try:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             text="Главное меню администратора",
             reply_markup=main_menu_keyboard(),
         )
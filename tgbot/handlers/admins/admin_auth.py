@@ -1,15 +1,18 @@
 # tgbot/handlers/admins/admin_auth.py
-from aiogram import Router, F
+from aiogram import F
 from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
+from tgbot.utils.prefix_router import PrefixRouter
 from infrastructure.database.repositories.requests import RequestsRepo
 from infrastructure.database.repositories.users import UsersRepo
 from infrastructure.database.repositories.logs import LogsRepo
+from infrastructure.database.models.logs import LogAction
 from tgbot.config import Config
 from tgbot.keyboards.admin_main_menu import admin_back_button
 from tgbot.filters.admin import AdminFilter
+from tgbot.utils.message_edit import edit_text
 
 # Состояния для авторизации и управления администраторами
 class AdminAuth(StatesGroup):
@@ -21,7 +24,7 @@ class AdminAuth(StatesGroup):
     waiting_for_admin_id_to_remove = State()  # Ожидание ID удаляемого администратора
     confirm_remove_admin = State()  # Подтверждение удаления администратора
 
-admin_auth_router = Router()
+admin_auth_router = PrefixRouter(name="admin_auth_router")
 
 # Клавиатура меню управления администраторами
 def admin_management_keyboard():
@@ -78,7 +81,7 @@ async def admin_command(message: Message, state: FSMContext, config: Config):
 
 # Обработчик ввода пароля администратора
 @admin_auth_router.message(AdminAuth.waiting_for_password)
-async def process_admin_password(message: Message, state: FSMContext, config: Config, request: RequestsRepo):
+async def process_admin_password(message: Message, state: FSMContext, config: Config, repo: RequestsRepo):
     """
     Проверяет пароль администратора и предоставляет доступ, если пароль верный.
     """
@@ -89,7 +92,7 @@ async def process_admin_password(message: Message, state: FSMContext, config: Co
         user_id = message.from_user.id
         
         # Добавляем пользователя как администратора в базу данных
-        users_repo = request.users
+        users_repo = repo.users
         user = await users_repo.get_user_by_id(user_id)
         
         if user:
@@ -97,11 +100,10 @@ async def process_admin_password(message: Message, state: FSMContext, config: Co
             await users_repo.update_field(user_id, "role", "admin")
         
         # Логируем действие
-        logs_repo = request.logs
+        logs_repo = repo.logs
         await logs_repo.create_log(
             user_id=user_id,
-            action="admin_authorized",
-            details="Предоставлен доступ к панели администратора"
+            action=LogAction.ADMIN_AUTHORIZED
         )
         
         await state.clear()
@@ -135,7 +137,8 @@ async def manage_admins_callback(callback: CallbackQuery):
     """
     Показывает меню управления администраторами.
     """
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="👨‍💼 <b>Управление администраторами</b>\n\n"
              "Выберите действие:",
         reply_markup=admin_management_keyboard(),
@@ -151,7 +154,8 @@ async def add_admin_callback(callback: CallbackQuery, state: FSMContext):
     """
     await state.set_state(AdminAuth.waiting_for_admin_id)
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="👨‍💼 <b>Добавление нового администратора</b>\n\n"
              "Введите Telegram ID пользователя, которого хотите сделать администратором:",
         reply_markup=admin_back_button("manage_admins"),
@@ -186,7 +190,7 @@ async def process_admin_id(message: Message, state: FSMContext):
 
 # Обработчик выбора роли администратора
 @admin_auth_router.callback_query(AdminAuth.waiting_for_admin_role, F.data.startswith("role_"))
-async def process_admin_role(callback: CallbackQuery, state: FSMContext, request: RequestsRepo):
+async def process_admin_role(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
     """
     Обрабатывает выбор роли для нового администратора.
     """
@@ -198,7 +202,7 @@ async def process_admin_role(callback: CallbackQuery, state: FSMContext, request
     role = callback.data.split("_")[1]  # "role_admin" -> "admin"
     
     # Получаем репозиторий пользователей
-    users_repo = request.users
+    users_repo = repo.users
     
     # Проверяем, существует ли пользователь
     user = await users_repo.get_user_by_id(new_admin_id)
@@ -235,17 +239,18 @@ async def process_admin_role(callback: CallbackQuery, state: FSMContext, request
             )
     
     # Логируем действие
-    logs_repo = request.logs
+    logs_repo = repo.logs
     await logs_repo.create_log(
         user_id=callback.from_user.id,
-        action="add_admin",
-        details=f"Добавлен администратор с ID {new_admin_id} и ролью {role}"
+        action=LogAction.ADD_ADMIN,
+        details={"admin_id": new_admin_id, "role": role}
     )
     
     # Сбрасываем состояние и отправляем ответ
     await state.clear()
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=success_text,
         reply_markup=admin_back_button("manage_admins"),
         parse_mode="HTML"
@@ -260,7 +265,8 @@ async def remove_admin_callback(callback: CallbackQuery, state: FSMContext):
     """
     await state.set_state(AdminAuth.waiting_for_admin_id_to_remove)
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="👨‍💼 <b>Удаление администратора</b>\n\n"
              "Введите Telegram ID администратора, которого хотите удалить:",
         reply_markup=admin_back_button("manage_admins"),
@@ -270,7 +276,7 @@ async def remove_admin_callback(callback: CallbackQuery, state: FSMContext):
 
 # Обработчик ввода ID администратора для удаления
 @admin_auth_router.message(AdminAuth.waiting_for_admin_id_to_remove)
-async def process_admin_id_to_remove(message: Message, state: FSMContext, request: RequestsRepo):
+async def process_admin_id_to_remove(message: Message, state: FSMContext, repo: RequestsRepo):
     """
     Обрабатывает ввод ID администратора для удаления.
     """
@@ -278,7 +284,7 @@ async def process_admin_id_to_remove(message: Message, state: FSMContext, reques
         admin_id = int(message.text.strip())
         
         # Получаем репозиторий пользователей
-        users_repo = request.users
+        users_repo = repo.users
         
         # Проверяем, существует ли пользователь и является ли он администратором
         user = await users_repo.get_user_by_id(admin_id)
@@ -328,7 +334,7 @@ async def process_admin_id_to_remove(message: Message, state: FSMContext, reques
 
 # Обработчик подтверждения удаления администратора
 @admin_auth_router.callback_query(AdminAuth.confirm_remove_admin, F.data.startswith("confirm_remove_"))
-async def confirm_remove_admin(callback: CallbackQuery, state: FSMContext, request: RequestsRepo):
+async def confirm_remove_admin(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
     """
     Обрабатывает подтверждение удаления администратора.
     """
@@ -336,23 +342,24 @@ async def confirm_remove_admin(callback: CallbackQuery, state: FSMContext, reque
     admin_id = int(callback.data.split("_")[-1])
     
     # Получаем репозиторий пользователей
-    users_repo = request.users
+    users_repo = repo.users
     
     # Обновляем роль пользователя на "user"
     await users_repo.update_field(admin_id, "role", "user")
     
     # Логируем действие
-    logs_repo = request.logs
+    logs_repo = repo.logs
     await logs_repo.create_log(
         user_id=callback.from_user.id,
-        action="remove_admin",
-        details=f"Удален администратор с ID {admin_id}"
+        action=LogAction.REMOVE_ADMIN,
+        details={"admin_id": admin_id}
     )
     
     # Сбрасываем состояние и отправляем ответ
     await state.clear()
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=f"✅ <b>Администратор успешно удален!</b>\n\n"
              f"ID: {admin_id}\n",
         reply_markup=admin_back_button("manage_admins"),
@@ -362,12 +369,12 @@ async def confirm_remove_admin(callback: CallbackQuery, state: FSMContext, reque
 
 # Обработчик кнопки "Список администраторов"
 @admin_auth_router.callback_query(F.data == "list_admins")
-async def list_admins_callback(callback: CallbackQuery, request: RequestsRepo):
+async def list_admins_callback(callback: CallbackQuery, repo: RequestsRepo):
     """
     Показывает список всех администраторов.
     """
     # Получаем репозиторий пользователей
-    users_repo = request.users
+    users_repo = repo.users
     
     # Получаем всех пользователей с ролью "admin" или "manager"
     from sqlalchemy import select
@@ -389,7 +396,8 @@ async def list_admins_callback(callback: CallbackQuery, request: RequestsRepo):
         text = "👨‍💼 <b>Список администраторов</b>\n\n"
         text += "В системе нет администраторов."
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=text,
         reply_markup=admin_back_button("manage_admins"),
         parse_mode="HTML"
@@ -0,0 +1,104 @@
+# tgbot/handlers/admins/admin_export.py
+from datetime import datetime, timedelta
+from aiogram import F, Bot
+from aiogram.types import Message, CallbackQuery
+from aiogram.filters import Command, CommandObject
+from tgbot.utils.prefix_router import PrefixRouter
+from tgbot.utils.message_edit import edit_text
+from tgbot.keyboards.admin_export import export_kind_keyboard, export_period_keyboard
+from tgbot.services.export import CsvExporter, EXPORT_KINDS
+import logging
+
+# Admin access is checked by admin_gate_router
+admin_export_router = PrefixRouter(name="admin_export_router")
+
+logger = logging.getLogger(__name__)
+
+EXPORT_USAGE = (
+    "Использование: /export <orders|products|logs> [с ГГГГ-ММ-ДД] [по ГГГГ-ММ-ДД]\n"
+    "Например: /export logs 2024-01-01 2024-01-31"
+)
+
+
+def period_bounds(days: int) -> tuple:
+    """
+    Возвращает границы периода за последние days дней (0 - за все время).
+    """
+    if days <= 0:
+        return None, None
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days - 1), None
+
+
+@admin_export_router.callback_query(F.data == "export_menu")
+async def export_menu(callback: CallbackQuery):
+    """
+    Показывает выбор данных для выгрузки в CSV.
+    """
+    await edit_text(
+        callback.message,
+        "📤 <b>Выгрузка в CSV</b>\n\nВыберите данные для выгрузки:",
+        reply_markup=export_kind_keyboard(),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+
+@admin_export_router.callback_query(F.data.regexp(r"^export_kind_(\w+)$"))
+async def export_select_period(callback: CallbackQuery):
+    """
+    Запрашивает период выгрузки.
+    """
+    kind = callback.data.removeprefix("export_kind_")
+    if kind not in EXPORT_KINDS:
+        await callback.answer("Неизвестный тип выгрузки.", show_alert=True)
+        return
+
+    await edit_text(
+        callback.message,
+        f"📅 <b>{EXPORT_KINDS[kind].title}: выберите период выгрузки</b>",
+        reply_markup=export_period_keyboard(kind),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+
+@admin_export_router.callback_query(F.data.regexp(r"^export_run_(\w+)_(\d+)$"))
+async def export_run(callback: CallbackQuery, bot: Bot, exporter: CsvExporter):
+    """
+    Запускает выгрузку за выбранный период в фоне.
+    """
+    kind, days = callback.data.removeprefix("export_run_").rsplit("_", 1)
+    if kind not in EXPORT_KINDS:
+        await callback.answer("Неизвестный тип выгрузки.", show_alert=True)
+        return
+
+    date_from, date_to = period_bounds(int(days))
+    exporter.start(bot, callback.message.chat.id, kind, date_from, date_to)
+    logger.info(f"Администратор {callback.from_user.id} запустил выгрузку {kind} за {days} дн.")
+
+    await callback.answer("⏳ Выгрузка запущена, файл придет отдельным сообщением.", show_alert=True)
+
+
+@admin_export_router.message(Command("export"))
+async def export_command(message: Message, command: CommandObject, bot: Bot, exporter: CsvExporter):
+    """
+    Выгрузка по команде с произвольным периодом: /export logs 2024-01-01 2024-01-31
+    """
+    args = (command.args or "").split()
+    if not args or args[0] not in EXPORT_KINDS or len(args) > 3:
+        await message.answer(EXPORT_USAGE)
+        return
+
+    try:
+        dates = [datetime.strptime(arg, "%Y-%m-%d") for arg in args[1:]]
+    except ValueError:
+        await message.answer(f"❌ Неверный формат даты.\n\n{EXPORT_USAGE}")
+        return
+
+    date_from = dates[0] if dates else None
+    # Дата окончания включается в период целиком
+    date_to = dates[1] + timedelta(days=1) if len(dates) > 1 else None
+
+    exporter.start(bot, message.chat.id, args[0], date_from, date_to)
+    await message.answer("⏳ Выгрузка запущена, файл придет отдельным сообщением.")
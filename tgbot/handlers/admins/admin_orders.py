@@ -1,10 +1,15 @@
 # tgbot/handlers/admins/admin_orders.py
-from aiogram import Router, F
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Tuple
+from aiogram import F
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery
+from aiogram.types import CallbackQuery, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-from tgbot.keyboards.admin_main_menu import main_menu_keyboard
+from tgbot.utils.prefix_router import PrefixRouter
+from tgbot.utils.message_edit import edit_text
+from tgbot.misc.callback_factory import OrderFilterCallback, OrderBulkCallback
+from tgbot.services.outbox import OutboxDispatcher
 from tgbot.misc.states import OrderManagement
 from tgbot.filters.admin import AdminFilter
 from infrastructure.database.repositories.requests import RequestsRepo
@@ -12,29 +17,61 @@ from math import ceil
 import re
 import logging
 
-admin_orders_router = Router()
+admin_orders_router = PrefixRouter(name="admin_orders_router")
 admin_orders_router.callback_query.filter(AdminFilter())
+admin_orders_router.message.filter(AdminFilter())
 
-def order_list_keyboard_paginated(orders, page: int = 1, page_size: int = 5) -> InlineKeyboardMarkup:
+# Количество заказов на странице списка
+ORDERS_PAGE_SIZE = 5
+
+# Периоды фильтра по дате: ключ -> (название, первый день и день после последнего
+# в днях назад от сегодняшнего; None - по текущий момент)
+ORDER_PERIODS = {
+    "today": ("Сегодня", 0, None),
+    "yesterday": ("Вчера", 1, 0),
+    "week": ("7 дней", 6, None),
+    "month": ("30 дней", 29, None),
+}
+
+async def get_order_filters(state: FSMContext) -> Dict[str, Any]:
+    """
+    Текущие фильтры списка заказов администратора (статус, период, пользователь).
+    """
+    data = await state.get_data()
+    return data.get("orders_filter", {})
+
+
+def filter_query(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Переводит фильтры списка в аргументы запросов OrdersRepo.
     """
-    Создаём клавиатуру для списка заказов с пагинацией
+    query: Dict[str, Any] = {"user_id": filters.get("user_id")}
+    period = ORDER_PERIODS.get(filters.get("period"))
+    if period:
+        _, first_day, end_day = period
+        today = datetime.combine(date.today(), time.min)
+        query["date_from"] = today - timedelta(days=first_day)
+        if end_day is not None:
+            query["date_to"] = today - timedelta(days=end_day)
+    return query
+
+
+def order_list_keyboard_paginated(orders, page: int, total_pages: int, counts: Dict[str, int],
+                                  filters: Dict[str, Any]) -> InlineKeyboardMarkup:
+    """
+    Создаём клавиатуру для страницы списка заказов с фильтрами
     """
     builder = InlineKeyboardBuilder()
-    
-    total_orders = len(orders)
-    total_pages = ceil(total_orders / page_size)
-    
-    start_index = (page - 1) * page_size
-    end_index = start_index + page_size
-    page_orders = orders[start_index:end_index]
-    
+
     # Создаем кнопку для каждого заказа
-    for order in page_orders:
-        builder.button(
-            text=f"Заказ #{order.order_id} - {order.status}",
-            callback_data=f"order_{order.order_id}"
+    for order in orders:
+        builder.row(
+            InlineKeyboardButton(
+                text=f"Заказ #{order.order_id} - {order.status}",
+                callback_data=f"order_{order.order_id}"
+            )
         )
-    
+
     # Кнопки навигации
     nav_buttons = []
     if page > 1:
@@ -53,14 +90,54 @@ def order_list_keyboard_paginated(orders, page: int = 1, page_size: int = 5) ->
         )
     if nav_buttons:
         builder.row(*nav_buttons)
-    
+
+    # Фильтр по статусу с количеством заказов в каждом статусе
+    status_buttons = [
+        InlineKeyboardButton(
+            text=f"{'✅ ' if filters.get('status') == status else ''}{status} ({count})",
+            callback_data=OrderFilterCallback(kind="status", value=status).pack()
+        )
+        for status, count in counts.items()
+    ]
+    for index in range(0, len(status_buttons), 2):
+        builder.row(*status_buttons[index:index + 2])
+
+    # Фильтр по периоду
+    builder.row(*(
+        InlineKeyboardButton(
+            text=f"{'✅ ' if filters.get('period') == key else ''}{title}",
+            callback_data=OrderFilterCallback(kind="period", value=key).pack()
+        )
+        for key, (title, *_) in ORDER_PERIODS.items()
+    ))
+
+    # Массовая смена статуса доступна, когда выбран фильтр по статусу
+    if counts.get(filters.get("status")):
+        builder.row(
+            InlineKeyboardButton(
+                text=f"🔁 Изменить статус всех найденных ({counts[filters['status']]})",
+                callback_data=OrderBulkCallback(action="start").pack()
+            )
+        )
+
+    builder.row(
+        InlineKeyboardButton(
+            text="👤 По пользователю",
+            callback_data=OrderFilterCallback(kind="user").pack()
+        ),
+        InlineKeyboardButton(
+            text="♻️ Сбросить фильтры",
+            callback_data=OrderFilterCallback(kind="reset").pack()
+        )
+    )
+
     # Кнопка "Назад" для возврата в меню
-    builder.button(
-        text="Назад",
-        callback_data="back_to_main_menu"
+    builder.row(
+        InlineKeyboardButton(
+            text="Назад",
+            callback_data="back_to_main_menu"
+        )
     )
-    
-    builder.adjust(1)
     return builder.as_markup()
 
 def order_details_keyboard(order_id: int) -> InlineKeyboardMarkup:
@@ -72,88 +149,230 @@ def order_details_keyboard(order_id: int) -> InlineKeyboardMarkup:
     builder.adjust(1)
     return builder.as_markup()
 
+async def render_orders_page(repo: RequestsRepo, filters: Dict[str, Any],
+                             page: int) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Формирует текст и клавиатуру страницы списка заказов.
+
+    Страница заказов (вместе с товаром и пользователем) и количество заказов по
+    статусам загружаются двумя запросами, независимо от числа заказов в базе.
+    """
+    query = filter_query(filters)
+    counts = await repo.orders.count_orders_by_status(**query)
+    orders, total = await repo.orders.get_orders_page(
+        page=page - 1, page_size=ORDERS_PAGE_SIZE, status=filters.get("status"), **query
+    )
+    total_pages = max(ceil(total / ORDERS_PAGE_SIZE), 1)
+
+    active = []
+    if filters.get("status"):
+        active.append(f"статус «{filters['status']}»")
+    if filters.get("period") in ORDER_PERIODS:
+        active.append(ORDER_PERIODS[filters["period"]][0].lower())
+    if filters.get("user_id"):
+        active.append(f"пользователь {filters['user_id']}")
+
+    text_lines = [f"Список заказов (стр. {page} из {total_pages}, всего {total}):"]
+    if active:
+        text_lines.append(f"Фильтры: {', '.join(active)}")
+    text_lines.append("")
+    for o in orders:
+        if o.product_id is None:
+            product_name = "корзина"
+        else:
+            product_name = o.product.name if o.product else "товар удален"
+        user_name = o.user.first_name if o.user else o.user_id
+        text_lines.append(
+            f"- #{o.order_id} от {o.created_at.strftime('%d.%m.%Y %H:%M')}, {user_name} ({o.user_id}), "
+            f"{product_name}, {o.total_price}₽, статус: {o.status}"
+        )
+    if not orders:
+        text_lines.append("Заказов не найдено.")
+
+    keyboard = order_list_keyboard_paginated(orders, page, total_pages, counts, filters)
+    return "\n".join(text_lines), keyboard
+
+async def show_orders_page(callback: CallbackQuery, repo: RequestsRepo, state: FSMContext, page: int):
+    """
+    Показывает страницу списка заказов, редактируя текущее сообщение.
+    """
+    text_output, keyboard = await render_orders_page(repo, await get_order_filters(state), page)
+    try:
+        await edit_text(callback.message, text_output, reply_markup=keyboard)
+    except Exception as e:
+        logging.error(f"Error editing message: {e}")
+        # Если не получается отредактировать, отправляем новое сообщение
+        try:
+            await callback.message.delete()
+        except Exception:
+            pass
+        await callback.message.answer(text_output, reply_markup=keyboard)
+
 # Обработчик кнопки просмотра заказов
 @admin_orders_router.callback_query(F.data == "view_orders")
-async def view_orders_handler(callback: CallbackQuery, repo: RequestsRepo):
+async def view_orders_handler(callback: CallbackQuery, repo: RequestsRepo, state: FSMContext):
     """Показать первую страницу со списком заказов."""
     try:
-        orders = await repo.orders.get_all_orders()
-        
-        if not orders:
-            # Даже здесь не редактируем, а отправляем новое сообщение
-            try:
-                await callback.message.delete()
-            except Exception as e:
-                logging.error(f"Error deleting message: {e}")
-                
-            await callback.message.answer(
-                "На данный момент заказы отсутствуют.",
-                reply_markup=main_menu_keyboard()
-            )
-            await callback.answer()
-            return
-        
-        # Формируем текст 
-        text_lines = ["Список заказов (стр. 1):\n"]
-        for o in orders[:5]:  # только первые 5 для примера
-            text_lines.append(f"- #{o.order_id}, пользователь: {o.user_id}, статус: {o.status}")
-        text_output = "\n".join(text_lines)
-        
-        # Создаём клавиатуру для страницы 1
-        keyboard = order_list_keyboard_paginated(orders, page=1, page_size=5)
-        
-        try:
-            # Сначала попробуем отредактировать текущее сообщение
-            await callback.message.edit_text(text_output, reply_markup=keyboard)
-            await callback.answer()
-        except Exception as e:
-            logging.error(f"Error editing message: {e}")
-            # Если не получается отредактировать, отправляем новое сообщение
-            try:
-                await callback.message.delete()
-            except Exception:
-                pass
-                
-            await callback.message.answer(text_output, reply_markup=keyboard)
-            await callback.answer()
+        await show_orders_page(callback, repo, state, page=1)
+        await callback.answer()
     except Exception as e:
         logging.error(f"Error in view_orders_handler: {e}")
         await callback.answer("Произошла ошибка при загрузке заказов.", show_alert=True)
 
 # Обработчик пагинации для списка заказов
 @admin_orders_router.callback_query(F.data.regexp(r"^view_orders_page_(\d+)$"))
-async def view_orders_page_handler(callback: CallbackQuery, repo: RequestsRepo):
+async def view_orders_page_handler(callback: CallbackQuery, repo: RequestsRepo, state: FSMContext):
     """Обработка переключения страниц в списке заказов."""
     match = re.match(r"^view_orders_page_(\d+)$", callback.data)
-    if not match:
-        return
-    
-    page = int(match.group(1))
-    orders = await repo.orders.get_all_orders()
-    
-    if not orders or page < 1:
+    if not match or int(match.group(1)) < 1:
         await callback.answer("Нет данных для отображения.", show_alert=True)
         return
-    
-    # Формируем текст
-    text_lines = [f"Список заказов (стр. {page}):\n"]
-    page_size = 5
-    start_index = (page - 1) * page_size
-    end_index = start_index + page_size
-    for o in orders[start_index:end_index]:
-        text_lines.append(f"- #{o.order_id}, пользователь: {o.user_id}, статус: {o.status}")
-    text_output = "\n".join(text_lines)
-    
-    # Генерируем клавиатуру для указанной страницы
-    keyboard = order_list_keyboard_paginated(orders, page=page, page_size=page_size)
-    
-    # Отправляем новое сообщение и удаляем старое
+
+    await show_orders_page(callback, repo, state, page=int(match.group(1)))
+    await callback.answer()
+
+# Обработчик фильтров списка заказов
+@admin_orders_router.callback_query(OrderFilterCallback.filter())
+async def order_filter_handler(callback: CallbackQuery, callback_data: OrderFilterCallback,
+                               repo: RequestsRepo, state: FSMContext):
+    """Включает или выключает фильтр списка заказов и показывает первую страницу."""
+    filters = await get_order_filters(state)
+
+    if callback_data.kind == "user":
+        await state.set_state(OrderManagement.viewing)
+        await callback.message.answer("Введите ID пользователя, заказы которого нужно показать:")
+        await callback.answer()
+        return
+    if callback_data.kind == "reset":
+        filters = {}
+    elif callback_data.kind in ("status", "period"):
+        # Повторное нажатие на выбранный фильтр выключает его
+        if filters.get(callback_data.kind) == callback_data.value:
+            filters.pop(callback_data.kind)
+        else:
+            filters[callback_data.kind] = callback_data.value
+
+    await state.update_data(orders_filter=filters)
+    await show_orders_page(callback, repo, state, page=1)
+    await callback.answer()
+
+@admin_orders_router.message(OrderManagement.viewing)
+async def order_user_filter_handler(message: Message, repo: RequestsRepo, state: FSMContext):
+    """Принимает ID пользователя для фильтра списка заказов."""
     try:
-        await callback.message.delete()
-    except Exception:
-        pass
-        
-    await callback.message.answer(text_output, reply_markup=keyboard)
+        user_id = int((message.text or "").strip())
+    except ValueError:
+        await message.answer("ID пользователя должен быть числом. Попробуйте снова:")
+        return
+
+    filters = await get_order_filters(state)
+    filters["user_id"] = user_id
+    await state.update_data(orders_filter=filters)
+    await state.set_state(None)
+
+    text_output, keyboard = await render_orders_page(repo, filters, page=1)
+    await message.answer(text_output, reply_markup=keyboard)
+
+def bulk_status_keyboard(statuses) -> InlineKeyboardMarkup:
+    """
+    Создает клавиатуру выбора нового статуса для массовой смены
+    """
+    builder = InlineKeyboardBuilder()
+    for status in statuses:
+        builder.button(
+            text=status,
+            callback_data=OrderBulkCallback(action="to", value=status)
+        )
+    builder.button(text="Отмена", callback_data="view_orders")
+    builder.adjust(1)
+    return builder.as_markup()
+
+def bulk_confirm_keyboard(to_status: str) -> InlineKeyboardMarkup:
+    """
+    Создает клавиатуру подтверждения массовой смены статуса
+    """
+    builder = InlineKeyboardBuilder()
+    builder.button(
+        text="✅ Подтвердить",
+        callback_data=OrderBulkCallback(action="confirm", value=to_status)
+    )
+    builder.button(text="Отмена", callback_data="view_orders")
+    builder.adjust(2)
+    return builder.as_markup()
+
+# Обработчики массовой смены статуса заказов
+@admin_orders_router.callback_query(OrderBulkCallback.filter(F.action == "start"))
+async def bulk_status_start(callback: CallbackQuery, repo: RequestsRepo, state: FSMContext):
+    """Показывает статусы, в которые можно перевести найденные заказы."""
+    filters = await get_order_filters(state)
+    from_status = filters.get("status")
+    if not from_status:
+        await callback.answer("Сначала выберите статус в фильтре.", show_alert=True)
+        return
+
+    statuses = await repo.orders.get_allowed_transitions(from_status)
+    if not statuses:
+        await callback.answer(f"Из статуса «{from_status}» переходов нет.", show_alert=True)
+        return
+
+    await edit_text(
+        callback.message,
+        f"Выберите новый статус для заказов в статусе «{from_status}»:",
+        reply_markup=bulk_status_keyboard(statuses)
+    )
+    await callback.answer()
+
+@admin_orders_router.callback_query(OrderBulkCallback.filter(F.action == "to"))
+async def bulk_status_confirm(callback: CallbackQuery, callback_data: OrderBulkCallback,
+                              repo: RequestsRepo, state: FSMContext):
+    """Просит подтвердить массовую смену статуса."""
+    filters = await get_order_filters(state)
+    from_status = filters.get("status")
+    if not from_status:
+        await callback.answer("Сначала выберите статус в фильтре.", show_alert=True)
+        return
+
+    counts = await repo.orders.count_orders_by_status(**filter_query(filters))
+    await edit_text(
+        callback.message,
+        f"Перевести {counts.get(from_status, 0)} заказ(ов) из статуса «{from_status}» "
+        f"в статус «{callback_data.value}»?\nПокупатели получат уведомления.",
+        reply_markup=bulk_confirm_keyboard(callback_data.value)
+    )
+    await callback.answer()
+
+@admin_orders_router.callback_query(OrderBulkCallback.filter(F.action == "confirm"),
+                                    flags={"callback_answer": "manual"})
+async def bulk_status_apply(callback: CallbackQuery, callback_data: OrderBulkCallback,
+                            repo: RequestsRepo, state: FSMContext, outbox: OutboxDispatcher):
+    """Меняет статус всех найденных заказов одним запросом и уведомляет покупателей."""
+    filters = await get_order_filters(state)
+    from_status = filters.get("status")
+    if not from_status:
+        await callback.answer("Сначала выберите статус в фильтре.", show_alert=True)
+        return
+
+    to_status = callback_data.value
+    rows = await repo.orders.bulk_transition_status(
+        to_status, from_status=from_status, notify_users=True, **filter_query(filters)
+    )
+    if rows is None:
+        await callback.answer("Не удалось изменить статус заказов.", show_alert=True)
+        return
+
+    logging.info(
+        f"Администратор {callback.from_user.id} перевел {len(rows)} заказ(ов) "
+        f"из статуса «{from_status}» в «{to_status}»"
+    )
+    # Уведомления покупателям поставлены в outbox в той же транзакции
+    if rows:
+        outbox.wake()
+
+    # Найденные заказы теперь в новом статусе: показываем их
+    filters["status"] = to_status
+    await state.update_data(orders_filter=filters)
+    await callback.answer(f"Статус изменен у {len(rows)} заказ(ов).", show_alert=True)
+    await show_orders_page(callback, repo, state, page=1)
 
 # Обработчик для просмотра деталей заказа
 @admin_orders_router.callback_query(F.data.regexp(r"^order_(\d+)$"))
@@ -170,9 +389,15 @@ async def view_order_details(callback: CallbackQuery, repo: RequestsRepo):
         await callback.answer("Заказ не найден.", show_alert=True)
         return
     
-    # Получаем информацию о товаре
-    product = await repo.products.get_product_by_id(order.product_id)
-    product_name = product.name if product else "Неизвестный товар"
+    # Получаем информацию о товаре (у заказа из корзины товары перечислены в позициях)
+    if order.items:
+        product_name = "".join(
+            f"\n  • {item.product.name if item.product else 'Неизвестный товар'}"
+            f" × {item.quantity} по {item.unit_price}"
+            for item in order.items
+        )
+    else:
+        product_name = order.product.name if order.product else "Неизвестный товар"
     
     # Получаем информацию о пользователе
     user = await repo.users.get_user_by_id(order.user_id)
@@ -192,7 +417,8 @@ async def view_order_details(callback: CallbackQuery, repo: RequestsRepo):
     )
     
     try:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             text,
             reply_markup=order_details_keyboard(order_id)
         )
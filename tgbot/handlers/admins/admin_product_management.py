@@ -1,11 +1,14 @@
 # tgbot/handlers/admin_product_management.py
 import logging
+import os
 import re
+import tempfile
 from typing import Optional, Dict, Any, Union
 
-from aiogram import Router, F
+from aiogram import F, Bot
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
+from tgbot.utils.prefix_router import PrefixRouter
 
 from tgbot.keyboards.product_management import (
     product_management_keyboard,
@@ -19,6 +22,10 @@ from tgbot.keyboards.admin_main_menu import main_menu_keyboard
 from tgbot.misc.states import ProductManagement, ProductField
 from infrastructure.database.repositories.requests import RequestsRepo 
 from tgbot.filters.admin import AdminFilter
+from tgbot.services.media import product_photo, remember_photo
+from tgbot.services.price_import import import_price_list, PriceListError
+from tgbot.utils.render_cache import product_cards, admin_card_text
+from tgbot.utils.message_edit import edit_text
 
 # Используем константы из перечисления ProductField
 PREVIOUS_STATE = ProductField.PREVIOUS_STATE
@@ -31,7 +38,7 @@ MATERIAL = ProductField.MATERIAL
 PRICE = ProductField.PRICE
 IMAGE_URL = ProductField.IMAGE_URL
 
-admin_product_router = Router()
+admin_product_router = PrefixRouter(name="admin_product_router")
 
 # Применяем фильтр ко всем сообщениям и callback_query в этом роутере
 admin_product_router.message.filter(AdminFilter())
@@ -49,7 +56,7 @@ def format_product_info(product) -> str:
         str: Отформатированная строка с информацией о товаре
     """
     if hasattr(product, 'formatted_info') and callable(getattr(product, 'formatted_info')):
-        return product.formatted_info()
+        return product_cards.get(product, "admin", admin_card_text)
     
     # Запасной вариант, если метод не доступен
     return (
@@ -63,12 +70,15 @@ def format_product_info(product) -> str:
     )
 
 @admin_product_router.callback_query(F.data == "manage_products")
-async def show_product_management_menu(callback: CallbackQuery):
+async def show_product_management_menu(callback: CallbackQuery, state: FSMContext):
     """
     Переход в меню управления товарами.
     """
+    # Выход в меню завершает незаконченный сценарий (например, ожидание прайс-листа)
+    await state.clear()
     try:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "Выберите действие с товарами:",
             reply_markup=product_management_keyboard()
         )
@@ -171,7 +181,8 @@ async def back_to_main_menu(callback: CallbackQuery, state: FSMContext):
     Возвращение в основную админ-панель.
     """
     logging.info(f"Пользователь {callback.from_user.id} нажал 'Назад' в меню управления товарами.")
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "Добро пожаловать в админ-панель!\n\nВыберите действие из меню:",
         reply_markup=main_menu_keyboard()
     )
@@ -196,26 +207,29 @@ async def view_product_details(callback: CallbackQuery, repo: RequestsRepo):
     # Используем функцию форматирования информации о товаре
     text = format_product_info(product)
     
-    # Если у товара есть изображение, отправляем его 
-    image_url = getattr(product, 'image_url', None)
-    if image_url:
+    # Если у товара есть изображение, отправляем его по file_id
+    photo = product_photo(product)
+    if photo:
         try:
-            await callback.message.answer_photo(
-                photo=image_url,
+            sent = await callback.message.answer_photo(
+                photo=photo,
                 caption=text,
                 reply_markup=product_details_keyboard(product_id)
             )
+            await remember_photo(repo.media, product, sent)
             # Удаляем предыдущее сообщение
             await callback.message.delete()
         except Exception as e:
             logging.error(f"Error sending product photo: {e}")
             # Fallback to text message if photo can't be sent
-            await callback.message.edit_text(
+            await edit_text(
+                callback.message,
                 text,
                 reply_markup=product_details_keyboard(product_id)
             )
     else:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             text,
             reply_markup=product_details_keyboard(product_id)
         )
@@ -247,7 +261,8 @@ async def edit_product_handler(callback: CallbackQuery, state: FSMContext, repo:
             )
         else:
             # Если фото нет, можем редактировать текст
-            await callback.message.edit_text(
+            await edit_text(
+                callback.message,
                 f"Выберите, что хотите изменить в товаре «{product.name}»:",
                 reply_markup=edit_product_keyboard(product_id)
             )
@@ -288,7 +303,8 @@ async def delete_product_handler(callback: CallbackQuery, repo: RequestsRepo):
             )
         else:
             # Если фото нет, можем редактировать текст
-            await callback.message.edit_text(
+            await edit_text(
+                callback.message,
                 f"Вы уверены, что хотите удалить товар «{product.name}»?",
                 reply_markup=confirmation_keyboard(product_id)
             )
@@ -300,7 +316,7 @@ async def delete_product_handler(callback: CallbackQuery, repo: RequestsRepo):
             reply_markup=confirmation_keyboard(product_id)
         )
 
-@admin_product_router.callback_query(F.data.regexp(r"^confirm_delete_(\d+)$"))
+@admin_product_router.callback_query(F.data.regexp(r"^confirm_delete_(\d+)$"), flags={"callback_answer": "manual"})
 async def confirm_delete_product(callback: CallbackQuery, repo: RequestsRepo):
     """
     Обработчик подтверждения удаления товара.
@@ -320,12 +336,14 @@ async def confirm_delete_product(callback: CallbackQuery, repo: RequestsRepo):
     success = await repo.products.delete_product(product_id)
     
     if success:
+        product_cards.invalidate(product_id)
         await callback.answer(f"Товар «{product.name}» успешно удален.", show_alert=True)
         # Возвращаемся к списку товаров
         products = await repo.products.get_all_products()
         
         if not products:
-            await callback.message.edit_text(
+            await edit_text(
+                callback.message,
                 "На данный момент товары отсутствуют.",
                 reply_markup=product_management_keyboard()
             )
@@ -338,7 +356,7 @@ async def confirm_delete_product(callback: CallbackQuery, repo: RequestsRepo):
         
         keyboard = product_list_keyboard_paginated(products, page=1, page_size=5)
         
-        await callback.message.edit_text(text_output, reply_markup=keyboard)
+        await edit_text(callback.message, text_output, reply_markup=keyboard)
     else:
         await callback.answer("Ошибка при удалении товара. Попробуйте снова.", show_alert=True)
 
@@ -400,7 +418,8 @@ async def edit_product_field(callback: CallbackQuery, state: FSMContext, repo: R
         message_text = f"Текущее {field_title}: {current_value}\n\nВведите новое {field_title} товара:"
     
     # Отправляем сообщение и устанавливаем соответствующее состояние
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         message_text,
         reply_markup=back_button_keyboard()
     )
@@ -441,6 +460,7 @@ async def process_field_update(message: Message, state: FSMContext, repo: Reques
         success = await repo.products.update_product_field(product_id, field_name, field_value)
         
         if success:
+            product_cards.invalidate(product_id)
             product = await repo.products.get_product_by_id(product_id)
             field_titles = {
                 "name": "Название",
@@ -558,6 +578,7 @@ async def process_new_image(message: Message, state: FSMContext, repo: RequestsR
         success = await repo.products.update_product_field(product_id, IMAGE_URL, photo_id)
         
         if success:
+            product_cards.invalidate(product_id)
             product = await repo.products.get_product_by_id(product_id)
             await message.answer("Изображение товара успешно обновлено.")
             
@@ -565,11 +586,11 @@ async def process_new_image(message: Message, state: FSMContext, repo: RequestsR
             product_info = format_product_info(product)
             
             # Возвращаемся к просмотру товара с фото
-            image_url = getattr(product, 'image_url', None)
-            if image_url:
+            photo = product_photo(product)
+            if photo:
                 try:
                     await message.answer_photo(
-                        photo=image_url,
+                        photo=photo,
                         caption=product_info,
                         reply_markup=product_details_keyboard(product_id)
                     )
@@ -596,7 +617,7 @@ async def start_add_product(callback: CallbackQuery, state: FSMContext):
     """
     logging.info(f"Пользователь {callback.from_user.id} начал добавление товара.")
     await state.update_data({PREVIOUS_STATE: None})  # Сбрасываем предыдущее состояние
-    await callback.message.edit_text("Введите название товара:", reply_markup=back_button_keyboard())
+    await edit_text(callback.message, "Введите название товара:", reply_markup=back_button_keyboard())
     await state.set_state(ProductManagement.name)
 
 # Функция для общего процесса создания товара
@@ -744,7 +765,8 @@ async def go_back(callback: CallbackQuery, state: FSMContext):
 
     if not previous_state:
         # Если предыдущего состояния нет, возвращаем в меню управления товарами
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "Выберите действие с товарами:",
             reply_markup=product_management_keyboard()
         )
@@ -775,5 +797,67 @@ async def go_back(callback: CallbackQuery, state: FSMContext):
         prompt = f"{prompt}\n\nТекущее значение: {current_value}"
     
     # Отображаем сообщение
-    await callback.message.edit_text(prompt, reply_markup=back_button_keyboard())
+    await edit_text(callback.message, prompt, reply_markup=back_button_keyboard())
     logging.info(f"Возвращение к состоянию: {previous_state}")
+
+
+# Ограничение Bot API на размер скачиваемого ботом файла
+MAX_PRICE_LIST_SIZE = 20 * 1024 * 1024
+
+@admin_product_router.callback_query(F.data == "import_price_list")
+async def start_price_list_import(callback: CallbackQuery, state: FSMContext):
+    """
+    Запрашивает файл прайс-листа для массового импорта товаров.
+    """
+    await state.set_state(ProductManagement.import_file)
+    await edit_text(
+        callback.message,
+        "Отправьте прайс-лист файлом .csv или .xlsx.\n\n"
+        "Первая строка - заголовки колонок. Обязательна колонка «артикул» (sku), "
+        "остальные необязательны: название, описание, тип, материал, цена, "
+        "цена со скидкой, остаток, изображение.\n\n"
+        "Товары с новым артикулом будут добавлены (для них нужны название и цена), "
+        "существующие - обновлены. Колонки, которых нет в файле, не изменяются.",
+        reply_markup=back_button_keyboard("manage_products")
+    )
+    await callback.answer()
+
+@admin_product_router.message(ProductManagement.import_file, F.document)
+async def process_price_list(message: Message, state: FSMContext, repo: RequestsRepo, bot: Bot):
+    """
+    Импортирует полученный прайс-лист одной транзакцией и показывает отчет.
+    """
+    document = message.document
+    if document.file_size and document.file_size > MAX_PRICE_LIST_SIZE:
+        await message.answer("❌ Файл слишком большой (максимум 20 МБ). Разделите прайс-лист на части.")
+        return
+
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        await message.answer("⏳ Импортирую прайс-лист...")
+        await bot.download(document, destination=path)
+        report = await import_price_list(repo.products, path, document.file_name or "")
+    except PriceListError as e:
+        await message.answer(f"❌ Не удалось прочитать файл: {e}.")
+        return
+    finally:
+        os.remove(path)
+
+    if report is None:
+        await message.answer("❌ Ошибка при сохранении товаров, изменения не применены. Попробуйте снова.")
+        return
+
+    await state.clear()
+    logging.info(f"Администратор {message.from_user.id} импортировал прайс-лист {document.file_name}")
+    await message.answer(report.format(), parse_mode="HTML", reply_markup=product_management_keyboard())
+
+@admin_product_router.message(ProductManagement.import_file)
+async def price_list_expected(message: Message):
+    """
+    Напоминает, что в этом шаге ожидается файл.
+    """
+    await message.answer(
+        "Пожалуйста, отправьте прайс-лист файлом .csv или .xlsx.",
+        reply_markup=back_button_keyboard("manage_products")
+    )
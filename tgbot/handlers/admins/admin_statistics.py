@@ -1,26 +1,32 @@
 # tgbot/handlers/admins/admin_statistics.py
-from aiogram import Router, F
+import html
+from aiogram import F
 from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
+from tgbot.utils.prefix_router import PrefixRouter
 from datetime import datetime, timedelta
 from infrastructure.database.repositories.logs import LogsRepo
 from infrastructure.database.repositories.products import ProductsRepo
 from infrastructure.database.repositories.requests import RequestsRepo
+from infrastructure.database.models.logs import LogAction
 from tgbot.keyboards.admin_main_menu import admin_back_button
 from tgbot.filters.admin import AdminFilter
+from tgbot.utils.render_cache import static_markup
+from tgbot.utils.message_edit import edit_text
 
 # Состояния для просмотра статистики
 class StatsViewing(StatesGroup):
     select_period = State()  # Выбор периода просмотра
     select_log_filter = State()  # Выбор фильтра логов
 
-admin_stats_router = Router()
+admin_stats_router = PrefixRouter(name="admin_stats_router")
 admin_stats_router.message.filter(AdminFilter())
 admin_stats_router.callback_query.filter(AdminFilter())
 
 # Клавиатура для меню статистики
+@static_markup
 def stats_menu_keyboard():
     from aiogram.utils.keyboard import InlineKeyboardBuilder
     from aiogram.types import InlineKeyboardButton
@@ -30,12 +36,14 @@ def stats_menu_keyboard():
         InlineKeyboardButton(text="📊 Просмотр статистики товаров", callback_data="view_product_stats"),
         InlineKeyboardButton(text="📝 Просмотр логов пользователей", callback_data="view_user_logs"),
         InlineKeyboardButton(text="👤 Популярные товары", callback_data="popular_products"),
+        InlineKeyboardButton(text="📤 Выгрузка в CSV", callback_data="export_menu"),
         InlineKeyboardButton(text="🔙 Назад", callback_data="admin_main")
     )
     builder.adjust(1)
     return builder.as_markup()
 
 # Клавиатура для выбора периода
+@static_markup
 def period_selection_keyboard():
     from aiogram.utils.keyboard import InlineKeyboardBuilder
     from aiogram.types import InlineKeyboardButton
@@ -51,6 +59,7 @@ def period_selection_keyboard():
     return builder.as_markup()
 
 # Клавиатура для фильтрации логов
+@static_markup
 def log_filter_keyboard():
     from aiogram.utils.keyboard import InlineKeyboardBuilder
     from aiogram.types import InlineKeyboardButton
@@ -71,7 +80,8 @@ async def view_statistics_menu(callback: CallbackQuery):
     """
     Показывает меню статистики и логов.
     """
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="📊 <b>Статистика и логи</b>\n\n"
              "Выберите раздел для просмотра:",
         reply_markup=stats_menu_keyboard(),
@@ -87,7 +97,8 @@ async def view_product_stats(callback: CallbackQuery, state: FSMContext):
     await state.set_state(StatsViewing.select_period)
     await state.update_data(stats_type="product")
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="📅 <b>Выберите период для просмотра статистики товаров:</b>",
         reply_markup=period_selection_keyboard(),
         parse_mode="HTML"
@@ -101,7 +112,8 @@ async def view_user_logs(callback: CallbackQuery, state: FSMContext):
     """
     await state.set_state(StatsViewing.select_log_filter)
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="🔍 <b>Выберите тип действий для просмотра логов:</b>",
         reply_markup=log_filter_keyboard(),
         parse_mode="HTML"
@@ -116,7 +128,8 @@ async def view_popular_products(callback: CallbackQuery, state: FSMContext):
     await state.set_state(StatsViewing.select_period)
     await state.update_data(stats_type="popular")
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="📅 <b>Выберите период для просмотра популярных товаров:</b>",
         reply_markup=period_selection_keyboard(),
         parse_mode="HTML"
@@ -124,68 +137,76 @@ async def view_popular_products(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 @admin_stats_router.callback_query(F.data.startswith("period_"))
-async def process_period_selection(callback: CallbackQuery, state: FSMContext, request: RequestsRepo):
+async def process_period_selection(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
     """
     Обрабатывает выбор периода и показывает соответствующую статистику.
+    
+    Статистика читается из суточных сверток, по исходным данным досчитывается
+    только текущий день, поэтому время ответа не зависит от объема логов.
     """
     # Получаем данные о типе статистики
     user_data = await state.get_data()
     stats_type = user_data.get("stats_type", "product")
     
-    # Определяем период
+    # Определяем период (количество дней, включая сегодняшний)
     period = callback.data.split("_")[1]
-    now = datetime.now()
     
     if period == "day":
-        start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        days = 1
         period_name = "за сегодня"
     elif period == "week":
-        start_date = now - timedelta(days=7)
+        days = 7
         period_name = "за неделю"
     elif period == "month":
-        start_date = now - timedelta(days=30)
+        days = 30
         period_name = "за месяц"
     else:
-        start_date = now - timedelta(days=7)  # По умолчанию неделя
+        days = 7  # По умолчанию неделя
         period_name = "за последнее время"
     
     # Формируем ответ в зависимости от типа статистики
     if stats_type == "product":
-        # Здесь должна быть логика получения статистики товаров
-        # Для примера формируем тестовую статистику
-        product_stats = [
-            {"name": "Дверь металлическая", "views": 45, "orders": 5},
-            {"name": "Дверь деревянная", "views": 32, "orders": 3},
-            {"name": "Ручка дверная", "views": 28, "orders": 8},
-        ]
+        summary = await repo.statistics.get_stats_summary_by_period(days)
+        product_stats = await repo.statistics.get_product_stats_table(days, limit=10)
+        actions = await repo.statistics.get_action_summary(days)
         
         # Формируем текст ответа
         text = f"📊 <b>Статистика товаров {period_name}</b>\n\n"
-        for prod in product_stats:
-            text += f"📦 <b>{prod['name']}</b>\n"
-            text += f"👁 Просмотры: {prod['views']}\n"
-            text += f"🛒 Заказы: {prod['orders']}\n\n"
+        text += f"👁 Просмотры: {summary['view']}\n"
+        text += f"❤️ Добавления в избранное: {summary['favorite']}\n"
+        text += f"🛒 Заказы: {summary['purchase']}\n\n"
         
-    elif stats_type == "popular":
-        # Логика получения популярных товаров
-        logs_repo = request.logs
-        products_repo = request.products
+        if product_stats:
+            for prod in product_stats:
+                text += f"📦 <b>{html.escape(prod['name'])}</b>\n"
+                text += f"👁 {prod['view']} | ❤️ {prod['favorite']} | 🛒 {prod['purchase']}\n\n"
+        else:
+            text += "Нет данных о товарах за выбранный период.\n\n"
         
-        # Получаем популярные товары по логам
-        popular_products = await logs_repo.get_popular_products(
-            days=30 if period == "month" else (7 if period == "week" else 1)
-        )
+        if actions:
+            text += "⚙️ <b>Действия пользователей</b>\n"
+            for action in actions[:10]:
+                text += f"🔹 {action['action'].label}: {action['count']}\n"
+        
+    elif stats_type == "popular":
+        # Популярные товары по просмотрам
+        popular_products = await repo.statistics.get_top_products_by_stat("view", days=days, limit=5)
         
         text = f"🔝 <b>Популярные товары {period_name}</b>\n\n"
         
         if popular_products:
-            for idx, prod_data in enumerate(popular_products[:5], 1):
-                product = await products_repo.get_product_by_id(prod_data["product_id"])
-                if product:
-                    text += f"{idx}. <b>{product.name}</b>\n"
-                    text += f"👁 Просмотры: {prod_data['views']}\n\n"
+            for idx, prod_data in enumerate(popular_products, 1):
+                text += f"{idx}. <b>{html.escape(prod_data['name'])}</b>\n"
+                text += f"👁 Просмотры: {prod_data['total']}\n\n"
         else:
-            text += "Нет данных о популярных товарах за выбранный период."
+            text += "Нет данных о популярных товарах за выбранный период.\n\n"
+        
+        # Избранное за все время: счетчик хранится в товаре, подсчет по таблице не нужен
+        most_favorited = await repo.products.get_most_favorited(limit=5)
+        if most_favorited:
+            text += "❤️ <b>Чаще всего в избранном</b>\n"
+            for idx, product in enumerate(most_favorited, 1):
+                text += f"{idx}. {html.escape(product.name)}: {product.favorite_count}\n"
     
     else:
         text = "Неизвестный тип статистики."
@@ -193,7 +214,8 @@ async def process_period_selection(callback: CallbackQuery, state: FSMContext, r
     # Сбрасываем состояние и отправляем ответ
     await state.clear()
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=text,
         reply_markup=admin_back_button("view_statistics"),
         parse_mode="HTML"
@@ -201,7 +223,7 @@ async def process_period_selection(callback: CallbackQuery, state: FSMContext, r
     await callback.answer()
 
 @admin_stats_router.callback_query(F.data.startswith("log_"))
-async def process_log_filter(callback: CallbackQuery, state: FSMContext, request: RequestsRepo):
+async def process_log_filter(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
     """
     Обрабатывает выбор фильтра логов и показывает соответствующие логи.
     """
@@ -209,7 +231,7 @@ async def process_log_filter(callback: CallbackQuery, state: FSMContext, request
     log_type = callback.data.split("_")[1]
     
     # Получаем логи из репозитория
-    logs_repo = request.logs
+    logs_repo = repo.logs
     
     # Фильтруем логи по типу
     if log_type == "all":
@@ -220,13 +242,13 @@ async def process_log_filter(callback: CallbackQuery, state: FSMContext, request
         )
         filter_name = "всех действий"
     elif log_type == "view_product":
-        logs = await logs_repo.get_logs_by_action("view_product", limit=20)
+        logs = await logs_repo.get_logs_by_action(LogAction.VIEW_PRODUCT, limit=20)
         filter_name = "просмотров товаров"
     elif log_type == "favorite":
-        logs = await logs_repo.get_logs_by_action("add_favorite", limit=20)
+        logs = await logs_repo.get_logs_by_action(LogAction.ADD_FAVORITE, limit=20)
         filter_name = "добавлений в избранное"
     elif log_type == "order":
-        logs = await logs_repo.get_logs_by_action("create_order", limit=20)
+        logs = await logs_repo.get_logs_by_action(LogAction.ORDER_CREATED, limit=20)
         filter_name = "заказов"
     else:
         logs = []
@@ -241,9 +263,10 @@ async def process_log_filter(callback: CallbackQuery, state: FSMContext, request
             date_str = log.timestamp.strftime("%d.%m.%Y %H:%M")
             text += f"👤 <b>Пользователь ID {log.user_id}</b>\n"
             text += f"🕒 {date_str}\n"
-            text += f"🔹 Действие: {log.action}\n"
+            text += f"🔹 Действие: {log.action.label}\n"
             if log.details:
-                text += f"📄 Детали: {log.details}\n"
+                details = ", ".join(f"{key}={value}" for key, value in log.details.items())
+                text += f"📄 Детали: {html.escape(details)}\n"
             text += "\n"
     else:
         text += "Нет логов за выбранный период."
@@ -255,7 +278,8 @@ async def process_log_filter(callback: CallbackQuery, state: FSMContext, request
     if len(text) > 4000:
         text = text[:3997] + "..."
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=text,
         reply_markup=admin_back_button("view_statistics"),
         parse_mode="HTML"
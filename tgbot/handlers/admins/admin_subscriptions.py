@@ -1,14 +1,17 @@
 # tgbot/handlers/admins/admin_subscriptions.py
-from aiogram import Router, F
+from aiogram import F
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
+from tgbot.utils.prefix_router import PrefixRouter
 from infrastructure.database.repositories.requests import RequestsRepo
 from infrastructure.database.repositories.users import UsersRepo
 from infrastructure.database.repositories.logs import LogsRepo
+from infrastructure.database.models.logs import LogAction
 from infrastructure.database.repositories.notifications import NotificationsRepo
 from tgbot.keyboards.admin_main_menu import admin_back_button
 from tgbot.filters.admin import AdminFilter
+from tgbot.utils.message_edit import edit_text
 
 # Состояния для управления подписками и уведомлениями
 class SubscriptionManagement(StatesGroup):
@@ -17,7 +20,7 @@ class SubscriptionManagement(StatesGroup):
     confirm_notification = State()      # Подтверждение отправки
     view_subscribers = State()          # Просмотр списка подписчиков
 
-admin_subscription_router = Router()
+admin_subscription_router = PrefixRouter(name="admin_subscription_router")
 admin_subscription_router.message.filter(AdminFilter())
 admin_subscription_router.callback_query.filter(AdminFilter())
 
@@ -57,7 +60,8 @@ async def manage_subscriptions_menu(callback: CallbackQuery):
     """
     Показывает меню управления подписками.
     """
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="🔔 <b>Управление подписками</b>\n\n"
              "Выберите действие:",
         reply_markup=subscription_management_keyboard(),
@@ -73,7 +77,8 @@ async def send_notification_callback(callback: CallbackQuery, state: FSMContext)
     """
     await state.set_state(SubscriptionManagement.select_notification_type)
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="📩 <b>Отправка уведомления</b>\n\n"
              "Выберите тип уведомления:",
         reply_markup=notification_type_keyboard(),
@@ -101,7 +106,8 @@ async def process_notification_type(callback: CallbackQuery, state: FSMContext):
         "promotions": "подписчикам на акции"
     }.get(notification_type, "выбранным пользователям")
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=f"📝 <b>Введите текст уведомления для отправки {type_description}:</b>\n\n"
              f"Сообщение будет отправлено от имени бота.",
         reply_markup=admin_back_button("send_notification"),
@@ -162,7 +168,7 @@ async def process_notification_text(message: Message, state: FSMContext):
 
 # Обработчик подтверждения отправки уведомления
 @admin_subscription_router.callback_query(SubscriptionManagement.confirm_notification, F.data == "confirm_send")
-async def confirm_send_notification(callback: CallbackQuery, state: FSMContext, request: RequestsRepo):
+async def confirm_send_notification(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
     """
     Обрабатывает подтверждение отправки уведомления.
     """
@@ -172,9 +178,9 @@ async def confirm_send_notification(callback: CallbackQuery, state: FSMContext,
     notification_text = user_data.get("notification_text")
     
     # Получаем репозитории
-    users_repo = request.users
-    notifications_repo = request.notifications
-    logs_repo = request.logs
+    users_repo = repo.users
+    notifications_repo = repo.notifications
+    logs_repo = repo.logs
     
     # В зависимости от типа уведомления, получаем список пользователей
     if notification_type == "all":
@@ -217,21 +223,22 @@ async def confirm_send_notification(callback: CallbackQuery, state: FSMContext,
             # Логируем ошибку, но продолжаем отправку другим пользователям
             await logs_repo.create_log(
                 user_id=callback.from_user.id,
-                action="notification_error",
-                details=f"Ошибка при отправке уведомления пользователю {user_id}: {str(e)}"
+                action=LogAction.NOTIFICATION_ERROR,
+                details={"recipient_id": user_id, "error": str(e)}
             )
     
     # Логируем действие
     await logs_repo.create_log(
         user_id=callback.from_user.id,
-        action="send_notification",
-        details=f"Отправлено уведомление {recipient_description}. Отправлено: {sent_count}"
+        action=LogAction.SEND_NOTIFICATION,
+        details={"recipients": recipient_description, "sent": sent_count}
     )
     
     # Сбрасываем состояние и отправляем ответ
     await state.clear()
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=f"✅ <b>Уведомление отправлено!</b>\n\n"
              f"Тип: {recipient_description}\n"
              f"Отправлено: {sent_count} пользователям\n\n"
@@ -243,12 +250,12 @@ async def confirm_send_notification(callback: CallbackQuery, state: FSMContext,
 
 # Обработчик кнопки "Список подписчиков"
 @admin_subscription_router.callback_query(F.data == "list_subscribers")
-async def list_subscribers_callback(callback: CallbackQuery, request: RequestsRepo):
+async def list_subscribers_callback(callback: CallbackQuery, repo: RequestsRepo):
     """
     Показывает список подписчиков на разные типы уведомлений.
     """
     # Получаем репозиторий пользователей
-    users_repo = request.users
+    users_repo = repo.users
     
     # В реальном проекте здесь должна быть логика получения статистики по подпискам
     # Для примера формируем тестовую статистику
@@ -278,7 +285,8 @@ async def list_subscribers_callback(callback: CallbackQuery, request: RequestsRe
             text += f"Имя: {user.first_name or 'Не указано'} {user.last_name or ''}\n"
             text += f"Дата регистрации: {user.created_at.strftime('%d.%m.%Y')}\n\n"
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=text,
         reply_markup=admin_back_button("manage_subscriptions"),
         parse_mode="HTML"
@@ -311,7 +319,8 @@ async def subscription_stats_callback(callback: CallbackQuery):
     text += "• Персонализируйте сообщения\n"
     text += "• Не отправляйте слишком много уведомлений\n"
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=text,
         reply_markup=admin_back_button("manage_subscriptions"),
         parse_mode="HTML"
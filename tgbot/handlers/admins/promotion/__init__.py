@@ -8,6 +8,7 @@ from .create import register_create_handlers
 from .view import register_view_handlers
 from .edit import register_edit_handlers
 from .product_management import register_product_handlers
+from .product_picker import register_picker_handlers
 
 # Create main router for all promotion-related functionality
 promotion_router = Router()
@@ -23,6 +24,7 @@ def register_promotion_handlers():
     register_view_handlers(admin_promotion_router)
     register_edit_handlers(admin_promotion_router)
     register_product_handlers(admin_promotion_router)
+    register_picker_handlers(admin_promotion_router)
     
     # Include the admin_promotion_router in the main promotion router
     promotion_router.include_router(admin_promotion_router)
@@ -2,18 +2,20 @@
 Base module for promotion management - contains shared states, router, and utility functions
 """
 import logging
-from aiogram import Router, F
+from aiogram import F
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup
 from aiogram.fsm.state import StatesGroup, State
+from tgbot.utils.prefix_router import PrefixRouter
+from tgbot.utils.message_edit import edit_text
 from datetime import datetime
 from infrastructure.database.models.promotions import DiscountType
-from infrastructure.database.repositories.promotion_repo import PromotionRepo
+from infrastructure.database.repositories.requests import RequestsRepo
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 # Create router
-admin_promotion_router = Router()
+admin_promotion_router = PrefixRouter(name="admin_promotion_router")
 
 # Shared state classes
 class PromotionManagement(StatesGroup):
@@ -40,13 +42,17 @@ class PromotionManagement(StatesGroup):
     
     # Manage products states
     manage_products = State()
+    product_rule = State()
+    
+    # Product picker search input (shared by create and manage flows)
+    product_search = State()
     
     # Delete promotion states
     delete_confirm = State()
 
 # Shared utility functions
 async def show_promotion_details(callback: CallbackQuery = None, message: Message = None, 
-                                promo_id: int = None, promotion = None, repo: PromotionRepo = None):
+                                promo_id: int = None, promotion = None, repo: RequestsRepo = None):
     """
     Displays promotion details in a formatted message.
     This utility function is used by multiple promotion handlers.
@@ -56,13 +62,13 @@ async def show_promotion_details(callback: CallbackQuery = None, message: Messag
         message: Optional message for answer responses
         promo_id: ID of the promotion to display
         promotion: Optional pre-fetched promotion object
-        repo: Promotion repository for database access
+        repo: Repository holder for database access
     """
     from tgbot.keyboards.admin_promotion import promotion_edit_keyboard, promotion_management_keyboard
     
     # If promotion object not provided, fetch it
     if not promotion and promo_id:
-        promotion = await repo.get_promotion_by_id(promo_id)
+        promotion = await repo.promotions.get_promotion_by_id(promo_id)
     
     if not promotion:
         text = "❌ Акция не найдена"
@@ -86,12 +92,12 @@ async def show_promotion_details(callback: CallbackQuery = None, message: Messag
         )
         
         # Get and add products in promotion
-        promoted_products = await repo.get_promotion_products(promo_id)
+        promoted_products = await repo.promotions.get_promotion_products(promo_id)
         
         text += "📦 *Товары в акции:*\n"
         if promoted_products:
             for i, product in enumerate(promoted_products[:5], 1):
-                text += f"{i}. {product.name} - {product.price}₽\n"
+                text += f"{i}. {product.name} - {product.formatted_price()}\n"
             
             if len(promoted_products) > 5:
                 text += f"... и еще {len(promoted_products) - 5} товаров\n"
@@ -102,7 +108,8 @@ async def show_promotion_details(callback: CallbackQuery = None, message: Messag
     
     # Send or edit message based on context
     if callback:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             text,
             reply_markup=reply_markup,
             parse_mode="Markdown"
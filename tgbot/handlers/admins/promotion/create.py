@@ -7,10 +7,14 @@ from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
 from infrastructure.database.models.promotions import DiscountType
-from infrastructure.database.repositories.promotion_repo import PromotionRepo
-from infrastructure.database.repositories.products import ProductsRepo
-from tgbot.keyboards.admin_promotion import admin_back_button, product_selection_keyboard
+from infrastructure.database.repositories.requests import RequestsRepo
+from tgbot.services.jobs import PROMOTION_PRICES_JOB
+from tgbot.services.outbox import OutboxDispatcher
+from tgbot.services.scheduler import JobScheduler
+from tgbot.keyboards.admin_promotion import admin_back_button
+from tgbot.utils.message_edit import edit_text
 from .base import PromotionManagement, show_promotion_details
+from .product_picker import start_picker, build_picker, get_selected_products
 
 logger = logging.getLogger(__name__)
 
@@ -60,12 +64,7 @@ def register_create_handlers(router: Router):
         PromotionManagement.add_end_date
     )
     
-    # Process product selection
-    router.callback_query.register(
-        process_product_selection, 
-        PromotionManagement.add_select_products, 
-        F.data.regexp(r"^select_product_(\d+)$")
-    )
+    # Product toggling, paging and search are handled by the shared product picker
     
     # Confirm product selection
     router.callback_query.register(
@@ -78,7 +77,8 @@ def register_create_handlers(router: Router):
     router.callback_query.register(
         confirm_add_promotion, 
         PromotionManagement.add_confirm, 
-        F.data == "confirm_add_promotion"
+        F.data == "confirm_add_promotion",
+        flags={"callback_answer": "manual"}
     )
     
     # Cancel creation
@@ -92,7 +92,8 @@ async def add_promotion_start(callback: CallbackQuery, state: FSMContext):
     """
     Starts the process of adding a new promotion.
     """
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "Давайте создадим новую акцию!\n\n"
         "Введите название акции:",
         reply_markup=admin_back_button("manage_promotions"),
@@ -220,7 +221,7 @@ async def process_start_date(message: Message, state: FSMContext):
     )
     await state.set_state(PromotionManagement.add_end_date)
 
-async def process_end_date(message: Message, state: FSMContext, product_repo: ProductsRepo):
+async def process_end_date(message: Message, state: FSMContext, repo: RequestsRepo):
     """
     Processes end date and shows product selection.
     """
@@ -251,49 +252,11 @@ async def process_end_date(message: Message, state: FSMContext, product_repo: Pr
     await state.update_data(end_date=end_date)
     
     # Request product selection
-    products = await product_repo.get_all_products()
-    
-    if not products:
-        await message.answer(
-            "❌ В системе нет товаров, к которым можно применить акцию. Сначала добавьте товары."
-        )
-        await state.clear()
-        return
-    
-    await message.answer(
-        "Выберите товары, к которым применяется акция:",
-        reply_markup=product_selection_keyboard(products)
-    )
-    await state.update_data(selected_products=[])
+    await start_picker(state, "Выберите товары, к которым применяется акция:")
     await state.set_state(PromotionManagement.add_select_products)
-
-async def process_product_selection(callback: CallbackQuery, state: FSMContext, product_repo: ProductsRepo):
-    """
-    Handles product selection for the promotion.
-    """
-    product_id = int(callback.data.split('_')[-1])
-    
-    # Get current selected products
-    data = await state.get_data()
-    selected_products = data.get("selected_products", [])
-    
-    # Toggle product selection
-    if product_id in selected_products:
-        selected_products.remove(product_id)
-    else:
-        selected_products.append(product_id)
-    
-    # Update state data
-    await state.update_data(selected_products=selected_products)
     
-    # Refresh product selection display
-    products = await product_repo.get_all_products()
-    
-    await callback.message.edit_text(
-        "Выберите товары, к которым применяется акция:",
-        reply_markup=product_selection_keyboard(products, selected_products)
-    )
-    await callback.answer()
+    text, keyboard = await build_picker(state, repo)
+    await message.answer(text, reply_markup=keyboard)
 
 async def confirm_products(callback: CallbackQuery, state: FSMContext):
     """
@@ -301,6 +264,7 @@ async def confirm_products(callback: CallbackQuery, state: FSMContext):
     """
     # Get all promotion data
     data = await state.get_data()
+    selected_products = await get_selected_products(state)
     
     # Format dates for display
     start_date = data['start_date'].strftime("%d-%m-%Y")
@@ -321,14 +285,15 @@ async def confirm_products(callback: CallbackQuery, state: FSMContext):
     )
     
     # Show promotion summary
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         f"Проверьте данные акции перед созданием:\n\n"
         f"Название: {data['name']}\n"
         f"Описание: {data['description']}\n"
         f"Тип скидки: {discount_type}\n"
         f"Значение скидки: {discount_value}\n"
         f"Период: с {start_date} по {end_date}\n"
-        f"Выбрано товаров: {len(data['selected_products'])}\n\n"
+        f"Выбрано товаров: {len(selected_products)}\n\n"
         f"Всё верно?",
         reply_markup=builder.as_markup()
     )
@@ -336,7 +301,8 @@ async def confirm_products(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PromotionManagement.add_confirm)
     await callback.answer()
 
-async def confirm_add_promotion(callback: CallbackQuery, state: FSMContext, repo: PromotionRepo):
+async def confirm_add_promotion(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo, scheduler: JobScheduler,
+                                outbox: OutboxDispatcher):
     """
     Creates the new promotion with all the collected data.
     """
@@ -344,37 +310,46 @@ async def confirm_add_promotion(callback: CallbackQuery, state: FSMContext, repo
     data = await state.get_data()
     
     try:
-        # Create the promotion
-        promo_id = await repo.create_promotion(
-            name=data['name'],
-            description=data['description'],
-            discount_type=data['discount_type'],
-            discount_value=data['discount_value'],
-            start_date=data['start_date'],
-            end_date=data['end_date'],
-            is_active=True
-        )
+        # Create the promotion; the subscriber notification is committed with it
+        promotion = await repo.promotions.create_promotion({
+            "name": data['name'],
+            "description": data['description'],
+            "discount_type": data['discount_type'],
+            "discount_value": data['discount_value'],
+            "start_date": data['start_date'],
+            "end_date": data['end_date'],
+            "is_active": True,
+            "created_by": callback.from_user.id
+        }, notify_subscribers=True)
         
-        if promo_id:
-            # Associate products with the promotion
-            if data['selected_products']:
-                await repo.update_promotion_products(promo_id, data['selected_products'])
+        if promotion:
+            promo_id = promotion.promo_id
+            
+            # Associate products with the promotion (recalculates their effective prices)
+            selected_products = await get_selected_products(state)
+            if selected_products:
+                await repo.promotions.apply_promotion_to_products(promo_id, selected_products)
+            
+            # Plan price recalculation for the promotion start/end
+            scheduler.reschedule(PROMOTION_PRICES_JOB)
+            outbox.wake()
             
             await callback.answer("✅ Акция успешно создана!", show_alert=True)
             
             # Show the created promotion
-            promotion = await repo.get_promotion_by_id(promo_id)
             await show_promotion_details(callback=callback, promotion=promotion, promo_id=promo_id, repo=repo)
         else:
             await callback.answer("❌ Не удалось создать акцию. Пожалуйста, попробуйте позже.", show_alert=True)
-            await callback.message.edit_text(
+            await edit_text(
+                callback.message,
                 "Произошла ошибка при создании акции. Вернитесь в меню управления акциями.",
                 reply_markup=admin_back_button("manage_promotions")
             )
     except Exception as e:
         logger.error(f"Error creating promotion: {e}")
         await callback.answer("❌ Ошибка при создании акции.", show_alert=True)
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             f"Произошла ошибка при создании акции: {str(e)}",
             reply_markup=admin_back_button("manage_promotions")
         )
@@ -391,7 +366,8 @@ async def cancel_add_promotion(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     await callback.answer("❌ Создание акции отменено", show_alert=True)
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "Создание акции отменено. Вернитесь в меню управления акциями:",
         reply_markup=promotion_management_keyboard()
     )
\ No newline at end of file
@@ -9,12 +9,15 @@ from aiogram.types import CallbackQuery, Message, InlineKeyboardButton, InlineKe
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
 from infrastructure.database.models.promotions import DiscountType
-from infrastructure.database.repositories.promotion_repo import PromotionRepo
+from infrastructure.database.repositories.requests import RequestsRepo
+from tgbot.services.jobs import PROMOTION_PRICES_JOB
+from tgbot.services.scheduler import JobScheduler
 from tgbot.keyboards.admin_promotion import (
     admin_back_button,
     promotion_list_keyboard,
     promotion_management_keyboard,
 )
+from tgbot.utils.message_edit import edit_text
 from .base import PromotionManagement, show_promotion_details
 
 logger = logging.getLogger(__name__)
@@ -47,7 +50,8 @@ def register_edit_handlers(router: Router):
     # Toggle promotion status
     router.callback_query.register(
         toggle_promotion_status,
-        F.data.regexp(r"^toggle_promo_status_(\d+)$")
+        F.data.regexp(r"^toggle_promo_status_(\d+)$"),
+        flags={"callback_answer": "manual"}
     )
     
     # Delete promotion handlers
@@ -59,7 +63,8 @@ def register_edit_handlers(router: Router):
     router.callback_query.register(
         delete_promotion,
         PromotionManagement.delete_confirm,
-        F.data.regexp(r"^confirm_delete_(\d+)$")
+        F.data.regexp(r"^confirm_delete_(\d+)$"),
+        flags={"callback_answer": "manual"}
     )
 
 def edit_field_keyboard(promo_id: int) -> InlineKeyboardMarkup:
@@ -124,14 +129,15 @@ async def start_edit_promotion(callback: CallbackQuery, state: FSMContext):
     
     await state.update_data(promo_id=promo_id)
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "Выберите, что именно вы хотите изменить:",
         reply_markup=edit_field_keyboard(promo_id)
     )
     await state.set_state(PromotionManagement.edit_select_field)
     await callback.answer()
 
-async def edit_promotion_field(callback: CallbackQuery, state: FSMContext, repo: PromotionRepo):
+async def edit_promotion_field(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
     """
     Handles field selection for editing.
     """
@@ -139,7 +145,7 @@ async def edit_promotion_field(callback: CallbackQuery, state: FSMContext, repo:
     promo_id = int(promo_id)
     
     # Get current promotion data
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     if not promotion:
         await callback.answer("Акция не найдена", show_alert=True)
         await state.clear()
@@ -158,7 +164,8 @@ async def edit_promotion_field(callback: CallbackQuery, state: FSMContext, repo:
         await state.set_state(PromotionManagement.edit_discount_type)
         current_value = "Процентная" if promotion.discount_type == DiscountType.PERCENTAGE.value else "Фиксированная"
         field_name = "типа скидки"
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             f"Текущий тип скидки: {current_value}\n\n"
             "Выберите новый тип скидки:\n"
             "1. Процентная скидка\n"
@@ -187,7 +194,8 @@ async def edit_promotion_field(callback: CallbackQuery, state: FSMContext, repo:
     await state.update_data(promo_id=promo_id, field=field)
     
     # Show current value and prompt for new one
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         f"Редактирование {field_name} акции\n\n"
         f"Текущее значение: {current_value}\n\n"
         f"Введите новое значение для {field_name}:",
@@ -195,7 +203,7 @@ async def edit_promotion_field(callback: CallbackQuery, state: FSMContext, repo:
     )
     await callback.answer()
 
-async def process_edit_name(message: Message, state: FSMContext, repo: PromotionRepo):
+async def process_edit_name(message: Message, state: FSMContext, repo: RequestsRepo):
     """
     Processes editing the promotion name.
     """
@@ -211,7 +219,7 @@ async def process_edit_name(message: Message, state: FSMContext, repo: Promotion
     
     # Update promotion name
     try:
-        updated = await repo.update_promotion(promo_id, {"name": new_name})
+        updated = await repo.promotions.update_promotion(promo_id, {"name": new_name})
         if updated:
             await message.answer(f"✅ Название акции успешно изменено на '{new_name}'")
         else:
@@ -220,11 +228,11 @@ async def process_edit_name(message: Message, state: FSMContext, repo: Promotion
         await message.answer(f"❌ Произошла ошибка: {str(e)}")
     
     # Show updated promotion
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     await show_promotion_details(message=message, promo_id=promo_id, promotion=promotion, repo=repo)
     await state.clear()
 
-async def process_edit_description(message: Message, state: FSMContext, repo: PromotionRepo):
+async def process_edit_description(message: Message, state: FSMContext, repo: RequestsRepo):
     """
     Processes editing the promotion description.
     """
@@ -236,7 +244,7 @@ async def process_edit_description(message: Message, state: FSMContext, repo: Pr
     
     # Update promotion description
     try:
-        updated = await repo.update_promotion(promo_id, {"description": new_description})
+        updated = await repo.promotions.update_promotion(promo_id, {"description": new_description})
         if updated:
             await message.answer(f"✅ Описание акции успешно изменено")
         else:
@@ -245,11 +253,11 @@ async def process_edit_description(message: Message, state: FSMContext, repo: Pr
         await message.answer(f"❌ Произошла ошибка: {str(e)}")
     
     # Show updated promotion
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     await show_promotion_details(message=message, promo_id=promo_id, promotion=promotion, repo=repo)
     await state.clear()
 
-async def process_edit_discount_type(message: Message, state: FSMContext, repo: PromotionRepo):
+async def process_edit_discount_type(message: Message, state: FSMContext, repo: RequestsRepo):
     """
     Processes editing the promotion discount type.
     """
@@ -269,7 +277,7 @@ async def process_edit_discount_type(message: Message, state: FSMContext, repo:
     
     # Update discount type
     try:
-        updated = await repo.update_promotion(promo_id, {"discount_type": discount_type})
+        updated = await repo.promotions.update_promotion(promo_id, {"discount_type": discount_type})
         if updated:
             type_name = "процентную" if discount_type == DiscountType.PERCENTAGE.value else "фиксированную"
             await message.answer(f"✅ Тип скидки успешно изменен на {type_name}")
@@ -279,11 +287,11 @@ async def process_edit_discount_type(message: Message, state: FSMContext, repo:
         await message.answer(f"❌ Произошла ошибка: {str(e)}")
     
     # Show updated promotion
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     await show_promotion_details(message=message, promo_id=promo_id, promotion=promotion, repo=repo)
     await state.clear()
 
-async def process_edit_discount_value(message: Message, state: FSMContext, repo: PromotionRepo):
+async def process_edit_discount_value(message: Message, state: FSMContext, repo: RequestsRepo):
     """
     Processes editing the promotion discount value.
     """
@@ -297,13 +305,13 @@ async def process_edit_discount_value(message: Message, state: FSMContext, repo:
         promo_id = data.get("promo_id")
         
         # Get current promotion for discount type check
-        promotion = await repo.get_promotion_by_id(promo_id)
+        promotion = await repo.promotions.get_promotion_by_id(promo_id)
         if promotion.discount_type == DiscountType.PERCENTAGE.value and new_value > 100:
             await message.answer("❌ Процент скидки не может быть больше 100%. Пожалуйста, введите корректное значение.")
             return
         
         # Update discount value
-        updated = await repo.update_promotion(promo_id, {"discount_value": new_value})
+        updated = await repo.promotions.update_promotion(promo_id, {"discount_value": new_value})
         if updated:
             await message.answer(f"✅ Значение скидки успешно изменено на {new_value}")
         else:
@@ -317,11 +325,11 @@ async def process_edit_discount_value(message: Message, state: FSMContext, repo:
         return
     
     # Show updated promotion
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     await show_promotion_details(message=message, promo_id=promo_id, promotion=promotion, repo=repo)
     await state.clear()
 
-async def process_edit_start_date(message: Message, state: FSMContext, repo: PromotionRepo):
+async def process_edit_start_date(message: Message, state: FSMContext, repo: RequestsRepo, scheduler: JobScheduler):
     """
     Processes editing the promotion start date.
     """
@@ -343,8 +351,9 @@ async def process_edit_start_date(message: Message, state: FSMContext, repo: Pro
     
     # Update start date
     try:
-        updated = await repo.update_promotion(promo_id, {"start_date": new_date})
+        updated = await repo.promotions.update_promotion(promo_id, {"start_date": new_date})
         if updated:
+            scheduler.reschedule(PROMOTION_PRICES_JOB)
             await message.answer(f"✅ Дата начала акции успешно изменена на {new_date.strftime('%d-%m-%Y')}")
         else:
             await message.answer("❌ Не удалось обновить дату начала акции. Попробуйте позже.")
@@ -352,11 +361,11 @@ async def process_edit_start_date(message: Message, state: FSMContext, repo: Pro
         await message.answer(f"❌ Произошла ошибка: {str(e)}")
     
     # Show updated promotion
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     await show_promotion_details(message=message, promo_id=promo_id, promotion=promotion, repo=repo)
     await state.clear()
 
-async def process_edit_end_date(message: Message, state: FSMContext, repo: PromotionRepo):
+async def process_edit_end_date(message: Message, state: FSMContext, repo: RequestsRepo, scheduler: JobScheduler):
     """
     Processes editing the promotion end date.
     """
@@ -367,7 +376,7 @@ async def process_edit_end_date(message: Message, state: FSMContext, repo: Promo
     promo_id = data.get("promo_id")
     
     # Get current promotion for start date check
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     
     if not date_text:
         # Set to None if empty (indefinite promotion)
@@ -385,8 +394,9 @@ async def process_edit_end_date(message: Message, state: FSMContext, repo: Promo
     
     # Update end date
     try:
-        updated = await repo.update_promotion(promo_id, {"end_date": new_date})
+        updated = await repo.promotions.update_promotion(promo_id, {"end_date": new_date})
         if updated:
+            scheduler.reschedule(PROMOTION_PRICES_JOB)
             date_str = new_date.strftime('%d-%m-%Y') if new_date else "бессрочно"
             await message.answer(f"✅ Дата окончания акции успешно изменена на {date_str}")
         else:
@@ -395,18 +405,18 @@ async def process_edit_end_date(message: Message, state: FSMContext, repo: Promo
         await message.answer(f"❌ Произошла ошибка: {str(e)}")
     
     # Show updated promotion
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     await show_promotion_details(message=message, promo_id=promo_id, promotion=promotion, repo=repo)
     await state.clear()
 
-async def toggle_promotion_status(callback: CallbackQuery, repo: PromotionRepo):
+async def toggle_promotion_status(callback: CallbackQuery, repo: RequestsRepo, scheduler: JobScheduler):
     """
     Toggles the active status of a promotion.
     """
     promo_id = int(callback.data.split('_')[-1])
     
     # Get current promotion
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     if not promotion:
         await callback.answer("Акция не найдена", show_alert=True)
         return
@@ -416,8 +426,9 @@ async def toggle_promotion_status(callback: CallbackQuery, repo: PromotionRepo):
     
     # Update promotion status
     try:
-        updated = await repo.update_promotion(promo_id, {"is_active": new_status})
+        updated = await repo.promotions.update_promotion(promo_id, {"is_active": new_status})
         if updated:
+            scheduler.reschedule(PROMOTION_PRICES_JOB)
             status_str = "активной" if new_status else "неактивной"
             await callback.answer(f"Акция теперь {status_str}", show_alert=True)
         else:
@@ -426,7 +437,7 @@ async def toggle_promotion_status(callback: CallbackQuery, repo: PromotionRepo):
         await callback.answer(f"Ошибка: {str(e)}", show_alert=True)
     
     # Show updated promotion
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     await show_promotion_details(callback=callback, promo_id=promo_id, promotion=promotion, repo=repo)
 
 async def confirm_delete_promotion(callback: CallbackQuery, state: FSMContext):
@@ -452,14 +463,15 @@ async def confirm_delete_promotion(callback: CallbackQuery, state: FSMContext):
         )
     )
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "⚠️ Вы уверены, что хотите удалить эту акцию?\n"
         "Это действие нельзя будет отменить.",
         reply_markup=builder.as_markup()
     )
     await callback.answer()
 
-async def delete_promotion(callback: CallbackQuery, state: FSMContext, repo: PromotionRepo):
+async def delete_promotion(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo, scheduler: JobScheduler):
     """
     Deletes a promotion after confirmation.
     """
@@ -467,8 +479,9 @@ async def delete_promotion(callback: CallbackQuery, state: FSMContext, repo: Pro
     
     # Delete promotion
     try:
-        deleted = await repo.delete_promotion(promo_id)
+        deleted = await repo.promotions.delete_promotion(promo_id)
         if deleted:
+            scheduler.reschedule(PROMOTION_PRICES_JOB)
             await callback.answer("✅ Акция успешно удалена", show_alert=True)
         else:
             await callback.answer("❌ Не удалось удалить акцию", show_alert=True)
@@ -478,14 +491,16 @@ async def delete_promotion(callback: CallbackQuery, state: FSMContext, repo: Pro
     # Back to promotion list
     await state.clear()
     
-    promotions = await repo.get_all_promotions()
+    promotions = await repo.promotions.get_all_promotions()
     if promotions:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "Список доступных акций:",
             reply_markup=promotion_list_keyboard(promotions)
         )
     else:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "В системе нет акций.",
             reply_markup=promotion_management_keyboard()
         )
\ No newline at end of file
@@ -3,13 +3,16 @@ Handlers for managing products in promotions
 """
 import logging
 import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict
 from aiogram import Router, F
-from aiogram.types import CallbackQuery
+from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
-from infrastructure.database.repositories.promotion_repo import PromotionRepo
-from infrastructure.database.repositories.products import ProductsRepo
-from tgbot.keyboards.admin_promotion import product_selection_keyboard
+from infrastructure.database.repositories.requests import RequestsRepo
+from tgbot.keyboards.admin_promotion import admin_back_button
+from tgbot.utils.message_edit import edit_text
 from .base import PromotionManagement, show_promotion_details
+from .product_picker import start_picker, build_picker, get_selected_products
 
 logger = logging.getLogger(__name__)
 
@@ -23,93 +26,64 @@ def register_product_handlers(router: Router):
         F.data.regexp(r"^manage_promo_products_(\d+)$")
     )
     
-    # Toggle product selection
-    router.callback_query.register(
-        toggle_product_selection,
-        PromotionManagement.manage_products, 
-        F.data.regexp(r"^select_product_(\d+)$")
-    )
+    # Product toggling, paging and search are handled by the shared product picker
     
     # Confirm product selection
     router.callback_query.register(
         confirm_product_selection,
         PromotionManagement.manage_products, 
-        F.data == "confirm_product_selection"
+        F.data == "confirm_product_selection",
+        flags={"callback_answer": "manual"}
     )
+    
+    # Rule-based linking (type, material, category, price range)
+    router.callback_query.register(
+        start_rule_linking,
+        F.data.regexp(r"^promo_rule_(\d+)$")
+    )
+    router.message.register(process_product_rule, PromotionManagement.product_rule)
 
-async def manage_promotion_products(callback: CallbackQuery, state: FSMContext, repo: PromotionRepo, product_repo: ProductsRepo):
+async def manage_promotion_products(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
     """
     Displays interface for managing products in a promotion.
     """
     promo_id = int(callback.data.split('_')[-1])
     
     # Get promotion details
-    promotion = await repo.get_promotion_by_id(promo_id)
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
     if not promotion:
         await callback.answer("Акция не найдена", show_alert=True)
         return
     
-    # Get all available products
-    all_products = await product_repo.get_all_products()
-    
     # Get products currently in the promotion
-    promoted_products = await repo.get_promotion_products(promo_id)
-    selected_product_ids = [p.product_id for p in promoted_products]
+    selected_product_ids = await repo.promotions.get_promotion_product_ids(promo_id)
     
     # Save data in state
-    await state.update_data(promo_id=promo_id, selected_products=selected_product_ids)
-    await state.set_state(PromotionManagement.manage_products)
-    
-    await callback.message.edit_text(
+    await state.update_data(promo_id=promo_id)
+    await start_picker(
+        state,
         f"Управление товарами для акции '{promotion.name}'\n\n"
         "Выберите товары, которые должны участвовать в акции:",
-        reply_markup=product_selection_keyboard(all_products, selected_product_ids)
+        selected_product_ids
     )
-    await callback.answer()
-
-async def toggle_product_selection(callback: CallbackQuery, state: FSMContext, product_repo: ProductsRepo):
-    """
-    Toggles selection of a product for the promotion.
-    """
-    product_id = int(callback.data.split('_')[-1])
-    
-    # Get current selected products from state
-    data = await state.get_data()
-    promo_id = data.get("promo_id")
-    selected_products = data.get("selected_products", [])
-    
-    # Toggle product selection (add/remove)
-    if product_id in selected_products:
-        selected_products.remove(product_id)
-    else:
-        selected_products.append(product_id)
-    
-    # Update state data
-    await state.update_data(selected_products=selected_products)
-    
-    # Get all products for updating keyboard
-    all_products = await product_repo.get_all_products()
+    await state.set_state(PromotionManagement.manage_products)
     
-    # Update message with new keyboard
-    await callback.message.edit_text(
-        f"Управление товарами для акции (ID: {promo_id})\n\n"
-        "Выберите товары, которые должны участвовать в акции:",
-        reply_markup=product_selection_keyboard(all_products, selected_products)
-    )
+    text, keyboard = await build_picker(state, repo)
+    await edit_text(callback.message, text, reply_markup=keyboard)
     await callback.answer()
 
-async def confirm_product_selection(callback: CallbackQuery, state: FSMContext, repo: PromotionRepo):
+async def confirm_product_selection(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
     """
     Confirms the selection of products for the promotion.
     """
     # Get data from state
     data = await state.get_data()
     promo_id = data.get("promo_id")
-    selected_products = data.get("selected_products", [])
+    selected_products = await get_selected_products(state)
     
     # Update products in promotion
     try:
-        updated = await repo.update_promotion_products(promo_id, selected_products)
+        updated = await repo.promotions.update_promotion_products(promo_id, selected_products)
         if updated:
             await callback.answer("✅ Список товаров в акции обновлен", show_alert=True)
         else:
@@ -121,5 +95,123 @@ async def confirm_product_selection(callback: CallbackQuery, state: FSMContext,
     await state.clear()
     
     # Show updated promotion details
-    promotion = await repo.get_promotion_by_id(promo_id)
-    await show_promotion_details(callback=callback, promo_id=promo_id, promotion=promotion, repo=repo)
\ No newline at end of file
+    promotion = await repo.promotions.get_promotion_by_id(promo_id)
+    await show_promotion_details(callback=callback, promo_id=promo_id, promotion=promotion, repo=repo)
+
+RULE_HELP = (
+    "Отправьте правило: по одному условию в строке, условия объединяются через И.\n\n"
+    "тип: дверь\n"
+    "материал: дуб\n"
+    "категория: Межкомнатные (название или ID)\n"
+    "цена: 5000-20000 (или «от 5000», «до 20000»)"
+)
+
+def _parse_price(value: str) -> Decimal:
+    try:
+        price = Decimal(value.strip().replace(",", ".").replace(" ", ""))
+    except InvalidOperation:
+        raise ValueError(f"Некорректная цена: {value.strip()}")
+    if price < 0:
+        raise ValueError("Цена не может быть отрицательной")
+    return price
+
+def parse_product_rule(text: str) -> Dict[str, Any]:
+    """
+    Parses a rule of the form "ключ: значение" per line.
+    
+    Returns keyword arguments for PromotionRepo.apply_promotion_by_rule
+    (the category is returned as given, under "category").
+    
+    Raises:
+        ValueError: With a message for the admin if the rule is invalid
+    """
+    rule: Dict[str, Any] = {}
+    for line in filter(None, (line.strip() for line in text.splitlines())):
+        key, sep, value = line.partition(":")
+        key, value = key.strip().lower(), value.strip()
+        if not sep or not value:
+            raise ValueError(f"Строка без значения: {line}")
+        
+        if key == "тип":
+            rule["product_type"] = value
+        elif key == "материал":
+            rule["material"] = value
+        elif key == "категория":
+            rule["category"] = value
+        elif key == "цена":
+            if "-" in value:
+                low, high = value.split("-", 1)
+                rule["min_price"], rule["max_price"] = _parse_price(low), _parse_price(high)
+                continue
+            match = re.fullmatch(r"(?:от\s*(?P<min>[\d\s.,]+?))?\s*(?:до\s*(?P<max>[\d\s.,]+))?", value, re.IGNORECASE)
+            if match and (match.group("min") or match.group("max")):
+                if match.group("min"):
+                    rule["min_price"] = _parse_price(match.group("min"))
+                if match.group("max"):
+                    rule["max_price"] = _parse_price(match.group("max"))
+            else:
+                raise ValueError(f"Некорректный диапазон цен: {value}")
+        else:
+            raise ValueError(f"Неизвестное условие: {key}")
+    
+    if not rule:
+        raise ValueError("Правило не содержит условий")
+    if rule.get("min_price") is not None and rule.get("max_price") is not None \
+            and rule["min_price"] > rule["max_price"]:
+        raise ValueError("Минимальная цена больше максимальной")
+    return rule
+
+async def start_rule_linking(callback: CallbackQuery, state: FSMContext):
+    """
+    Asks for a rule selecting the products to add to the promotion.
+    """
+    promo_id = int(callback.data.split('_')[-1])
+    
+    await state.update_data(promo_id=promo_id)
+    await state.set_state(PromotionManagement.product_rule)
+    await edit_text(
+        callback.message,
+        f"🧩 Добавление товаров в акцию по правилу\n\n{RULE_HELP}",
+        reply_markup=admin_back_button(f"promotion_{promo_id}")
+    )
+    await callback.answer()
+
+async def process_product_rule(message: Message, state: FSMContext, repo: RequestsRepo):
+    """
+    Links all products matching the rule to the promotion in one INSERT ... SELECT.
+    """
+    data = await state.get_data()
+    promo_id = data.get("promo_id")
+    
+    try:
+        rule = parse_product_rule(message.text or "")
+    except ValueError as e:
+        await message.answer(f"❌ {e}\n\n{RULE_HELP}", reply_markup=admin_back_button(f"promotion_{promo_id}"))
+        return
+    
+    category = rule.pop("category", None)
+    if category is not None:
+        if category.isdigit():
+            found = await repo.categories.get_category_by_id(int(category))
+        else:
+            found = await repo.categories.get_category_by_name(category)
+        if found is None:
+            await message.answer(
+                f"❌ Категория «{category}» не найдена",
+                reply_markup=admin_back_button(f"promotion_{promo_id}")
+            )
+            return
+        rule["category_id"] = found.category_id
+    
+    linked = await repo.promotions.apply_promotion_by_rule(promo_id, **rule)
+    if linked is None:
+        await message.answer(
+            "❌ Не удалось применить правило",
+            reply_markup=admin_back_button(f"promotion_{promo_id}")
+        )
+        return
+    
+    logger.info(f"Admin {message.from_user.id} linked {len(linked)} products to promotion {promo_id} by rule {rule}")
+    await state.clear()
+    await message.answer(f"✅ Акция применена к новым товарам: {len(linked)}")
+    await show_promotion_details(message=message, promo_id=promo_id, repo=repo)
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+Paged, searchable product picker shared by promotion creation and product management
+"""
+import logging
+from typing import Iterable
+from aiogram import Router, F
+from aiogram.filters import StateFilter
+from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup
+from aiogram.fsm.context import FSMContext
+from infrastructure.database.repositories.requests import RequestsRepo
+from tgbot.keyboards.admin_promotion import product_selection_keyboard
+from tgbot.utils.id_set import pack_ids, unpack_ids
+from tgbot.utils.message_edit import edit_text, edit_reply_markup
+from .base import PromotionManagement
+
+logger = logging.getLogger(__name__)
+
+# Number of products shown on one picker page
+PICKER_PAGE_SIZE = 10
+
+# States in which the picker keyboard is active
+picker_states = StateFilter(PromotionManagement.add_select_products, PromotionManagement.manage_products)
+
+
+def register_picker_handlers(router: Router):
+    """
+    Register all handlers of the product picker
+    """
+    # Toggle product selection
+    router.callback_query.register(
+        toggle_product,
+        picker_states,
+        F.data.regexp(r"^select_product_(\d+)$")
+    )
+
+    # Page navigation
+    router.callback_query.register(
+        change_page,
+        picker_states,
+        F.data.regexp(r"^picker_page_(\d+)$")
+    )
+
+    # The page indicator button does nothing, the tap is only answered
+    router.callback_query.register(
+        current_page,
+        picker_states,
+        F.data == "current_page"
+    )
+
+    # Search by product name
+    router.callback_query.register(
+        start_search,
+        picker_states,
+        F.data == "picker_search"
+    )
+    router.message.register(
+        process_search,
+        PromotionManagement.product_search
+    )
+    router.callback_query.register(
+        reset_search,
+        picker_states,
+        F.data == "picker_reset_search"
+    )
+
+    # Select / clear all products matching the current search
+    router.callback_query.register(
+        select_all,
+        picker_states,
+        F.data == "picker_select_all",
+        flags={"callback_answer": "manual"}
+    )
+    router.callback_query.register(
+        clear_all,
+        picker_states,
+        F.data == "picker_clear_all"
+    )
+
+
+async def start_picker(state: FSMContext, title: str, selected: Iterable[int] = ()):
+    """
+    Initializes picker data in FSM: selection, title, page and search query.
+    """
+    await state.update_data(
+        selected_products=pack_ids(selected),
+        picker_title=title,
+        picker_page=0,
+        picker_query=None
+    )
+
+
+async def get_selected_products(state: FSMContext) -> set:
+    """
+    Returns the set of product IDs selected in the picker.
+    """
+    data = await state.get_data()
+    return unpack_ids(data.get("selected_products"))
+
+
+async def build_picker(state: FSMContext, repo: RequestsRepo) -> tuple[str, InlineKeyboardMarkup]:
+    """
+    Builds picker text and keyboard for the current page only.
+    """
+    data = await state.get_data()
+    query = data.get("picker_query")
+    page = data.get("picker_page", 0)
+
+    products, total = await repo.products.get_products_page(query, page, PICKER_PAGE_SIZE)
+    if not products and page > 0:
+        # The page disappeared (e.g. search narrowed the list) - go back to the first one
+        page = 0
+        await state.update_data(picker_page=page)
+        products, total = await repo.products.get_products_page(query, page, PICKER_PAGE_SIZE)
+
+    total_pages = max(1, (total + PICKER_PAGE_SIZE - 1) // PICKER_PAGE_SIZE)
+
+    text = data.get("picker_title", "Выберите товары, к которым применяется акция:")
+    if query:
+        text += f"\n\n🔍 Поиск: «{query}», найдено: {total}"
+    elif not total:
+        text += "\n\nТовары не найдены."
+
+    keyboard = product_selection_keyboard(
+        products, unpack_ids(data.get("selected_products")), page, total_pages, query
+    )
+    return text, keyboard
+
+
+async def current_page(callback: CallbackQuery):
+    """
+    Answers a tap on the page indicator, so the client does not keep the spinner.
+    """
+    await callback.answer()
+
+
+async def toggle_product(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
+    """
+    Toggles selection of a product and re-renders the current page.
+    """
+    product_id = int(callback.data.split('_')[-1])
+
+    selected = await get_selected_products(state)
+    selected ^= {product_id}
+    await state.update_data(selected_products=pack_ids(selected))
+
+    _, keyboard = await build_picker(state, repo)
+    await edit_reply_markup(callback.message, reply_markup=keyboard)
+    await callback.answer()
+
+
+async def change_page(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
+    """
+    Shows another page of the picker.
+    """
+    await state.update_data(picker_page=int(callback.data.split('_')[-1]))
+
+    _, keyboard = await build_picker(state, repo)
+    await edit_reply_markup(callback.message, reply_markup=keyboard)
+    await callback.answer()
+
+
+async def start_search(callback: CallbackQuery, state: FSMContext):
+    """
+    Asks for a search query, remembering the state to return to.
+    """
+    await state.update_data(picker_return_state=await state.get_state())
+    await state.set_state(PromotionManagement.product_search)
+
+    await callback.message.answer("Введите часть названия товара для поиска:")
+    await callback.answer()
+
+
+async def process_search(message: Message, state: FSMContext, repo: RequestsRepo):
+    """
+    Applies the search query and shows the first page of matching products.
+    """
+    query = message.text.strip() if message.text else ""
+    data = await state.get_data()
+
+    await state.update_data(picker_query=query or None, picker_page=0)
+    await state.set_state(data.get("picker_return_state") or PromotionManagement.add_select_products)
+
+    text, keyboard = await build_picker(state, repo)
+    await message.answer(text, reply_markup=keyboard)
+
+
+async def reset_search(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
+    """
+    Clears the search query and returns to the full product list.
+    """
+    await state.update_data(picker_query=None, picker_page=0)
+
+    text, keyboard = await build_picker(state, repo)
+    await edit_text(callback.message, text, reply_markup=keyboard)
+    await callback.answer()
+
+
+async def select_all(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
+    """
+    Selects all products matching the current search.
+    """
+    data = await state.get_data()
+    matching = await repo.products.get_product_ids(data.get("picker_query"))
+
+    selected = unpack_ids(data.get("selected_products")) | set(matching)
+    await state.update_data(selected_products=pack_ids(selected))
+
+    _, keyboard = await build_picker(state, repo)
+    await edit_reply_markup(callback.message, reply_markup=keyboard)
+    await callback.answer(f"Выбрано товаров: {len(matching)}")
+
+
+async def clear_all(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
+    """
+    Deselects all products matching the current search.
+    """
+    data = await state.get_data()
+    query = data.get("picker_query")
+
+    if query:
+        selected = unpack_ids(data.get("selected_products")) - set(await repo.products.get_product_ids(query))
+    else:
+        selected = set()
+    await state.update_data(selected_products=pack_ids(selected))
+
+    _, keyboard = await build_picker(state, repo)
+    await edit_reply_markup(callback.message, reply_markup=keyboard)
+    await callback.answer()
@@ -9,8 +9,8 @@ from tgbot.keyboards.admin_promotion import (
     promotion_management_keyboard,
     promotion_list_keyboard,
 )
-from infrastructure.database.repositories.promotion_repo import PromotionRepo
-from infrastructure.database.repositories.products import ProductsRepo
+from tgbot.utils.message_edit import edit_text
+from infrastructure.database.repositories.requests import RequestsRepo
 from .base import show_promotion_details
 
 logger = logging.getLogger(__name__)
@@ -41,33 +41,36 @@ async def manage_promotions_menu(callback: CallbackQuery):
     """
     Shows the promotion management menu.
     """
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "🏷️ *Управление акциями и скидками*\n\nВыберите действие:",
         reply_markup=promotion_management_keyboard(),
         parse_mode="Markdown"
     )
     await callback.answer()
 
-async def view_promotions(callback: CallbackQuery, repo: PromotionRepo):
+async def view_promotions(callback: CallbackQuery, repo: RequestsRepo):
     """
     Shows the list of all promotions.
     """
-    promotions = await repo.get_all_promotions()
+    promotions = await repo.promotions.get_all_promotions()
     
     if promotions:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "Список доступных акций:",
             reply_markup=promotion_list_keyboard(promotions)
         )
     else:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "В системе пока нет акций.",
             reply_markup=promotion_management_keyboard()
         )
     
     await callback.answer()
 
-async def view_promotion_details(callback: CallbackQuery, repo: PromotionRepo):
+async def view_promotion_details(callback: CallbackQuery, repo: RequestsRepo):
     """
     Shows detailed information about a specific promotion.
     """
@@ -0,0 +1,208 @@
+# tgbot/handlers/users/user_cart.py
+
+import logging
+from aiogram import F
+from aiogram.types import CallbackQuery
+from aiogram.fsm.context import FSMContext
+from tgbot.utils.prefix_router import PrefixRouter
+from tgbot.utils.message_edit import edit_text
+from tgbot.keyboards.user_cart import cart_keyboard, empty_cart_keyboard
+from tgbot.misc.callback_factory import CartCallback, PurchaseCallback
+from tgbot.services.cart import Cart, MAX_CART_ITEMS, MAX_ITEM_QUANTITY
+from tgbot.services.outbox import OutboxDispatcher
+from infrastructure.database.repositories.requests import RequestsRepo
+from infrastructure.database.models.logs import LogAction
+
+user_cart_router = PrefixRouter(name="user_cart_router")
+
+# Настройка логирования для данного модуля
+logger = logging.getLogger(__name__)
+
+
+async def load_cart_lines(cart: Cart, repo: RequestsRepo):
+    """
+    Загружает товары корзины одним запросом.
+
+    Товары, которые были удалены из каталога, убираются из корзины.
+
+    Returns:
+        Список пар (товар, количество)
+    """
+    items = await cart.items()
+    products = await repo.products.get_products_by_ids(list(items))
+    for product_id in set(items) - {product.product_id for product in products}:
+        await cart.remove(product_id)
+    return [(product, items[product.product_id]) for product in products]
+
+
+def cart_text(lines) -> str:
+    """
+    Текст корзины со стоимостью позиций и итоговой суммой.
+    """
+    text = "🛒 *Ваша корзина:*\n\n"
+    total = 0
+    for product, quantity in lines:
+        line_total = product.current_price * quantity
+        total += line_total
+        stock_note = "" if product.stock_quantity >= quantity else " ⚠️ нет в нужном количестве"
+        text += f"• {product.name} × {quantity} = {line_total}₽{stock_note}\n"
+    text += f"\nИтого: *{total}₽*"
+    return text
+
+
+async def show_cart(callback: CallbackQuery, cart: Cart, repo: RequestsRepo, edit: bool = True):
+    """
+    Показывает корзину: редактирует текущее сообщение или отправляет новое
+    (если текущее сообщение - карточка товара с фото).
+    """
+    lines = await load_cart_lines(cart, repo)
+    if lines:
+        text, keyboard = cart_text(lines), cart_keyboard(lines)
+    else:
+        text, keyboard = "🛒 Ваша корзина пуста.", empty_cart_keyboard()
+
+    if edit and callback.message.text:
+        try:
+            await edit_text(callback.message, text=text, parse_mode="Markdown", reply_markup=keyboard)
+            return
+        except Exception as e:
+            logger.debug(f"Не удалось отредактировать сообщение корзины: {e}")
+
+    try:
+        await callback.message.delete()
+    except Exception:
+        pass  # Игнорируем ошибки удаления
+    await callback.message.answer(text=text, parse_mode="Markdown", reply_markup=keyboard)
+
+
+@user_cart_router.callback_query(PurchaseCallback.filter(F.action == "add_to_cart"), flags={"callback_answer": "manual"})
+async def add_to_cart(callback: CallbackQuery, callback_data: PurchaseCallback, state: FSMContext,
+                      repo: RequestsRepo):
+    """
+    Добавляет товар в корзину (остаток проверяется при оформлении заказа).
+    """
+    user_id = callback.from_user.id
+    product_id = callback_data.product_id
+
+    product = await repo.products.get_product_by_id(product_id, active_only=True)
+    if not product:
+        await callback.answer("❌ Товар не найден.", show_alert=True)
+        return
+    if not product.is_in_stock:
+        await callback.answer("❌ Товар закончился на складе.", show_alert=True)
+        return
+
+    cart = Cart(state)
+    if not await cart.add(product_id):
+        await callback.answer(
+            f"❌ В корзине может быть не больше {MAX_CART_ITEMS} товаров "
+            f"и не больше {MAX_ITEM_QUANTITY} шт. одного товара.",
+            show_alert=True
+        )
+        return
+
+    logger.info(f"Пользователь {user_id} добавил товар {product_id} в корзину.")
+    await callback.answer("🛒 Товар добавлен в корзину.")
+
+
+@user_cart_router.callback_query(CartCallback.filter(F.action == "view"))
+async def view_cart(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
+    """
+    Показывает содержимое корзины.
+    """
+    await show_cart(callback, Cart(state), repo)
+    await callback.answer()
+
+
+@user_cart_router.callback_query(CartCallback.filter(F.action.in_({"inc", "dec", "remove"})))
+async def change_cart_item(callback: CallbackQuery, callback_data: CartCallback, state: FSMContext,
+                           repo: RequestsRepo):
+    """
+    Изменяет количество товара в корзине или удаляет его.
+    """
+    cart = Cart(state)
+    if callback_data.action == "remove":
+        await cart.remove(callback_data.product_id)
+    elif not await cart.add(callback_data.product_id, 1 if callback_data.action == "inc" else -1):
+        await callback.answer(f"❌ Не больше {MAX_ITEM_QUANTITY} шт. одного товара.", show_alert=True)
+        return
+
+    await show_cart(callback, cart, repo)
+    await callback.answer()
+
+
+@user_cart_router.callback_query(CartCallback.filter(F.action == "clear"), flags={"callback_answer": "manual"})
+async def clear_cart(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
+    """
+    Очищает корзину.
+    """
+    cart = Cart(state)
+    await cart.clear()
+    await show_cart(callback, cart, repo)
+    await callback.answer("🗑 Корзина очищена.")
+
+
+@user_cart_router.callback_query(CartCallback.filter(F.action == "checkout"), flags={"callback_answer": "manual"})
+async def checkout_cart(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo,
+                        outbox: OutboxDispatcher):
+    """
+    Оформляет заказ на все товары корзины.
+
+    Остаток всех товаров резервируется, а заказ с позициями создается в одной транзакции:
+    если хотя бы одного товара не хватает, заказ не создается и ничего не резервируется.
+    """
+    user_id = callback.from_user.id
+    cart = Cart(state)
+    lines = await load_cart_lines(cart, repo)
+    if not lines:
+        await show_cart(callback, cart, repo)
+        await callback.answer("🛒 Корзина пуста.", show_alert=True)
+        return
+
+    items = {product.product_id: quantity for product, quantity in lines}
+    logger.info(f"Пользователь {user_id} оформляет заказ из корзины: {items}.")
+    order, missing = await repo.orders.place_cart_order(user_id, items)
+
+    if order is None:
+        if missing:
+            names = ", ".join(product.name for product, _ in lines if product.product_id in missing)
+            await callback.answer(
+                f"❌ Недостаточно на складе: {names}. Измените количество и попробуйте снова.",
+                show_alert=True
+            )
+            logger.warning(f"Не удалось зарезервировать товары {missing} для пользователя {user_id}.")
+            await show_cart(callback, cart, repo)
+        else:
+            await callback.answer("❌ Не удалось создать заказ. Попробуйте позже.", show_alert=True)
+        return
+
+    await cart.clear()
+    await repo.logs.create_log(
+        user_id=user_id,
+        action=LogAction.ORDER_CREATED,
+        details={"order_id": order.order_id, "product_ids": list(items)}
+    )
+
+    names = {product.product_id: product.name for product, _ in lines}
+    items_text = "\n".join(
+        f"• {names[item.product_id]} × {item.quantity}" for item in order.items
+    )
+    await edit_text(
+        callback.message,
+        text=(
+            f"✅ *Заказ успешно создан!*\n\n"
+            f"Номер заказа: *#{order.order_id}*\n"
+            f"{items_text}\n"
+            f"Сумма: *{order.total_price}₽*\n"
+            f"Статус: *{order.status}*\n\n"
+            f"Администратор свяжется с вами в ближайшее время для уточнения деталей доставки."
+        ),
+        parse_mode="Markdown",
+        reply_markup=empty_cart_keyboard()
+    )
+    await callback.answer("✅ Заказ создан!", show_alert=True)
+    logger.info(f"Заказ #{order.order_id} из корзины создан пользователем {user_id}.")
+
+    # Уведомление администраторам записано в outbox вместе с заказом
+    outbox.wake()
+
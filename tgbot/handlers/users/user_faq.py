@@ -1,10 +1,12 @@
 # tgbot/handlers/user_faq.py
-from aiogram import Router, F
+from aiogram import F
 from aiogram.types import CallbackQuery
 from aiogram.filters import Command
+from tgbot.utils.prefix_router import PrefixRouter
+from tgbot.utils.message_edit import edit_text
 import logging
 
-user_faq_router = Router()
+user_faq_router = PrefixRouter(name="user_faq_router")
 
 @user_faq_router.callback_query(F.data == "faq")
 async def show_faq(callback: CallbackQuery):
@@ -25,7 +27,8 @@ async def show_faq(callback: CallbackQuery):
         "   - Рекомендуем учитывать стиль интерьера, материал, размеры и функциональные требования. Наши консультанты всегда готовы помочь вам с выбором.\n"
     )
     try:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             faq_text,
             parse_mode="Markdown",
             reply_markup=None  # Убираем клавиатуру, если необходимо
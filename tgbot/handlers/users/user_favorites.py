@@ -1,25 +1,56 @@
 # tgbot/handlers/users/user_favorites.py
 
-from aiogram import Router, F
+from aiogram import F
 from aiogram.types import CallbackQuery, Message
+from tgbot.utils.prefix_router import PrefixRouter
 from tgbot.keyboards.user_favorites import favorites_keyboard, empty_favorites_keyboard
 from infrastructure.database.repositories.favorites import FavoritesRepo
-from tgbot.misc.callback_factory import FavoriteActionCallback
+from tgbot.misc.callback_factory import FavoriteActionCallback, FavoritesPageCallback
 from infrastructure.database.repositories.products import ProductsRepo
+from tgbot.services.media import product_photo, remember_photo
+from tgbot.utils.render_cache import product_cards, user_card_text
+from tgbot.utils.message_edit import edit_text
 import logging
 
-user_favorites_router = Router()
+user_favorites_router = PrefixRouter(name="user_favorites_router")
 
 # Настройка логирования для данного модуля
 logger = logging.getLogger(__name__)
 
+# Количество товаров на одной странице избранного
+FAVORITES_PAGE_SIZE = 10
+
+async def favorites_page_view(repo, user_id: int, page: int = 0):
+    """
+    Формирует текст и клавиатуру страницы избранного.
+    
+    Если страница оказалась за концом списка (например, с нее удален последний товар),
+    показывается последняя страница.
+    
+    Returns:
+        Кортеж (текст, клавиатура)
+    """
+    favorites, total = await repo.favorites.get_favorites_page(user_id, page, FAVORITES_PAGE_SIZE)
+    total_pages = max(1, (total + FAVORITES_PAGE_SIZE - 1) // FAVORITES_PAGE_SIZE)
+    if not favorites and total:
+        page = total_pages - 1
+        favorites, total = await repo.favorites.get_favorites_page(user_id, page, FAVORITES_PAGE_SIZE)
+    
+    if not favorites:
+        return "У вас нет избранных товаров.", empty_favorites_keyboard()
+    
+    text = "*Ваше избранное:*\n\n"
+    for fav in favorites:
+        text += f"• {fav.name}\n"
+    return text, favorites_keyboard(favorites, page, total_pages)
+
 @user_favorites_router.callback_query(F.data == "view_favorites")
 async def view_favorites(callback: CallbackQuery, repo):
     """
-    Показывает список избранных товаров пользователя.
+    Показывает первую страницу избранных товаров пользователя.
     """
     user_id = callback.from_user.id
-    favorites = await repo.favorites.get_favorites_by_user(user_id=user_id)
+    text, keyboard = await favorites_page_view(repo, user_id)
 
     # Удаляем старое сообщение и отправляем новое
     try:
@@ -27,24 +58,23 @@ async def view_favorites(callback: CallbackQuery, repo):
     except Exception:
         pass  # Игнорируем ошибки удаления
     
-    if favorites:
-        keyboard = favorites_keyboard(favorites)
-        text = "*Ваше избранное:*\n\n"
-        for fav in favorites:
-            text += f"• {fav.product.name}\n"
-        await callback.message.answer(
-            text=text,
-            parse_mode="Markdown",
-            reply_markup=keyboard
-        )
-    else:
-        await callback.message.answer(
-            "У вас нет избранных товаров.",
-            reply_markup=empty_favorites_keyboard()
-        )
+    await callback.message.answer(
+        text=text,
+        parse_mode="Markdown",
+        reply_markup=keyboard
+    )
+    await callback.answer()
+
+@user_favorites_router.callback_query(FavoritesPageCallback.filter())
+async def change_favorites_page(callback: CallbackQuery, callback_data: FavoritesPageCallback, repo):
+    """
+    Переключает страницу списка избранного.
+    """
+    text, keyboard = await favorites_page_view(repo, callback.from_user.id, callback_data.page)
+    await edit_text(callback.message, text=text, parse_mode="Markdown", reply_markup=keyboard)
     await callback.answer()
 
-@user_favorites_router.callback_query(FavoriteActionCallback.filter(F.action == "remove"))
+@user_favorites_router.callback_query(FavoriteActionCallback.filter(F.action == "remove"), flags={"callback_answer": "manual"})
 async def remove_favorite(callback: CallbackQuery, callback_data: FavoriteActionCallback, repo):
     """
     Удаляет товар из избранного.
@@ -52,36 +82,15 @@ async def remove_favorite(callback: CallbackQuery, callback_data: FavoriteAction
     user_id = callback.from_user.id
     product_id = callback_data.product_id
 
-    await repo.favorites.remove_favorite_by_user_product(user_id=user_id, product_id=product_id)
-    logger.info(f"Пользователь {user_id} удалил продукт {product_id} из избранного.")
+    if await repo.favorites.remove_favorite_by_user_product(user_id=user_id, product_id=product_id):
+        logger.info(f"Пользователь {user_id} удалил продукт {product_id} из избранного.")
 
     # Уведомление пользователя
     await callback.answer("⭐ Товар удалён из избранного.", show_alert=True)
 
-    # Обновить список избранного
-    favorites = await repo.favorites.get_favorites_by_user(user_id=user_id)
-    
-    # Удаляем старое сообщение и отправляем новое
-    try:
-        await callback.message.delete()
-    except Exception:
-        pass  # Игнорируем ошибки удаления
-    
-    if favorites:
-        keyboard = favorites_keyboard(favorites)
-        text = "*Ваше избранное:*\n\n"
-        for fav in favorites:
-            text += f"• {fav.product.name}\n"
-        await callback.message.answer(
-            text=text,
-            parse_mode="Markdown",
-            reply_markup=keyboard
-        )
-    else:
-        await callback.message.answer(
-            "У вас нет избранных товаров.",
-            reply_markup=empty_favorites_keyboard()
-        )
+    # Обновить текущую страницу избранного
+    text, keyboard = await favorites_page_view(repo, user_id, callback_data.page)
+    await edit_text(callback.message, text=text, parse_mode="Markdown", reply_markup=keyboard)
 
 @user_favorites_router.callback_query(FavoriteActionCallback.filter(F.action == "view"))
 async def view_favorite_product(callback: CallbackQuery, callback_data: FavoriteActionCallback, repo):
@@ -89,29 +98,21 @@ async def view_favorite_product(callback: CallbackQuery, callback_data: Favorite
     Показывает детали избранного товара, отправляя фотографию.
     """
     product_id = callback_data.product_id
-    product = await repo.products.get_product_by_id(product_id)
+    product = await repo.products.get_product_by_id(product_id, active_only=True)
 
     if product:
-        text = (
-            f"*{product.name}*\n\n"
-            f"{product.description}\n"
-            f"🔹 *Тип:* {product.type}\n"
-            f"🔹 *Материал:* {product.material}\n"
-            f"💰 *Цена:* {product.price}₽"
-        )
+        text = product_cards.get(product, "user", user_card_text)
         try:
             from tgbot.keyboards.purchase import purchase_keyboard_from_favorites
-            from aiogram.types import FSInputFile
-            
-            # Создаем объект файла для отправки
-            photo_file = FSInputFile(product.image_url)
             
-            await callback.message.answer_photo(
-                photo=photo_file,
+            # Отправляем фото по file_id (файл загружается в Telegram только при первом показе)
+            sent = await callback.message.answer_photo(
+                photo=product_photo(product),
                 caption=text,
                 parse_mode="Markdown",
-                reply_markup=purchase_keyboard_from_favorites(product_id)
+                reply_markup=purchase_keyboard_from_favorites(product_id, product.is_in_stock)
             )
+            await remember_photo(repo.media, product, sent)
             await callback.answer()
             logger.info(f"Отправлена информация о продукте {product_id} пользователю {callback.from_user.id}.")
         except Exception as e:
@@ -119,4 +120,4 @@ async def view_favorite_product(callback: CallbackQuery, callback_data: Favorite
             await callback.answer("❌ Не удалось отправить фото товара.", show_alert=True)
     else:
         logger.warning(f"Пользователь {callback.from_user.id} запросил несуществующий продукт {product_id}.")
-        await callback.answer("❌ Товар не найден.", show_alert=True)
+        await callback.answer("❌ Товар не найден или снят с продажи.", show_alert=True)
@@ -1,15 +1,17 @@
 # tgbot/handlers/users/user_feedback.py
 
 import logging
-from aiogram import Router, F
+from aiogram import F
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
+from tgbot.utils.prefix_router import PrefixRouter
 from tgbot.keyboards.user_feedback import feedback_keyboard
 from tgbot.misc.states import FeedbackStates
+from tgbot.utils.message_edit import edit_text
 from infrastructure.database.repositories.feedback import FeedbackRepo
 
 # Инициализация роутера
-user_feedback_router = Router()
+user_feedback_router = PrefixRouter(name="user_feedback_router")
 
 # Настройка логирования для данного модуля
 logger = logging.getLogger(__name__)
@@ -22,7 +24,8 @@ async def start_feedback(callback: CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     logger.info(f"Пользователь {user_id} инициировал обратную связь.")
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "Пожалуйста, введите ваш отзыв или предложение:",
         reply_markup=feedback_keyboard()
     )
@@ -69,7 +72,8 @@ async def cancel_feedback(callback: CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     logger.info(f"Пользователь {user_id} отменил процесс обратной связи.")
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "✅ Обратная связь отменена.",
         reply_markup=None
     )
@@ -1,15 +1,17 @@
 # tgbot/handlers/user_menu.py
-from aiogram import Router, F
+from aiogram import F
 from aiogram.filters.command import CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
+from tgbot.utils.prefix_router import PrefixRouter
+from tgbot.utils.message_edit import edit_text
 import logging
 
 from tgbot.keyboards.user_menu import main_menu_keyboard
 from tgbot.keyboards.user_products import products_keyboard
 from infrastructure.database.repositories.requests import RequestsRepo
 
-user_menu_router = Router()
+user_menu_router = PrefixRouter(name="user_menu_router")
 logger = logging.getLogger(__name__)
 
 @user_menu_router.message(CommandStart())
@@ -39,14 +41,16 @@ async def catalog_callback(callback: CallbackQuery, repo: RequestsRepo):
     
     products = await repo.products.get_all_products()
     if products:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             text="📦 *Каталог товаров:*\nВыберите товар, чтобы узнать больше или воспользуйтесь фильтрами.",
             reply_markup=products_keyboard(products),
             parse_mode="Markdown"
         )
     else:
         logger.warning("В магазине нет доступных товаров.")
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "❌ В магазине пока нет доступных товаров."
         )
     
@@ -64,7 +68,8 @@ async def main_menu_callback(callback: CallbackQuery, state: FSMContext):
     # Очищаем состояние FSM для предотвращения проблем с незавершенными операциями
     await state.clear()
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text=(
             "Главное меню\n"
             "В нашем магазине вы найдёте лучшие двери для вашего дома и офиса.\n"
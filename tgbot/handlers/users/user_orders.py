@@ -12,7 +12,11 @@ async def orders_info(message: Message, repo: RequestsRepo):
     if orders:
         text = "*Ваши заказы:*\n\n"
         for order in orders:
-            text += f"№{order.order_id}: {order.product.name} — *{order.status}*\n"
+            if order.items:
+                name = f"корзина, позиций: {len(order.items)}"
+            else:
+                name = order.product.name if order.product else "Товар удален"
+            text += f"№{order.order_id}: {name} — *{order.status}*\n"
         await message.answer(text)
     else:
         await message.answer("У вас нет активных заказов\\.")
@@ -1,16 +1,22 @@
 # tgbot/handlers/users/user_products.py
 
 import logging
-from aiogram import Router, F
+from aiogram import F
 from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
+from tgbot.utils.prefix_router import PrefixRouter
 from tgbot.keyboards.user_products import products_keyboard, filter_keyboard, build_materials_keyboard, build_types_keyboard, build_price_range_keyboard
 from infrastructure.database.repositories.requests import RequestsRepo
+from infrastructure.database.models.logs import LogAction
 from tgbot.misc.callback_factory import ProductViewCallback, FavoriteActionCallback, FilterCallback, PurchaseCallback
 from tgbot.keyboards.purchase import purchase_keyboard, confirm_purchase_keyboard
 from tgbot.misc.states import FilterStates
+from tgbot.services.media import product_photo, remember_photo
+from tgbot.services.outbox import OutboxDispatcher
+from tgbot.utils.render_cache import product_cards, user_card_text
+from tgbot.utils.message_edit import edit_text
 
-user_products_router = Router()
+user_products_router = PrefixRouter(name="user_products_router")
 
 # Настройка логирования для данного модуля
 logger = logging.getLogger(__name__)
@@ -46,32 +52,23 @@ async def view_product(callback: CallbackQuery, callback_data: ProductViewCallba
     # Логируем действие пользователя
     await repo.logs.create_log(
         user_id=user_id,
-        action="view_product",
-        details=f"Просмотр товара с ID {product_id}"
+        action=LogAction.VIEW_PRODUCT,
+        details={"product_id": product_id}
     )
     
-    product = await repo.products.get_product_by_id(product_id)
+    product = await repo.products.get_product_by_id(product_id, active_only=True)
     
     if product:
-        text = (
-            f"*{product.name}*\n\n"
-            f"{product.description}\n"
-            f"🔹 *Тип:* {product.type}\n"
-            f"🔹 *Материал:* {product.material}\n"
-            f"💰 *Цена:* {product.price}₽"
-        )
+        text = product_cards.get(product, "user", user_card_text)
         try:
-            from aiogram.types import FSInputFile
-            
-            # Создаем объект файла для отправки
-            photo_file = FSInputFile(product.image_url)
-            
-            await callback.message.answer_photo(
-                photo=photo_file,
+            # Отправляем фото по file_id (файл загружается в Telegram только при первом показе)
+            sent = await callback.message.answer_photo(
+                photo=product_photo(product),
                 caption=text,
                 parse_mode="Markdown",
-                reply_markup=purchase_keyboard(product_id)
+                reply_markup=purchase_keyboard(product_id, product.is_in_stock)
             )
+            await remember_photo(repo.media, product, sent)
             await callback.answer()
             logger.info(f"Отправлена информация о продукте {product_id} пользователю {user_id}.")
         except Exception as e:
@@ -79,7 +76,7 @@ async def view_product(callback: CallbackQuery, callback_data: ProductViewCallba
             await callback.answer("❌ Не удалось отправить фото товара.", show_alert=True)
     else:
         logger.warning(f"Пользователь {user_id} запросил несуществующий продукт {product_id}.")
-        await callback.answer("❌ Товар не найден.", show_alert=True)
+        await callback.answer("❌ Товар не найден или снят с продажи.", show_alert=True)
 
 @user_products_router.callback_query(F.data == "filter_products")
 async def show_filter_menu(callback: CallbackQuery, state: FSMContext, repo: RequestsRepo):
@@ -95,11 +92,11 @@ async def show_filter_menu(callback: CallbackQuery, state: FSMContext, repo: Req
     # Логируем действие пользователя
     await repo.logs.create_log(
         user_id=user_id,
-        action="open_filter_menu",
-        details="Открытие меню фильтрации товаров"
+        action=LogAction.OPEN_FILTER_MENU
     )
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "🔍 *Фильтрация товаров*\n\nВыберите параметры для фильтрации:",
         reply_markup=filter_keyboard(),
         parse_mode="Markdown"
@@ -118,7 +115,8 @@ async def select_material(callback: CallbackQuery, repo: RequestsRepo, state: FS
     materials = await repo.products.get_available_materials()
     
     if materials:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "🔍 *Выберите материал:*",
             reply_markup=build_materials_keyboard(materials),
             parse_mode="Markdown"
@@ -139,7 +137,8 @@ async def select_type(callback: CallbackQuery, repo: RequestsRepo, state: FSMCon
     types = await repo.products.get_available_types()
     
     if types:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "🔍 *Выберите тип товара:*",
             reply_markup=build_types_keyboard(types),
             parse_mode="Markdown"
@@ -156,7 +155,8 @@ async def select_price(callback: CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     logger.info(f"Пользователь {user_id} выбирает диапазон цен для фильтрации.")
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         "💰 *Выберите диапазон цен:*",
         reply_markup=build_price_range_keyboard(),
         parse_mode="Markdown"
@@ -184,8 +184,8 @@ async def apply_filters(callback: CallbackQuery, repo: RequestsRepo, state: FSMC
     # Создаем лог действия пользователя
     await repo.logs.create_log(
         user_id=user_id,
-        action="filter_products",
-        details=f"Фильтры: материал={material}, тип={product_type}, цена={min_price}-{max_price}"
+        action=LogAction.FILTER_PRODUCTS,
+        details={"material": material, "type": product_type, "min_price": min_price, "max_price": max_price}
     )
     
     # Получаем отфильтрованные товары
@@ -197,13 +197,15 @@ async def apply_filters(callback: CallbackQuery, repo: RequestsRepo, state: FSMC
     )
     
     if products:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             f"🔍 *Результаты поиска:*\nНайдено товаров: {len(products)}",
             reply_markup=products_keyboard(products, with_filter=True),
             parse_mode="Markdown"
         )
     else:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "❌ По вашему запросу ничего не найдено. Попробуйте изменить параметры фильтрации.",
             reply_markup=filter_keyboard(),
             parse_mode="Markdown"
@@ -227,13 +229,15 @@ async def reset_filters(callback: CallbackQuery, repo: RequestsRepo, state: FSMC
     products = await repo.products.get_all_products()
     
     if products:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "📦 *Каталог товаров:*\nФильтры сброшены.",
             reply_markup=products_keyboard(products),
             parse_mode="Markdown"
         )
     else:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             "❌ В магазине пока нет доступных товаров."
         )
     
@@ -253,7 +257,8 @@ async def process_material_selection(callback: CallbackQuery, state: FSMContext,
     await state.update_data(material=material)
     logger.info(f"Пользователь {callback.from_user.id} выбрал материал: {material}")
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         f"✅ Выбран материал: *{material}*\n\nПродолжите настройку фильтров:",
         reply_markup=filter_keyboard(),
         parse_mode="Markdown"
@@ -274,7 +279,8 @@ async def process_type_selection(callback: CallbackQuery, state: FSMContext, rep
     await state.update_data(type=product_type)
     logger.info(f"Пользователь {callback.from_user.id} выбрал тип товара: {product_type}")
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         f"✅ Выбран тип товара: *{product_type}*\n\nПродолжите настройку фильтров:",
         reply_markup=filter_keyboard(),
         parse_mode="Markdown"
@@ -302,7 +308,8 @@ async def process_price_selection(callback: CallbackQuery, state: FSMContext, re
     
     logger.info(f"Пользователь {callback.from_user.id} выбрал ценовой диапазон: {min_str} - {max_str}")
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         f"✅ Выбран ценовой диапазон: от *{min_str}* до *{max_str}*\n\nПродолжите настройку фильтров:",
         reply_markup=filter_keyboard(),
         parse_mode="Markdown"
@@ -310,7 +317,7 @@ async def process_price_selection(callback: CallbackQuery, state: FSMContext, re
     await state.set_state(None)
     await callback.answer()
 
-@user_products_router.callback_query(FavoriteActionCallback.filter(F.action == "add"))
+@user_products_router.callback_query(FavoriteActionCallback.filter(F.action == "add"), flags={"callback_answer": "manual"})
 async def add_favorite(callback: CallbackQuery, callback_data: FavoriteActionCallback, repo: RequestsRepo):
     """
     Добавляет товар в избранное пользователя.
@@ -320,13 +327,12 @@ async def add_favorite(callback: CallbackQuery, callback_data: FavoriteActionCal
     logger.info(f"Пользователь {user_id} пытается добавить продукт {product_id} в избранное.")
 
     try:
-        is_fav = await repo.favorites.is_favorite(user_id, product_id)
-        if is_fav:
+        # Повторное добавление (например, двойное нажатие) ничего не меняет
+        if not await repo.favorites.add_favorite(user_id, product_id):
             logger.info(f"Пользователь {user_id} уже имеет продукт {product_id} в избранном.")
             await callback.answer("⭐ Товар уже в избранном.", show_alert=True)
             return
         
-        await repo.favorites.add_favorite(user_id, product_id)
         logger.info(f"Пользователь {user_id} добавил продукт {product_id} в избранное.")
         await callback.answer("⭐ Товар добавлен в избранное!", show_alert=True)
     except Exception as e:
@@ -427,7 +433,8 @@ async def handle_pagination(callback: CallbackQuery, repo: RequestsRepo):
     
     products = await repo.products.get_all_products()
     if products:
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             text="📦 *Каталог товаров:*\nВыберите товар, чтобы узнать больше или воспользуйтесь фильтрами.",
             reply_markup=products_keyboard(products, page=page),
             parse_mode="Markdown"
@@ -456,7 +463,8 @@ async def handle_go_back(callback: CallbackQuery, state: FSMContext, repo: Reque
         # Сбрасываем состояние
         await state.clear()
         
-        await callback.message.edit_text(
+        await edit_text(
+            callback.message,
             text="Возвращаемся в главное меню...",
             reply_markup=None
         )
@@ -479,7 +487,7 @@ async def initiate_purchase(callback: CallbackQuery, callback_data: PurchaseCall
     logger.info(f"Пользователь {user_id} инициирует покупку товара {product_id}.")
     
     # Получаем информацию о товаре
-    product = await repo.products.get_product_by_id(product_id)
+    product = await repo.products.get_product_by_id(product_id, active_only=True)
     
     if not product:
         await callback.answer("❌ Товар не найден.", show_alert=True)
@@ -492,15 +500,15 @@ async def initiate_purchase(callback: CallbackQuery, callback_data: PurchaseCall
     # Логируем действие пользователя
     await repo.logs.create_log(
         user_id=user_id,
-        action="initiate_purchase",
-        details=f"Инициирование покупки товара с ID {product_id}"
+        action=LogAction.INITIATE_PURCHASE,
+        details={"product_id": product_id}
     )
     
     # Формируем сообщение с подтверждением
     text = (
         f"🛒 *Подтверждение заказа*\n\n"
         f"Товар: *{product.name}*\n"
-        f"Цена: *{product.price}₽*\n\n"
+        f"Цена: *{product.formatted_price()}*\n\n"
         f"Подтвердите заказ для продолжения."
     )
     
@@ -517,8 +525,34 @@ async def initiate_purchase(callback: CallbackQuery, callback_data: PurchaseCall
     )
     await callback.answer()
 
-@user_products_router.callback_query(PurchaseCallback.filter(F.action == "confirm"))
-async def confirm_purchase(callback: CallbackQuery, callback_data: PurchaseCallback, repo: RequestsRepo):
+@user_products_router.callback_query(PurchaseCallback.filter(F.action == "notify_stock"), flags={"callback_answer": "manual"})
+async def notify_when_in_stock(callback: CallbackQuery, callback_data: PurchaseCallback, repo: RequestsRepo):
+    """
+    Добавляет пользователя в лист ожидания товара, которого нет в наличии.
+    """
+    user_id = callback.from_user.id
+    product_id = callback_data.product_id
+    
+    product = await repo.products.get_product_by_id(product_id, active_only=True)
+    if not product or not product.is_active:
+        await callback.answer("❌ Товар не найден.", show_alert=True)
+        return
+    if product.is_in_stock:
+        await callback.answer("✅ Товар уже в наличии, его можно заказать.", show_alert=True)
+        return
+    
+    added = await repo.waitlist.add(user_id, product_id)
+    if added is None:
+        await callback.answer("❌ Не удалось оформить подписку. Попробуйте позже.", show_alert=True)
+        return
+    
+    if added:
+        logger.info(f"Пользователь {user_id} ждет поступления товара {product_id}.")
+    await callback.answer("🔔 Мы сообщим, когда товар появится в наличии.", show_alert=True)
+
+@user_products_router.callback_query(PurchaseCallback.filter(F.action == "confirm"), flags={"callback_answer": "manual"})
+async def confirm_purchase(callback: CallbackQuery, callback_data: PurchaseCallback, repo: RequestsRepo,
+                           outbox: OutboxDispatcher):
     """
     Подтверждает покупку и создает заказ.
     """
@@ -528,7 +562,7 @@ async def confirm_purchase(callback: CallbackQuery, callback_data: PurchaseCallb
     
     try:
         # Получаем информацию о товаре
-        product = await repo.products.get_product_by_id(product_id)
+        product = await repo.products.get_product_by_id(product_id, active_only=True)
         
         if not product:
             await callback.answer("❌ Товар не найден.", show_alert=True)
@@ -538,23 +572,16 @@ async def confirm_purchase(callback: CallbackQuery, callback_data: PurchaseCallb
             await callback.answer("❌ Товар закончился на складе.", show_alert=True)
             return
         
-        # Создаем заказ
-        order_data = {
-            "user_id": user_id,
-            "product_id": product_id,
-            "quantity": 1,
-            "total_price": float(product.price),
-            "status": "Новый"
-        }
-        
-        order = await repo.orders.create_order(order_data)
+        # Резервируем товар и создаем заказ одним запросом: при одновременных
+        # покупках последнего товара заказ получит только один покупатель
+        order = await repo.orders.place_order(user_id, product_id, quantity=1)
         
         if order:
             # Логируем успешное создание заказа
             await repo.logs.create_log(
                 user_id=user_id,
-                action="order_created",
-                details=f"Создан заказ #{order.order_id} на товар {product.name}"
+                action=LogAction.ORDER_CREATED,
+                details={"order_id": order.order_id, "product_id": product.product_id}
             )
             
             # Уведомляем пользователя
@@ -562,7 +589,7 @@ async def confirm_purchase(callback: CallbackQuery, callback_data: PurchaseCallb
                 f"✅ *Заказ успешно создан!*\n\n"
                 f"Номер заказа: *#{order.order_id}*\n"
                 f"Товар: *{product.name}*\n"
-                f"Сумма: *{product.price}₽*\n"
+                f"Сумма: *{order.total_price}₽*\n"
                 f"Статус: *{order.status}*\n\n"
                 f"Администратор свяжется с вами в ближайшее время для уточнения деталей доставки."
             )
@@ -579,26 +606,27 @@ async def confirm_purchase(callback: CallbackQuery, callback_data: PurchaseCallb
                 )
             )
             
-            await callback.message.edit_text(
+            await edit_text(
+                callback.message,
                 text=success_text,
                 parse_mode="Markdown",
                 reply_markup=builder.as_markup()
             )
             
-            # Отправляем уведомление администраторам
-            await notify_admins_about_new_order(order, product, callback.from_user, repo)
+            # Уведомление администраторам записано в outbox вместе с заказом
+            outbox.wake()
             
             await callback.answer("✅ Заказ создан!", show_alert=True)
             logger.info(f"Заказ #{order.order_id} успешно создан пользователем {user_id}.")
         else:
-            await callback.answer("❌ Ошибка при создании заказа. Попробуйте позже.", show_alert=True)
-            logger.error(f"Не удалось создать заказ для пользователя {user_id} на товар {product_id}.")
+            await callback.answer("❌ Товар закончился на складе или заказ не удалось создать.", show_alert=True)
+            logger.warning(f"Не удалось зарезервировать товар {product_id} для пользователя {user_id}.")
     
     except Exception as e:
         logger.error(f"Ошибка при подтверждении покупки пользователем {user_id}: {e}")
         await callback.answer("❌ Произошла ошибка. Попробуйте позже.", show_alert=True)
 
-@user_products_router.callback_query(PurchaseCallback.filter(F.action == "cancel"))
+@user_products_router.callback_query(PurchaseCallback.filter(F.action == "cancel"), flags={"callback_answer": "manual"})
 async def cancel_purchase(callback: CallbackQuery, callback_data: PurchaseCallback, repo: RequestsRepo):
     """
     Отменяет покупку товара.
@@ -610,8 +638,8 @@ async def cancel_purchase(callback: CallbackQuery, callback_data: PurchaseCallba
     # Логируем действие пользователя
     await repo.logs.create_log(
         user_id=user_id,
-        action="cancel_purchase",
-        details=f"Отмена покупки товара с ID {product_id}"
+        action=LogAction.CANCEL_PURCHASE,
+        details={"product_id": product_id}
     )
     
     # Создаем клавиатуру для возврата к каталогу
@@ -626,57 +654,9 @@ async def cancel_purchase(callback: CallbackQuery, callback_data: PurchaseCallba
         )
     )
     
-    await callback.message.edit_text(
+    await edit_text(
+        callback.message,
         text="❌ Покупка отменена.",
         reply_markup=builder.as_markup()
     )
     await callback.answer("Покупка отменена.")
-
-async def notify_admins_about_new_order(order, product, user, repo: RequestsRepo):
-    """
-    Отправляет уведомление администраторам о новом заказе.
-    """
-    try:
-        from tgbot.config import load_config
-        
-        # Получаем конфигурацию и список админов из .env
-        config = load_config(".env")
-        admin_ids = config.tg_bot.admin_ids
-        
-        if not admin_ids:
-            logger.warning("Нет админов в конфигурации для отправки уведомления о новом заказе.")
-            return
-        
-        # Формируем текст уведомления
-        notification_text = (
-            f"🔔 *Новый заказ #{order.order_id}*\n\n"
-            f"👤 Пользователь: @{user.username if user.username else 'Без username'} (ID: {user.id})\n"
-            f"📦 Товар: *{product.name}*\n"
-            f"💰 Сумма: *{product.price}₽*\n"
-            f"📅 Дата: {order.created_at.strftime('%d.%m.%Y %H:%M')}\n\n"
-            f"Свяжитесь с клиентом для уточнения деталей доставки."
-        )
-        
-        # Отправляем уведомление каждому админу
-        for admin_id in admin_ids:
-            try:
-                from aiogram import Bot
-                
-                # Создаем экземпляр бота с токеном из конфигурации
-                bot = Bot(token=config.tg_bot.token)
-                
-                await bot.send_message(
-                    chat_id=admin_id,
-                    text=notification_text,
-                    parse_mode="Markdown"
-                )
-                
-                # Закрываем сессию бота
-                await bot.session.close()
-                
-                logger.info(f"Уведомление о заказе #{order.order_id} отправлено админу {admin_id}.")
-            except Exception as e:
-                logger.error(f"Ошибка при отправке уведомления админу {admin_id}: {e}")
-    
-    except Exception as e:
-        logger.error(f"Ошибка при отправке уведомлений админам о заказе #{order.order_id}: {e}")
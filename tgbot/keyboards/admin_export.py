@@ -0,0 +1,34 @@
+# tgbot/keyboards/admin_export.py
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from tgbot.utils.render_cache import static_markup, keyed_markup
+
+@static_markup
+def export_kind_keyboard() -> InlineKeyboardMarkup:
+    """
+    Клавиатура выбора данных для выгрузки.
+    """
+    builder = InlineKeyboardBuilder()
+    builder.row(InlineKeyboardButton(text="🛒 Заказы", callback_data="export_kind_orders"))
+    builder.row(InlineKeyboardButton(text="📦 Товары", callback_data="export_kind_products"))
+    builder.row(InlineKeyboardButton(text="📝 Логи действий", callback_data="export_kind_logs"))
+    builder.row(InlineKeyboardButton(text="🔙 Назад", callback_data="view_statistics"))
+    return builder.as_markup()
+
+@keyed_markup
+def export_period_keyboard(kind: str) -> InlineKeyboardMarkup:
+    """
+    Клавиатура выбора периода выгрузки (число дней, 0 - за все время).
+    """
+    builder = InlineKeyboardBuilder()
+    builder.row(
+        InlineKeyboardButton(text="📅 За сегодня", callback_data=f"export_run_{kind}_1"),
+        InlineKeyboardButton(text="📅 За неделю", callback_data=f"export_run_{kind}_7"),
+    )
+    builder.row(
+        InlineKeyboardButton(text="📅 За месяц", callback_data=f"export_run_{kind}_30"),
+        InlineKeyboardButton(text="📅 За 90 дней", callback_data=f"export_run_{kind}_90"),
+    )
+    builder.row(InlineKeyboardButton(text="🗂 За все время", callback_data=f"export_run_{kind}_0"))
+    builder.row(InlineKeyboardButton(text="🔙 Назад", callback_data="export_menu"))
+    return builder.as_markup()
\ No newline at end of file
@@ -1,7 +1,9 @@
 # tgbot/keyboards/admin_main_menu.py
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from tgbot.utils.render_cache import static_markup, keyed_markup
 
+@static_markup
 def main_menu_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.add(
@@ -33,6 +35,7 @@ def main_menu_keyboard() -> InlineKeyboardMarkup:
     builder.adjust(1)  # Каждый пункт в отдельной строке
     return builder.as_markup()
 
+@keyed_markup
 def admin_back_button(callback_data: str = "admin_main") -> InlineKeyboardMarkup:
     """
     Простая кнопка "Назад" для админ-меню.
@@ -1,7 +1,9 @@
 # tgbot/keyboards/admin_management.py
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from tgbot.utils.render_cache import static_markup
 
+@static_markup
 def admin_management_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура для управления администраторами.
@@ -1,9 +1,11 @@
 # tgbot/keyboards/admin_promotion.py
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from infrastructure.database.models.products import Product
+from tgbot.utils.render_cache import static_markup, keyed_markup
 
+@static_markup
 def promotion_management_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура для управления акциями.
@@ -61,6 +63,7 @@ def promotion_list_keyboard(promotions: List) -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
+@keyed_markup
 def promotion_edit_keyboard(promo_id: int) -> InlineKeyboardMarkup:
     """
     Клавиатура для редактирования акции.
@@ -82,6 +85,12 @@ def promotion_edit_keyboard(promo_id: int) -> InlineKeyboardMarkup:
             callback_data=f"manage_promo_products_{promo_id}"
         )
     )
+    builder.row(
+        InlineKeyboardButton(
+            text="🧩 Добавить товары по правилу",
+            callback_data=f"promo_rule_{promo_id}"
+        )
+    )
     
     # Деактивация/активация акции
     builder.row(
@@ -109,16 +118,24 @@ def promotion_edit_keyboard(promo_id: int) -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
-def product_selection_keyboard(products: List[Product], selected_products: Optional[List[int]] = None) -> InlineKeyboardMarkup:
+def product_selection_keyboard(products: List[Product], selected_products: Optional[Iterable[int]] = None,
+                               page: int = 0, total_pages: int = 1,
+                               query: Optional[str] = None) -> InlineKeyboardMarkup:
     """
-    Клавиатура для выбора товаров при создании акции.
+    Клавиатура для постраничного выбора товаров акции.
+    
+    Args:
+        products: Товары текущей страницы
+        selected_products: ID выбранных товаров (по всем страницам)
+        page: Номер текущей страницы (с нуля)
+        total_pages: Общее количество страниц
+        query: Текущий поисковый запрос
     """
     builder = InlineKeyboardBuilder()
     
-    if selected_products is None:
-        selected_products = []
+    selected_products = set(selected_products or ())
     
-    # Добавляем кнопку для каждого товара
+    # Добавляем кнопку для каждого товара текущей страницы
     for product in products:
         # Отмечаем выбранные товары
         mark = "✅ " if product.product_id in selected_products else ""
@@ -129,10 +146,52 @@ def product_selection_keyboard(products: List[Product], selected_products: Optio
             )
         )
     
+    # Кнопки пагинации
+    if total_pages > 1:
+        pagination_buttons = []
+        if page > 0:
+            pagination_buttons.append(
+                InlineKeyboardButton(text="◀️", callback_data=f"picker_page_{page - 1}")
+            )
+        pagination_buttons.append(
+            InlineKeyboardButton(text=f"📄 {page + 1}/{total_pages}", callback_data="current_page")
+        )
+        if page < total_pages - 1:
+            pagination_buttons.append(
+                InlineKeyboardButton(text="▶️", callback_data=f"picker_page_{page + 1}")
+            )
+        builder.row(*pagination_buttons)
+    
+    # Поиск и массовый выбор
+    if query:
+        builder.row(
+            InlineKeyboardButton(
+                text=f"🔍 «{query}» ✖️",
+                callback_data="picker_reset_search"
+            )
+        )
+    else:
+        builder.row(
+            InlineKeyboardButton(
+                text="🔍 Поиск",
+                callback_data="picker_search"
+            )
+        )
+    builder.row(
+        InlineKeyboardButton(
+            text="☑️ Выбрать все найденные" if query else "☑️ Выбрать все",
+            callback_data="picker_select_all"
+        ),
+        InlineKeyboardButton(
+            text="⬜️ Снять все найденные" if query else "⬜️ Снять все",
+            callback_data="picker_clear_all"
+        )
+    )
+    
     # Кнопки для подтверждения выбора и отмены
     builder.row(
         InlineKeyboardButton(
-            text="✅ Подтвердить выбор",
+            text=f"✅ Подтвердить выбор ({len(selected_products)})",
             callback_data="confirm_product_selection"
         ),
         InlineKeyboardButton(
@@ -143,6 +202,7 @@ def product_selection_keyboard(products: List[Product], selected_products: Optio
     
     return builder.as_markup()
 
+@keyed_markup
 def admin_back_button(callback_data: str) -> InlineKeyboardMarkup:
     """
     Кнопка назад для меню акций.
@@ -1,7 +1,9 @@
 # tgbot/keyboards/admin_stats.py
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from tgbot.utils.render_cache import static_markup, keyed_markup
 
+@static_markup
 def stats_menu_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура меню статистики.
@@ -34,6 +36,7 @@ def stats_menu_keyboard() -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
+@static_markup
 def period_selection_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура выбора периода для статистики.
@@ -72,6 +75,7 @@ def period_selection_keyboard() -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
+@static_markup
 def log_filter_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура фильтров для логов.
@@ -117,6 +121,7 @@ def log_filter_keyboard() -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
+@keyed_markup
 def admin_back_button(callback_data: str) -> InlineKeyboardMarkup:
     """
     Кнопка назад для меню статистики.
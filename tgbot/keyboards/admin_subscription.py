@@ -2,7 +2,9 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from infrastructure.database.models.subscriptions import SubscriptionType
+from tgbot.utils.render_cache import static_markup, keyed_markup
 
+@static_markup
 def subscription_management_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура для управления подписками.
@@ -35,6 +37,7 @@ def subscription_management_keyboard() -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
+@static_markup
 def subscription_type_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура выбора типа подписки для уведомления.
@@ -73,6 +76,7 @@ def subscription_type_keyboard() -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
+@keyed_markup
 def admin_back_button(callback_data: str) -> InlineKeyboardMarkup:
     """
     Кнопка назад для меню подписок.
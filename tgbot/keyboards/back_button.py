@@ -1,7 +1,9 @@
 # tgbot/keyboards/back_button.py
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from tgbot.utils.render_cache import keyed_markup
 
+@keyed_markup
 def back_button_keyboard(callback_data: str = "go_back") -> InlineKeyboardMarkup:
     """
     Создает клавиатуру с одной кнопкой "Назад".
@@ -22,6 +24,7 @@ def back_button_keyboard(callback_data: str = "go_back") -> InlineKeyboardMarkup
     )
     return builder.as_markup()
 
+@keyed_markup
 def main_menu_button(is_admin: bool = False) -> InlineKeyboardMarkup:
     """
     Создает клавиатуру с кнопкой возврата в главное меню.
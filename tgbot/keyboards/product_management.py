@@ -2,6 +2,7 @@ from math import ceil
 from typing import List, Optional, Union, Any
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from tgbot.utils.render_cache import static_markup, keyed_markup
 
 class KeyboardBuilder:
     """
@@ -96,6 +97,7 @@ class KeyboardBuilder:
         builder.button(text=no_text, callback_data=no_callback)
         builder.adjust(2)  # Располагаем кнопки в одной строке
 
+@static_markup
 def product_management_keyboard() -> InlineKeyboardMarkup:
     """
     Создает клавиатуру для управления товарами.
@@ -107,6 +109,7 @@ def product_management_keyboard() -> InlineKeyboardMarkup:
     builder.button(text="Добавить товар", callback_data="add_product")
     builder.button(text="Удалить товар", callback_data="delete_product")
     builder.button(text="Просмотреть товары", callback_data="view_products")
+    builder.button(text="Импорт прайс-листа", callback_data="import_price_list")
     KeyboardBuilder.add_back_button(builder, text="Назад", callback_data="back_to_main_menu")
     builder.adjust(2)  # Располагаем кнопки по 2 в строке
     return builder.as_markup()
@@ -161,6 +164,7 @@ def product_list_keyboard_paginated(products, page: int = 1, page_size: int = 5)
     builder.adjust(2)
     return builder.as_markup()
 
+@keyed_markup
 def confirmation_keyboard(product_id: int) -> InlineKeyboardMarkup:
     """
     Создаёт клавиатуру для подтверждения действия с товаром.
@@ -181,6 +185,7 @@ def confirmation_keyboard(product_id: int) -> InlineKeyboardMarkup:
     )
     return builder.as_markup()
 
+@keyed_markup
 def edit_product_keyboard(product_id: int) -> InlineKeyboardMarkup:
     """
     Создаёт клавиатуру для редактирования товара.
@@ -218,6 +223,7 @@ def edit_product_keyboard(product_id: int) -> InlineKeyboardMarkup:
     builder.adjust(3)
     return builder.as_markup()
 
+@keyed_markup
 def product_details_keyboard(product_id: int) -> InlineKeyboardMarkup:
     """
     Создает клавиатуру для просмотра деталей товара с кнопками действий.
@@ -1,27 +1,47 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from tgbot.misc.callback_factory import PurchaseCallback, FavoriteActionCallback
+from tgbot.utils.render_cache import keyed_markup
 
 
-def purchase_keyboard(product_id: int) -> InlineKeyboardMarkup:
+def purchase_buttons(product_id: int, in_stock: bool):
+    """
+    Кнопки покупки товара в наличии или подписки на его поступление.
+    """
+    if not in_stock:
+        return [
+            InlineKeyboardButton(
+                text="🔔 Сообщить о поступлении",
+                callback_data=PurchaseCallback(product_id=product_id, action="notify_stock").pack()
+            )
+        ]
+    return [
+        InlineKeyboardButton(
+            text="💳 Купить",
+            callback_data=PurchaseCallback(product_id=product_id, action="buy").pack()
+        ),
+        InlineKeyboardButton(
+            text="🛒 В корзину",
+            callback_data=PurchaseCallback(product_id=product_id, action="add_to_cart").pack()
+        )
+    ]
+
+@keyed_markup
+def purchase_keyboard(product_id: int, in_stock: bool = True) -> InlineKeyboardMarkup:
     """
     Клавиатура для покупки товара.
     
     Args:
         product_id: ID товара
+        in_stock: Есть ли товар в наличии (иначе вместо покупки - подписка на поступление)
         
     Returns:
-        InlineKeyboardMarkup с кнопками покупки и добавления в избранное
+        InlineKeyboardMarkup с кнопками покупки, добавления в корзину и в избранное
     """
     builder = InlineKeyboardBuilder()
     
-    # Кнопка покупки
-    builder.row(
-        InlineKeyboardButton(
-            text="💳 Купить",
-            callback_data=PurchaseCallback(product_id=product_id, action="buy").pack()
-        )
-    )
+    # Кнопки покупки и добавления в корзину (или подписка на поступление)
+    builder.row(*purchase_buttons(product_id, in_stock))
     
     # Кнопка добавления в избранное
     builder.row(
@@ -41,25 +61,22 @@ def purchase_keyboard(product_id: int) -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
-def purchase_keyboard_from_favorites(product_id: int) -> InlineKeyboardMarkup:
+@keyed_markup
+def purchase_keyboard_from_favorites(product_id: int, in_stock: bool = True) -> InlineKeyboardMarkup:
     """
     Клавиатура для покупки товара из избранного.
     
     Args:
         product_id: ID товара
+        in_stock: Есть ли товар в наличии (иначе вместо покупки - подписка на поступление)
         
     Returns:
-        InlineKeyboardMarkup с кнопками покупки и возврата к избранному
+        InlineKeyboardMarkup с кнопками покупки, добавления в корзину и возврата к избранному
     """
     builder = InlineKeyboardBuilder()
     
-    # Кнопка покупки
-    builder.row(
-        InlineKeyboardButton(
-            text="💳 Купить",
-            callback_data=PurchaseCallback(product_id=product_id, action="buy").pack()
-        )
-    )
+    # Кнопки покупки и добавления в корзину (или подписка на поступление)
+    builder.row(*purchase_buttons(product_id, in_stock))
     
     # Кнопка добавления в избранное - здесь уже в избранном, поэтому удаление
     builder.row(
@@ -79,6 +96,7 @@ def purchase_keyboard_from_favorites(product_id: int) -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
+@keyed_markup
 def confirm_purchase_keyboard(product_id: int) -> InlineKeyboardMarkup:
     """
     Клавиатура для подтверждения покупки.
@@ -0,0 +1,71 @@
+# tgbot/keyboards/user_cart.py
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from tgbot.misc.callback_factory import CartCallback, ProductViewCallback
+from tgbot.utils.render_cache import static_markup
+
+def cart_keyboard(lines) -> InlineKeyboardMarkup:
+    """
+    Клавиатура корзины: изменение количества и удаление товаров, оформление заказа.
+
+    Args:
+        lines: Список пар (товар, количество)
+    """
+    builder = InlineKeyboardBuilder()
+    for product, quantity in lines:
+        builder.row(
+            InlineKeyboardButton(
+                text=f"{product.name} × {quantity}",
+                callback_data=ProductViewCallback(product_id=product.product_id).pack()
+            )
+        )
+        builder.row(
+            InlineKeyboardButton(
+                text="➖",
+                callback_data=CartCallback(action="dec", product_id=product.product_id).pack()
+            ),
+            InlineKeyboardButton(
+                text="➕",
+                callback_data=CartCallback(action="inc", product_id=product.product_id).pack()
+            ),
+            InlineKeyboardButton(
+                text="❌",
+                callback_data=CartCallback(action="remove", product_id=product.product_id).pack()
+            )
+        )
+
+    builder.row(
+        InlineKeyboardButton(
+            text="✅ Оформить заказ",
+            callback_data=CartCallback(action="checkout").pack()
+        )
+    )
+    builder.row(
+        InlineKeyboardButton(
+            text="🗑 Очистить корзину",
+            callback_data=CartCallback(action="clear").pack()
+        ),
+        InlineKeyboardButton(
+            text="🔙 Назад в главное меню",
+            callback_data="main_menu"
+        )
+    )
+    return builder.as_markup()
+
+@static_markup
+def empty_cart_keyboard() -> InlineKeyboardMarkup:
+    """
+    Клавиатура для пустой корзины.
+    """
+    builder = InlineKeyboardBuilder()
+    builder.button(
+        text="📦 Каталог",
+        callback_data="catalog"
+    )
+    builder.button(
+        text="🔙 Назад",
+        callback_data="main_menu"
+    )
+    builder.adjust(1)
+    return builder.as_markup()
\ No newline at end of file
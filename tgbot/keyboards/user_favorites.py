@@ -2,24 +2,49 @@
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from tgbot.misc.callback_factory import FavoriteActionCallback
+from tgbot.misc.callback_factory import FavoriteActionCallback, FavoritesPageCallback
+from tgbot.utils.render_cache import static_markup
 
-def favorites_keyboard(favorites) -> InlineKeyboardMarkup:
+def favorites_keyboard(favorites, page: int = 0, total_pages: int = 1) -> InlineKeyboardMarkup:
     """
-    Клавиатура для отображения списка избранных товаров с опциями просмотра и удаления.
+    Клавиатура для отображения страницы избранных товаров с опциями просмотра и удаления.
+    
+    Args:
+        favorites: Строки страницы избранного (product_id, name)
+        page: Номер текущей страницы (с нуля)
+        total_pages: Общее количество страниц
     """
     builder = InlineKeyboardBuilder()
     for favorite in favorites:
         builder.button(
-            text=favorite.product.name,
-            callback_data=FavoriteActionCallback(action="view", product_id=favorite.product_id)
+            text=favorite.name,
+            callback_data=FavoriteActionCallback(action="view", product_id=favorite.product_id, page=page)
         )
         builder.button(
             text="❌ Удалить",
-            callback_data=FavoriteActionCallback(action="remove", product_id=favorite.product_id)
+            callback_data=FavoriteActionCallback(action="remove", product_id=favorite.product_id, page=page)
         )
     builder.adjust(2)  # Две кнопки в строке: Просмотр и Удаление
     
+    # Кнопки пагинации
+    if total_pages > 1:
+        pagination_buttons = []
+        if page > 0:
+            pagination_buttons.append(
+                InlineKeyboardButton(text="◀️", callback_data=FavoritesPageCallback(page=page - 1).pack())
+            )
+        pagination_buttons.append(
+            InlineKeyboardButton(
+                text=f"📄 {page + 1}/{total_pages}",
+                callback_data=FavoritesPageCallback(page=page).pack()
+            )
+        )
+        if page < total_pages - 1:
+            pagination_buttons.append(
+                InlineKeyboardButton(text="▶️", callback_data=FavoritesPageCallback(page=page + 1).pack())
+            )
+        builder.row(*pagination_buttons)
+    
     # Добавляем кнопку возврата
     builder.row(
         InlineKeyboardButton(
@@ -30,6 +55,7 @@ def favorites_keyboard(favorites) -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
+@static_markup
 def empty_favorites_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура для случая, когда у пользователя нет избранных товаров.
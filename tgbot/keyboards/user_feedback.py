@@ -2,7 +2,9 @@
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from tgbot.utils.render_cache import static_markup
 
+@static_markup
 def feedback_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура для обратной связи с кнопкой отмены.
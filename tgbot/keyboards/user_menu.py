@@ -2,7 +2,10 @@
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from tgbot.misc.callback_factory import CartCallback
+from tgbot.utils.render_cache import static_markup
 
+@static_markup
 def main_menu_keyboard() -> InlineKeyboardMarkup:
     """
     Главное меню пользователя с добавленной кнопкой обратной связи.
@@ -16,6 +19,10 @@ def main_menu_keyboard() -> InlineKeyboardMarkup:
         text="⭐ Избранное",
         callback_data="view_favorites"
     )
+    builder.button(
+        text="🛒 Корзина",
+        callback_data=CartCallback(action="view")
+    )
     builder.button(
         text="💬 Обратная связь",
         callback_data="start_feedback"
@@ -3,6 +3,7 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from tgbot.misc.callback_factory import ProductViewCallback, FavoriteActionCallback, FilterCallback
+from tgbot.utils.render_cache import static_markup
 
 def products_keyboard(products, with_filter: bool = True, page: int = 0, items_per_page: int = 5) -> InlineKeyboardMarkup:
     """
@@ -96,6 +97,7 @@ def products_keyboard(products, with_filter: bool = True, page: int = 0, items_p
     
     return builder.as_markup()
 
+@static_markup
 def filter_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура для меню фильтрации товаров.
@@ -211,6 +213,7 @@ def build_types_keyboard(types: list) -> InlineKeyboardMarkup:
     
     return builder.as_markup()
 
+@static_markup
 def build_price_range_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура для выбора ценового диапазона.
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.dispatcher.flags import get_flag
+from aiogram.methods import AnswerCallbackQuery, TelegramMethod
+from aiogram.types import CallbackQuery
+
+
+class CallbackAnswerTracker(BaseRequestMiddleware):
+    """
+    Bot session middleware that lets a callback query be answered only once.
+
+    Only queries whose handler is running under CallbackAnswerMiddleware are tracked:
+    whoever answers first (the early acknowledgement or the handler) is sent to
+    Telegram, the later answer becomes a no-op instead of a "query is too old" error.
+    A later alert (show_alert) is not lost: it is sent to the chat as a message.
+    """
+
+    def __init__(self) -> None:
+        # callback query ID -> chat the query came from (for late alerts)
+        self._tracked: Dict[str, Optional[int]] = {}
+        self._answered: Set[str] = set()
+        self.logger = logging.getLogger(__name__)
+
+    def track(self, query_id: str, chat_id: Optional[int] = None) -> None:
+        self._tracked[query_id] = chat_id
+
+    def untrack(self, query_id: str) -> None:
+        self._tracked.pop(query_id, None)
+        self._answered.discard(query_id)
+
+    async def _forward_alert(self, bot: Bot, method: AnswerCallbackQuery) -> None:
+        chat_id = self._tracked[method.callback_query_id]
+        if not method.show_alert or chat_id is None:
+            self.logger.warning(
+                f"Callback {method.callback_query_id} was already acknowledged, "
+                f"answer {method.text!r} dropped"
+            )
+            return
+        try:
+            await bot.send_message(chat_id, method.text)
+        except Exception as e:
+            self.logger.warning(f"Late alert of callback {method.callback_query_id} was not sent: {e}")
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ) -> Any:
+        if isinstance(method, AnswerCallbackQuery) and method.callback_query_id in self._tracked:
+            if method.callback_query_id in self._answered:
+                if method.text:
+                    await self._forward_alert(bot, method)
+                return True
+            # Marked before the request, so a concurrent answer sees it immediately
+            self._answered.add(method.callback_query_id)
+        return await make_request(bot, method)
+
+
+class CallbackAnswerMiddleware(BaseMiddleware):
+    """
+    Acknowledges callback queries while the handler is still running.
+
+    The acknowledgement is sent concurrently with the handler after a short grace
+    period (delay): fast handlers that answer with a toast or an alert themselves
+    get there first and the acknowledgement is skipped, slow handlers stop the
+    loading spinner without waiting for their database work and message edits.
+
+    Handlers showing a result alert or toast at the end of slow work are registered
+    with flags={"callback_answer": "manual"} and are never acknowledged early; an
+    alert of a handler that was not flagged arrives as a message instead.
+    Must be registered as an inner middleware, so the handler flags are known.
+    """
+
+    def __init__(self, tracker: CallbackAnswerTracker, delay: float = 0.2) -> None:
+        super().__init__()
+        self.tracker = tracker
+        self.delay = delay
+        self.logger = logging.getLogger(__name__)
+
+    async def _answer(self, event: CallbackQuery) -> None:
+        # Goes through the tracker, so it is free if the handler has already answered
+        try:
+            await event.answer()
+        except Exception as e:
+            self.logger.debug(f"Acknowledgement of callback {event.id} failed: {e}")
+
+    async def _acknowledge(self, event: CallbackQuery) -> None:
+        await asyncio.sleep(self.delay)
+        await self._answer(event)
+
+    async def __call__(
+        self,
+        handler: Callable[[CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
+        data: Dict[str, Any],
+    ) -> Any:
+        if get_flag(data, "callback_answer") == "manual":
+            return await handler(event, data)
+
+        self.tracker.track(event.id, event.message.chat.id if event.message else None)
+        task = asyncio.create_task(self._acknowledge(event))
+        try:
+            return await handler(event, data)
+        finally:
+            # The handler finished within the grace period: answer now unless it did
+            if not task.done():
+                task.cancel()
+                await self._answer(event)
+            self.tracker.untrack(event.id)
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject, User as TelegramUser
+from redis.asyncio import Redis
+
+
+class MemoryThrottleStorage:
+    """
+    Token buckets and duplicate-callback markers in process memory.
+
+    Entries are pruned lazily, once the tables grow beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._buckets: Dict[int, Tuple[float, float]] = {}
+        self._seen: Dict[str, float] = {}
+
+    async def consume(self, user_id: int, rate: float, burst: int) -> bool:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(user_id, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[user_id] = (tokens, now)
+
+        if len(self._buckets) > self.max_entries:
+            # A bucket idle long enough to refill completely is the same as a missing one
+            full_after = burst / rate
+            self._buckets = {
+                key: value for key, value in self._buckets.items() if now - value[1] < full_after
+            }
+        return allowed
+
+    async def claim(self, key: str, ttl: float) -> bool:
+        now = time.monotonic()
+        expires = self._seen.get(key)
+        if expires is not None and expires > now:
+            return False
+        self._seen[key] = now + ttl
+
+        if len(self._seen) > self.max_entries:
+            self._seen = {k: v for k, v in self._seen.items() if v > now}
+        return True
+
+
+class RedisThrottleStorage:
+    """
+    Token buckets and duplicate-callback markers in Redis (shared by all bot processes).
+    """
+
+    # Refills the bucket by the elapsed time and takes one token, atomically
+    TOKEN_BUCKET_SCRIPT = """
+        local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+        local rate = tonumber(ARGV[1])
+        local burst = tonumber(ARGV[2])
+        local now = tonumber(ARGV[3])
+        local tokens = tonumber(bucket[1]) or burst
+        local ts = tonumber(bucket[2]) or now
+        tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+        local allowed = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+            allowed = 1
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+        redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+        return allowed
+    """
+
+    def __init__(self, redis: Redis, prefix: str = "throttle") -> None:
+        self.redis = redis
+        self.prefix = prefix
+        self._token_bucket = redis.register_script(self.TOKEN_BUCKET_SCRIPT)
+
+    async def consume(self, user_id: int, rate: float, burst: int) -> bool:
+        allowed = await self._token_bucket(
+            keys=[f"{self.prefix}:bucket:{user_id}"], args=[rate, burst, time.time()]
+        )
+        return bool(allowed)
+
+    async def claim(self, key: str, ttl: float) -> bool:
+        return bool(await self.redis.set(f"{self.prefix}:seen:{key}", 1, px=int(ttl * 1000), nx=True))
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Drops repeated taps and floods before they reach the database.
+
+    - the same callback data from the same user within duplicate_window seconds is
+      handled once (double and triple taps on "Подтвердить", "В избранное", ...);
+    - each user has a token bucket of burst updates refilled at rate per second;
+    - updates of one user are handled one at a time, so a tap arriving while the
+      previous one is still in its handler waits instead of racing it.
+
+    Rejected callbacks only get an empty callback.answer(), rejected messages are ignored.
+    Must be registered before the database middleware.
+    """
+
+    def __init__(self, storage=None, rate: float = 2.0, burst: int = 5,
+                 duplicate_window: float = 0.8) -> None:
+        super().__init__()
+        self.storage = storage or MemoryThrottleStorage()
+        self.rate = rate
+        self.burst = burst
+        self.duplicate_window = duplicate_window
+        # user_id -> [lock, number of updates holding or waiting for it]
+        self._locks: Dict[int, List[Any]] = {}
+        self.logger = logging.getLogger(__name__)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        from_user: TelegramUser = getattr(event, "from_user", None)
+        if not from_user:
+            return await handler(event, data)
+        user_id = from_user.id
+
+        try:
+            if isinstance(event, CallbackQuery) and event.data:
+                if not await self.storage.claim(f"{user_id}:{event.data}", self.duplicate_window):
+                    self.logger.debug(f"Duplicate callback {event.data!r} from user {user_id} suppressed")
+                    await event.answer()
+                    return None
+            if not await self.storage.consume(user_id, self.rate, self.burst):
+                self.logger.info(f"User {user_id} is throttled")
+                if isinstance(event, CallbackQuery):
+                    await event.answer("⏳ Слишком часто, подождите немного.")
+                return None
+        except Exception as e:
+            # Throttling must not take the bot down if Redis is unavailable
+            self.logger.error(f"Throttling check failed for user {user_id}: {e}")
+
+        entry = self._locks.setdefault(user_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await handler(event, data)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[user_id]
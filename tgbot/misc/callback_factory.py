@@ -10,6 +10,7 @@ class ProductViewCallback(CallbackData, prefix="product"):
 class FavoriteActionCallback(CallbackData, prefix="favorite"):
     action: str  # Возможные значения: "add", "remove", "view"
     product_id: int
+    page: int = 0  # Страница списка избранного, на которой нажата кнопка
 
 # CallbackData для действий, связанных с обратной связью
 class FeedbackCallback(CallbackData, prefix="feedback"):
@@ -27,4 +28,23 @@ class FilterCallback(CallbackData, prefix="filter"):
 # CallbackData для действий, связанных с покупкой
 class PurchaseCallback(CallbackData, prefix="purchase"):
     product_id: int
-    action: str  # Возможные значения: "buy", "confirm", "cancel"
+    action: str  # Возможные значения: "buy", "add_to_cart", "notify_stock", "confirm", "cancel"
+
+# CallbackData для действий с корзиной
+class CartCallback(CallbackData, prefix="cart"):
+    action: str  # Возможные значения: "view", "inc", "dec", "remove", "clear", "checkout"
+    product_id: int = 0
+
+# CallbackData для фильтров списка заказов администратора
+class OrderFilterCallback(CallbackData, prefix="ofilter"):
+    kind: str  # Возможные значения: "status", "period", "user", "reset"
+    value: str = ""
+
+# CallbackData для массовой смены статуса заказов
+class OrderBulkCallback(CallbackData, prefix="obulk"):
+    action: str  # Возможные значения: "start", "to", "confirm"
+    value: str = ""
+
+# CallbackData для страниц списка избранного
+class FavoritesPageCallback(CallbackData, prefix="favpage"):
+    page: int
\ No newline at end of file
@@ -32,6 +32,7 @@ class ProductManagement(StatesGroup):
     price = State()  # Ввод цены товара
     image_url = State()  # Загрузка изображения товара
     confirm = State()  # Подтверждение добавления/изменения
+    import_file = State()  # Ожидание файла прайс-листа для импорта
 
 # Состояния для работы с заказами
 class OrderManagement(StatesGroup):
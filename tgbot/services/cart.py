@@ -0,0 +1,69 @@
+# tgbot/services/cart.py
+
+from dataclasses import replace
+from typing import Dict
+
+from aiogram.fsm.context import FSMContext
+
+# Отдельное назначение ключа хранилища: state.clear() в других сценариях не очищает корзину
+CART_DESTINY = "cart"
+
+# Ограничения размера корзины
+MAX_CART_ITEMS = 20
+MAX_ITEM_QUANTITY = 99
+
+
+class Cart:
+    """
+    Корзина пользователя в хранилище FSM (Redis или память).
+
+    Хранится как {product_id: количество}; ключи в JSON хранятся строками,
+    поэтому при чтении приводятся к int.
+    """
+
+    def __init__(self, state: FSMContext):
+        self._context = FSMContext(storage=state.storage, key=replace(state.key, destiny=CART_DESTINY))
+
+    async def items(self) -> Dict[int, int]:
+        """
+        Товары в корзине: {product_id: количество}.
+        """
+        data = await self._context.get_data()
+        return {int(product_id): quantity for product_id, quantity in data.get("items", {}).items()}
+
+    async def _save(self, items: Dict[int, int]) -> None:
+        await self._context.set_data({"items": {str(product_id): quantity for product_id, quantity in items.items()}})
+
+    async def add(self, product_id: int, quantity: int = 1) -> bool:
+        """
+        Добавляет товар (или изменяет количество на quantity, может быть отрицательным).
+
+        Returns:
+            False, если корзина уже заполнена или превышено количество одного товара
+        """
+        items = await self.items()
+        if product_id not in items and len(items) >= MAX_CART_ITEMS:
+            return False
+        new_quantity = items.get(product_id, 0) + quantity
+        if new_quantity > MAX_ITEM_QUANTITY:
+            return False
+        if new_quantity > 0:
+            items[product_id] = new_quantity
+        else:
+            items.pop(product_id, None)
+        await self._save(items)
+        return True
+
+    async def remove(self, product_id: int) -> None:
+        """
+        Удаляет товар из корзины.
+        """
+        items = await self.items()
+        if items.pop(product_id, None) is not None:
+            await self._save(items)
+
+    async def clear(self) -> None:
+        """
+        Очищает корзину.
+        """
+        await self._context.set_data({})
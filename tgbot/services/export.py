@@ -0,0 +1,158 @@
+# tgbot/services/export.py
+
+import asyncio
+import csv
+import gzip
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+from aiogram import Bot
+from aiogram.types import FSInputFile
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from infrastructure.database.models.logs import LogAction
+from infrastructure.database.repositories.logs import LogsRepo
+from infrastructure.database.repositories.orders import OrdersRepo
+from infrastructure.database.repositories.products import ProductsRepo
+
+logger = logging.getLogger(__name__)
+
+# Ограничение Telegram Bot API на размер отправляемого документа
+MAX_DOCUMENT_SIZE = 50 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ExportKind:
+    """
+    Описание выгрузки.
+
+    Attributes:
+        title: Название для сообщений администратору
+        repo: Фабрика репозитория с методом export_rows() и атрибутом EXPORT_COLUMNS
+    """
+    title: str
+    repo: Callable[[AsyncSession], object]
+
+
+EXPORT_KINDS: Dict[str, ExportKind] = {
+    "orders": ExportKind(title="Заказы", repo=OrdersRepo),
+    "products": ExportKind(title="Товары", repo=ProductsRepo),
+    "logs": ExportKind(title="Логи действий", repo=LogsRepo),
+}
+
+
+def _format_value(value) -> object:
+    """
+    Приводит значение к виду для CSV (даты в ISO-формате, коды действий - названиями,
+    JSON - строкой, NULL - пустая строка).
+    """
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, LogAction):
+        return value.label
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class CsvExporter:
+    """
+    Выгружает заказы, товары и логи в gzip-сжатый CSV и отправляет его документом.
+
+    Строки читаются из PostgreSQL серверным курсором пачками и сразу записываются
+    в сжатый временный файл, поэтому потребление памяти не зависит от числа строк.
+    Выгрузка выполняется фоновой задачей в отдельной сессии, не задерживая обработчик.
+    """
+
+    def __init__(self, session_pool: async_sessionmaker, max_parallel: int = 2):
+        """
+        Args:
+            session_pool: Пул сессий, из которого открывается сессия на выгрузку
+            max_parallel: Максимальное число одновременно выполняемых выгрузок
+        """
+        self.session_pool = session_pool
+        self._semaphore = asyncio.Semaphore(max_parallel)
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(self, bot: Bot, chat_id: int, kind: str,
+              date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> None:
+        """
+        Запускает выгрузку в фоне; результат будет отправлен в чат chat_id.
+        """
+        task = asyncio.create_task(self._run(bot, chat_id, kind, date_from, date_to))
+        # Храним ссылку на задачу, чтобы ее не собрал сборщик мусора
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, bot: Bot, chat_id: int, kind: str,
+                   date_from: Optional[datetime], date_to: Optional[datetime]) -> None:
+        export_kind = EXPORT_KINDS[kind]
+        filename = self._filename(kind, date_from, date_to)
+        fd, path = tempfile.mkstemp(suffix=".csv.gz")
+        os.close(fd)
+
+        try:
+            async with self._semaphore:
+                rows = await self.write_csv(kind, path, date_from, date_to)
+
+            if os.path.getsize(path) > MAX_DOCUMENT_SIZE:
+                await bot.send_message(
+                    chat_id,
+                    f"❌ Выгрузка «{export_kind.title}» ({rows} строк) превышает 50 МБ. "
+                    f"Укажите более короткий период."
+                )
+                return
+
+            await bot.send_document(
+                chat_id,
+                FSInputFile(path, filename=filename),
+                caption=f"📤 {export_kind.title}: {rows} строк"
+            )
+            logger.info(f"Выгрузка {kind} отправлена в чат {chat_id}, строк: {rows}")
+        except Exception as e:
+            logger.error(f"Ошибка при выгрузке {kind}: {e}")
+            await bot.send_message(chat_id, f"❌ Не удалось выполнить выгрузку «{export_kind.title}».")
+        finally:
+            os.remove(path)
+
+    async def write_csv(self, kind: str, path: str,
+                        date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> int:
+        """
+        Записывает выгрузку в gzip-сжатый CSV-файл.
+
+        Args:
+            kind: Тип выгрузки (ключ EXPORT_KINDS)
+            path: Путь к создаваемому файлу
+            date_from: Начало периода (включительно)
+            date_to: Конец периода (не включительно)
+
+        Returns:
+            Количество выгруженных строк
+        """
+        total = 0
+        async with self.session_pool() as session:
+            repo = EXPORT_KINDS[kind].repo(session)
+            # utf-8-sig, чтобы Excel правильно открывал кириллицу
+            with gzip.open(path, "wt", encoding="utf-8-sig", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(repo.EXPORT_COLUMNS)
+
+                async for batch in repo.export_rows(date_from, date_to):
+                    rows: List[list] = [[_format_value(value) for value in row] for row in batch]
+                    # Сжатие выполняется в потоке, чтобы не блокировать цикл событий
+                    await asyncio.to_thread(writer.writerows, rows)
+                    total += len(rows)
+        return total
+
+    @staticmethod
+    def _filename(kind: str, date_from: Optional[datetime], date_to: Optional[datetime]) -> str:
+        start = date_from.strftime("%Y%m%d") if date_from else "all"
+        end = (date_to or datetime.now()).strftime("%Y%m%d")
+        return f"{kind}_{start}-{end}.csv.gz"
@@ -0,0 +1,132 @@
+# tgbot/services/jobs.py
+
+import logging
+import os
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.database.repositories.logs import LogsRepo
+from infrastructure.database.repositories.outbox import OutboxRepo
+from infrastructure.database.repositories.product_statistic_repo import ProductStatisticRepo
+from infrastructure.database.repositories.promotion_repo import PromotionRepo
+from infrastructure.database.repositories.waitlist import WaitlistRepo
+from tgbot.services.scheduler import JobScheduler
+
+logger = logging.getLogger(__name__)
+
+# Названия задач планировщика (используются как ключи в таблице scheduled_jobs)
+PROMOTION_PRICES_JOB = "promotion_prices"
+LOG_RETENTION_JOB = "log_retention"
+LOG_PARTITIONS_JOB = "log_partitions"
+STATS_ROLLUP_JOB = "stats_rollup"
+OUTBOX_RETENTION_JOB = "outbox_retention"
+WAITLIST_JOB = "stock_waitlist"
+
+# Срок хранения логов действий пользователей
+LOG_RETENTION_DAYS = 90
+
+# Срок хранения обработанных событий outbox
+OUTBOX_RETENTION_DAYS = 7
+
+# Как часто проверяется лист ожидания (остатки могут меняться в обход бота, например скриптом)
+WAITLIST_CHECK_INTERVAL = timedelta(minutes=5)
+
+# На сколько месяцев вперед заранее создаются партиции логов
+LOG_PARTITIONS_AHEAD = 3
+
+# Каталог архивов удаленных партиций логов
+LOG_ARCHIVE_DIR = os.path.join("archive", "logs")
+
+# Сдвиг свертки статистики от полуночи, чтобы успели записаться события конца дня
+STATS_ROLLUP_DELAY = timedelta(minutes=5)
+
+
+async def refresh_promotion_prices(session: AsyncSession) -> None:
+    """
+    Пересчитывает итоговые цены товаров на границе начала/окончания акций.
+    """
+    updated = await PromotionRepo(session).recalculate_effective_prices()
+    logger.info(f"Цены пересчитаны по границе акций, изменено товаров: {updated}")
+
+
+async def next_promotion_boundary(session: AsyncSession, now: datetime) -> Optional[datetime]:
+    """
+    Возвращает время следующего запуска пересчета цен.
+    
+    Акция с end_date действует включительно, поэтому запуск планируется
+    на секунду позже самой границы.
+    """
+    boundary = await PromotionRepo(session).get_next_boundary(now)
+    return boundary + timedelta(seconds=1) if boundary else None
+
+
+async def create_log_partitions(session: AsyncSession) -> None:
+    """
+    Создает партиции логов на ближайшие месяцы.
+    """
+    created = await LogsRepo(session).create_partitions(LOG_PARTITIONS_AHEAD)
+    if created:
+        logger.info(f"Созданы партиции логов: {', '.join(created)}")
+
+
+async def archive_old_logs(session: AsyncSession) -> None:
+    """
+    Архивирует и удаляет месячные партиции логов старше срока хранения.
+    
+    Партиции с днями, еще не свернутыми в статистику, не трогаются.
+    """
+    before = datetime.now() - timedelta(days=LOG_RETENTION_DAYS)
+    watermark = await ProductStatisticRepo(session).get_rollup_watermark()
+    if watermark is not None:
+        before = min(before, datetime.combine(watermark, time.min))
+    archived = await LogsRepo(session).archive_partitions_before(before, LOG_ARCHIVE_DIR)
+    if archived:
+        logger.info(f"Партиции логов перенесены в архив: {', '.join(archived)}")
+
+
+async def rollup_statistics(session: AsyncSession) -> None:
+    """
+    Сворачивает статистику товаров и действий за завершенные дни.
+    """
+    rolled = await ProductStatisticRepo(session).rollup_pending_days()
+    logger.info(f"Свернута статистика за дней: {rolled}")
+
+
+async def next_stats_rollup(session: AsyncSession, now: datetime) -> Optional[datetime]:
+    """
+    Возвращает время следующей свертки статистики: вскоре после ближайшей полуночи.
+    """
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    run_at = midnight + STATS_ROLLUP_DELAY
+    return run_at if run_at > now else run_at + timedelta(days=1)
+
+
+async def purge_outbox(session: AsyncSession) -> None:
+    """
+    Удаляет события outbox, обработанные раньше срока хранения.
+    """
+    purged = await OutboxRepo(session).purge_processed(datetime.now() - timedelta(days=OUTBOX_RETENTION_DAYS))
+    if purged:
+        logger.info(f"Удалено обработанных событий outbox: {purged}")
+
+
+async def release_waitlist(session: AsyncSession) -> None:
+    """
+    Ставит уведомления о поступлении товаров, остаток которых изменили в обход бота.
+    """
+    await WaitlistRepo(session).release_in_stock()
+    await session.commit()
+
+
+def register_jobs(scheduler: JobScheduler) -> None:
+    """
+    Регистрирует фоновые задачи бота в планировщике.
+    """
+    scheduler.add_event_job(PROMOTION_PRICES_JOB, refresh_promotion_prices, next_promotion_boundary)
+    scheduler.add_event_job(STATS_ROLLUP_JOB, rollup_statistics, next_stats_rollup)
+    scheduler.add_periodic_job(LOG_PARTITIONS_JOB, create_log_partitions, timedelta(days=1))
+    scheduler.add_periodic_job(LOG_RETENTION_JOB, archive_old_logs, timedelta(days=1))
+    scheduler.add_periodic_job(OUTBOX_RETENTION_JOB, purge_outbox, timedelta(days=1))
+    scheduler.add_periodic_job(WAITLIST_JOB, release_waitlist, WAITLIST_CHECK_INTERVAL)
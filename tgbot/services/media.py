@@ -0,0 +1,146 @@
+# tgbot/services/media.py
+
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Optional, Union
+
+import aiohttp
+from aiogram import Bot
+from aiogram.types import FSInputFile, URLInputFile, BufferedInputFile, Message
+
+from infrastructure.database.models.products import Product
+from infrastructure.database.repositories.media import MediaRepo
+
+logger = logging.getLogger(__name__)
+
+PhotoInput = Union[str, FSInputFile, URLInputFile, BufferedInputFile]
+
+
+def is_url(source: str) -> bool:
+    """
+    Проверяет, является ли источник изображения URL-адресом.
+    """
+    return source.startswith(("http://", "https://"))
+
+
+def is_local_file(source: str) -> bool:
+    """
+    Проверяет, является ли источник изображения локальным файлом.
+    """
+    return os.path.isfile(source)
+
+
+def file_sha256(path: str, chunk_size: int = 64 * 1024) -> str:
+    """
+    Считает SHA-256 содержимого файла, читая его частями.
+
+    Чтение блокирующее: из обработчиков вызывается через asyncio.to_thread.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def product_photo(product: Product) -> Optional[PhotoInput]:
+    """
+    Возвращает фото товара для отправки: file_id из кэша, если он уже есть,
+    иначе файл или URL для первой загрузки.
+
+    Args:
+        product: Товар
+
+    Returns:
+        Значение для параметра photo или None, если у товара нет изображения
+    """
+    if product.image_file_id:
+        return product.image_file_id
+    source = product.image_url
+    if not source:
+        return None
+    if is_local_file(source):
+        return FSInputFile(source)
+    if is_url(source):
+        return URLInputFile(source)
+    # Иначе image_url уже содержит Telegram file_id
+    return source
+
+
+async def remember_photo(media_repo: MediaRepo, product: Product, sent: Message) -> None:
+    """
+    Сохраняет file_id изображения после первой отправки, чтобы последующие
+    показы карточки не загружали файл повторно.
+
+    Если изображение с тем же содержимым уже есть в кэше, сохраняется его file_id,
+    так что одинаковые изображения разных товаров используют один file_id.
+
+    Args:
+        media_repo: Репозиторий кэша медиафайлов
+        product: Товар, фото которого было отправлено
+        sent: Отправленное сообщение с фото
+    """
+    source = product.image_url
+    if product.image_file_id or not source or not sent.photo:
+        return
+    if not (is_local_file(source) or is_url(source)):
+        return
+
+    file_id = sent.photo[-1].file_id
+    content_hash = None
+    if is_local_file(source):
+        content_hash = await asyncio.to_thread(file_sha256, source)
+        duplicate = await media_repo.get_by_hash(content_hash)
+        if duplicate:
+            file_id = duplicate.file_id
+    if await media_repo.save_file_id(source, file_id, content_hash):
+        product.image_file_id = file_id
+        logger.info(f"Сохранен file_id изображения товара {product.product_id}")
+
+
+async def upload_image(bot: Bot, media_repo: MediaRepo, chat_id: int, source: str) -> Optional[str]:
+    """
+    Загружает изображение в служебный чат один раз и сохраняет его file_id.
+
+    Изображения с одинаковым содержимым загружаются только один раз:
+    при совпадении хэша используется уже полученный file_id.
+
+    Args:
+        bot: Экземпляр бота
+        media_repo: Репозиторий кэша медиафайлов
+        chat_id: ID служебного чата для загрузки
+        source: Локальный путь или URL изображения
+
+    Returns:
+        file_id изображения или None в случае ошибки
+    """
+    cached = await media_repo.get_by_source(source)
+    if cached:
+        return cached.file_id
+
+    if is_local_file(source):
+        content_hash = await asyncio.to_thread(file_sha256, source)
+        photo = FSInputFile(source)
+    elif is_url(source):
+        # Скачиваем изображение, чтобы посчитать хэш содержимого
+        async with aiohttp.ClientSession() as http:
+            async with http.get(source) as response:
+                response.raise_for_status()
+                content = await response.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+        photo = BufferedInputFile(content, filename=os.path.basename(source) or "image")
+    else:
+        logger.warning(f"Источник изображения не найден: {source}")
+        return None
+
+    duplicate = await media_repo.get_by_hash(content_hash)
+    if duplicate:
+        file_id = duplicate.file_id
+    else:
+        sent = await bot.send_photo(chat_id=chat_id, photo=photo, disable_notification=True)
+        file_id = sent.photo[-1].file_id
+
+    await media_repo.save_file_id(source, file_id, content_hash)
+    return file_id
@@ -0,0 +1,342 @@
+# tgbot/services/outbox.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from infrastructure.database.models.outbox import OutboxEvent
+from infrastructure.database.models.promotions import DiscountType
+from infrastructure.database.models.subscriptions import SubscriptionType
+from infrastructure.database.repositories.orders import OrdersRepo
+from infrastructure.database.repositories.outbox import (
+    OutboxRepo, BACK_IN_STOCK, ORDER_CREATED, ORDER_STATUS_CHANGED, PRICE_DROP, PROMOTION_CREATED, SEND_MESSAGE
+)
+from infrastructure.database.repositories.promotion_repo import PromotionRepo
+from infrastructure.database.repositories.subscription_repo import SubscriptionRepo
+
+logger = logging.getLogger(__name__)
+
+# Handler turning a domain event into send_message events, within the claiming transaction
+Expander = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+# At most this many messages per second (the Telegram broadcast limit is about 30)
+BROADCAST_RATE = 25
+
+# Failed attempts after which an event is given up
+MAX_ATTEMPTS = 8
+
+# Backoff of the n-th retry: RETRY_BASE * 2 ** (n - 1), at most RETRY_MAX
+RETRY_BASE = timedelta(seconds=10)
+RETRY_MAX = timedelta(hours=1)
+
+
+class PermanentError(Exception):
+    """
+    Event failure that retrying cannot fix (unknown kind, missing order, blocked bot).
+    """
+
+
+def retry_at(attempts: int, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Time of the next attempt after ``attempts`` failed ones, None to give up.
+    """
+    if attempts >= MAX_ATTEMPTS:
+        return None
+    delay = min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX)
+    return (now or datetime.now()) + delay
+
+
+def order_notification_text(order) -> str:
+    """
+    Admin notification about a new order (single product or cart).
+    """
+    user = order.user
+    username = user.username if user is not None and user.username else 'Без username'
+    if order.items:
+        header = f"🔔 *Новый заказ #{order.order_id}* (корзина, позиций: {len(order.items)})\n\n"
+        products = "📦 Товары:\n" + "\n".join(
+            f"• {item.product.name} × {item.quantity}" for item in order.items
+        ) + "\n"
+    else:
+        header = f"🔔 *Новый заказ #{order.order_id}*\n\n"
+        products = f"📦 Товар: *{order.product.name}*\n"
+    return (
+        f"{header}"
+        f"👤 Пользователь: @{username} (ID: {order.user_id})\n"
+        f"{products}"
+        f"💰 Сумма: *{order.total_price}₽*\n"
+        f"📅 Дата: {order.created_at.strftime('%d.%m.%Y %H:%M')}\n\n"
+        f"Свяжитесь с клиентом для уточнения деталей доставки."
+    )
+
+
+def promotion_notification_text(promotion) -> str:
+    """
+    Subscriber notification about a new promotion.
+    """
+    if promotion.discount_type == DiscountType.PERCENTAGE.value:
+        discount = f"{promotion.discount_value}%"
+    else:
+        discount = f"{promotion.discount_value}₽"
+    period = f"Действует с {promotion.start_date.strftime('%d.%m.%Y')}"
+    if promotion.end_date:
+        period += f" по {promotion.end_date.strftime('%d.%m.%Y')}"
+    return (
+        f"🎉 *Новая акция в магазине!*\n\n"
+        f"*{promotion.name}*\n"
+        f"{promotion.description or ''}\n\n"
+        f"Скидка: {discount} на выбранные товары\n"
+        f"{period}\n\n"
+        f"Откройте каталог, чтобы увидеть товары со скидкой!"
+    )
+
+
+def price_drop_text(items: List[Dict[str, Any]]) -> str:
+    """
+    Notification about price drops of favorited products (one message per user).
+    """
+    lines = "\n".join(
+        f"• {item['name']}: {item['old_price']:.2f}₽ → {item['new_price']:.2f}₽"
+        for item in sorted(items, key=lambda item: item["name"])
+    )
+    return (
+        f"📉 Снизилась цена на товары из вашего избранного:\n\n"
+        f"{lines}\n\n"
+        f"Откройте избранное, чтобы оформить заказ по новой цене."
+    )
+
+
+def back_in_stock_text(items: List[Dict[str, Any]]) -> str:
+    """
+    Notification about awaited products that are back in stock (one message per user).
+    """
+    lines = "\n".join(f"• {item['name']}" for item in sorted(items, key=lambda item: item["name"]))
+    return (
+        f"🔔 Снова в наличии товары, которые вы ждали:\n\n"
+        f"{lines}\n\n"
+        f"Откройте каталог, чтобы оформить заказ."
+    )
+
+
+def order_status_text(status: str, orders: List[Dict[str, Any]]) -> str:
+    """
+    Notification about orders moved to a new status in bulk (one message per user).
+    """
+    lines = [f"📦 Статус ваших заказов изменен на «{status}»:"]
+    lines += [
+        f"• заказ #{order['order_id']} (был «{order['old_status']}»)"
+        for order in sorted(orders, key=lambda order: order["order_id"])
+    ]
+    return "\n".join(lines)
+
+
+class OutboxDispatcher:
+    """
+    Background processor of the transactional outbox.
+
+    Each batch is claimed with FOR UPDATE SKIP LOCKED and processed inside one
+    transaction, so several bot instances never process the same event. Domain
+    events (order_created, order_status_changed, promotion_created, price_drop, back_in_stock) are expanded into send_message
+    events, each in its own savepoint; send_message events are sent concurrently,
+    paced to the Telegram broadcast limit. Results are committed together: failed
+    events are retried with exponential backoff, then given up.
+    """
+
+    def __init__(self, session_pool: async_sessionmaker, bot: Bot, admin_ids: Sequence[int],
+                 batch_size: int = 100, poll_interval: float = 5.0, rate: int = BROADCAST_RATE):
+        """
+        Initialize dispatcher.
+
+        Args:
+            session_pool: Session pool used to open a session per batch
+            bot: Bot instance used to send messages
+            admin_ids: Recipients of order notifications
+            batch_size: Maximum number of events claimed at once
+            poll_interval: Seconds between polls when nobody calls wake()
+            rate: Maximum number of messages sent per second
+        """
+        self.session_pool = session_pool
+        self.bot = bot
+        self.admin_ids = list(admin_ids)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.rate = rate
+        self._expanders: Dict[str, Expander] = {
+            ORDER_CREATED: self._expand_order_created,
+            ORDER_STATUS_CHANGED: self._expand_order_status_changed,
+            PROMOTION_CREATED: self._expand_promotion_created,
+            PRICE_DROP: self._expand_price_drop,
+            BACK_IN_STOCK: self._expand_back_in_stock,
+        }
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def wake(self) -> None:
+        """
+        Process pending events now instead of at the next poll (called after a commit).
+        """
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        """
+        Start the dispatcher loop.
+        """
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info("Outbox dispatcher started")
+
+    async def stop(self) -> None:
+        """
+        Stop the dispatcher loop. An interrupted batch is rolled back and processed again later.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Outbox batch failed: {e}")
+                processed = 0
+            # A processed batch may have staged new events (expanded notifications)
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def process_batch(self) -> int:
+        """
+        Claim and process one batch of due events.
+
+        Returns:
+            Number of claimed events
+        """
+        async with self.session_pool() as session:
+            repo = OutboxRepo(session)
+            events = await repo.claim_batch(self.batch_size)
+            if not events:
+                return 0
+
+            done: List[int] = []
+            failed: List[Tuple[OutboxEvent, Exception]] = []
+            messages: List[OutboxEvent] = []
+            for event in events:
+                if event.kind == SEND_MESSAGE:
+                    messages.append(event)
+                    continue
+                try:
+                    expander = self._expanders.get(event.kind)
+                    if expander is None:
+                        raise PermanentError(f"unknown event kind {event.kind!r}")
+                    async with session.begin_nested():
+                        await expander(session, event.payload)
+                    done.append(event.event_id)
+                except Exception as e:
+                    failed.append((event, e))
+
+            for event, result in zip(messages, await self._send_all(messages)):
+                if isinstance(result, Exception):
+                    failed.append((event, result))
+                else:
+                    done.append(event.event_id)
+
+            await repo.complete(done)
+            now = datetime.now()
+            for event, error in failed:
+                attempts = event.attempts + 1
+                if isinstance(error, (PermanentError, TelegramForbiddenError, TelegramBadRequest)):
+                    next_attempt = None
+                elif isinstance(error, TelegramRetryAfter):
+                    next_attempt = now + timedelta(seconds=error.retry_after)
+                else:
+                    next_attempt = retry_at(attempts, now)
+                if next_attempt is None:
+                    logger.warning(f"Outbox event {event.event_id} ({event.kind}) given up: {error}")
+                await repo.fail(event.event_id, f"{type(error).__name__}: {error}", next_attempt)
+            await session.commit()
+
+        if failed:
+            logger.info(f"Outbox batch: {len(done)} processed, {len(failed)} failed")
+        return len(events)
+
+    async def _send_all(self, events: List[OutboxEvent]) -> List[Any]:
+        """
+        Sends messages concurrently, at most ``rate`` per second.
+        """
+        loop = asyncio.get_running_loop()
+        results: List[Any] = []
+        for start in range(0, len(events), self.rate):
+            started = loop.time()
+            chunk = events[start:start + self.rate]
+            results.extend(await asyncio.gather(
+                *(self.bot.send_message(
+                    chat_id=event.payload["chat_id"],
+                    text=event.payload["text"],
+                    parse_mode=event.payload.get("parse_mode"),
+                ) for event in chunk),
+                return_exceptions=True
+            ))
+            if start + self.rate < len(events):
+                await asyncio.sleep(max(0.0, 1 - (loop.time() - started)))
+        return results
+
+    async def _expand_order_created(self, session: AsyncSession, payload: Dict[str, Any]) -> None:
+        if not self.admin_ids:
+            logger.warning("No admins configured, order notification skipped")
+            return
+        order = await OrdersRepo(session).get_order_by_id(payload["order_id"], with_user=True)
+        if order is None:
+            raise PermanentError(f"order {payload['order_id']} not found")
+        text = order_notification_text(order)
+        repo = OutboxRepo(session)
+        for admin_id in self.admin_ids:
+            repo.stage(SEND_MESSAGE, {"chat_id": admin_id, "text": text, "parse_mode": "Markdown"})
+        await session.flush()
+
+    async def _expand_order_status_changed(self, session: AsyncSession, payload: Dict[str, Any]) -> None:
+        OutboxRepo(session).stage(SEND_MESSAGE, {
+            "chat_id": payload["user_id"],
+            "text": order_status_text(payload["status"], payload["orders"]),
+            "parse_mode": None,
+        })
+        await session.flush()
+
+    async def _expand_promotion_created(self, session: AsyncSession, payload: Dict[str, Any]) -> None:
+        promotion = await PromotionRepo(session).get_promotion_by_id(payload["promo_id"])
+        if promotion is None:
+            raise PermanentError(f"promotion {payload['promo_id']} not found")
+        staged = await OutboxRepo(session).stage_messages(
+            SubscriptionRepo.subscribers_query(SubscriptionType.PROMOTIONS.value),
+            promotion_notification_text(promotion),
+            parse_mode="Markdown",
+        )
+        logger.info(f"Promotion {promotion.promo_id} notification queued for {staged} subscribers")
+
+    async def _expand_price_drop(self, session: AsyncSession, payload: Dict[str, Any]) -> None:
+        OutboxRepo(session).stage(SEND_MESSAGE, {
+            "chat_id": payload["user_id"],
+            "text": price_drop_text(payload["items"]),
+            "parse_mode": None,
+        })
+        await session.flush()
+
+    async def _expand_back_in_stock(self, session: AsyncSession, payload: Dict[str, Any]) -> None:
+        OutboxRepo(session).stage(SEND_MESSAGE, {
+            "chat_id": payload["user_id"],
+            "text": back_in_stock_text(payload["items"]),
+            "parse_mode": None,
+        })
+        await session.flush()
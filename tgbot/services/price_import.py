@@ -0,0 +1,317 @@
+# tgbot/services/price_import.py
+
+import asyncio
+import csv
+import html
+import logging
+import zipfile
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from infrastructure.database.repositories.products import ProductsRepo
+
+logger = logging.getLogger(__name__)
+
+# Размер пачки строк, проверяемых и загружаемых через COPY за раз
+IMPORT_BATCH_SIZE = 1000
+
+# Сколько отклоненных строк показывать администратору в отчете
+MAX_REPORTED_ERRORS = 15
+
+# Допустимые заголовки колонок прайс-листа
+COLUMN_ALIASES: Dict[str, str] = {
+    "sku": "sku", "артикул": "sku", "код": "sku",
+    "name": "name", "название": "name", "наименование": "name",
+    "description": "description", "описание": "description",
+    "type": "type", "тип": "type",
+    "material": "material", "материал": "material",
+    "price": "price", "цена": "price",
+    "discount_price": "discount_price", "цена со скидкой": "discount_price", "скидка": "discount_price",
+    "stock_quantity": "stock_quantity", "stock": "stock_quantity", "остаток": "stock_quantity",
+    "количество": "stock_quantity",
+    "image_url": "image_url", "изображение": "image_url", "фото": "image_url",
+}
+
+# Максимальная длина строковых колонок (как в модели Product)
+MAX_LENGTHS = {"sku": 64, "name": 100, "type": 50, "material": 50, "image_url": 255}
+
+
+class PriceListError(Exception):
+    """
+    Файл прайс-листа не может быть прочитан (формат, заголовки).
+    """
+
+
+@dataclass
+class ImportReport:
+    """
+    Итог импорта прайс-листа.
+    """
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    rejected: Dict[int, str] = field(default_factory=dict)
+
+    def format(self) -> str:
+        lines = [
+            "📥 <b>Импорт прайс-листа завершен</b>\n",
+            f"➕ Добавлено: {self.inserted}",
+            f"✏️ Обновлено: {self.updated}",
+            f"➖ Без изменений: {self.unchanged}",
+            f"❌ Отклонено: {len(self.rejected)}",
+        ]
+        if self.rejected:
+            lines.append("")
+            for row_no in sorted(self.rejected)[:MAX_REPORTED_ERRORS]:
+                lines.append(f"Строка {row_no}: {html.escape(self.rejected[row_no])}")
+            if len(self.rejected) > MAX_REPORTED_ERRORS:
+                lines.append(f"... и еще {len(self.rejected) - MAX_REPORTED_ERRORS}")
+        return "\n".join(lines)
+
+
+def iter_csv(path: str) -> Iterator[Sequence]:
+    """
+    Построчно читает CSV, определяя разделитель (; или ,) по началу файла.
+    """
+    # Excel в русской локали сохраняет CSV в cp1251
+    with open(path, "rb") as file:
+        raw_sample = file.read(64 * 1024)
+    try:
+        raw_sample.decode("utf-8")
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError as e:
+        # Обрезанный на границе символа UTF-8 не считается ошибкой
+        encoding = "utf-8-sig" if e.start >= len(raw_sample) - 3 else "cp1251"
+
+    try:
+        with open(path, newline="", encoding=encoding) as file:
+            sample = file.read(4096)
+            file.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.reader(file, dialect)
+    except UnicodeDecodeError:
+        raise PriceListError("не удалось определить кодировку файла, сохраните CSV в UTF-8")
+    except csv.Error as e:
+        raise PriceListError(f"некорректный CSV ({e})")
+
+
+def iter_xlsx(path: str) -> Iterator[Sequence]:
+    """
+    Построчно читает первый лист XLSX в режиме только для чтения (без загрузки всего файла).
+    """
+    # openpyxl нужен только для XLSX, поэтому импортируется лениво
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise PriceListError("для импорта XLSX не установлен пакет openpyxl, загрузите CSV")
+
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError):
+        raise PriceListError("файл поврежден или не является книгой Excel")
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    except (KeyError, ValueError, SyntaxError, zipfile.BadZipFile):
+        # SyntaxError - базовый класс ошибок разбора XML листа
+        raise PriceListError("файл поврежден, не удалось прочитать лист")
+    finally:
+        workbook.close()
+
+
+def parse_header(header: Sequence) -> Tuple[List[str], List[int]]:
+    """
+    Сопоставляет заголовки файла с колонками товара.
+
+    Returns:
+        Колонки импорта (sku первой) и индексы соответствующих ячеек строки
+    """
+    positions: Dict[str, int] = {}
+    for index, title in enumerate(header):
+        column = COLUMN_ALIASES.get(str(title or "").strip().lower())
+        if column and column not in positions:
+            positions[column] = index
+    if "sku" not in positions:
+        raise PriceListError("в файле нет колонки «артикул» (sku)")
+    if len(positions) == 1:
+        raise PriceListError("в файле нет ни одной колонки для обновления")
+
+    columns = [column for column in ProductsRepo.IMPORT_COLUMNS if column in positions]
+    return columns, [positions[column] for column in columns]
+
+
+def parse_decimal(value) -> Optional[Decimal]:
+    """
+    Разбирает цену: допускает пробелы между разрядами и запятую как разделитель.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        number = Decimal(str(value))
+    else:
+        number = Decimal(str(value).replace("\xa0", "").replace(" ", "").replace(",", "."))
+    if not number.is_finite() or number < 0:
+        raise InvalidOperation
+    return number.quantize(Decimal("0.01"))
+
+
+def parse_text(cell) -> Optional[str]:
+    """
+    Приводит текстовую ячейку к строке (None для пустой ячейки).
+    """
+    if isinstance(cell, str):
+        cell = cell.strip()
+    # Числовые артикулы из XLSX приходят как float
+    if isinstance(cell, float) and cell.is_integer():
+        cell = int(cell)
+    return str(cell) if cell not in (None, "") else None
+
+
+def validate_row(columns: List[str], cells: List) -> tuple:
+    """
+    Проверяет и приводит значения строки к типам колонок товара.
+
+    Raises:
+        ValueError: С описанием ошибки для отчета
+    """
+    values = []
+    for column, cell in zip(columns, cells):
+        if isinstance(cell, str):
+            cell = cell.strip()
+        if column in ("price", "discount_price"):
+            try:
+                value = parse_decimal(cell)
+            except (InvalidOperation, ValueError):
+                raise ValueError(f"неверная цена «{cell}»")
+            if value is not None and value >= Decimal("100000000"):
+                raise ValueError(f"слишком большая цена «{cell}»")
+            if column == "price" and value is None:
+                raise ValueError("не указана цена")
+        elif column == "stock_quantity":
+            try:
+                value = int(Decimal(str(cell))) if cell not in (None, "") else None
+            except (InvalidOperation, ValueError):
+                raise ValueError(f"неверный остаток «{cell}»")
+            if value is not None and value < 0:
+                raise ValueError("остаток не может быть отрицательным")
+        else:
+            value = parse_text(cell)
+            if column in ("sku", "name") and value is None:
+                raise ValueError("не указано название" if column == "name" else "не указан артикул")
+            if value is not None and len(value) > MAX_LENGTHS.get(column, len(value)):
+                raise ValueError(f"слишком длинное значение в колонке {column}")
+        values.append(value)
+    return tuple(values)
+
+
+class PriceListReader:
+    """
+    Потоково читает прайс-лист и отдает проверенные строки пачками.
+
+    Ошибочные строки не попадают в пачки, а собираются в rejected; их артикулы
+    (если артикул в строке корректен) собираются в rejected_skus, остальные
+    считаются в rejected_without_sku.
+    Ошибки чтения самого файла (кодировка, поврежденный XLSX, некорректный CSV)
+    поднимаются как PriceListError; ошибка посреди файла сохраняется в error.
+    """
+
+    def __init__(self, path: str, filename: str):
+        lower_name = filename.lower()
+        if lower_name.endswith(".csv"):
+            self._rows = iter_csv(path)
+        elif lower_name.endswith(".xlsx"):
+            self._rows = iter_xlsx(path)
+        else:
+            raise PriceListError("поддерживаются только файлы .csv и .xlsx")
+
+        header = next(self._rows, None)
+        if header is None:
+            raise PriceListError("файл пуст")
+        self.columns, self._positions = parse_header(header)
+        self.rejected: Dict[int, str] = {}
+        self.rejected_skus: Set[str] = set()
+        self.rejected_without_sku = 0
+        self.error: Optional[PriceListError] = None
+        # Первая строка - заголовок, нумерация как в табличном редакторе
+        self._row_no = 1
+
+    def kept_skus(self) -> Optional[Set[str]]:
+        """
+        Артикулы отклоненных строк, товары которых нельзя считать отсутствующими
+        в каталоге; None, если у части отклоненных строк артикул не прочитан.
+        """
+        return None if self.rejected_without_sku else self.rejected_skus
+
+    def _next_batch(self) -> List[tuple]:
+        batch: List[tuple] = []
+        for row in self._rows:
+            self._row_no += 1
+            if not any(cell not in (None, "") for cell in row):
+                continue
+            cells = [row[index] if index < len(row) else None for index in self._positions]
+            try:
+                batch.append((self._row_no, *validate_row(self.columns, cells)))
+            except ValueError as e:
+                self.rejected[self._row_no] = str(e)
+                # Артикул всегда первая колонка импорта
+                sku = parse_text(cells[0])
+                if sku is not None and len(sku) <= MAX_LENGTHS["sku"]:
+                    self.rejected_skus.add(sku)
+                else:
+                    self.rejected_without_sku += 1
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                break
+        return batch
+
+    async def batches(self) -> AsyncIterator[List[tuple]]:
+        """
+        Пачки проверенных строк; чтение и проверка выполняются в потоке.
+        """
+        while True:
+            try:
+                batch = await asyncio.to_thread(self._next_batch)
+            except PriceListError as e:
+                # Репозиторий откатывает транзакцию, ошибка показывается после отката
+                self.error = e
+                raise
+            if not batch:
+                return
+            yield batch
+
+
+async def import_price_list(repo: ProductsRepo, path: str, filename: str) -> Optional[ImportReport]:
+    """
+    Импортирует прайс-лист из CSV или XLSX.
+
+    Args:
+        repo: Репозиторий товаров
+        path: Путь к скачанному файлу
+        filename: Исходное имя файла (по расширению определяется формат)
+
+    Returns:
+        Отчет об импорте или None при ошибке базы данных
+
+    Raises:
+        PriceListError: Если файл не удалось прочитать
+    """
+    reader = await asyncio.to_thread(PriceListReader, path, filename)
+    result = await repo.import_price_list(reader.batches(), reader.columns)
+    if result is None:
+        if reader.error is not None:
+            raise reader.error
+        return None
+
+    logger.info(
+        f"Импорт прайс-листа {filename}: добавлено {result['inserted']}, "
+        f"обновлено {result['updated']}, отклонено {len(reader.rejected) + len(result['rejected'])}"
+    )
+    return ImportReport(
+        inserted=result["inserted"],
+        updated=result["updated"],
+        unchanged=result["unchanged"],
+        rejected={**reader.rejected, **result["rejected"]},
+    )
@@ -0,0 +1,243 @@
+# tgbot/services/scheduler.py
+
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from infrastructure.database.repositories.scheduled_jobs import ScheduledJobsRepo
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[AsyncSession], Awaitable[None]]
+NextRunResolver = Callable[[AsyncSession, datetime], Awaitable[Optional[datetime]]]
+
+# Delay before retrying when the next run of a job could not be computed or persisted
+RETRY_DELAY = timedelta(minutes=1)
+
+
+@dataclass
+class Job:
+    """
+    Scheduler job description.
+
+    Attributes:
+        name: Unique job name, also used as the persistence key
+        func: Coroutine function receiving a fresh database session
+        interval: Period for periodic jobs
+        next_run: Resolver of the next run time for event-driven jobs
+    """
+    name: str
+    func: JobFunc
+    interval: Optional[timedelta] = None
+    next_run: Optional[NextRunResolver] = None
+
+
+class JobScheduler:
+    """
+    In-process scheduler running jobs on the asyncio loop.
+
+    Upcoming runs are kept in a heap ordered by run time, the loop sleeps until
+    the earliest one. Next-run times are persisted after every run, so jobs that
+    were due while the bot was offline run right after startup.
+    """
+
+    def __init__(self, session_pool: async_sessionmaker):
+        """
+        Initialize scheduler.
+
+        Args:
+            session_pool: Session pool used to open a session per job run
+        """
+        self.session_pool = session_pool
+        self._jobs: Dict[str, Job] = {}
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._planned: Dict[str, datetime] = {}
+        self._to_resolve: Set[str] = set()
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def add_periodic_job(self, name: str, func: JobFunc, interval: timedelta) -> None:
+        """
+        Register a job running every ``interval``.
+        """
+        self._jobs[name] = Job(name=name, func=func, interval=interval)
+
+    def add_event_job(self, name: str, func: JobFunc, next_run: NextRunResolver) -> None:
+        """
+        Register a job running at times computed by ``next_run`` (e.g. promotion boundaries).
+        """
+        self._jobs[name] = Job(name=name, func=func, next_run=next_run)
+
+    def reschedule(self, name: str) -> None:
+        """
+        Ask the scheduler to recompute the next run of an event-driven job,
+        e.g. after its source data was changed.
+        """
+        if name in self._jobs:
+            self._to_resolve.add(name)
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        """
+        Load persisted next-run times and start the scheduler loop.
+        """
+        now = datetime.now()
+        async with self.session_pool() as session:
+            persisted = await ScheduledJobsRepo(session).get_next_run_times()
+
+            for job in self._jobs.values():
+                run_at = persisted.get(job.name)
+                if job.next_run is not None:
+                    try:
+                        resolved = await job.next_run(session, now)
+                    except Exception as e:
+                        logger.error(f"Failed to resolve next run of job {job.name}: {e}")
+                        await session.rollback()
+                        resolved = None
+                    # A persisted run in the past means a boundary was missed while offline
+                    if run_at is None or run_at <= now:
+                        run_at = now
+                    elif resolved is not None:
+                        run_at = min(run_at, resolved)
+                elif run_at is None:
+                    run_at = now
+                self._plan(job.name, max(run_at, now))
+
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info(f"Scheduler started with {len(self._jobs)} jobs")
+
+    async def stop(self) -> None:
+        """
+        Stop the scheduler loop.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _plan(self, name: str, run_at: datetime) -> None:
+        """
+        Put a job run into the heap. Earlier entries of the same job become stale.
+        """
+        self._planned[name] = run_at
+        heapq.heappush(self._heap, (run_at, next(self._counter), name))
+        self._wakeup.set()
+
+    async def _resolve_pending(self) -> None:
+        """
+        Recompute next runs of event-driven jobs marked by ``reschedule()``.
+
+        A job whose resolver fails is planned to run after RETRY_DELAY (its run
+        resolves the next boundary again); a job without upcoming runs is unplanned.
+        """
+        now = datetime.now()
+        async with self.session_pool() as session:
+            # Names are removed one by one, so a failure to open the session keeps them pending
+            for name in list(self._to_resolve):
+                self._to_resolve.discard(name)
+                job = self._jobs[name]
+                try:
+                    run_at = await job.next_run(session, now)
+                except Exception as e:
+                    logger.error(f"Failed to resolve next run of job {name}: {e}")
+                    await session.rollback()
+                    self._plan(name, now + RETRY_DELAY)
+                    continue
+
+                if run_at is not None:
+                    self._plan(name, max(run_at, now))
+                else:
+                    # The stale heap entry is skipped by the loop once it is not planned
+                    self._planned.pop(name, None)
+                try:
+                    await ScheduledJobsRepo(session).save_run_state(name, run_at)
+                except Exception as e:
+                    logger.error(f"Failed to persist state of job {name}: {e}")
+
+    async def _run_loop(self) -> None:
+        """
+        Main loop: sleep until the earliest planned run, then execute due jobs.
+
+        Errors of the scheduling bookkeeping are logged and the loop goes on,
+        so a database outage does not stop the periodic jobs for good.
+        """
+        while True:
+            try:
+                await self._tick()
+            except Exception as e:
+                logger.exception(f"Scheduler loop error: {e}")
+                await asyncio.sleep(RETRY_DELAY.total_seconds())
+
+    async def _tick(self) -> None:
+        """
+        One loop iteration: execute the earliest due job or wait for it.
+        """
+        self._wakeup.clear()
+        if self._to_resolve:
+            await self._resolve_pending()
+
+        # Drop stale entries left after rescheduling
+        while self._heap and self._planned.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+        now = datetime.now()
+        if self._heap and self._heap[0][0] <= now:
+            _, _, name = heapq.heappop(self._heap)
+            del self._planned[name]
+            try:
+                await self._execute(self._jobs[name])
+            except Exception:
+                # E.g. no session could be opened: retry the job instead of dropping it
+                if name not in self._planned:
+                    self._plan(name, datetime.now() + RETRY_DELAY)
+                raise
+            return
+
+        timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _execute(self, job: Job) -> None:
+        """
+        Run a job in its own session, then plan and persist its next run.
+
+        The next run is planned before it is persisted; if it cannot be computed,
+        the job is retried after RETRY_DELAY instead of being dropped.
+        """
+        started_at = datetime.now()
+        async with self.session_pool() as session:
+            try:
+                await job.func(session)
+            except Exception as e:
+                logger.error(f"Scheduled job {job.name} failed: {e}")
+                await session.rollback()
+
+            try:
+                if job.interval is not None:
+                    next_run_at = started_at + job.interval
+                else:
+                    next_run_at = await job.next_run(session, datetime.now())
+            except Exception as e:
+                logger.error(f"Failed to resolve next run of job {job.name}: {e}")
+                await session.rollback()
+                next_run_at = datetime.now() + RETRY_DELAY
+
+            if next_run_at is not None and job.name not in self._planned:
+                self._plan(job.name, next_run_at)
+
+            try:
+                await ScheduledJobsRepo(session).save_run_state(job.name, next_run_at, last_run_at=started_at)
+            except Exception as e:
+                logger.error(f"Failed to persist state of job {job.name}: {e}")
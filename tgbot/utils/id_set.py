@@ -0,0 +1,50 @@
+"""
+Compact storage of ID sets in FSM data
+"""
+from typing import Iterable, Optional, Set
+
+
+def pack_ids(ids: Iterable[int]) -> str:
+    """
+    Packs a set of IDs into a compact range string, e.g. {1, 2, 3, 7} -> "1-3,7".
+    
+    Args:
+        ids: IDs to pack
+        
+    Returns:
+        Range string (empty string for an empty set)
+    """
+    parts = []
+    start = prev = None
+    for value in sorted(set(ids)):
+        if prev is not None and value == prev + 1:
+            prev = value
+            continue
+        if start is not None:
+            parts.append(str(start) if start == prev else f"{start}-{prev}")
+        start = prev = value
+    if start is not None:
+        parts.append(str(start) if start == prev else f"{start}-{prev}")
+    return ",".join(parts)
+
+
+def unpack_ids(packed: Optional[str]) -> Set[int]:
+    """
+    Unpacks a range string produced by pack_ids() back into a set of IDs.
+    
+    Args:
+        packed: Range string
+        
+    Returns:
+        Set of IDs
+    """
+    ids = set()
+    if not packed:
+        return ids
+    for part in packed.split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            ids.update(range(int(start), int(end) + 1))
+        else:
+            ids.add(int(part))
+    return ids
@@ -0,0 +1,127 @@
+"""
+Message edits that skip the Telegram API call when nothing would change.
+
+The fingerprint (hash of text, parse mode and markup) of every edit made through
+these helpers is remembered per (chat_id, message_id) together with the edit_date
+Telegram returned. A later edit with the same fingerprint is skipped only if the
+message still carries that edit_date, i.e. nobody edited it in between; a
+"message is not modified" error from Telegram is treated as a skipped edit too.
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, Message
+
+logger = logging.getLogger(__name__)
+
+
+def markup_fingerprint(markup: Optional[InlineKeyboardMarkup]) -> Hashable:
+    """
+    Hashable representation of an inline keyboard.
+    """
+    if markup is None:
+        return None
+    return tuple(
+        tuple((button.text, button.callback_data, button.url) for button in row)
+        for row in markup.inline_keyboard
+    )
+
+
+def is_not_modified(error: TelegramBadRequest) -> bool:
+    """
+    Whether Telegram rejected an edit because the content is the same.
+    """
+    return "message is not modified" in str(error)
+
+
+class EditFingerprintCache:
+    """
+    LRU cache of the last content set by the helpers, keyed by (chat_id, message_id).
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[int, Any]]" = OrderedDict()
+
+    @staticmethod
+    def key(message: Message) -> Tuple[int, int]:
+        return message.chat.id, message.message_id
+
+    def is_current(self, message: Message, fingerprint: int) -> bool:
+        """
+        Whether the message shows exactly this content (set by the last helper edit).
+        """
+        entry = self._entries.get(self.key(message))
+        return entry is not None and entry == (fingerprint, message.edit_date)
+
+    def remember(self, message: Message, fingerprint: int, edit_date: Any) -> None:
+        key = self.key(message)
+        self._entries[key] = (fingerprint, edit_date)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns cache size information.
+        """
+        return {"size": len(self._entries), "maxsize": self.maxsize}
+
+
+# Shared cache of the content of edited messages
+edit_fingerprints = EditFingerprintCache()
+
+
+async def _edit(message: Message, fingerprint: int, unchanged: bool, method, **kwargs) -> bool:
+    if unchanged or edit_fingerprints.is_current(message, fingerprint):
+        logger.debug(f"Skipped no-op edit of message {message.message_id} in chat {message.chat.id}")
+        return False
+    try:
+        result = await method(**kwargs)
+    except TelegramBadRequest as e:
+        if not is_not_modified(e):
+            raise
+        edit_fingerprints.remember(message, fingerprint, message.edit_date)
+        return False
+    if isinstance(result, Message):
+        edit_fingerprints.remember(message, fingerprint, result.edit_date)
+    return True
+
+
+async def edit_text(message: Message, text: str,
+                    reply_markup: Optional[InlineKeyboardMarkup] = None,
+                    parse_mode: Optional[str] = None, **kwargs: Any) -> bool:
+    """
+    Message.edit_text() that is skipped when the message already shows this content.
+
+    Returns:
+        True if the message was edited, False if the edit was a no-op
+    """
+    markup = markup_fingerprint(reply_markup)
+    fingerprint = hash(("text", text, parse_mode, markup))
+    # A message that was never edited through the helpers can still be compared
+    # directly, if its text is plain (entities are not known for formatted text)
+    unchanged = (
+        parse_mode is None and message.text == text
+        and markup_fingerprint(message.reply_markup) == markup
+    )
+    return await _edit(
+        message, fingerprint, unchanged, message.edit_text,
+        text=text, reply_markup=reply_markup, parse_mode=parse_mode, **kwargs
+    )
+
+
+async def edit_reply_markup(message: Message,
+                            reply_markup: Optional[InlineKeyboardMarkup] = None) -> bool:
+    """
+    Message.edit_reply_markup() that is skipped when the keyboard is already shown.
+
+    Returns:
+        True if the keyboard was edited, False if the edit was a no-op
+    """
+    markup = markup_fingerprint(reply_markup)
+    fingerprint = hash(("markup", markup))
+    unchanged = markup_fingerprint(message.reply_markup) == markup
+    return await _edit(message, fingerprint, unchanged, message.edit_reply_markup, reply_markup=reply_markup)
@@ -0,0 +1,214 @@
+"""
+Prefix-indexed callback dispatch.
+
+aiogram checks callback handlers of a router one by one, evaluating the filters of
+every handler until one matches. PrefixRouter keeps its callback handlers in a trie
+keyed by the literal callback_data prefix each handler requires, so for an update
+only the handlers whose prefix is a prefix of callback_data are checked.
+
+The prefix is inferred from the filters the handlers are already registered with:
+    F.data == "manage_products"          -> "manage_products"
+    F.data.startswith("select_product_") -> "select_product_"
+    F.data.regexp(r"^order_(\\d+)$")      -> "order_"
+    SomeCallbackData.filter(...)         -> "<prefix>:"
+Handlers without such a filter are always checked, so the index never changes which
+handler wins: candidates are still tried in registration order with all their filters.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters.callback_data import CallbackQueryFilter
+from aiogram.types import TelegramObject
+from magic_filter import MagicFilter
+from magic_filter.operations import CallOperation, ComparatorOperation, FunctionOperation, GetAttributeOperation
+
+# Characters that end the literal part of a regular expression
+_REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+
+def _regex_prefix(pattern: "re.Pattern", anchored: bool) -> Optional[str]:
+    """
+    Returns the literal prefix every string matched by the pattern starts with.
+    """
+    if pattern.flags & re.IGNORECASE:
+        return None
+    source = pattern.pattern
+    if "|" in source:
+        return None
+    if source.startswith("^"):
+        source = source[1:]
+    elif source.startswith("\\A"):
+        source = source[2:]
+    elif not anchored:
+        return None
+
+    prefix = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\" and i + 1 < len(source) and not source[i + 1].isalnum():
+            prefix.append(source[i + 1])
+            i += 2
+        elif char in _REGEX_SPECIAL:
+            # A quantifier makes the previous literal optional
+            if char in "*?{" and prefix:
+                prefix.pop()
+            break
+        else:
+            prefix.append(char)
+            i += 1
+    return "".join(prefix)
+
+
+def _magic_prefixes(magic: MagicFilter) -> Optional[List[str]]:
+    """
+    Extracts required callback_data prefixes from F.data filters.
+    """
+    operations = magic._operations
+    if not operations or not isinstance(operations[0], GetAttributeOperation) or operations[0].name != "data":
+        return None
+
+    if len(operations) == 2:
+        operation = operations[1]
+        # F.data == "value"
+        if isinstance(operation, ComparatorOperation) and operation.comparator.__name__ == "eq":
+            if isinstance(operation.right, str):
+                return [operation.right]
+        # F.data.regexp(...)
+        if isinstance(operation, FunctionOperation) and not operation.args and not operation.kwargs:
+            pattern = getattr(operation.function, "__self__", None)
+            if isinstance(pattern, re.Pattern):
+                prefix = _regex_prefix(pattern, anchored=operation.function.__name__ in ("match", "fullmatch"))
+                return [prefix] if prefix is not None else None
+        return None
+
+    # F.data.startswith("prefix") / F.data.startswith(("a", "b"))
+    if (
+        len(operations) == 3
+        and isinstance(operations[1], GetAttributeOperation)
+        and operations[1].name == "startswith"
+        and isinstance(operations[2], CallOperation)
+        and len(operations[2].args) == 1
+        and not operations[2].kwargs
+    ):
+        value = operations[2].args[0]
+        if isinstance(value, str):
+            return [value]
+        if isinstance(value, tuple) and all(isinstance(item, str) for item in value):
+            return list(value)
+    return None
+
+
+def callback_prefixes(handler: HandlerObject) -> List[str]:
+    """
+    Returns the callback_data prefixes one of which is required by the handler filters.
+
+    An empty string means the handler may match any callback_data.
+    """
+    best: Optional[List[str]] = None
+    for filter_object in handler.filters or ():
+        target = getattr(filter_object, "magic", None) or filter_object.callback
+        if isinstance(target, MagicFilter):
+            prefixes = _magic_prefixes(target)
+        elif isinstance(target, CallbackQueryFilter):
+            callback_data = target.callback_data
+            prefixes = [f"{callback_data.__prefix__}{callback_data.__separator__}"]
+        else:
+            prefixes = None
+
+        # Every filter must pass, so the most selective one is enough
+        if prefixes and (best is None or min(map(len, prefixes)) > min(map(len, best))):
+            best = prefixes
+    return best or [""]
+
+
+class _TrieNode:
+    __slots__ = ("children", "handlers")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.handlers: List[int] = []
+
+
+class PrefixTrie:
+    """
+    Character trie mapping callback_data prefixes to handler positions.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def insert(self, prefix: str, position: int) -> None:
+        node = self.root
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        node.handlers.append(position)
+
+    def match(self, data: str) -> List[int]:
+        """
+        Returns positions of handlers whose prefix is a prefix of data, in registration order.
+        """
+        node = self.root
+        found: Set[int] = set(node.handlers)
+        for char in data:
+            node = node.children.get(char)
+            if node is None:
+                break
+            found.update(node.handlers)
+        return sorted(found)
+
+
+class PrefixCallbackObserver(TelegramEventObserver):
+    """
+    Callback query observer that checks only the handlers indexed for the callback_data prefix.
+    """
+
+    def __init__(self, router: Router, event_name: str):
+        super().__init__(router=router, event_name=event_name)
+        self.trie = PrefixTrie()
+
+    def register(self, callback, *filters, flags: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        result = super().register(callback, *filters, flags=flags, **kwargs)
+        position = len(self.handlers) - 1
+        for prefix in callback_prefixes(self.handlers[position]):
+            self.trie.insert(prefix, position)
+        return result
+
+    def candidates(self, event: TelegramObject) -> Iterable[HandlerObject]:
+        data = getattr(event, "data", None)
+        if data is None:
+            return [self.handlers[position] for position in self.trie.match("")]
+        return [self.handlers[position] for position in self.trie.match(data)]
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        # Same loop as TelegramEventObserver.trigger, but over the indexed candidates only
+        for handler in self.candidates(event):
+            kwargs["handler"] = handler
+            result, data = await handler.check(event, **kwargs)
+            if result:
+                kwargs.update(data)
+                try:
+                    wrapped_inner = self.outer_middleware.wrap_middlewares(
+                        self._resolve_middlewares(),
+                        handler.call,
+                    )
+                    return await wrapped_inner(event, kwargs)
+                except SkipHandler:
+                    continue
+
+        return UNHANDLED
+
+
+class PrefixRouter(Router):
+    """
+    Router whose callback query handlers are dispatched through a prefix trie.
+    """
+
+    def __init__(self, *, name: Optional[str] = None):
+        super().__init__(name=name)
+        self.callback_query = PrefixCallbackObserver(router=self, event_name="callback_query")
+        self.observers["callback_query"] = self.callback_query
@@ -0,0 +1,149 @@
+"""
+Render cache for keyboards and product cards.
+
+Static menus are built once (at startup via precompile_static_markups()) and reused,
+per-product keyboards are memoized by their arguments, and product card texts are
+memoized per product version (updated_at, current price, stock and rating), so a card
+is rendered again only after the product was changed.
+
+There is no warm-up job in the scheduler: static markups never go stale after the
+startup precompilation, and rendering a card on its first view costs about as much as
+a dozen attribute reads, far less than loading the catalog to warm the cache up front.
+"""
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+from infrastructure.database.models.products import Product
+
+# Builders of static markups registered with @static_markup
+_static_builders: List[Callable[[], InlineKeyboardMarkup]] = []
+
+
+def static_markup(func: Callable[[], InlineKeyboardMarkup]) -> Callable[[], InlineKeyboardMarkup]:
+    """
+    Decorator for keyboards without arguments: the markup is built once and reused.
+
+    The returned markup object is shared, so callers must not modify it.
+    """
+    cached = functools.cache(func)
+    _static_builders.append(cached)
+    return cached
+
+
+def keyed_markup(func: Callable[..., InlineKeyboardMarkup]) -> Callable[..., InlineKeyboardMarkup]:
+    """
+    Decorator for keyboards depending only on hashable arguments (e.g. product_id).
+
+    The returned markup object is shared, so callers must not modify it.
+    """
+    return functools.lru_cache(maxsize=1024)(func)
+
+
+def precompile_static_markups() -> int:
+    """
+    Builds all registered static markups, so the first click does not pay for it.
+
+    Returns:
+        Number of precompiled markups
+    """
+    for builder in _static_builders:
+        builder()
+    return len(_static_builders)
+
+
+class ProductCardCache:
+    """
+    LRU cache of rendered product cards keyed by (kind, product_id).
+
+    Every entry stores the product version it was rendered for; an entry of an
+    older version is rendered again, so stale cards are never served even if
+    invalidate() was not called.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._cards: "OrderedDict[Tuple[str, int], Tuple[Hashable, Any]]" = OrderedDict()
+
+    @staticmethod
+    def version(product: Product) -> Hashable:
+        """
+        Product version used as the cache key (changes on every product update).
+
+        Review changes keep updated_at, so the rating aggregates are part of the version.
+        Loaded values are read from the instance dict: going through the instrumented
+        attributes costs about as much as rendering the card itself.
+        """
+        values = product.__dict__
+        return (
+            values.get("updated_at"), values.get("price"), values.get("effective_price"),
+            values.get("is_in_stock"), values.get("rating_count"), values.get("rating_sum")
+        )
+
+    def get(self, product: Product, kind: str, render: Callable[[Product], Any]) -> Any:
+        """
+        Returns a cached card of the given kind, rendering it if missing or outdated.
+        """
+        key = (kind, product.product_id)
+        version = self.version(product)
+        entry = self._cards.get(key)
+        if entry is not None and entry[0] == version:
+            self._cards.move_to_end(key)
+            return entry[1]
+
+        card = render(product)
+        self._cards[key] = (version, card)
+        self._cards.move_to_end(key)
+        if len(self._cards) > self.maxsize:
+            self._cards.popitem(last=False)
+        return card
+
+    def invalidate(self, product_id: int) -> None:
+        """
+        Drops all cached cards of a product (after edit or deletion).
+        """
+        for key in [key for key in self._cards if key[1] == product_id]:
+            del self._cards[key]
+
+    def clear(self) -> None:
+        """
+        Drops all cached cards.
+        """
+        self._cards.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns cache size information.
+        """
+        return {"size": len(self._cards), "maxsize": self.maxsize}
+
+
+def user_card_text(product: Product) -> str:
+    """
+    Текст карточки товара для пользователя (Markdown).
+    """
+    text = (
+        f"*{product.name}*\n\n"
+        f"{product.description}\n"
+        f"🔹 *Тип:* {product.type}\n"
+        f"🔹 *Материал:* {product.material}\n"
+        f"💰 *Цена:* {product.formatted_price()}"
+    )
+    if product.rating_count:
+        text += f"\n⭐ *Рейтинг:* {product.average_rating} из 5 (отзывов: {product.rating_count})"
+    if not product.is_in_stock:
+        text += "\n\n❌ *Нет в наличии* — нажмите «Сообщить о поступлении», и мы напишем, когда товар появится."
+    return text
+
+
+def admin_card_text(product: Product) -> str:
+    """
+    Текст карточки товара для администратора.
+    """
+    return product.formatted_info()
+
+
+# Shared cache of rendered product cards
+product_cards = ProductCardCache()